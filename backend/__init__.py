@@ -1,3 +1,10 @@
 """Backend package initialization."""
 
-from .app import create_app  # noqa: F401
+
+def __getattr__(name):
+    # Imported lazily so subpackages (e.g. the RAG tools loaded by ingestion
+    # pool processes) can be imported without building the Flask app
+    if name == "create_app":
+        from .app import create_app
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,26 +5,43 @@ Provider-agnostic interfaces for LLM and embedding services
 
 import os
 import abc
+import asyncio
+import contextvars
+import hashlib
+import json
 import logging
-from typing import List, Dict, Any, Optional, Union
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Callable, Optional, Union, Iterator, Tuple, Coroutine
 from datetime import datetime
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    httpx = None
 
 try:
     import openai
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
+    AsyncOpenAI = None
 
 try:
-    from groq import Groq
+    import groq
+    from groq import Groq, AsyncGroq
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
     Groq = None
+    AsyncGroq = None
 
 # support running as a module (recommended) and as a script
 try:
@@ -49,6 +66,53 @@ except Exception:
 logger = logging.getLogger(__name__)
 
 
+def _http_limits(config: Config):
+    """Connection pool limits shared by every provider HTTP client"""
+    return httpx.Limits(
+        max_connections=config.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.AI_HTTP_MAX_KEEPALIVE
+    )
+
+
+class AsyncRunner:
+    """
+    Event loop on a daemon thread for running provider coroutines from
+    synchronous code. Async HTTP clients are bound to the loop they first
+    run on, so keeping a single loop lets their connection pools be reused
+    across requests.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="ai-provider-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result; on timeout the coroutine is cancelled"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+
+_async_runner = AsyncRunner()
+
+
+def get_async_runner() -> AsyncRunner:
+    """Get the shared event loop runner for provider coroutines"""
+    return _async_runner
+
+
 class LLMProvider(abc.ABC):
     """Abstract base class for LLM providers"""
 
@@ -62,6 +126,15 @@ class LLMProvider(abc.ABC):
         """Chat completion with message history"""
         pass
 
+    def chat_stream(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Chat completion yielding text deltas as they arrive (providers without streaming yield one delta)"""
+        yield self.chat(messages, params)
+
+    async def achat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> str:
+        """Async chat completion (providers without an async client run chat() in a worker thread)"""
+        return await asyncio.wait_for(asyncio.to_thread(self.chat, messages, params), timeout)
+
     @abc.abstractmethod
     def healthcheck(self) -> bool:
         """Check if provider is available"""
@@ -87,21 +160,34 @@ class EmbeddingProvider(abc.ABC):
         """Generate embeddings for batch of texts"""
         pass
 
+    async def aembed_batch(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Async batch embedding (providers without an async client run embed_batch() in a worker thread)"""
+        return await asyncio.wait_for(asyncio.to_thread(self.embed_batch, texts), timeout)
+
 
 class OpenAILLMProvider(LLMProvider):
     """OpenAI LLM provider implementation"""
 
-    def __init__(self, api_key: str, model: str = "gpt-4", timeout: int = 30):
+    def __init__(self, api_key: str, model: str = "gpt-4", timeout: int = 30, base_url: Optional[str] = None):
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI package not installed")
         if not api_key:
             raise ValueError("OpenAI API key required")
 
-        self.client = OpenAI(api_key=api_key)
+        config = Config()
+        self.api_key = api_key
+        self.base_url = base_url
+        self.limits = _http_limits(config)
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            http_client=openai.DefaultHttpxClient(limits=self.limits)
+        )
+        self._async_client = None
         self.model = model
         self.timeout = timeout
         self.last_token_usage = 0
-        config = Config()
         self.default_params = {
             "max_tokens": config.AI_MAX_TOKENS,
             "temperature": config.AI_TEMPERATURE,
@@ -140,6 +226,70 @@ class OpenAILLMProvider(LLMProvider):
             logger.error(f"OpenAI API error: {str(e)}")
             raise
 
+    def chat_stream(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        request_params = {**self.default_params}
+        if params:
+            request_params.update(params)
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **request_params
+            )
+
+            self.last_token_usage = 0
+            try:
+                for chunk in stream:
+                    # The final chunk carries usage and no choices
+                    if chunk.usage:
+                        self.last_token_usage = chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Stops the HTTP response when the consumer goes away mid-stream
+                stream.close()
+        except Exception as e:
+            logger.error(f"OpenAI API streaming error: {str(e)}")
+            raise
+
+    def _get_async_client(self):
+        # Created lazily so it binds to the loop it is first used on (normally the shared AsyncRunner loop)
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=openai.DefaultAsyncHttpxClient(limits=self.limits)
+            )
+        return self._async_client
+
+    async def achat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> str:
+        request_params = {**self.default_params}
+        if params:
+            request_params.update(params)
+
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=self.model,
+                messages=messages,
+                timeout=timeout or self.timeout,
+                **request_params
+            )
+
+            # Track token usage
+            self.last_token_usage = response.usage.total_tokens if response.usage else 0
+
+            return response.choices[0].message.content.strip()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise
+
     def get_last_token_usage(self) -> int:
         """Get the token usage from the last API call"""
         return self.last_token_usage
@@ -162,11 +312,14 @@ class GroqLLMProvider(LLMProvider):
         if not api_key:
             raise ValueError("Groq API key required")
 
-        self.client = Groq(api_key=api_key)
+        config = Config()
+        self.api_key = api_key
+        self.limits = _http_limits(config)
+        self.client = Groq(api_key=api_key, timeout=timeout, http_client=groq.DefaultHttpxClient(limits=self.limits))
+        self._async_client = None
         self.model = model
         self.timeout = timeout
         self.last_token_usage = 0
-        config = Config()
         self.default_params = {
             "max_tokens": config.AI_MAX_TOKENS,
             "temperature": config.AI_TEMPERATURE,
@@ -205,6 +358,68 @@ class GroqLLMProvider(LLMProvider):
             logger.error(f"Groq API error: {str(e)}")
             raise
 
+    def chat_stream(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        request_params = {**self.default_params}
+        if params:
+            request_params.update(params)
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                **request_params
+            )
+
+            self.last_token_usage = 0
+            try:
+                for chunk in stream:
+                    # Groq reports usage on the final chunk under x_groq
+                    x_groq = getattr(chunk, 'x_groq', None)
+                    if x_groq is not None and getattr(x_groq, 'usage', None):
+                        self.last_token_usage = x_groq.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+        except Exception as e:
+            logger.error(f"Groq API streaming error: {str(e)}")
+            raise
+
+    def _get_async_client(self):
+        # Created lazily so it binds to the loop it is first used on (normally the shared AsyncRunner loop)
+        if self._async_client is None:
+            self._async_client = AsyncGroq(
+                api_key=self.api_key,
+                timeout=self.timeout,
+                http_client=groq.DefaultAsyncHttpxClient(limits=self.limits)
+            )
+        return self._async_client
+
+    async def achat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> str:
+        request_params = {**self.default_params}
+        if params:
+            request_params.update(params)
+
+        try:
+            response = await self._get_async_client().chat.completions.create(
+                model=self.model,
+                messages=messages,
+                timeout=timeout or self.timeout,
+                **request_params
+            )
+
+            # Track token usage
+            self.last_token_usage = response.usage.total_tokens if response.usage else 0
+
+            return response.choices[0].message.content.strip()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Groq API error: {str(e)}")
+            raise
+
     def get_last_token_usage(self) -> int:
         """Get the token usage from the last API call"""
         return self.last_token_usage
@@ -218,33 +433,375 @@ class GroqLLMProvider(LLMProvider):
             return False
 
 
-class LocalLLMProvider(LLMProvider):
-    """Local LLM provider (placeholder for future implementation)"""
+class LocalLLMProvider(OpenAILLMProvider):
+    """
+    Self-hosted model behind an OpenAI-compatible API (llama.cpp server,
+    vLLM, Ollama and similar), reached at LOCAL_LLM_URL
+    """
+
+    def __init__(self, base_url: str, model: str = "local", timeout: int = 30):
+        if not base_url:
+            raise ValueError("LOCAL_LLM_URL required for local LLM provider")
+        # Local servers ignore the key, but the OpenAI client requires one
+        super().__init__(api_key="local", model=model, timeout=timeout, base_url=base_url)
+
+
+class ProviderStats:
+    """Rolling latency and error statistics for one LLM provider"""
+
+    def __init__(self, window: int = 200):
+        self._latencies: deque = deque(maxlen=window)  # Seconds per successful completion
+        self._first_token: deque = deque(maxlen=window)  # Seconds to first streamed token
+        self._outcomes: deque = deque(maxlen=window)  # True for success
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency: float, first_token: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.consecutive_failures = 0
+            (self._first_token if first_token else self._latencies).append(latency)
+            self._outcomes.append(True)
+
+    def record_failure(self, cooldown_seconds: float, failure_threshold: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._outcomes.append(False)
+            if self.consecutive_failures >= failure_threshold:
+                self.cooldown_until = time.monotonic() + cooldown_seconds
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def latency_percentile(self, percentile: float, first_token: bool = False) -> Optional[float]:
+        """Rolling latency percentile in seconds, or None without samples"""
+        with self._lock:
+            samples = sorted(self._first_token if first_token else self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile / 100 * len(samples)))]
+
+    def sample_count(self) -> int:
+        return len(self._latencies)
+
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate(), 4),
+            'p50_ms': ms(self.latency_percentile(50)),
+            'p95_ms': ms(self.latency_percentile(95)),
+            'p99_ms': ms(self.latency_percentile(99)),
+            'first_token_p50_ms': ms(self.latency_percentile(50, first_token=True)),
+            'first_token_p99_ms': ms(self.latency_percentile(99, first_token=True)),
+            'available': self.available,
+        }
+
 
-    def __init__(self, model_path: str = None):
-        # Placeholder - would implement local model loading
-        raise NotImplementedError("Local LLM provider not yet implemented")
+class AllProvidersFailedError(RuntimeError):
+    """Raised when every configured LLM provider failed a request"""
+
+
+class RoutingLLMProvider(LLMProvider):
+    """
+    Routes completions across several LLM providers.
+
+    Providers are tried in configured order (primary first). A provider
+    that fails failure_threshold times in a row is skipped for
+    cooldown_seconds, unless no other provider is left. Requests fail over
+    to the next provider on error.
+
+    With hedging on, a completion still running on the first provider
+    after the hedge delay is also sent to the second one and the first
+    reply wins. The delay is hedge_delay seconds, or else the first
+    provider's rolling p95 latency (DEFAULT_HEDGE_DELAY until it has
+    enough samples). Streams fail over only before their first token.
+
+    The answering provider and token usage are kept per thread / asyncio
+    task, so concurrent callers each bill their own call.
+    """
+
+    # Samples needed before the rolling p95 is trusted as the hedge delay
+    MIN_HEDGE_SAMPLES = 20
+    DEFAULT_HEDGE_DELAY = 2.0
+
+    def __init__(
+        self,
+        providers: Dict[str, LLMProvider],
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        cooldown_seconds: float = 30.0,
+        failure_threshold: int = 3,
+        hedge_pool_size: int = 32
+    ):
+        if not providers:
+            raise ValueError("At least one LLM provider required")
+
+        self.providers = dict(providers)
+        self.stats = {name: ProviderStats() for name in self.providers}
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.cooldown_seconds = cooldown_seconds
+        self.failure_threshold = failure_threshold
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._token_usage: contextvars.ContextVar = contextvars.ContextVar(f"routing_usage_{id(self)}", default=0)
+        self._answered_by: contextvars.ContextVar = contextvars.ContextVar(f"routing_answered_{id(self)}", default=None)
+        # Hedged requests run here; each one in flight holds a thread until its provider replies
+        self._pool = ThreadPoolExecutor(max_workers=max(1, hedge_pool_size), thread_name_prefix="llm-route")
+
+    @property
+    def last_token_usage(self) -> int:
+        return self._token_usage.get()
+
+    @property
+    def last_answered_by(self) -> Optional[str]:
+        return self._answered_by.get()
+
+    def _candidates(self) -> List[Tuple[str, LLMProvider]]:
+        """Available providers in configured order, then those cooling down as a last resort"""
+        ordered = list(self.providers.items())
+        return [item for item in ordered if self.stats[item[0]].available] + \
+            [item for item in ordered if not self.stats[item[0]].available]
+
+    def _get_hedge_delay(self, name: str) -> float:
+        if self.hedge_delay:
+            return self.hedge_delay
+        stats = self.stats[name]
+        if stats.sample_count() >= self.MIN_HEDGE_SAMPLES:
+            return stats.latency_percentile(95)
+        return self.DEFAULT_HEDGE_DELAY
+
+    def _timed_chat(self, name: str, provider: LLMProvider, messages: List[Dict[str, str]],
+                    params: Optional[Dict[str, Any]]) -> Tuple[str, int]:
+        """(reply, token usage); usage is read straight after the call, in the thread that made it"""
+        started = time.perf_counter()
+        try:
+            reply = provider.chat(messages, params)
+        except Exception:
+            self.stats[name].record_failure(self.cooldown_seconds, self.failure_threshold)
+            raise
+        self.stats[name].record_success(time.perf_counter() - started)
+        return reply, getattr(provider, 'last_token_usage', 0)
+
+    def _answered(self, name: str, result: Tuple[str, int]) -> str:
+        reply, usage = result
+        self._token_usage.set(usage)
+        self._answered_by.set(name)
+        return reply
 
     def generate(self, prompt: str, context: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> str:
-        raise NotImplementedError("Local LLM generation not implemented")
+        messages = [{"role": "system", "content": prompt}]
+        if context:
+            messages.append({"role": "user", "content": context})
+        else:
+            messages = [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt}
+            ]
+        return self.chat(messages, params)
 
     def chat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
-        raise NotImplementedError("Local LLM chat not implemented")
+        candidates = self._candidates()
+        errors = []
+
+        if self.hedge and len(candidates) > 1:
+            try:
+                return self._hedged_chat(candidates[0], candidates[1], messages, params)
+            except AllProvidersFailedError as e:
+                errors.append(str(e))
+                candidates = candidates[2:]
+
+        for name, provider in candidates:
+            try:
+                return self._answered(name, self._timed_chat(name, provider, messages, params))
+            except Exception as e:
+                logger.warning(f"LLM provider {name} failed, trying next: {e}")
+                errors.append(f"{name}: {e}")
+
+        raise AllProvidersFailedError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    def _hedged_chat(self, first: Tuple[str, LLMProvider], second: Tuple[str, LLMProvider],
+                     messages: List[Dict[str, str]], params: Optional[Dict[str, Any]]) -> str:
+        """Run on first; start second once first passes the hedge delay (or fails), and take the first reply"""
+        pending = {self._pool.submit(self._timed_chat, *first, messages, params): first[0]}
+        second_started = False
+        hedged = False
+        errors = []
+
+        while pending:
+            timeout = None if second_started else self._get_hedge_delay(first[0])
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                if hedged and name == second[0]:
+                    self.hedges_won += 1
+                # The slower request keeps running in the pool and still updates its provider's stats
+                return self._answered(name, answer)
+
+            if not second_started:
+                hedged = not done
+                if hedged:
+                    self.hedges_sent += 1
+                pending[self._pool.submit(self._timed_chat, *second, messages, params)] = second[0]
+                second_started = True
+
+        raise AllProvidersFailedError('; '.join(errors))
+
+    async def achat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> str:
+        candidates = self._candidates()
+        errors = []
+
+        if self.hedge and len(candidates) > 1:
+            try:
+                return await self._ahedged_chat(candidates[0], candidates[1], messages, params, timeout)
+            except AllProvidersFailedError as e:
+                errors.append(str(e))
+                candidates = candidates[2:]
+
+        for name, provider in candidates:
+            try:
+                return self._answered(name, await self._atimed_chat(name, provider, messages, params, timeout))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"LLM provider {name} failed, trying next: {e}")
+                errors.append(f"{name}: {e}")
+
+        raise AllProvidersFailedError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    async def _atimed_chat(self, name: str, provider: LLMProvider, messages: List[Dict[str, str]],
+                           params: Optional[Dict[str, Any]], timeout: Optional[float]) -> Tuple[str, int]:
+        started = time.perf_counter()
+        try:
+            reply = await provider.achat(messages, params, timeout=timeout)
+        except asyncio.CancelledError:
+            raise  # Lost a hedge race; not the provider's fault
+        except Exception:
+            self.stats[name].record_failure(self.cooldown_seconds, self.failure_threshold)
+            raise
+        self.stats[name].record_success(time.perf_counter() - started)
+        return reply, getattr(provider, 'last_token_usage', 0)
+
+    async def _ahedged_chat(self, first: Tuple[str, LLMProvider], second: Tuple[str, LLMProvider],
+                            messages: List[Dict[str, str]], params: Optional[Dict[str, Any]],
+                            timeout: Optional[float]) -> str:
+        """Async form of _hedged_chat; the losing request is cancelled"""
+        pending = {asyncio.ensure_future(self._atimed_chat(*first, messages, params, timeout)): first[0]}
+        second_started = False
+        hedged = False
+        errors = []
+
+        try:
+            while pending:
+                wait_timeout = None if second_started else self._get_hedge_delay(first[0])
+                done, _ = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        answer = task.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {e}")
+                        continue
+                    if hedged and name == second[0]:
+                        self.hedges_won += 1
+                    return self._answered(name, answer)
+
+                if not second_started:
+                    hedged = not done
+                    if hedged:
+                        self.hedges_sent += 1
+                    pending[asyncio.ensure_future(self._atimed_chat(*second, messages, params, timeout))] = second[0]
+                    second_started = True
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise AllProvidersFailedError('; '.join(errors))
+
+    def chat_stream(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        errors = []
+        for name, provider in self._candidates():
+            started = time.perf_counter()
+            streamed = False
+            try:
+                for delta in provider.chat_stream(messages, params):
+                    if not streamed:
+                        streamed = True
+                        self.stats[name].record_success(time.perf_counter() - started, first_token=True)
+                    yield delta
+                self._token_usage.set(getattr(provider, 'last_token_usage', 0))
+                self._answered_by.set(name)
+                return
+            except Exception as e:
+                if streamed:
+                    raise  # Part of the answer is already out; another provider cannot continue it
+                self.stats[name].record_failure(self.cooldown_seconds, self.failure_threshold)
+                logger.warning(f"LLM provider {name} failed to stream, trying next: {e}")
+                errors.append(f"{name}: {e}")
+
+        raise AllProvidersFailedError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    def get_last_token_usage(self) -> int:
+        return self.last_token_usage
+
+    def get_last_model(self) -> Tuple[Optional[str], Optional[str]]:
+        """(provider name, model) of the provider that answered this caller's last call"""
+        name = self._answered_by.get()
+        if name is None:
+            return None, None
+        return name, getattr(self.providers[name], 'model', None)
 
     def healthcheck(self) -> bool:
-        return False
+        return any(provider.healthcheck() for provider in self.providers.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider rolling latency and error statistics, plus hedging counts"""
+        return {
+            'providers': {name: stats.snapshot() for name, stats in self.stats.items()},
+            'order': [name for name, _ in self._candidates()],
+            'hedging': self.hedge,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+        }
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
     """OpenAI embedding provider"""
 
-    def __init__(self, api_key: str, model: str = "text-embedding-ada-002", dimensions: int = 1536):
+    def __init__(self, api_key: str, model: str = "text-embedding-ada-002", dimensions: int = 1536, timeout: int = 30):
         if not OPENAI_AVAILABLE:
             raise ImportError("OpenAI package not installed")
         if not api_key:
             raise ValueError("OpenAI API key required")
 
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limits = _http_limits(Config())
+        self.client = OpenAI(api_key=api_key, timeout=timeout, http_client=openai.DefaultHttpxClient(limits=self.limits))
+        self._async_client = None
         self.model = model
         self._embedding_dimension = dimensions
 
@@ -266,6 +823,27 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
             logger.error(f"OpenAI embedding error: {str(e)}")
             raise
 
+    async def aembed_batch(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                timeout=self.timeout,
+                http_client=openai.DefaultAsyncHttpxClient(limits=self.limits)
+            )
+
+        try:
+            response = await self._async_client.embeddings.create(
+                input=texts,
+                model=self.model,
+                timeout=timeout or self.timeout
+            )
+            return [data.embedding for data in response.data]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"OpenAI embedding error: {str(e)}")
+            raise
+
 
 class HuggingFaceEmbeddingProvider(EmbeddingProvider):
     """HuggingFace Spaces embedding provider"""
@@ -313,6 +891,270 @@ class HuggingFaceEmbeddingProvider(EmbeddingProvider):
             raise
 
 
+class SingleFlight:
+    """
+    Shares in-flight calls between concurrent identical requests.
+
+    The first caller for a key becomes the leader and makes the call;
+    callers arriving with the same key before it finishes wait for the
+    leader's result (or exception) instead of making their own. Nothing is
+    kept once the call finishes, so this is not a cache.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._metrics = {'calls': 0, 'shared': 0}
+
+    def claim(self, keys: List[str]) -> Tuple[Dict[str, Future], Dict[str, Future]]:
+        """
+        Split keys into those this caller now leads and those already in flight.
+
+        Returns:
+            (owned, shared) dicts of key -> Future; the caller must resolve
+            every owned future with resolve() or fail()
+        """
+        owned: Dict[str, Future] = {}
+        shared: Dict[str, Future] = {}
+        with self._lock:
+            for key in keys:
+                if key in owned or key in shared:
+                    continue
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = Future()
+                    owned[key] = call
+                else:
+                    shared[key] = call
+            self._metrics['calls'] += len(owned)
+            self._metrics['shared'] += len(shared)
+        return owned, shared
+
+    def resolve(self, owned: Dict[str, Future], results: Dict[str, Any]) -> None:
+        """Complete owned calls with their results; any without a result fail, so no follower is left waiting"""
+        self._release(owned)
+        for key, call in owned.items():
+            if call.done():
+                continue
+            if key in results:
+                call.set_result(results[key])
+            else:
+                call.set_exception(RuntimeError("Coalesced request returned no result for this input"))
+
+    def fail(self, owned: Dict[str, Future], error: BaseException) -> None:
+        self._release(owned)
+        for call in owned.values():
+            if not call.done():
+                call.set_exception(error)
+
+    def _release(self, owned: Dict[str, Future]) -> None:
+        with self._lock:
+            for key, call in owned.items():
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already in flight"""
+        owned, shared = self.claim([key])
+        if shared:
+            return shared[key].result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.fail(owned, e)
+            raise
+        self.resolve(owned, {key: result})
+        return result
+
+    async def ado(self, key: str, coro_factory: Callable[[], Coroutine]) -> Any:
+        """Async form of do; a follower that is cancelled does not cancel the leader's call"""
+        owned, shared = self.claim([key])
+        if shared:
+            return await asyncio.shield(asyncio.wrap_future(shared[key]))
+        try:
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            self.fail(owned, RuntimeError("Coalesced request was cancelled"))
+            raise
+        except Exception as e:
+            self.fail(owned, e)
+            raise
+        self.resolve(owned, {key: result})
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['in_flight'] = len(self._calls)
+        total = metrics['calls'] + metrics['shared']
+        metrics['shared_rate'] = metrics['shared'] / total if total else 0.0
+        return metrics
+
+
+def request_key(kind: str, model: str, payload: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Coalescing key for a provider call: kind, model, params and a hash of the content"""
+    content = json.dumps([payload, params or {}], sort_keys=True, default=str)
+    return f"{kind}:{model}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
+class CoalescingLLMProvider(LLMProvider):
+    """
+    Wraps an LLM provider so concurrent identical completions (same model,
+    messages and params) share one provider call. Streams are passed
+    through, since one token stream cannot be replayed to several callers.
+
+    Token usage is reported per caller: the caller whose request was sent
+    sees the call's usage, callers that shared its result see 0, so usage
+    is billed once.
+    """
+
+    def __init__(self, provider: LLMProvider, flights: Optional[SingleFlight] = None):
+        self.provider = provider
+        self.flights = flights or SingleFlight()
+        self.model = getattr(provider, 'model', type(provider).__name__)
+        # Per thread / asyncio task; None defers to the wrapped provider (streams)
+        self._token_usage: contextvars.ContextVar = contextvars.ContextVar(f"coalesced_usage_{id(self)}", default=None)
+        self._answered_model: contextvars.ContextVar = contextvars.ContextVar(f"coalesced_model_{id(self)}", default=None)
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set here (client, get_stats, ...)
+        return getattr(self.provider, name)
+
+    @property
+    def last_token_usage(self) -> int:
+        return self.get_last_token_usage()
+
+    def get_last_token_usage(self) -> int:
+        usage = self._token_usage.get()
+        return self._provider_usage() if usage is None else usage
+
+    def get_last_model(self) -> Tuple[Optional[str], Optional[str]]:
+        """(provider name, model) that answered this caller's last call, where the wrapped provider reports it"""
+        answered = self._answered_model.get()
+        return self._provider_model() if answered is None else answered
+
+    def _provider_usage(self) -> int:
+        return getattr(self.provider, 'last_token_usage', 0) or 0
+
+    def _provider_model(self) -> Tuple[Optional[str], Optional[str]]:
+        get_last_model = getattr(self.provider, 'get_last_model', None)
+        return get_last_model() if get_last_model else (None, None)
+
+    def _settle(self, led: bool, usage: int, answered: Tuple[Optional[str], Optional[str]]) -> None:
+        self._token_usage.set(usage if led else 0)
+        self._answered_model.set(answered)
+
+    def _shared(self, key: str, call: Callable[[], str]) -> str:
+        led = []
+
+        def lead():
+            led.append(True)
+            return call(), self._provider_usage(), self._provider_model()
+
+        reply, usage, answered = self.flights.do(key, lead)
+        self._settle(bool(led), usage, answered)
+        return reply
+
+    def generate(self, prompt: str, context: Optional[str] = None, params: Optional[Dict[str, Any]] = None) -> str:
+        key = request_key('generate', self.model, [prompt, context], params)
+        return self._shared(key, lambda: self.provider.generate(prompt, context, params))
+
+    def chat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+        key = request_key('chat', self.model, messages, params)
+        return self._shared(key, lambda: self.provider.chat(messages, params))
+
+    async def achat(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                    timeout: Optional[float] = None) -> str:
+        key = request_key('chat', self.model, messages, params)
+        led = []
+
+        async def lead():
+            led.append(True)
+            return await self.provider.achat(messages, params, timeout=timeout), self._provider_usage(), self._provider_model()
+
+        reply, usage, answered = await self.flights.ado(key, lead)
+        self._settle(bool(led), usage, answered)
+        return reply
+
+    def chat_stream(self, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        self._token_usage.set(None)
+        self._answered_model.set(None)
+        return self.provider.chat_stream(messages, params)
+
+    def healthcheck(self) -> bool:
+        return self.provider.healthcheck()
+
+
+class CoalescingEmbeddingProvider(EmbeddingProvider):
+    """
+    Wraps an embedding provider so a text already being embedded by another
+    caller is not sent again: embed_batch sends only texts with no call in
+    flight, and waits for the rest
+    """
+
+    def __init__(self, provider: EmbeddingProvider, flights: Optional[SingleFlight] = None):
+        self.provider = provider
+        self.flights = flights or SingleFlight()
+        self.model = getattr(provider, 'model', type(provider).__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    @property
+    def embedding_dimension(self) -> int:
+        return self.provider.embedding_dimension
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+    def _claim(self, texts: List[str]) -> Tuple[List[str], Dict[str, Future], Dict[str, Future], Dict[str, str]]:
+        keys = {text: request_key('embed', self.model, text) for text in texts}
+        owned, shared = self.flights.claim(list(keys.values()))
+        to_send = [text for text in dict.fromkeys(texts) if keys[text] in owned]
+        return to_send, owned, shared, keys
+
+    @staticmethod
+    def _by_key(to_send: List[str], keys: Dict[str, str], embeddings: List[List[float]]) -> Dict[str, List[float]]:
+        if len(embeddings) != len(to_send):
+            raise ValueError(f"Embedding provider returned {len(embeddings)} embeddings for {len(to_send)} texts")
+        return dict(zip((keys[text] for text in to_send), embeddings))
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        to_send, owned, shared, keys = self._claim(texts)
+        embeddings: Dict[str, List[float]] = {}
+
+        if to_send:
+            try:
+                embeddings = self._by_key(to_send, keys, self.provider.embed_batch(to_send))
+            except BaseException as e:
+                self.flights.fail(owned, e)
+                raise
+            self.flights.resolve(owned, embeddings)
+
+        for key, call in shared.items():
+            embeddings[key] = call.result()
+        return [embeddings[keys[text]] for text in texts]
+
+    async def aembed_batch(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        to_send, owned, shared, keys = self._claim(texts)
+        embeddings: Dict[str, List[float]] = {}
+
+        if to_send:
+            try:
+                embeddings = self._by_key(to_send, keys, await self.provider.aembed_batch(to_send, timeout=timeout))
+            except asyncio.CancelledError:
+                self.flights.fail(owned, RuntimeError("Coalesced request was cancelled"))
+                raise
+            except Exception as e:
+                self.flights.fail(owned, e)
+                raise
+            self.flights.resolve(owned, embeddings)
+
+        for key, call in shared.items():
+            embeddings[key] = await asyncio.shield(asyncio.wrap_future(call))
+        return [embeddings[keys[text]] for text in texts]
+
+
 class AIProviderManager:
     """Central manager for AI providers"""
 
@@ -320,6 +1162,7 @@ class AIProviderManager:
         self.config = Config()
         self._llm_provider: Optional[LLMProvider] = None
         self._embedding_provider: Optional[EmbeddingProvider] = None
+        self._flights = SingleFlight()
         self._initialized = False
 
     def initialize(self):
@@ -335,17 +1178,50 @@ class AIProviderManager:
         # Initialize embedding provider
         self._embedding_provider = self._create_embedding_provider()
 
+        # Share in-flight calls between concurrent identical requests
+        if self.config.AI_COALESCE_REQUESTS:
+            self._llm_provider = CoalescingLLMProvider(self._llm_provider, self._flights)
+            self._embedding_provider = CoalescingEmbeddingProvider(self._embedding_provider, self._flights)
+
         self._initialized = True
         logger.info("AI providers initialized successfully")
 
     def _create_llm_provider(self) -> LLMProvider:
-        """Create LLM provider based on configuration"""
-        provider = self.config.AI_PROVIDER
-
+        """
+        Create LLM provider based on configuration. With AI_FALLBACK_PROVIDERS
+        or AI_HEDGE_ENABLED set, the primary and fallback providers are
+        wrapped in a RoutingLLMProvider.
+        """
+        primary = self.config.AI_PROVIDER
+        provider = self._create_named_llm_provider(primary, self.config.AI_MODEL)
+
+        fallbacks = [name for name in self.config.AI_FALLBACK_PROVIDERS if name != primary]
+        if not fallbacks and not self.config.AI_HEDGE_ENABLED:
+            return provider
+
+        providers = {primary: provider}
+        for name in fallbacks:
+            try:
+                providers[name] = self._create_named_llm_provider(name)
+            except Exception as e:
+                logger.warning(f"Fallback LLM provider {name} unavailable: {e}")
+
+        logger.info(f"Routing LLM requests across {list(providers)} (hedging: {self.config.AI_HEDGE_ENABLED})")
+        return RoutingLLMProvider(
+            providers,
+            hedge=self.config.AI_HEDGE_ENABLED,
+            hedge_delay=self.config.AI_HEDGE_DELAY_MS / 1000 if self.config.AI_HEDGE_DELAY_MS else None,
+            cooldown_seconds=self.config.AI_PROVIDER_COOLDOWN_SECONDS,
+            failure_threshold=self.config.AI_PROVIDER_FAILURE_THRESHOLD,
+            hedge_pool_size=self.config.AI_HEDGE_POOL_SIZE
+        )
+
+    def _create_named_llm_provider(self, provider: str, model: Optional[str] = None) -> LLMProvider:
+        """Create one LLM provider by name, using its own model setting unless a model is given"""
         if provider == "openai":
             if not self.config.OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY required for OpenAI provider")
-            model = self.config.AI_MODEL or "gpt-4"
+            model = model or self.config.OPENAI_MODEL or "gpt-4"
             return OpenAILLMProvider(
                 api_key=self.config.OPENAI_API_KEY,
                 model=model,
@@ -355,7 +1231,7 @@ class AIProviderManager:
         elif provider == "groq":
             if not self.config.GROQ_API_KEY:
                 raise ValueError("GROQ_API_KEY required for Groq provider")
-            model = self.config.AI_MODEL or "mixtral-8x7b-32768"
+            model = model or self.config.GROQ_MODEL or "mixtral-8x7b-32768"
             return GroqLLMProvider(
                 api_key=self.config.GROQ_API_KEY,
                 model=model,
@@ -363,8 +1239,11 @@ class AIProviderManager:
             )
 
         elif provider == "local":
-            # Placeholder for local models
-            raise NotImplementedError("Local LLM provider not yet implemented")
+            return LocalLLMProvider(
+                base_url=self.config.LOCAL_LLM_URL,
+                model=model or self.config.LOCAL_LLM_MODEL,
+                timeout=self.config.AI_TIMEOUT
+            )
 
         else:
             raise ValueError(f"Unsupported AI provider: {provider}")
@@ -380,7 +1259,8 @@ class AIProviderManager:
             return OpenAIEmbeddingProvider(
                 api_key=self.config.OPENAI_API_KEY,
                 model=model,
-                dimensions=self.config.EMBEDDING_DIMENSIONS
+                dimensions=self.config.EMBEDDING_DIMENSIONS,
+                timeout=self.config.AI_TIMEOUT
             )
 
         elif provider == "huggingface":
@@ -418,14 +1298,68 @@ class AIProviderManager:
             "embedding": True,  # Embedding providers don't have external dependencies to check
         }
 
+    def run_async(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a provider coroutine to completion from synchronous code"""
+        return get_async_runner().run(coro, timeout)
+
+    async def achat_many(
+        self,
+        chat_requests: List[Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        provider: Optional[LLMProvider] = None
+    ) -> List[Union[str, Exception]]:
+        """
+        Run several chat completions concurrently, at most max_concurrency
+        (AI_MAX_CONCURRENCY) at a time.
+
+        Args:
+            chat_requests: (messages, params) pairs
+            timeout: Per-completion timeout in seconds, retries included
+                (by default each attempt gets the provider's AI_TIMEOUT)
+            provider: LLM provider to use (the active one by default)
+
+        Returns:
+            One reply per request, in order; a failed request gives its exception instead
+        """
+        provider = provider or self.llm
+        semaphore = asyncio.Semaphore(max_concurrency or self.config.AI_MAX_CONCURRENCY)
+
+        async def complete(messages, params):
+            async with semaphore:
+                # The SDK timeout applies per attempt; wait_for bounds the call including retries
+                return await asyncio.wait_for(provider.achat(messages, params, timeout=timeout), timeout)
+
+        return await asyncio.gather(
+            *(complete(messages, params) for messages, params in chat_requests),
+            return_exceptions=True
+        )
+
+    def chat_many(
+        self,
+        chat_requests: List[Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        provider: Optional[LLMProvider] = None
+    ) -> List[Union[str, Exception]]:
+        """Blocking form of achat_many for synchronous callers"""
+        return self.run_async(self.achat_many(chat_requests, timeout, max_concurrency, provider))
+
     def get_provider_info(self) -> Dict[str, Any]:
         """Get information about active providers"""
-        return {
+        info = {
             "llm_provider": self.config.AI_PROVIDER,
             "embedding_provider": self.config.EMBEDDING_PROVIDER,
             "rag_enabled": self.config.RAG_ENABLED,
             "embedding_dimension": self.embedding.embedding_dimension if self._embedding_provider else None,
         }
+        llm_provider = self._llm_provider
+        if isinstance(llm_provider, CoalescingLLMProvider):
+            info["coalescing"] = self._flights.get_stats()
+            llm_provider = llm_provider.provider
+        if isinstance(llm_provider, RoutingLLMProvider):
+            info["llm_routing"] = llm_provider.get_stats()
+        return info
 
 
 # Global instance
@@ -5,11 +5,13 @@ Uses provider-agnostic AI system with support for OpenAI, Groq, and local models
 
 import os
 import json
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple, Union
 from datetime import datetime
 
 from .ai_providers import get_ai_provider_manager
 
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
+
 
 class AIService:
     """Base AI service class with provider-agnostic functionality"""
@@ -34,43 +36,21 @@ class AIService:
             AI response as string
         """
         # Check subscription access
-        if user:
-            from backend.utils.subscription import SubscriptionManager
-            if user.organization:
-                if not SubscriptionManager.check_organization_access(user.organization, "ai_chat"):
-                    return "Your organization's trial has expired or subscription is inactive. Please upgrade to continue using AI features."
-            else:
-                if not SubscriptionManager.check_user_access(user, "ai_chat"):
-                    return "Your trial has expired or subscription is inactive. Please upgrade to continue using AI features."
+        denial = self._check_access(user)
+        if denial:
+            return denial
 
         try:
             print(f"DEBUG: AI Service - Provider: {self.provider_manager.config.AI_PROVIDER}, Model: {self.provider_manager.config.AI_MODEL}")
             print(f"DEBUG: API Key loaded: {'Yes' if self._has_api_key() else 'No'}")
 
-            messages = [{"role": "system", "content": system_prompt}]
-
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-
-            # Add current user message
-            messages.append({"role": "user", "content": user_message})
+            messages = self._build_messages(system_prompt, user_message, conversation_history)
 
             # Use provider-agnostic chat
             response = self.llm_provider.chat(messages)
 
             # Track token usage if user provided
-            if user and hasattr(self.llm_provider, 'get_last_token_usage'):
-                token_usage = self.llm_provider.get_last_token_usage()
-                if token_usage:
-                    SubscriptionManager.track_token_usage(
-                        user=user,
-                        org=user.organization,
-                        provider=self.provider_manager.config.AI_PROVIDER,
-                        model=self.provider_manager.config.AI_MODEL,
-                        tokens=token_usage,
-                        operation_type=operation_type
-                    )
+            self._track_token_usage(user, operation_type)
 
             print(f"DEBUG: AI response length: {len(response)}")
             return response
@@ -79,7 +59,138 @@ class AIService:
             print(f"AI service error: {str(e)}")
             import traceback
             traceback.print_exc()
-            return "I apologize, but I'm having trouble processing your response right now. Could you please try again?"
+            return FALLBACK_RESPONSE
+
+    def generate_response_stream(self, system_prompt: str, user_message: str, conversation_history: Optional[List[Dict]] = None,
+                                 user: Optional['User'] = None, operation_type: str = "ai_chat") -> Iterator[str]:
+        """
+        Stream an AI response as text deltas, as generate_response does in one piece.
+
+        A failure before the first delta yields the fallback message; after
+        that the stream just ends, leaving the partial response.
+        """
+        denial = self._check_access(user)
+        if denial:
+            yield denial
+            return
+
+        streamed = False
+        try:
+            messages = self._build_messages(system_prompt, user_message, conversation_history)
+
+            for delta in self.llm_provider.chat_stream(messages):
+                streamed = True
+                yield delta
+
+            self._track_token_usage(user, operation_type)
+
+        except Exception as e:
+            print(f"AI service streaming error: {str(e)}")
+            if not streamed:
+                yield FALLBACK_RESPONSE
+
+    def generate_responses(self, prompts: List[Tuple[str, str]], timeout: Optional[float] = None) -> List[Union[str, Exception]]:
+        """
+        Generate responses to several independent (system_prompt, user_message)
+        pairs concurrently. A failed prompt gets its exception in place of a reply.
+        """
+        if not prompts:
+            return []
+
+        replies = self.provider_manager.chat_many(
+            [(self._build_messages(system_prompt, user_message), None) for system_prompt, user_message in prompts],
+            timeout=timeout,
+            provider=self.llm_provider
+        )
+
+        for reply in replies:
+            if isinstance(reply, Exception):
+                print(f"AI service error: {str(reply)}")
+        return replies
+
+    def _check_access(self, user: Optional['User']) -> Optional[str]:
+        """Return the message to show when the user's subscription does not allow AI chat"""
+        if not user:
+            return None
+
+        from backend.utils.subscription import SubscriptionManager
+        if user.organization:
+            if not SubscriptionManager.check_organization_access(user.organization, "ai_chat"):
+                return "Your organization's trial has expired or subscription is inactive. Please upgrade to continue using AI features."
+        else:
+            if not SubscriptionManager.check_user_access(user, "ai_chat"):
+                return "Your trial has expired or subscription is inactive. Please upgrade to continue using AI features."
+        return None
+
+    @staticmethod
+    def _build_messages(system_prompt: str, user_message: str, conversation_history: Optional[List[Dict]] = None) -> List[Dict]:
+        messages = [{"role": "system", "content": system_prompt}]
+
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+
+        # Add current user message
+        messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _track_token_usage(self, user: Optional['User'], operation_type: str) -> None:
+        """Record the last call's token usage against the user's subscription"""
+        if user and hasattr(self.llm_provider, 'get_last_token_usage'):
+            token_usage = self.llm_provider.get_last_token_usage()
+            if token_usage:
+                provider, model = self._answering_model()
+                from backend.utils.subscription import SubscriptionManager
+                SubscriptionManager.track_token_usage(
+                    user=user,
+                    org=user.organization,
+                    provider=provider,
+                    model=model,
+                    tokens=token_usage,
+                    operation_type=operation_type
+                )
+
+    def _answering_model(self) -> Tuple[str, str]:
+        """Provider and model that answered the last call; the configured ones unless a fallback did"""
+        get_last_model = getattr(self.llm_provider, 'get_last_model', None)
+        provider, model = get_last_model() if get_last_model else (None, None)
+        config = self.provider_manager.config
+        if provider is None or provider == config.AI_PROVIDER:
+            return config.AI_PROVIDER, model or config.AI_MODEL
+        return provider, model
+
+    def summarize_conversation(self, previous_summary: Optional[str], turns: List[Dict[str, str]],
+                               max_tokens: int = 300) -> Optional[str]:
+        """
+        Fold conversation turns into a running summary
+
+        Args:
+            previous_summary: Summary of the turns before these, if any
+            turns: Messages to add, as role/content dicts in chronological order
+            max_tokens: Length limit for the new summary
+
+        Returns:
+            The updated summary, or None if it could not be generated
+        """
+        transcript = "\n".join(
+            f"{'Candidate' if turn['role'] == 'user' else 'Interviewer'}: {turn['content']}" for turn in turns
+        )
+        system_prompt = (
+            "You maintain a running summary of a job interview. Merge the new transcript into the existing "
+            "summary. Keep the questions asked, the candidate's key answers, skills, examples and figures, and "
+            "any concerns or topics still to cover. Write concise third-person notes, not a transcript."
+        )
+        user_message = f"EXISTING SUMMARY:\n{previous_summary or 'None yet.'}\n\nNEW TRANSCRIPT:\n{transcript}"
+
+        try:
+            summary = self.llm_provider.chat(
+                self._build_messages(system_prompt, user_message),
+                {"max_tokens": max_tokens, "temperature": 0.2}
+            )
+            return summary.strip() or None
+        except Exception as e:
+            print(f"Conversation summary error: {str(e)}")
+            return None
 
     def _has_api_key(self) -> bool:
         """Check if the current provider has an API key configured"""
@@ -1,12 +1,30 @@
 from flask import request, jsonify
+from sqlalchemy import event
 from .. import api_bp
+from ...config import Config
 from ...extensions import db
-from ...models import Interview, User, AIInterviewAgent, ConversationMessage
+from ...models import Interview, User, AIInterviewAgent, PracticeAIAgent, ConversationMessage, Organization, Post
 from ...ai_service import get_ai_service
+from ...memory_service import get_conversation_memory_service
 from ...utils.subscription import require_subscription
+from ...utils.streaming import format_sse, sse_response
+from ...utils.prompt_cache import CompiledPromptCache
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import json
 
+# Static part of each agent's system prompt, per (interview, round, agent version)
+_config = Config()
+agent_prompt_cache = CompiledPromptCache(_config.AI_PROMPT_CACHE_SIZE, _config.AI_PROMPT_CACHE_TTL_SECONDS)
+
+
+def _invalidate_agent_prompts(mapper, connection, target):
+    agent_prompt_cache.invalidate((mapper.local_table.name, target.id))
+
+
+for _model in (Interview, AIInterviewAgent, PracticeAIAgent, Post, Organization):
+    event.listen(_model, "after_update", _invalidate_agent_prompts)
+    event.listen(_model, "after_delete", _invalidate_agent_prompts)
+
 @api_bp.route('/interviews/<int:interview_id>/chat', methods=['POST'])
 @jwt_required()
 @require_subscription('ai_chat')
@@ -17,6 +35,91 @@ def interview_chat(interview_id):
     if not data or 'message' not in data:
         return jsonify({'error': 'Message required'}), 400
 
+    chat, error = load_interview_chat(interview_id)
+    if error:
+        return error
+    user, interview, agent = chat
+
+    message = data['message']
+
+    # Store user message
+    ConversationMessage.add_user_message(interview_id, user.id, message)
+    db.session.commit()
+
+    # Generate AI response
+    response = generate_agent_response(message, interview, agent, user)
+
+    # Store agent response
+    ConversationMessage.add_agent_message(interview_id, agent, response)
+    db.session.commit()
+
+    return jsonify({
+        'response': response,
+        'agent_name': agent.name,
+        'agent_persona': get_agent_persona(agent),
+        'interview_id': interview_id
+    }), 200
+
+
+@api_bp.route('/interviews/<int:interview_id>/chat/stream', methods=['POST'])
+@jwt_required()
+@require_subscription('ai_chat')
+def interview_chat_stream(interview_id):
+    """
+    Interview chat streamed as Server-Sent Events: a 'start' event with the
+    agent, 'token' events with text deltas, then a 'done' event with the
+    full response. The agent message is stored once the stream ends, even
+    if the client disconnects part-way.
+    """
+    data = request.get_json()
+
+    if not data or 'message' not in data:
+        return jsonify({'error': 'Message required'}), 400
+
+    chat, error = load_interview_chat(interview_id)
+    if error:
+        return error
+    user, interview, agent = chat
+    user_id = user.id
+
+    message = data['message']
+
+    # Store user message
+    ConversationMessage.add_user_message(interview_id, user_id, message)
+    db.session.commit()
+
+    def events():
+        # The request's session is closed once the response starts streaming; load the rows again in this one
+        interview = db.session.get(Interview, interview_id)
+        user = db.session.get(User, user_id)
+        agent = resolve_interview_agent(interview)
+
+        parts = []
+        try:
+            yield format_sse({'agent_name': agent.name, 'agent_persona': get_agent_persona(agent), 'interview_id': interview_id}, 'start')
+
+            for delta in generate_agent_response_stream(message, interview, agent, user):
+                parts.append(delta)
+                yield format_sse({'text': delta}, 'token')
+
+            yield format_sse({'response': ''.join(parts), 'interview_id': interview_id}, 'done')
+        finally:
+            # Store agent response (partial if the client went away)
+            response = ''.join(parts)
+            if response:
+                ConversationMessage.add_agent_message(interview_id, agent, response)
+                db.session.commit()
+
+    return sse_response(events())
+
+
+def load_interview_chat(interview_id):
+    """
+    Load the current user, the interview and its agent for a chat request.
+
+    Returns:
+        ((user, interview, agent), None), or (None, error response)
+    """
     # Get authenticated user
     user_id = get_jwt_identity()
     user_id = int(user_id)  # Convert to int for database comparison
@@ -24,13 +127,12 @@ def interview_chat(interview_id):
     user = User.query.get(user_id)
     if not user:
         print(f"Chat user not found for id: {user_id}")
-        return jsonify({'error': 'User not found'}), 404
+        return None, (jsonify({'error': 'User not found'}), 404)
 
-    message = data['message']
     interview = Interview.query.get(interview_id)
     if not interview:
         print(f"Chat interview not found for id: {interview_id}")
-        return jsonify({'error': 'Interview not found'}), 404
+        return None, (jsonify({'error': 'Interview not found'}), 404)
 
     # Debug logging
     print(f"Chat access check: user_id={user_id}, interview.user_id={interview.user_id}, interview.organization_id={interview.organization_id}, interview_type={interview.interview_type}")
@@ -54,42 +156,27 @@ def interview_chat(interview_id):
     
     if not has_access:
         print(f"Chat access denied for user {user_id} to interview {interview_id}")
-        return jsonify({'error': 'Access denied'}), 403
+        return None, (jsonify({'error': 'Access denied'}), 403)
 
     # Resolve AI agent for this interview
     agent = resolve_interview_agent(interview)
     print(f"Resolved agent for interview {interview_id}: {agent}")
     if not agent:
         print(f"No AI agent available for interview {interview_id}")
-        return jsonify({'error': 'No AI agent available for this interview'}), 400
+        return None, (jsonify({'error': 'No AI agent available for this interview'}), 400)
 
-    # Store user message
-    ConversationMessage.add_user_message(interview_id, user_id, message)
-    db.session.commit()
+    return (user, interview, agent), None
 
-    # Generate AI response
-    response = generate_agent_response(message, interview, agent, user)
 
-    # Store agent response
-    ConversationMessage.add_agent_message(interview_id, agent, response)
-    db.session.commit()
-
-    # Set agent_persona for response
+def get_agent_persona(agent):
+    """Persona shown alongside the agent's responses"""
     from ...models.ai_interview_agent import AIInterviewAgent
     from ...models.practice_ai_agent import PracticeAIAgent
     if isinstance(agent, AIInterviewAgent):
-        agent_persona = agent.persona if hasattr(agent, 'persona') and agent.persona else 'AI Interviewer'
+        return agent.persona if hasattr(agent, 'persona') and agent.persona else 'AI Interviewer'
     elif isinstance(agent, PracticeAIAgent):
-        agent_persona = agent.description if hasattr(agent, 'description') and agent.description else 'Practice AI Interviewer'
-    else:
-        agent_persona = 'AI Interviewer'
-
-    return jsonify({
-        'response': response,
-        'agent_name': agent.name,
-        'agent_persona': agent_persona,
-        'interview_id': interview_id
-    }), 200
+        return agent.description if hasattr(agent, 'description') and agent.description else 'Practice AI Interviewer'
+    return 'AI Interviewer'
 
 
 def resolve_interview_agent(interview):
@@ -127,30 +214,7 @@ def generate_agent_response(message, interview, agent, user):
     try:
         ai_service = get_ai_service()
 
-        # Build comprehensive system prompt
-        system_prompt = build_agent_system_prompt(agent, interview, is_first_message)
-
-        # Get conversation history (last 10 messages)
-        recent_messages = ConversationMessage.get_recent_conversation(interview.id, limit=10)
-        recent_messages.reverse()  # Chronological order
-
-        # Check if this is the first message (no previous conversation)
-        is_first_message = len(recent_messages) == 0
-
-        # Format for AI service
-        conversation_history = []
-        for msg in recent_messages:
-            role = "user" if msg.sender_type == "user" else "assistant"
-            conversation_history.append({
-                "role": role,
-                "content": msg.content
-            })
-
-        # Use the interview AI service for better round handling
-        interview_context = {
-            "round_number": interview.current_round or 1,
-            "is_first_message": is_first_message
-        }
+        system_prompt, conversation_history = build_agent_conversation(message, interview, agent)
 
         # Generate response using the specialized interview AI service
         response = ai_service.generate_response(system_prompt, message, conversation_history, user, "interview_ai")
@@ -161,12 +225,110 @@ def generate_agent_response(message, interview, agent, user):
         return generate_fallback_response(message, interview, agent)
 
 
-def build_agent_system_prompt(agent, interview, is_first_message=False):
-    """Build comprehensive system prompt for the AI agent"""
+def generate_agent_response_stream(message, interview, agent, user):
+    """Stream a response from the AI agent as text deltas"""
+    try:
+        system_prompt, conversation_history = build_agent_conversation(message, interview, agent)
+    except Exception as e:
+        print(f"Error generating agent response: {e}")
+        yield generate_fallback_response(message, interview, agent)
+        return
+
+    yield from get_ai_service().generate_response_stream(system_prompt, message, conversation_history, user, "interview_ai")
+
+
+def build_agent_conversation(message, interview, agent):
+    """
+    Build the system prompt and conversation history for the agent's next
+    response: a rolling summary of older turns in the system prompt, and
+    the most recent messages within the token budget as history. The
+    candidate's message, already stored, is left out of the history since
+    it is sent as the user message.
+    """
+    summary, conversation_history = get_conversation_memory_service().build_context(interview, message)
+
+    # Check if this is the first message (no previous conversation)
+    is_first_message = summary is None and len(conversation_history) == 0
+
+    # Build comprehensive system prompt
+    system_prompt = build_agent_system_prompt(agent, interview, is_first_message, summary)
+
+    return system_prompt, conversation_history
+
+
+def build_agent_system_prompt(agent, interview, is_first_message=False, conversation_summary=None):
+    """
+    Build comprehensive system prompt for the AI agent. The static part
+    comes first and is cached, so providers can reuse the prompt prefix;
+    the conversation summary, per-turn instructions and the current time
+    come last.
+    """
     from datetime import datetime
-    from ...models.ai_interview_agent import AIInterviewAgent
-    from ...models.practice_ai_agent import PracticeAIAgent  # Import to check type
 
+    round_number = interview.current_round or 1
+    prompt_parts = [get_static_agent_prompt(agent, interview, round_number)]
+
+    # Earlier conversation, no longer sent verbatim
+    if conversation_summary:
+        prompt_parts.append(f"\nEARLIER IN THIS INTERVIEW (summary):\n{conversation_summary}\n")
+
+    # First message instructions
+    if is_first_message:
+        if round_number == 1:
+            prompt_parts.append("""
+FIRST MESSAGE INSTRUCTIONS:
+- Start with a professional greeting and introduce yourself
+- Briefly explain the interview process
+- Ask an opening question to begin the conversation
+- Set a positive, professional tone
+""")
+        else:
+            prompt_parts.append(f"""
+ROUND {round_number} START INSTRUCTIONS:
+- Acknowledge that the candidate has advanced to Round {round_number}
+- Reference that they successfully completed Round {round_number - 1}
+- Briefly welcome them to this round
+- Ask your first question for this round
+""")
+
+    # Current time
+    current_time = datetime.utcnow()
+    time_until_interview = interview.scheduled_at - current_time
+    minutes_remaining = int(time_until_interview.total_seconds() / 60)
+
+    prompt_parts.append(f"""
+CURRENT STATUS:
+- Current Time: {current_time.strftime('%Y-%m-%d %H:%M UTC')}
+- Time Status: {'Interview in progress' if minutes_remaining < 0 else f'Starts in {abs(minutes_remaining)} minutes'}
+""")
+
+    return "\n".join(prompt_parts)
+
+
+def get_static_agent_prompt(agent, interview, round_number):
+    """
+    The part of the agent's system prompt that only changes when the agent,
+    interview, job post or organization is updated, from the prompt cache
+    when possible
+    """
+    key = (
+        interview.id, interview.updated_at, round_number,
+        agent.__tablename__, agent.id, agent.updated_at
+    )
+    prompt = agent_prompt_cache.get(key)
+    if prompt is None:
+        prompt = compile_static_agent_prompt(agent, interview, round_number)
+        agent_prompt_cache.set(key, prompt, tags=[
+            (Interview.__tablename__, interview.id),
+            (agent.__tablename__, agent.id),
+            (Post.__tablename__, interview.post_id),
+            (Organization.__tablename__, interview.organization_id),
+        ])
+    return prompt
+
+
+def compile_static_agent_prompt(agent, interview, round_number):
+    """Assemble the static part of the agent's system prompt from its rows"""
     prompt_parts = []
 
     # Agent identity and persona/behavioral style
@@ -192,20 +354,12 @@ def build_agent_system_prompt(agent, interview, is_first_message=False):
     prompt_parts.append("\n" + agent.system_prompt)
 
     # Interview context
-    current_time = datetime.utcnow()
-    time_until_interview = interview.scheduled_at - current_time
-    minutes_remaining = int(time_until_interview.total_seconds() / 60)
-
-    round_number = interview.current_round or 1
-
     prompt_parts.append(f"""
 INTERVIEW CONTEXT:
 - Position: {interview.title}
 - Description: {interview.description or 'Not specified'}
 - Organization: {interview.organization.name if interview.organization else 'Unknown'}
 - Current Round: {round_number}
-- Current Time: {current_time.strftime('%Y-%m-%d %H:%M UTC')}
-- Time Status: {'Interview in progress' if minutes_remaining < 0 else f'Starts in {abs(minutes_remaining)} minutes'}
 """)
 
     # Job details
@@ -232,25 +386,6 @@ ROUND {round_number} INSTRUCTIONS:
 - Build upon previous conversations - ask more advanced questions
 - Reference their previous answers when appropriate
 - Focus on deeper technical skills and problem-solving abilities
-""")
-
-    # First message instructions
-    if is_first_message:
-        if round_number == 1:
-            prompt_parts.append("""
-FIRST MESSAGE INSTRUCTIONS:
-- Start with a professional greeting and introduce yourself
-- Briefly explain the interview process
-- Ask an opening question to begin the conversation
-- Set a positive, professional tone
-""")
-        else:
-            prompt_parts.append(f"""
-ROUND {round_number} START INSTRUCTIONS:
-- Acknowledge that the candidate has advanced to Round {round_number}
-- Reference that they successfully completed Round {round_number - 1}
-- Briefly welcome them to this round
-- Ask your first question for this round
 """)
 
     # Response guidelines
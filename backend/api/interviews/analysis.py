@@ -1,8 +1,9 @@
 from flask import request, jsonify
 from .. import api_bp
 from ...extensions import db
-from ...models import Interview, InterviewAnalysis, Message
+from ...models import Interview, InterviewAnalysis, Message, User
 from ...ai_service import get_ai_service
+from flask_jwt_extended import jwt_required, get_jwt_identity
 import json
 from datetime import datetime
 
@@ -11,22 +12,59 @@ def generate_ai_analysis(interview, messages):
     try:
         ai_service = get_ai_service()
 
-        # Prepare conversation for analysis
-        conversation_text = "\n".join([
-            f"{msg.message_type.upper()}: {msg.content}"
-            for msg in messages
-        ])
+        system_prompt, user_prompt = build_analysis_prompts(interview, messages)
 
-        # Calculate basic metrics
-        user_messages = [msg for msg in messages if msg.message_type == 'user']
-        ai_messages = [msg for msg in messages if msg.message_type == 'ai']
-        question_count = len(ai_messages)
+        # Get AI analysis
+        ai_response = ai_service.generate_response(system_prompt, user_prompt)
+
+        return parse_ai_analysis(ai_response, interview, messages)
+
+    except Exception as e:
+        print(f"Error generating AI analysis: {e}")
+        return fallback_analysis(interview, messages)
+
+def generate_ai_analyses(interviews_with_messages):
+    """
+    Analyze several interviews at once, running the AI requests concurrently.
+
+    Args:
+        interviews_with_messages: (interview, messages) pairs
 
-        # Estimate response times (simplified)
-        avg_response_time = 30.0  # Default estimate
+    Returns:
+        One analysis dict per interview, in order, or None where the AI
+        request failed so the interview can be analyzed again later
+    """
+    if not interviews_with_messages:
+        return []
 
-        # AI Analysis Prompt
-        system_prompt = """You are an expert technical interviewer and HR professional analyzing a software development candidate's interview performance.
+    try:
+        prompts = [build_analysis_prompts(interview, messages) for interview, messages in interviews_with_messages]
+        ai_responses = get_ai_service().generate_responses(prompts)
+    except Exception as e:
+        print(f"Error generating AI analyses: {e}")
+        return [None] * len(interviews_with_messages)
+
+    analyses = []
+    for (interview, messages), ai_response in zip(interviews_with_messages, ai_responses):
+        if isinstance(ai_response, Exception):
+            analyses.append(None)
+            continue
+        try:
+            analyses.append(parse_ai_analysis(ai_response, interview, messages))
+        except Exception as e:
+            print(f"Error generating AI analysis: {e}")
+            analyses.append(fallback_analysis(interview, messages))
+    return analyses
+
+def build_analysis_prompts(interview, messages):
+    """System and user prompts asking the AI to score an interview conversation"""
+    # Prepare conversation for analysis
+    conversation_text = "\n".join([
+        f"{msg.message_type.upper()}: {msg.content}"
+        for msg in messages
+    ])
+
+    system_prompt = """You are an expert technical interviewer and HR professional analyzing a software development candidate's interview performance.
 
 CRITICAL: You must respond with VALID JSON only. No markdown, no explanations, just pure JSON.
 
@@ -52,7 +90,7 @@ Return ONLY this JSON structure:
     "improvements": ["<specific improvement 1>", "<specific improvement 2>", "<specific improvement 3>"]
 }"""
 
-        user_prompt = f"""Analyze this interview conversation:
+    user_prompt = f"""Analyze this interview conversation:
 
 Interview Details:
 - Position: {interview.title}
@@ -63,72 +101,101 @@ Conversation:
 
 Provide a detailed analysis with accurate scores based on the actual content and quality of responses."""
 
-        # Get AI analysis
-        ai_response = ai_service.generate_response(system_prompt, user_prompt)
+    return system_prompt, user_prompt
 
-        # Parse AI response as JSON
-        try:
-            # Clean the response to extract JSON
-            response_text = ai_response.strip()
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-
-            analysis_result = json.loads(response_text)
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Failed to parse AI response as JSON: {e}")
-            print(f"AI Response: {ai_response}")
-            # Fallback if AI doesn't return valid JSON
-            analysis_result = {
-                "overall_score": 75,
-                "communication_score": 78,
-                "technical_score": 72,
-                "problem_solving_score": 80,
-                "cultural_fit_score": 75,
-                "detailed_feedback": "AI analysis completed but response format was unexpected. Candidate showed engagement in the interview process with room for improvement in technical depth.",
-                "ai_analysis_summary": "Candidate participated actively in the interview. Analysis indicates solid foundational skills with opportunities for enhanced technical proficiency.",
-                "strengths": ["Active participation", "Clear communication", "Problem-solving approach"],
-                "improvements": ["Deepen technical knowledge", "Practice complex scenarios", "Enhance detailed explanations"]
-            }
-
-        # Ensure scores are within valid range
-        for score_key in ['overall_score', 'communication_score', 'technical_score', 'problem_solving_score', 'cultural_fit_score']:
-            if score_key in analysis_result:
-                analysis_result[score_key] = max(0, min(100, int(analysis_result[score_key])))
-
-        # Add calculated metrics
-        analysis_result.update({
-            "actual_duration_minutes": interview.duration_minutes,
-            "average_response_time_seconds": avg_response_time,
-            "question_count": question_count,
-            "analyzed_by": "AI Analysis System",
-            "analysis_method": "ai"
-        })
-
-        return analysis_result
+def parse_ai_analysis(ai_response, interview, messages):
+    """Turn the AI's JSON reply into an analysis dict, with calculated metrics added"""
+    # Calculate basic metrics
+    ai_messages = [msg for msg in messages if msg.message_type == 'ai']
+    question_count = len(ai_messages)
 
-    except Exception as e:
-        print(f"Error generating AI analysis: {e}")
-        # Fallback to basic analysis
-        return {
-            "overall_score": 70,
-            "communication_score": 75,
-            "technical_score": 65,
-            "problem_solving_score": 75,
-            "cultural_fit_score": 70,
-            "detailed_feedback": "Analysis completed with limited AI processing. Manual review recommended for comprehensive evaluation.",
-            "ai_analysis_summary": "Basic analysis completed. Consider manual review for detailed insights.",
-            "strengths": ["Completed interview", "Engaged in conversation"],
-            "improvements": ["Consider manual detailed analysis"],
-            "actual_duration_minutes": interview.duration_minutes,
-            "average_response_time_seconds": 30.0,
-            "question_count": len(messages) // 2,
-            "analyzed_by": "AI Analysis System (Limited)",
-            "analysis_method": "ai"
+    # Estimate response times (simplified)
+    avg_response_time = 30.0  # Default estimate
+
+    # Parse AI response as JSON
+    try:
+        # Clean the response to extract JSON
+        response_text = ai_response.strip()
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        response_text = response_text.strip()
+
+        analysis_result = json.loads(response_text)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Failed to parse AI response as JSON: {e}")
+        print(f"AI Response: {ai_response}")
+        # Fallback if AI doesn't return valid JSON
+        analysis_result = {
+            "overall_score": 75,
+            "communication_score": 78,
+            "technical_score": 72,
+            "problem_solving_score": 80,
+            "cultural_fit_score": 75,
+            "detailed_feedback": "AI analysis completed but response format was unexpected. Candidate showed engagement in the interview process with room for improvement in technical depth.",
+            "ai_analysis_summary": "Candidate participated actively in the interview. Analysis indicates solid foundational skills with opportunities for enhanced technical proficiency.",
+            "strengths": ["Active participation", "Clear communication", "Problem-solving approach"],
+            "improvements": ["Deepen technical knowledge", "Practice complex scenarios", "Enhance detailed explanations"]
         }
 
+    # Ensure scores are within valid range
+    for score_key in ['overall_score', 'communication_score', 'technical_score', 'problem_solving_score', 'cultural_fit_score']:
+        if score_key in analysis_result:
+            analysis_result[score_key] = max(0, min(100, int(analysis_result[score_key])))
+
+    # Add calculated metrics
+    analysis_result.update({
+        "actual_duration_minutes": interview.duration_minutes,
+        "average_response_time_seconds": avg_response_time,
+        "question_count": question_count,
+        "analyzed_by": "AI Analysis System",
+        "analysis_method": "ai"
+    })
+
+    return analysis_result
+
+def fallback_analysis(interview, messages):
+    """Basic analysis used when the AI analysis fails"""
+    return {
+        "overall_score": 70,
+        "communication_score": 75,
+        "technical_score": 65,
+        "problem_solving_score": 75,
+        "cultural_fit_score": 70,
+        "detailed_feedback": "Analysis completed with limited AI processing. Manual review recommended for comprehensive evaluation.",
+        "ai_analysis_summary": "Basic analysis completed. Consider manual review for detailed insights.",
+        "strengths": ["Completed interview", "Engaged in conversation"],
+        "improvements": ["Consider manual detailed analysis"],
+        "actual_duration_minutes": interview.duration_minutes,
+        "average_response_time_seconds": 30.0,
+        "question_count": len(messages) // 2,
+        "analyzed_by": "AI Analysis System (Limited)",
+        "analysis_method": "ai"
+    }
+
+def save_interview_analysis(interview_id, analysis_data):
+    """Store an analysis for an interview (the caller commits)"""
+    analysis = InterviewAnalysis(
+        interview_id=interview_id,
+        overall_score=analysis_data["overall_score"],
+        communication_score=analysis_data["communication_score"],
+        technical_score=analysis_data["technical_score"],
+        problem_solving_score=analysis_data["problem_solving_score"],
+        cultural_fit_score=analysis_data["cultural_fit_score"],
+        strengths=json.dumps(analysis_data["strengths"]),
+        improvements=json.dumps(analysis_data["improvements"]),
+        detailed_feedback=analysis_data["detailed_feedback"],
+        ai_analysis_summary=analysis_data["ai_analysis_summary"],
+        actual_duration_minutes=analysis_data["actual_duration_minutes"],
+        average_response_time_seconds=analysis_data["average_response_time_seconds"],
+        question_count=analysis_data["question_count"],
+        analyzed_by=analysis_data["analyzed_by"],
+        analysis_method=analysis_data["analysis_method"]
+    )
+    db.session.add(analysis)
+    return analysis
+
 @api_bp.route('/interviews/<int:interview_id>/analyze', methods=['POST'])
 def generate_interview_analysis(interview_id):
     """Generate AI analysis for completed interview"""
@@ -156,25 +223,7 @@ def generate_interview_analysis(interview_id):
     analysis_data = generate_ai_analysis(interview, messages)
 
     # Save analysis to database
-    analysis = InterviewAnalysis(
-        interview_id=interview_id,
-        overall_score=analysis_data["overall_score"],
-        communication_score=analysis_data["communication_score"],
-        technical_score=analysis_data["technical_score"],
-        problem_solving_score=analysis_data["problem_solving_score"],
-        cultural_fit_score=analysis_data["cultural_fit_score"],
-        strengths=json.dumps(analysis_data["strengths"]),
-        improvements=json.dumps(analysis_data["improvements"]),
-        detailed_feedback=analysis_data["detailed_feedback"],
-        ai_analysis_summary=analysis_data["ai_analysis_summary"],
-        actual_duration_minutes=analysis_data["actual_duration_minutes"],
-        average_response_time_seconds=analysis_data["average_response_time_seconds"],
-        question_count=analysis_data["question_count"],
-        analyzed_by=analysis_data["analyzed_by"],
-        analysis_method=analysis_data["analysis_method"]
-    )
-
-    db.session.add(analysis)
+    analysis = save_interview_analysis(interview_id, analysis_data)
     db.session.commit()
 
     return jsonify({
@@ -183,6 +232,45 @@ def generate_interview_analysis(interview_id):
         "interview": interview.to_dict()
     }), 200
 
+@api_bp.route('/organizations/<int:org_id>/interviews/analyze', methods=['POST'])
+@jwt_required()
+def generate_organization_analyses(org_id):
+    """Generate AI analyses for an organization's completed interviews that have none yet"""
+    user = User.query.get(int(get_jwt_identity()))
+    if not user or user.organization_id != org_id:
+        return jsonify({"error": "Access denied"}), 403
+
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    interviews = Interview.query.filter(
+        Interview.organization_id == org_id,
+        Interview.status == 'completed',
+        ~Interview.id.in_(db.session.query(InterviewAnalysis.interview_id))
+    ).order_by(Interview.id).limit(limit).all()
+
+    interviews_with_messages = [
+        (interview, Message.query.filter_by(interview_id=interview.id).order_by(Message.created_at).all())
+        for interview in interviews
+    ]
+
+    # The AI requests for all interviews run concurrently
+    analyses_data = generate_ai_analyses(interviews_with_messages)
+
+    # Interviews whose AI request failed stay unanalyzed, so the next run retries them
+    analyses = [
+        save_interview_analysis(interview.id, analysis_data)
+        for interview, analysis_data in zip(interviews, analyses_data)
+        if analysis_data is not None
+    ]
+    db.session.commit()
+
+    failed = [interview.id for interview, analysis_data in zip(interviews, analyses_data) if analysis_data is None]
+
+    return jsonify({
+        "message": f"Generated {len(analyses)} interview analyses",
+        "analyses": [analysis.to_dict() for analysis in analyses],
+        "failed_interview_ids": failed
+    }), 200
+
 @api_bp.route('/interviews/<int:interview_id>/analysis', methods=['GET'])
 def get_interview_analysis(interview_id):
     """Get analysis for a specific interview"""
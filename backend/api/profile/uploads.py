@@ -7,6 +7,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy import desc
 import os
 from werkzeug.utils import secure_filename
+from ...rag.jobs import enqueue_file_ingestion_job
 @api_bp.route('/profile/user/<int:user_id>', methods=['GET'])
 @jwt_required()
 def get_user_profile(user_id):
@@ -231,3 +232,74 @@ def upload_banner():
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to update banner: {str(e)}"}), 500
+
+
+# Resume Upload endpoint
+@api_bp.route('/profile/upload-resume', methods=['POST'])
+@jwt_required()
+def upload_resume():
+    """Upload a resume (PDF or DOCX) for the current user and queue it for RAG ingestion"""
+    user_id = int(get_jwt_identity())
+    try:
+        user_id_int = int(user_id)
+        user = User.query.get(user_id_int)
+    except (ValueError, TypeError):
+        return jsonify({"error": "invalid user identity"}), 400
+
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['resume']
+
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    # Validate file type
+    allowed_extensions = {'pdf', 'docx'}
+    if not file.filename.lower().split('.')[-1] in allowed_extensions:
+        return jsonify({'error': 'Invalid file type. Only PDF and DOCX are allowed'}), 400
+
+    # Validate file size (max 10MB)
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    file.seek(0)
+    if file_size > 10 * 1024 * 1024:  # 10MB
+        return jsonify({'error': 'File too large. Maximum size is 10MB'}), 400
+
+    filename = secure_filename(file.filename)
+    extension = filename.rsplit('.', 1)[1].lower()
+
+    # Create resumes directory if it doesn't exist
+    resumes_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'uploads', 'resumes')
+    if not os.path.exists(resumes_dir):
+        os.makedirs(resumes_dir)
+
+    # Save file
+    unique_filename = f"user_{user_id_int}_resume.{extension}"
+    file.save(os.path.join(resumes_dir, unique_filename))
+    resume_url = f"/uploads/resumes/{unique_filename}"
+
+    try:
+        # The worker extracts the text; re-uploading the same file reuses its
+        # cached extraction and only re-embeds chunks that changed
+        job, created = enqueue_file_ingestion_job(
+            file.stream,
+            extension,
+            source_type='resume',
+            user_id=user_id_int,
+            document_id=f"resume_user_{user_id_int}",
+            filename=filename,
+            metadata={'filename': filename, 'source_type': 'resume', 'user_id': user_id_int}
+        )
+        return jsonify({
+            'message': 'Resume uploaded successfully',
+            'resume_url': resume_url,
+            'job': job.to_dict(),
+            'duplicate': not created
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to queue resume ingestion: {str(e)}"}), 500
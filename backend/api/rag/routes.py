@@ -8,11 +8,15 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.orm import sessionmaker
 
 from ...extensions import db
+from ...models import User, TeamMember
+from ...models.ingestion_job import IngestionJob
+from ...rag.jobs import enqueue_ingestion_job, enqueue_file_ingestion_job, retry_job
 from ...rag.tools.supervisor import RAGSupervisor
 from ...rag.tools.ingestor import IngestorTool
 from ...rag.tools.embedder import EmbedderTool
 from ...rag.tools.retriever import RetrieverTool
 from ...rag.tools.generator import GeneratorTool
+from ...utils.streaming import format_sse, sse_response
 
 
 logger = logging.getLogger(__name__)
@@ -20,11 +24,11 @@ logger = logging.getLogger(__name__)
 rag_bp = Blueprint('rag', __name__, url_prefix='/api/rag')
 
 # Initialize RAG tools
-supervisor = RAGSupervisor()
 ingestor = IngestorTool()
 embedder = EmbedderTool()
 retriever = RetrieverTool()  # Initialize without engine, will be set when needed
 generator = GeneratorTool()
+supervisor = RAGSupervisor(ingestor=ingestor, embedder=embedder, retriever=retriever, generator=generator)
 
 
 def get_retriever():
@@ -45,14 +49,11 @@ def query_rag():
             return jsonify({'error': 'Query is required'}), 400
 
         query = data['query']
-        user_context = data.get('user_context', {})
+        user_context = _user_context(data)
         filters = data.get('filters', {})
 
-        # Add current user to context
-        current_user_id = get_jwt_identity()
-        user_context['user_id'] = current_user_id
-
-        # Execute RAG query workflow
+        # Execute RAG query workflow (the supervisor shares the retriever, so give it the engine first)
+        get_retriever()
         result = supervisor.orchestrate_workflow(
             input_data={'query': query, 'filters': filters},
             input_type='query',
@@ -85,13 +86,24 @@ def query_rag():
                     'rag_disabled': True
                 }), 503
 
+        final_result = result.get('final_result')
+        if not final_result:
+            return jsonify({
+                'success': False,
+                'workflow_id': result.get('workflow_id'),
+                'error': '; '.join(result.get('errors', [])) or result.get('error', 'Query failed'),
+                'stage_timings': result.get('performance', {}).get('stages', {})
+            }), 500
+
         return jsonify({
             'success': True,
             'workflow_id': result.get('workflow_id'),
-            'answer': result.get('final_result', {}).get('answer', ''),
-            'confidence': result.get('final_result', {}).get('confidence', 0),
-            'sources': result.get('final_result', {}).get('sources', []),
-            'processing_time': result.get('performance', {}).get('total_time', 0)
+            'answer': final_result.get('answer', ''),
+            'confidence': final_result.get('confidence', 0),
+            'sources': final_result.get('sources', []),
+            'processing_time': result.get('performance', {}).get('total_time', 0),
+            'stage_timings': result.get('performance', {}).get('stages', {}),
+            'cached': final_result.get('cached')
         })
 
     except Exception as e:
@@ -99,10 +111,49 @@ def query_rag():
         return jsonify({'error': str(e)}), 500
 
 
+@rag_bp.route('/query/stream', methods=['POST'])
+@jwt_required()
+def query_rag_stream():
+    """
+    Query the RAG system, streaming the answer as Server-Sent Events:
+    'token' events with text deltas, then one 'done' event with sources,
+    confidence and timings, or an 'error' event
+    """
+    data = request.get_json()
+    if not data or 'query' not in data:
+        return jsonify({'error': 'Query is required'}), 400
+
+    query = data['query']
+    user_context = _user_context(data)
+    filters = data.get('filters', {})
+
+    get_retriever()
+
+    def events():
+        try:
+            for event in supervisor.stream_query({'query': query, 'filters': filters}, user_context):
+                if event.get('rag_disabled'):
+                    # Fallback to direct AI generation without RAG
+                    from ...ai_service import get_ai_service
+                    system_prompt = "You are a helpful AI assistant for recruitment and career guidance. Provide accurate, helpful responses based on your knowledge."
+                    for delta in get_ai_service().generate_response_stream(system_prompt, query):
+                        yield format_sse({'text': delta}, 'token')
+                    yield format_sse({'workflow_id': event.get('workflow_id'), 'confidence': 0.5, 'sources': [], 'rag_disabled': True}, 'done')
+                    return
+
+                event_type = event.pop('type')
+                yield format_sse(event, event_type)
+        except Exception as e:
+            logger.error(f"RAG streaming query error: {e}")
+            yield format_sse({'error': str(e)}, 'error')
+
+    return sse_response(events())
+
+
 @rag_bp.route('/ingest/text', methods=['POST'])
 @jwt_required()
 def ingest_text():
-    """Ingest text content into the RAG system"""
+    """Queue text content for background ingestion into the RAG system"""
     try:
         data = request.get_json()
         if not data or 'content' not in data:
@@ -117,27 +168,20 @@ def ingest_text():
         metadata['user_id'] = current_user_id
         metadata['source_type'] = 'user_input'
 
-        # Process text through ingestor
-        chunks = ingestor.ingest_text(
-            text=content,
+        job, created = enqueue_ingestion_job(
+            content=content,
+            source_type='user_input',
+            user_id=int(current_user_id),
+            document_id=data.get('document_id'),
             metadata=metadata,
-            chunking_strategy=chunking_strategy
+            chunking_strategy=chunking_strategy,
+            mode=data.get('mode', IngestionJob.MODE_INCREMENTAL)
         )
 
-        # Generate embeddings
-        embedded_chunks = embedder.generate_embeddings(chunks)
-
-        # Store in database (simplified - would need proper storage logic)
-        stored_count = len(embedded_chunks)
-
-        return jsonify({
-            'success': True,
-            'chunks_created': len(chunks),
-            'chunks_embedded': stored_count,
-            'chunking_strategy': chunking_strategy,
-            'content_length': len(content)
-        })
+        return _job_accepted(job, created)
 
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Text ingestion error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -146,7 +190,7 @@ def ingest_text():
 @rag_bp.route('/ingest/file', methods=['POST'])
 @jwt_required()
 def ingest_file():
-    """Ingest file content into the RAG system"""
+    """Queue file content for background ingestion into the RAG system"""
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -155,34 +199,117 @@ def ingest_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        # Save file temporarily (would need proper file handling)
-        # For now, just process as text if it's a text file
-        if file.filename.endswith(('.txt', '.md')):
-            content = file.read().decode('utf-8')
+        extension = file.filename.rsplit('.', 1)[-1].lower()
+        if extension not in ('txt', 'md', 'pdf', 'docx'):
+            return jsonify({'error': 'Unsupported file type'}), 400
 
-            metadata = {
-                'filename': file.filename,
-                'source_type': 'file_upload',
-                'user_id': get_jwt_identity()
-            }
+        current_user_id = get_jwt_identity()
 
-            chunks = ingestor.ingest_text(content, metadata)
-            embedded_chunks = embedder.generate_embeddings(chunks)
+        metadata = {
+            'filename': file.filename,
+            'source_type': 'file_upload',
+            'user_id': current_user_id
+        }
+        job_args = dict(
+            source_type='file_upload',
+            user_id=int(current_user_id),
+            document_id=request.form.get('document_id'),
+            filename=file.filename,
+            metadata=metadata,
+            mode=request.form.get('mode', IngestionJob.MODE_INCREMENTAL)
+        )
 
-            return jsonify({
-                'success': True,
-                'file_processed': file.filename,
-                'chunks_created': len(chunks),
-                'chunks_embedded': len(embedded_chunks)
-            })
+        if extension in ('pdf', 'docx'):
+            # Saved as-is; the worker extracts the text
+            job, created = enqueue_file_ingestion_job(file.stream, extension, **job_args)
         else:
-            return jsonify({'error': 'Unsupported file type'}), 400
+            job, created = enqueue_ingestion_job(content=file.read().decode('utf-8'), **job_args)
 
+        return _job_accepted(job, created)
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"File ingestion error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+def _user_context(data):
+    """The request's user_context, with the user and organization set from the JWT identity rather than the client"""
+    user_context = dict(data.get('user_context') or {})
+    current_user_id = get_jwt_identity()
+    user = db.session.get(User, int(current_user_id))
+    user_context['user_id'] = current_user_id
+    user_context['organization_id'] = user.organization_id if user else None
+    return user_context
+
+
+def _job_accepted(job, created: bool):
+    """202 response for a queued job; an identical existing job is returned with duplicate=True"""
+    return jsonify({
+        'success': True,
+        'job': job.to_dict(),
+        'duplicate': not created,
+        'status_url': f"{rag_bp.url_prefix}/jobs/{job.id}"
+    }), 202 if created else 200
+
+
+def _get_user_job(job_id: int):
+    job = db.session.get(IngestionJob, job_id)
+    if job is None or job.user_id != int(get_jwt_identity()):
+        return None
+    return job
+
+
+@rag_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """List the current user's ingestion jobs, newest first"""
+    try:
+        query = IngestionJob.query.filter_by(user_id=int(get_jwt_identity()))
+
+        status = request.args.get('status')
+        if status:
+            query = query.filter_by(status=status)
+
+        limit = min(request.args.get('limit', 50, type=int), 200)
+        jobs = query.order_by(IngestionJob.id.desc()).limit(limit).all()
+
+        return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs]})
+
+    except Exception as e:
+        logger.error(f"Job listing error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@rag_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Get status and progress of an ingestion job"""
+    job = _get_user_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
+@rag_bp.route('/jobs/<int:job_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_ingestion_job(job_id):
+    """Requeue a failed ingestion job (no-op for jobs in any other state)"""
+    try:
+        job = _get_user_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        job = retry_job(job)
+        return jsonify({'success': True, 'job': job.to_dict()})
+
+    except Exception as e:
+        logger.error(f"Job retry error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @rag_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_stats():
@@ -197,11 +324,14 @@ def get_stats():
         # Get generator stats
         generator_stats = generator.get_usage_stats()
 
+        answer_cache = supervisor.get_answer_cache()
+
         return jsonify({
             'success': True,
             'retriever': retriever_stats,
             'embedder': embedder_stats,
-            'generator': generator_stats
+            'generator': generator_stats,
+            'answer_cache': answer_cache.get_stats() if answer_cache is not None else None
         })
 
     except Exception as e:
@@ -238,12 +368,23 @@ def health_check():
         }), 500
 
 
+def _is_admin(user_id) -> bool:
+    """Whether the user is an Admin team member of some organization"""
+    return TeamMember.query.filter_by(user_id=int(user_id), role="Admin").first() is not None
+
+
 @rag_bp.route('/clear-cache', methods=['POST'])
 @jwt_required()
 def clear_cache():
-    """Clear embedding cache"""
+    """Clear embedding and answer caches (process-wide, so admins only)"""
+    if not _is_admin(get_jwt_identity()):
+        return jsonify({'error': 'forbidden: admin role required'}), 403
+
     try:
         embedder.clear_cache()
+        answer_cache = supervisor.get_answer_cache()
+        if answer_cache is not None:
+            answer_cache.clear()
         return jsonify({'success': True, 'message': 'Cache cleared'})
 
     except Exception as e:
@@ -252,6 +393,7 @@ def clear_cache():
 
 
 @rag_bp.route('/estimate-cost', methods=['POST'])
+@jwt_required()
 def estimate_cost():
     """Estimate API costs for given text"""
     try:
@@ -269,17 +411,4 @@ def estimate_cost():
 
     except Exception as e:
         logger.error(f"Cost estimation error: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@rag_bp.route('/test', methods=['GET'])
-def test_endpoint():
-    """Test endpoint to verify RAG system is working"""
-    return jsonify({
-        'message': 'RAG system is operational',
-        'version': '1.0.0',
-        'components': [
-            'supervisor', 'ingestor', 'embedder', 'retriever', 'generator'
-        ],
-        'status': 'ready'
-    })
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
\ No newline at end of file
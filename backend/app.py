@@ -1,4 +1,5 @@
 import os
+import click
 from dotenv import load_dotenv
 from flask import Flask, jsonify, send_from_directory
 
@@ -177,6 +178,17 @@ def create_app(config_object: object | None = None):
 		except ImportError as e:
 			print(f"Warning: Could not register practice AI agents blueprint: {e}")
 
+	# RAG endpoints (the blueprint carries its own /api/rag prefix)
+	try:
+		from .api.rag import rag_bp
+		app.register_blueprint(rag_bp)
+	except ImportError:
+		try:
+			rag_module = importlib.import_module("backend.api.rag")
+			app.register_blueprint(rag_module.rag_bp)
+		except ImportError as e:
+			print(f"Warning: Could not register RAG blueprint: {e}")
+
 	# Error handlers for API routes - return JSON instead of HTML
 	@app.errorhandler(400)
 	def bad_request(error):
@@ -360,6 +372,57 @@ def optimize_database():
         print(f"❌ Error creating indexes: {e}")
 
 
+@app.cli.command("rag-ann-recall")
+@click.option("--queries", default=20, show_default=True, help="Number of sampled query vectors")
+@click.option("--top-k", default=None, type=int, help="Results per query (defaults to RAG_TOP_K)")
+def rag_ann_recall(queries, top_k):
+    """Report ANN recall@k and latency against an exact scan of the RAG store"""
+    import json
+    import importlib
+
+    retriever_module = importlib.import_module("backend.rag.tools.retriever")
+
+    try:
+        retriever = retriever_module.RetrieverTool(db.engine)
+        report = retriever.evaluate_recall(sample_size=queries, top_k=top_k)
+        print(json.dumps(report, indent=2))
+    except Exception as e:
+        print(f"❌ Error measuring recall: {e}")
+
+
+@app.cli.command("rag-worker")
+@click.option("--concurrency", default=None, type=int, help="Worker threads (defaults to RAG_WORKER_CONCURRENCY)")
+@click.option("--poll-interval", default=None, type=float, help="Seconds between polls when the queue is empty")
+@click.option("--once", is_flag=True, help="Process runnable jobs and exit instead of polling")
+def rag_worker(concurrency, poll_interval, once):
+    """Process queued RAG ingestion jobs"""
+    import importlib
+
+    jobs_module = importlib.import_module("backend.rag.jobs")
+
+    worker = jobs_module.IngestionWorker(app, concurrency=concurrency, poll_interval=poll_interval)
+    if once:
+        print(f"Processed {worker.run_until_empty()} ingestion jobs")
+    else:
+        worker.run_forever()
+
+
+@app.cli.command("rag-purge-tombstones")
+@click.option("--days", default=30, type=int, help="Delete chunks tombstoned more than this many days ago")
+def rag_purge_tombstones(days):
+    """Hard-delete RAG chunks removed from their documents"""
+    import importlib
+    from datetime import datetime, timedelta
+    from sqlalchemy.orm import Session
+
+    vector_store = importlib.import_module("backend.rag.models.vector_store")
+
+    with Session(db.engine) as session:
+        purged = vector_store.DocumentChunk.purge_tombstones(session, datetime.utcnow() - timedelta(days=days))
+        session.commit()
+    print(f"Purged {purged} tombstoned chunks")
+
+
 if __name__ == "__main__":
 	# quick dev runner
 	app.run(host="0.0.0.0", port=int(os.getenv("PORT", 5000)), debug=os.getenv("FLASK_DEBUG", "1") == "1")
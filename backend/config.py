@@ -129,6 +129,84 @@ class Config:
     def AI_TIMEOUT(self):
         return int(os.getenv("AI_TIMEOUT", "30"))
 
+    @property
+    def AI_HTTP_MAX_CONNECTIONS(self):
+        return int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+
+    @property
+    def AI_HTTP_MAX_KEEPALIVE(self):
+        return int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "10"))
+
+    @property
+    def AI_MAX_CONCURRENCY(self):
+        return int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+    @property
+    def AI_COALESCE_REQUESTS(self):
+        # Concurrent identical LLM/embedding calls share one provider request
+        return os.getenv("AI_COALESCE_REQUESTS", "1") == "1"
+
+    @property
+    def AI_FALLBACK_PROVIDERS(self):
+        # Providers tried after AI_PROVIDER, in order (e.g. "openai,local")
+        return [name.strip().lower() for name in os.getenv("AI_FALLBACK_PROVIDERS", "").split(",") if name.strip()]
+
+    @property
+    def AI_HEDGE_ENABLED(self):
+        return os.getenv("AI_HEDGE_ENABLED", "0") == "1"
+
+    @property
+    def AI_HEDGE_DELAY_MS(self):
+        # 0 hedges after the primary provider's rolling p95 latency
+        return int(os.getenv("AI_HEDGE_DELAY_MS", "0"))
+
+    @property
+    def AI_HEDGE_POOL_SIZE(self):
+        # Threads for hedged completions; bounds how many can be in flight at once
+        return int(os.getenv("AI_HEDGE_POOL_SIZE", "32"))
+
+    @property
+    def AI_PROVIDER_COOLDOWN_SECONDS(self):
+        return float(os.getenv("AI_PROVIDER_COOLDOWN_SECONDS", "30"))
+
+    @property
+    def AI_PROVIDER_FAILURE_THRESHOLD(self):
+        return int(os.getenv("AI_PROVIDER_FAILURE_THRESHOLD", "3"))
+
+    @property
+    def OPENAI_MODEL(self):
+        return os.getenv("OPENAI_MODEL")
+
+    @property
+    def GROQ_MODEL(self):
+        return os.getenv("GROQ_MODEL")
+
+    @property
+    def LOCAL_LLM_URL(self):
+        return os.getenv("LOCAL_LLM_URL")
+
+    @property
+    def LOCAL_LLM_MODEL(self):
+        return os.getenv("LOCAL_LLM_MODEL", "local")
+
+    @property
+    def AI_PROMPT_CACHE_SIZE(self):
+        # Compiled interview-agent system prompts kept in memory (0 disables)
+        return int(os.getenv("AI_PROMPT_CACHE_SIZE", "1000"))
+
+    @property
+    def AI_PROMPT_CACHE_TTL_SECONDS(self):
+        return float(os.getenv("AI_PROMPT_CACHE_TTL_SECONDS", "600"))
+
+    @property
+    def AI_MEMORY_TAIL_TOKENS(self):
+        # Token budget for the recent interview messages sent verbatim each turn
+        return int(os.getenv("AI_MEMORY_TAIL_TOKENS", "1500"))
+
+    @property
+    def AI_MEMORY_SUMMARY_MAX_TOKENS(self):
+        return int(os.getenv("AI_MEMORY_SUMMARY_MAX_TOKENS", "300"))
+
     @property
     def HUGGINGFACE_SPACES_URL(self):
         return os.getenv("HUGGINGFACE_SPACES_URL", "https://syedsyab-recruai.hf.space")
@@ -145,6 +223,21 @@ class Config:
     def RAG_CHUNK_OVERLAP(self):
         return int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
 
+    @property
+    def RAG_CHUNK_TOKENS(self):
+        # Token budget per semantic/sentence chunk; 0 derives it from RAG_CHUNK_SIZE (~4 chars per token)
+        return int(os.getenv("RAG_CHUNK_TOKENS", "0")) or self.RAG_CHUNK_SIZE // 4
+
+    @property
+    def RAG_CHUNK_OVERLAP_TOKENS(self):
+        # Whole trailing sentences up to this many tokens are repeated at the start of the next chunk
+        return int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "0")) or self.RAG_CHUNK_OVERLAP // 4
+
+    @property
+    def RAG_CHUNK_TOKENIZER(self):
+        # approximate | tiktoken
+        return os.getenv("RAG_CHUNK_TOKENIZER", "approximate").lower()
+
     @property
     def RAG_TOP_K(self):
         return int(os.getenv("RAG_TOP_K", "5"))
@@ -157,6 +250,164 @@ class Config:
     def RAG_MAX_CONTEXT_LENGTH(self):
         return int(os.getenv("RAG_MAX_CONTEXT_LENGTH", "8000"))
 
+    @property
+    def RAG_CONTEXT_DUPLICATE_SIMILARITY(self):
+        return float(os.getenv("RAG_CONTEXT_DUPLICATE_SIMILARITY", "0.97"))
+
+    @property
+    def RAG_VECTOR_INDEX(self):
+        # 'auto' uses the in-process index only when pgvector is unavailable
+        return os.getenv("RAG_VECTOR_INDEX", "auto").lower()
+
+    @property
+    def RAG_ANN_INDEX(self):
+        # pgvector index method: 'hnsw' or 'ivfflat'
+        return os.getenv("RAG_ANN_INDEX", "hnsw").lower()
+
+    @property
+    def RAG_HNSW_M(self):
+        return int(os.getenv("RAG_HNSW_M", "16"))
+
+    @property
+    def RAG_HNSW_EF_CONSTRUCTION(self):
+        return int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+
+    @property
+    def RAG_HNSW_EF_SEARCH(self):
+        return int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+
+    @property
+    def RAG_IVFFLAT_LISTS(self):
+        return int(os.getenv("RAG_IVFFLAT_LISTS", "100"))
+
+    @property
+    def RAG_IVFFLAT_PROBES(self):
+        return int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+
+    @property
+    def RAG_FTS_LANGUAGE(self):
+        # Postgres text search configuration used for keyword retrieval
+        return os.getenv("RAG_FTS_LANGUAGE", "english")
+
+    @property
+    def RAG_RRF_K(self):
+        return int(os.getenv("RAG_RRF_K", "60"))
+
+    @property
+    def RAG_BM25_K1(self):
+        return float(os.getenv("RAG_BM25_K1", "1.2"))
+
+    @property
+    def RAG_BM25_B(self):
+        return float(os.getenv("RAG_BM25_B", "0.75"))
+
+    @property
+    def RAG_KEYWORD_FIRST_MAX_TERMS(self):
+        # Queries this short skip the embedding call when keywords alone fill top_k (0 disables)
+        return int(os.getenv("RAG_KEYWORD_FIRST_MAX_TERMS", "3"))
+
+    @property
+    def RAG_EMBEDDING_CACHE(self):
+        # 'sqlite' shares embeddings across workers and restarts; 'memory' keeps them per process
+        return os.getenv("RAG_EMBEDDING_CACHE", "sqlite").lower()
+
+    @property
+    def RAG_EMBEDDING_CACHE_PATH(self):
+        return os.getenv("RAG_EMBEDDING_CACHE_PATH", os.path.join(here, "instance", "embedding_cache.sqlite3"))
+
+    @property
+    def RAG_EMBEDDING_CACHE_SIZE(self):
+        return int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "10000"))
+
+    @property
+    def RAG_EMBEDDING_CACHE_MAX_ENTRIES(self):
+        return int(os.getenv("RAG_EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+
+    @property
+    def RAG_EXTRACTION_CACHE_DIR(self):
+        return os.getenv("RAG_EXTRACTION_CACHE_DIR", os.path.join(here, "instance", "extraction_cache"))
+
+    @property
+    def RAG_EXTRACTION_CACHE_MAX_ENTRIES(self):
+        # Extracted PDF/DOCX texts kept on disk, keyed by file hash (0 disables)
+        return int(os.getenv("RAG_EXTRACTION_CACHE_MAX_ENTRIES", "1000"))
+
+    @property
+    def RAG_EMBEDDING_STORAGE_DTYPE(self):
+        # Packed format for cached embeddings and the non-pgvector embedding column: float32, float16 or int8
+        return os.getenv("RAG_EMBEDDING_STORAGE_DTYPE", "float32").lower()
+
+    @property
+    def RAG_WORKER_CONCURRENCY(self):
+        return int(os.getenv("RAG_WORKER_CONCURRENCY", "2"))
+
+    @property
+    def RAG_WORKER_POLL_SECONDS(self):
+        return float(os.getenv("RAG_WORKER_POLL_SECONDS", "2"))
+
+    @property
+    def RAG_JOB_MAX_ATTEMPTS(self):
+        return int(os.getenv("RAG_JOB_MAX_ATTEMPTS", "3"))
+
+    @property
+    def RAG_JOB_LEASE_SECONDS(self):
+        # A running job whose worker has not reported progress for this long is reclaimed
+        return int(os.getenv("RAG_JOB_LEASE_SECONDS", "600"))
+
+    @property
+    def RAG_JOB_RETRY_BASE_SECONDS(self):
+        return int(os.getenv("RAG_JOB_RETRY_BASE_SECONDS", "30"))
+
+    @property
+    def RAG_JOB_UPLOAD_DIR(self):
+        # Uploaded PDF/DOCX files waiting for the worker; must be shared storage when it runs on another host
+        return os.getenv("RAG_JOB_UPLOAD_DIR", os.path.join(here, "instance", "ingestion_uploads"))
+
+    @property
+    def RAG_JOB_PROGRESS_CHUNKS(self):
+        # Chunks embedded between progress updates
+        return int(os.getenv("RAG_JOB_PROGRESS_CHUNKS", "256"))
+
+    @property
+    def RAG_INDEX_REFRESH_SECONDS(self):
+        # How often in-process indexes pick up rows written by other processes (0 disables)
+        return float(os.getenv("RAG_INDEX_REFRESH_SECONDS", "30"))
+
+    @property
+    def RAG_INGEST_PROCESSES(self):
+        # Chunking processes for batch ingestion; 0 uses every core
+        return int(os.getenv("RAG_INGEST_PROCESSES", "0"))
+
+    @property
+    def RAG_INGEST_EMBED_CHUNKS(self):
+        # Chunks gathered across documents before each embedder call in batch ingestion
+        return int(os.getenv("RAG_INGEST_EMBED_CHUNKS", "512"))
+
+    @property
+    def RAG_ANSWER_CACHE_SIZE(self):
+        # Generated answers kept per process for repeated /api/rag/query questions (0 disables)
+        return int(os.getenv("RAG_ANSWER_CACHE_SIZE", "1000"))
+
+    @property
+    def RAG_ANSWER_CACHE_SIMILARITY(self):
+        # Minimum cosine similarity between query embeddings to reuse a cached answer
+        return float(os.getenv("RAG_ANSWER_CACHE_SIMILARITY", "0.95"))
+
+    @property
+    def RAG_ANSWER_CACHE_REFRESH_SECONDS(self):
+        # How often newly ingested or removed chunks are checked to invalidate cached answers
+        return float(os.getenv("RAG_ANSWER_CACHE_REFRESH_SECONDS", "5"))
+
+    @property
+    def RAG_PIPELINE_WORKERS(self):
+        # Threads shared by supervisor pipelines for running independent stages concurrently
+        return int(os.getenv("RAG_PIPELINE_WORKERS", "4"))
+
+    @property
+    def RAG_BULK_INSERT_BATCH_SIZE(self):
+        # Rows per INSERT ... RETURNING statement / COPY buffer when bulk-writing chunks
+        return int(os.getenv("RAG_BULK_INSERT_BATCH_SIZE", "1000"))
+
     @property
     def AI_REQUESTS_PER_MINUTE(self):
         return int(os.getenv("AI_REQUESTS_PER_MINUTE", "60"))
@@ -172,3 +423,36 @@ class Config:
     @property
     def EMBEDDING_REQUESTS_PER_HOUR(self):
         return int(os.getenv("EMBEDDING_REQUESTS_PER_HOUR", "1000"))
+
+    @property
+    def EMBEDDING_TOKENS_PER_MINUTE(self):
+        return int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000"))
+
+    @property
+    def EMBEDDING_MAX_CONCURRENCY(self):
+        # Embedding batches in flight at once per process
+        return int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+    @property
+    def EMBEDDING_MAX_RETRIES(self):
+        return int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+    @property
+    def EMBEDDING_RETRY_BASE_DELAY(self):
+        # Seconds; retries back off exponentially from this with full jitter
+        return float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "0.5"))
+
+    @property
+    def EMBEDDING_MAX_BATCH_SIZE(self):
+        # Inputs per embedding request; 0 uses the provider default
+        return int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "0"))
+
+    @property
+    def EMBEDDING_MAX_BATCH_TOKENS(self):
+        # Estimated tokens per embedding request; 0 uses the provider default
+        return int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "0"))
+
+    @property
+    def EMBEDDING_TARGET_BATCH_SECONDS(self):
+        # Batches slower than this shrink, faster ones grow
+        return float(os.getenv("EMBEDDING_TARGET_BATCH_SECONDS", "5"))
@@ -5,6 +5,7 @@ Usage (PowerShell):
     python backend\manage.py db init
     python backend\manage.py db migrate -m "msg"
     python backend\manage.py db upgrade
+    python backend\manage.py rag-worker --concurrency 2
 """
 from flask.cli import main
 
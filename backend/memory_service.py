@@ -0,0 +1,173 @@
+"""
+Conversation memory for AI interviews.
+Bounds the conversation sent to the model each turn: a rolling summary of
+older turns, kept as a ConversationMemory row, plus the most recent messages
+verbatim within a token budget.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from .config import Config
+from .models import ConversationMemory, ConversationMessage
+
+logger = logging.getLogger(__name__)
+
+# Messages past the summary loaded per turn; the token budget trims them further
+MAX_LOADED_MESSAGES = 100
+
+
+class ConversationMemoryService:
+    """
+    Builds bounded interview conversation context.
+
+    Each turn sends the rolling summary plus the newest messages that fit in
+    AI_MEMORY_TAIL_TOKENS. As soon as older messages no longer fit, a
+    background refresh folds everything except the newest half-budget of
+    messages into the summary, leaving room for the next turns before
+    anything overflows again. Until the summary covers them, overflowing
+    messages stay in the history (up to a second tail budget) rather than
+    being dropped.
+    """
+
+    def __init__(self):
+        config = Config()
+        self.tail_tokens = config.AI_MEMORY_TAIL_TOKENS
+        self.summary_tokens = config.AI_MEMORY_SUMMARY_MAX_TOKENS
+        self._tokenizer = None
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            from .rag.tools.tokenizer import get_tokenizer
+            self._tokenizer = get_tokenizer()
+        return self._tokenizer
+
+    def build_context(self, interview, current_message: Optional[str] = None) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        """
+        Get the conversation context for the agent's next response
+
+        Args:
+            interview: Interview being chatted in
+            current_message: The candidate's message, already stored; left out
+                of the history since it is sent as the user message
+
+        Returns:
+            (summary of older turns or None, recent messages as role/content dicts)
+        """
+        summary_row = ConversationMemory.get_summary(interview.id)
+        summary, through_id = self._summary_state(summary_row)
+
+        messages = ConversationMessage.query \
+            .filter(ConversationMessage.interview_id == interview.id, ConversationMessage.id > through_id) \
+            .order_by(ConversationMessage.id.desc()) \
+            .limit(MAX_LOADED_MESSAGES) \
+            .all()
+        messages.reverse()  # Chronological order
+
+        if messages and messages[-1].sender_type == "user" and messages[-1].content == current_message:
+            messages.pop()
+
+        tail = self._fit(messages, self.tail_tokens)
+        if len(tail) < len(messages):
+            keep = self._fit(messages, self.tail_tokens // 2)
+            self.schedule_refresh(interview.id, interview.user_id, messages[len(messages) - len(keep) - 1].id)
+            # Messages past the summary are not summarised yet (a refresh may already be in flight)
+            tail = self._fit(messages, 2 * self.tail_tokens)
+
+        history = [
+            {"role": "user" if message.sender_type == "user" else "assistant", "content": message.content}
+            for message in tail
+        ]
+        return summary, history
+
+    def schedule_refresh(self, interview_id: int, user_id: int, through_id: int) -> None:
+        """Fold messages up to through_id into the summary in the background (once at a time per interview)"""
+        with self._lock:
+            if interview_id in self._refreshing:
+                return
+            self._refreshing.add(interview_id)
+
+        app = current_app._get_current_object()
+        self._pool.submit(self._refresh, app, interview_id, user_id, through_id)
+
+    def refresh_summary(self, interview_id: int, user_id: int, through_id: int) -> Optional[str]:
+        """Fold the messages after the current summary, up to through_id, into it"""
+        from .ai_service import get_ai_service
+
+        summary_row = ConversationMemory.get_summary(interview_id)
+        summary, summarized_through = self._summary_state(summary_row)
+        if through_id <= summarized_through:
+            return summary
+
+        messages = ConversationMessage.query \
+            .filter(
+                ConversationMessage.interview_id == interview_id,
+                ConversationMessage.id > summarized_through,
+                ConversationMessage.id <= through_id
+            ) \
+            .order_by(ConversationMessage.id) \
+            .all()
+        if not messages:
+            return summary
+
+        turns = [
+            {"role": "user" if message.sender_type == "user" else "assistant", "content": message.content}
+            for message in messages
+        ]
+        updated = get_ai_service().summarize_conversation(summary, turns, self.summary_tokens)
+        if updated is None:
+            return summary
+
+        metadata = json.loads(summary_row.extra_data) if summary_row and summary_row.extra_data else {}
+        ConversationMemory.save_summary(interview_id, user_id, updated, {
+            "through_message_id": messages[-1].id,
+            "summarized_messages": metadata.get("summarized_messages", 0) + len(messages),
+        })
+        logger.info(f"Summarized {len(messages)} messages of interview {interview_id}")
+        return updated
+
+    def _refresh(self, app, interview_id: int, user_id: int, through_id: int) -> None:
+        try:
+            with app.app_context():
+                self.refresh_summary(interview_id, user_id, through_id)
+        except Exception as e:
+            logger.error(f"Failed to refresh conversation summary for interview {interview_id}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(interview_id)
+
+    def _fit(self, messages: List[ConversationMessage], budget: int) -> List[ConversationMessage]:
+        """The newest messages whose total tokens fit the budget (always at least the newest one)"""
+        used = 0
+        count = 0
+        for message in reversed(messages):
+            used += self.tokenizer.count(message.content)
+            if used > budget and count:
+                break
+            count += 1
+        return messages[len(messages) - count:]
+
+    @staticmethod
+    def _summary_state(summary_row: Optional[ConversationMemory]) -> Tuple[Optional[str], int]:
+        if summary_row is None:
+            return None, 0
+        metadata = json.loads(summary_row.extra_data) if summary_row.extra_data else {}
+        return summary_row.content, metadata.get("through_message_id", 0)
+
+
+# Global instance for easy access
+conversation_memory_service = ConversationMemoryService()
+
+
+def get_conversation_memory_service() -> ConversationMemoryService:
+    """Get the global conversation memory service instance"""
+    return conversation_memory_service
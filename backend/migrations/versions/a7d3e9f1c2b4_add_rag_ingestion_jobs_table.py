@@ -0,0 +1,64 @@
+"""Add rag ingestion jobs table
+
+Revision ID: a7d3e9f1c2b4
+Revises: f3c8d1a7b6e2
+Create Date: 2026-10-17 13:20:44.861205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3e9f1c2b4'
+down_revision = 'f3c8d1a7b6e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rag_ingestion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('document_id', sa.String(length=255), nullable=False),
+    sa.Column('source_type', sa.String(length=50), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('chunking_strategy', sa.String(length=20), nullable=False),
+    sa.Column('extra_data', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=True),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('total_chunks', sa.Integer(), nullable=False),
+    sa.Column('embedded_chunks', sa.Integer(), nullable=False),
+    sa.Column('stored_chunks', sa.Integer(), nullable=False),
+    sa.Column('skipped_chunks', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_rag_ingestion_jobs_content_hash'), ['content_hash'], unique=False)
+        batch_op.create_index(batch_op.f('ix_rag_ingestion_jobs_status'), ['status'], unique=False)
+        batch_op.create_index('idx_rag_ingestion_jobs_status_run_after', ['status', 'run_after'], unique=False)
+        batch_op.create_index('idx_rag_ingestion_jobs_user_hash', ['user_id', 'content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.drop_index('idx_rag_ingestion_jobs_user_hash')
+        batch_op.drop_index('idx_rag_ingestion_jobs_status_run_after')
+        batch_op.drop_index(batch_op.f('ix_rag_ingestion_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_rag_ingestion_jobs_content_hash'))
+
+    op.drop_table('rag_ingestion_jobs')
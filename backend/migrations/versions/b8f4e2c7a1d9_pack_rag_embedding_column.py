@@ -0,0 +1,89 @@
+"""Convert the JSON-text RAG embedding column to packed bytes
+
+Revision ID: b8f4e2c7a1d9
+Revises: c5e8f2a4d9b1
+Create Date: 2026-10-18 09:21:37.640215
+
+"""
+import json
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f4e2c7a1d9'
+down_revision = 'c5e8f2a4d9b1'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Same layout as rag.models.embedding_codec float32: b'E' + dtype code 1 + little-endian floats
+FLOAT32_HEADER = b'E\x01'
+
+
+def _embedding_type(bind):
+    """Postgres type of rag_embedding_store.embedding, or None if the table does not exist"""
+    return bind.execute(sa.text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = to_regclass('rag_embedding_store') AND attname = 'embedding'"
+    )).scalar()
+
+
+def _pack(text):
+    values = json.loads(text)
+    return FLOAT32_HEADER + struct.pack(f'<{len(values)}f', *values)
+
+
+def _unpack(value):
+    value = bytes(value)
+    if value[:2] != FLOAT32_HEADER:
+        raise ValueError("Only float32 embeddings can be converted back to JSON text")
+    payload = value[2:]
+    return json.dumps(list(struct.unpack(f'<{len(payload) // 4}f', payload)))
+
+
+def _convert(bind, new_type, convert):
+    """Rewrite every embedding through convert into a new column of new_type, then swap it in"""
+    op.execute(f"ALTER TABLE rag_embedding_store ADD COLUMN embedding_converted {new_type}")
+
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, embedding FROM rag_embedding_store WHERE id > :last_id ORDER BY id LIMIT :limit"
+        ), {'last_id': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE rag_embedding_store SET embedding_converted = :value WHERE id = :id"),
+            [{'id': row.id, 'value': convert(row.embedding)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.execute("ALTER TABLE rag_embedding_store DROP COLUMN embedding")
+    op.execute("ALTER TABLE rag_embedding_store RENAME COLUMN embedding_converted TO embedding")
+    op.execute("ALTER TABLE rag_embedding_store ALTER COLUMN embedding SET NOT NULL")
+
+
+def upgrade():
+    # SQLite stores the packed bytes in the existing column as-is, and pgvector
+    # columns are untouched; only Postgres TEXT columns need converting
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if _embedding_type(bind) != 'text':
+        return
+
+    _convert(bind, 'bytea', _pack)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if _embedding_type(bind) != 'bytea':
+        return
+
+    _convert(bind, 'text', _unpack)
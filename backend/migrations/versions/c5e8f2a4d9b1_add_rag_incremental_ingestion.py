@@ -0,0 +1,49 @@
+"""Add chunk tombstones and incremental ingestion job columns
+
+Revision ID: c5e8f2a4d9b1
+Revises: a7d3e9f1c2b4
+Create Date: 2026-10-17 14:05:12.407391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8f2a4d9b1'
+down_revision = 'a7d3e9f1c2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mode', sa.String(length=20), nullable=False, server_default='incremental'))
+        batch_op.add_column(sa.Column('reused_chunks', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('removed_chunks', sa.Integer(), nullable=False, server_default='0'))
+
+    # RAG tables are created by create_rag_tables, so only alter them where they already exist
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'rag_document_chunks' in inspector.get_table_names():
+        columns = {column['name'] for column in inspector.get_columns('rag_document_chunks')}
+        if 'deleted_at' not in columns:
+            with op.batch_alter_table('rag_document_chunks', schema=None) as batch_op:
+                batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+                batch_op.create_index('idx_document_chunks_deleted_at', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'rag_document_chunks' in inspector.get_table_names():
+        columns = {column['name'] for column in inspector.get_columns('rag_document_chunks')}
+        if 'deleted_at' in columns:
+            with op.batch_alter_table('rag_document_chunks', schema=None) as batch_op:
+                batch_op.drop_index('idx_document_chunks_deleted_at')
+                batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.drop_column('removed_chunks')
+        batch_op.drop_column('reused_chunks')
+        batch_op.drop_column('mode')
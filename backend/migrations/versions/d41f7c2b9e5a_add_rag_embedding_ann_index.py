@@ -0,0 +1,68 @@
+"""Add ANN index on rag_embedding_store embeddings
+
+Revision ID: d41f7c2b9e5a
+Revises: b3acf2c890de
+Create Date: 2026-10-17 10:12:41.208337
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f7c2b9e5a'
+down_revision = 'b3acf2c890de'
+branch_labels = None
+depends_on = None
+
+
+def _embedding_is_vector(bind):
+    """The index only applies when the embedding column uses the pgvector type"""
+    if bind.dialect.name != 'postgresql':
+        return False
+    if 'rag_embedding_store' not in sa.inspect(bind).get_table_names():
+        return False
+
+    column_type = bind.execute(sa.text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'rag_embedding_store'::regclass AND attname = 'embedding'"
+    )).scalar()
+    return bool(column_type) and column_type.startswith('vector')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not _embedding_is_vector(bind):
+        return
+
+    # Build parameters match RAG_* settings in config.py; query-time
+    # ef_search/probes are applied per transaction by RetrieverTool
+    method = os.getenv("RAG_ANN_INDEX", "hnsw").lower()
+
+    if method == 'ivfflat':
+        lists = int(os.getenv("RAG_IVFFLAT_LISTS", "100"))
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_store_embedding_ivfflat "
+            f"ON rag_embedding_store USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})"
+        )
+    else:
+        m = int(os.getenv("RAG_HNSW_M", "16"))
+        ef_construction = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_store_embedding_hnsw "
+            f"ON rag_embedding_store USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {m}, ef_construction = {ef_construction})"
+        )
+
+    op.execute("ANALYZE rag_embedding_store")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS idx_embedding_store_embedding_hnsw")
+    op.execute("DROP INDEX IF EXISTS idx_embedding_store_embedding_ivfflat")
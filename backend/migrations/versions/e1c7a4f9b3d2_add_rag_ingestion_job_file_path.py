@@ -0,0 +1,26 @@
+"""Add file_path to RAG ingestion jobs
+
+Revision ID: e1c7a4f9b3d2
+Revises: b8f4e2c7a1d9
+Create Date: 2026-10-18 11:02:44.918372
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1c7a4f9b3d2'
+down_revision = 'b8f4e2c7a1d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('file_path', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('rag_ingestion_jobs', schema=None) as batch_op:
+        batch_op.drop_column('file_path')
@@ -0,0 +1,56 @@
+"""Add composite and JSON metadata indexes for RAG retrieval filters
+
+Revision ID: e6b2a9d4c3f8
+Revises: d41f7c2b9e5a
+Create Date: 2026-10-17 11:02:17.534120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b2a9d4c3f8'
+down_revision = 'd41f7c2b9e5a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    tables = sa.inspect(bind).get_table_names()
+
+    if 'rag_embedding_store' in tables:
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_store_org_source "
+            "ON rag_embedding_store (organization_id, source_type) WHERE organization_id IS NOT NULL"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_store_user_source "
+            "ON rag_embedding_store (user_id, source_type) WHERE user_id IS NOT NULL"
+        )
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_store_created_at "
+            "ON rag_embedding_store (created_at)"
+        )
+
+    if 'rag_document_chunks' in tables:
+        # Serves the chunk_metadata::jsonb @> '{...}' predicates built by RetrieverTool
+        op.execute(
+            "CREATE INDEX IF NOT EXISTS idx_document_chunks_metadata_gin "
+            "ON rag_document_chunks USING gin ((chunk_metadata::jsonb) jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS idx_document_chunks_metadata_gin")
+    op.execute("DROP INDEX IF EXISTS idx_embedding_store_created_at")
+    op.execute("DROP INDEX IF EXISTS idx_embedding_store_user_source")
+    op.execute("DROP INDEX IF EXISTS idx_embedding_store_org_source")
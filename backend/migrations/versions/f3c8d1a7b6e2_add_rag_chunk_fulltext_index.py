@@ -0,0 +1,47 @@
+"""Add full-text GIN index on rag_document_chunks content
+
+Revision ID: f3c8d1a7b6e2
+Revises: e6b2a9d4c3f8
+Create Date: 2026-10-17 11:48:05.216944
+
+"""
+import os
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8d1a7b6e2'
+down_revision = 'e6b2a9d4c3f8'
+branch_labels = None
+depends_on = None
+
+# Same check as rag.models.vector_store.fts_language: a regconfig name, optionally schema-qualified
+FTS_LANGUAGE_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if 'rag_document_chunks' not in sa.inspect(bind).get_table_names():
+        return
+
+    # Must match the to_tsvector expression RetrieverTool builds from RAG_FTS_LANGUAGE
+    language = os.getenv("RAG_FTS_LANGUAGE", "english")
+    if not FTS_LANGUAGE_PATTERN.fullmatch(language):
+        raise ValueError(f"RAG_FTS_LANGUAGE is not a text search configuration name: {language!r}")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_document_chunks_content_fts "
+        f"ON rag_document_chunks USING gin (to_tsvector('{language}'::regconfig, content))"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS idx_document_chunks_content_fts")
@@ -9,7 +9,7 @@ class ConversationMemory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     interview_id = db.Column(db.Integer, db.ForeignKey("interviews.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    message_type = db.Column(db.String(20), nullable=False)  # 'user' or 'ai'
+    message_type = db.Column(db.String(20), nullable=False)  # 'user', 'ai' or 'summary'
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     extra_data = db.Column(db.Text, nullable=True)  # JSON string for additional data
@@ -33,6 +33,7 @@ class ConversationMemory(db.Model):
     def get_recent_conversation(cls, interview_id, limit=20):
         """Get recent conversation history for an interview"""
         return cls.query.filter_by(interview_id=interview_id)\
+                       .filter(cls.message_type != "summary")\
                        .order_by(cls.timestamp.desc())\
                        .limit(limit)\
                        .all()
@@ -52,4 +53,27 @@ class ConversationMemory(db.Model):
 
         db.session.add(memory)
         db.session.commit()
+        return memory
+
+    @classmethod
+    def get_summary(cls, interview_id):
+        """Get the rolling conversation summary for an interview, if any"""
+        return cls.query.filter_by(interview_id=interview_id, message_type="summary")\
+                       .order_by(cls.id.desc())\
+                       .first()
+
+    @classmethod
+    def save_summary(cls, interview_id, user_id, content, metadata=None):
+        """Replace the rolling conversation summary for an interview"""
+        import json
+
+        memory = cls.get_summary(interview_id)
+        if memory is None:
+            memory = cls(interview_id=interview_id, user_id=user_id, message_type="summary")
+            db.session.add(memory)
+
+        memory.content = content
+        memory.timestamp = datetime.utcnow()
+        memory.extra_data = json.dumps(metadata) if metadata else None
+        db.session.commit()
         return memory
\ No newline at end of file
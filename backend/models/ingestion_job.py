@@ -0,0 +1,103 @@
+from datetime import datetime
+
+from ..extensions import db
+
+
+class IngestionJob(db.Model):
+    """Queued RAG ingestion request, processed by the rag-worker CLI command"""
+
+    __tablename__ = "rag_ingestion_jobs"
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    # incremental: the content replaces the document's chunk set; append: chunks are only added
+    MODE_INCREMENTAL = "incremental"
+    MODE_APPEND = "append"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey("organizations.id"), nullable=True)
+
+    # What to ingest
+    document_id = db.Column(db.String(255), nullable=False)
+    source_type = db.Column(db.String(50), nullable=False)
+    filename = db.Column(db.String(255), nullable=True)
+    content = db.Column(db.Text, nullable=False)
+    file_path = db.Column(db.String(500), nullable=True)  # Uploaded PDF/DOCX extracted by the worker; content is empty
+    content_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 of content (or the file's bytes), for deduplication
+    chunking_strategy = db.Column(db.String(20), nullable=False, default="semantic")
+    extra_data = db.Column(db.Text, nullable=True)  # JSON string of chunk metadata
+    mode = db.Column(db.String(20), nullable=False, default=MODE_INCREMENTAL)
+
+    # Queue state
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED, index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=True)  # Retry backoff
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)  # Lease heartbeat; stale leases are reclaimed
+    error = db.Column(db.Text, nullable=True)
+
+    # Progress
+    total_chunks = db.Column(db.Integer, nullable=False, default=0)
+    embedded_chunks = db.Column(db.Integer, nullable=False, default=0)
+    stored_chunks = db.Column(db.Integer, nullable=False, default=0)
+    skipped_chunks = db.Column(db.Integer, nullable=False, default=0)  # Already stored (same content_hash)
+    reused_chunks = db.Column(db.Integer, nullable=False, default=0)  # Embedding copied from an identical stored chunk
+    removed_chunks = db.Column(db.Integer, nullable=False, default=0)  # Tombstoned, no longer in the document
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    user = db.relationship("User", backref="ingestion_jobs")
+
+    __table_args__ = (
+        db.Index("idx_rag_ingestion_jobs_status_run_after", "status", "run_after"),
+        db.Index("idx_rag_ingestion_jobs_user_hash", "user_id", "content_hash"),
+    )
+
+    @property
+    def progress(self):
+        """Fraction of chunks embedded, reused or skipped as duplicates; 1.0 once stored"""
+        if self.status == self.STATUS_COMPLETED:
+            return 1.0
+        if not self.total_chunks:
+            return 0.0
+        done = (self.embedded_chunks or 0) + (self.reused_chunks or 0) + (self.skipped_chunks or 0)
+        return min(1.0, done / self.total_chunks)
+
+    def to_dict(self):
+        import json
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "organization_id": self.organization_id,
+            "document_id": self.document_id,
+            "source_type": self.source_type,
+            "filename": self.filename,
+            "content_hash": self.content_hash,
+            "content_length": len(self.content) if self.content else 0,
+            "has_file": bool(self.file_path),
+            "chunking_strategy": self.chunking_strategy,
+            "mode": self.mode,
+            "metadata": json.loads(self.extra_data) if self.extra_data else None,
+            "status": self.status,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "error": self.error,
+            "progress": round(self.progress, 3),
+            "total_chunks": self.total_chunks,
+            "embedded_chunks": self.embedded_chunks,
+            "stored_chunks": self.stored_chunks,
+            "skipped_chunks": self.skipped_chunks,
+            "reused_chunks": self.reused_chunks,
+            "removed_chunks": self.removed_chunks,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
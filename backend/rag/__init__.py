@@ -9,6 +9,7 @@ __author__ = "RecruAI Team"
 # Import main components for easy access
 from .tools.supervisor import RAGSupervisor
 from .tools.ingestor import IngestorTool
+from .tools.batch_ingestor import BatchIngestor
 from .tools.embedder import EmbedderTool
 from .tools.retriever import RetrieverTool
 from .tools.generator import GeneratorTool
@@ -16,6 +17,7 @@ from .tools.generator import GeneratorTool
 __all__ = [
     "RAGSupervisor",
     "IngestorTool",
+    "BatchIngestor",
     "EmbedderTool",
     "RetrieverTool",
     "GeneratorTool",
@@ -0,0 +1,27 @@
+"""
+RAG Caches
+"""
+
+from .embedding_cache import (
+    EmbeddingCacheBackend,
+    LRUEmbeddingCache,
+    SQLiteEmbeddingCache,
+    TieredEmbeddingCache,
+    get_embedding_cache,
+)
+from .answer_cache import AnswerCache, CorpusChangeFeed, normalize_query
+from .extraction_cache import ExtractionCache, file_digest, get_extraction_cache
+
+__all__ = [
+    "EmbeddingCacheBackend",
+    "LRUEmbeddingCache",
+    "SQLiteEmbeddingCache",
+    "TieredEmbeddingCache",
+    "get_embedding_cache",
+    "AnswerCache",
+    "CorpusChangeFeed",
+    "normalize_query",
+    "ExtractionCache",
+    "file_digest",
+    "get_extraction_cache",
+]
\ No newline at end of file
@@ -0,0 +1,298 @@
+"""
+Answer Cache
+Two-level cache of generated RAG answers: an exact match on the normalized
+query, filters and tenant, then an approximate match on the query embedding
+within a similarity radius. Entries expire by TTL, are evicted LRU, and are
+dropped when chunks their filters could retrieve are added or removed.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+from ..index.base import METADATA_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+_QUERY_WHITESPACE = re.compile(r'\s+')
+_QUERY_EDGE_PUNCTUATION = re.compile(r'^[\s\W_]+|[\s\W_]+$')
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, collapse whitespace and strip leading/trailing punctuation"""
+    return _QUERY_EDGE_PUNCTUATION.sub('', _QUERY_WHITESPACE.sub(' ', query.casefold()))
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value or {}, sort_keys=True, default=str)
+
+
+class AnswerCache:
+    """
+    Thread-safe in-process answer cache.
+
+    The exact level is keyed by (normalized query, filters, tenant). The
+    semantic level groups entries by (filters, tenant) and matches a query
+    embedding against the group's cached query embeddings by cosine
+    similarity, so near-identical questions share an answer only within
+    the same scope.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # scope -> {entry key: unit query embedding}, plus a stacked matrix rebuilt on change
+        self._scopes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._metrics = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @staticmethod
+    def scope_key(filters: Optional[Dict[str, Any]], tenant: Optional[Dict[str, Any]]) -> str:
+        return hashlib.sha256(f"{_canonical(filters)}|{_canonical(tenant)}".encode('utf-8')).hexdigest()
+
+    def exact_key(self, query: str, filters: Optional[Dict[str, Any]], tenant: Optional[Dict[str, Any]]) -> str:
+        scope = self.scope_key(filters, tenant)
+        return hashlib.sha256(f"{normalize_query(query)}|{scope}".encode('utf-8')).hexdigest()
+
+    def get(self, query: str, filters: Optional[Dict[str, Any]], tenant: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Level 1: the cached answer for this exact normalized query, if fresh"""
+        key = self.exact_key(query, filters, tenant)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._metrics['exact_hits'] += 1
+            return entry['answer']
+
+    def get_similar(
+        self,
+        embedding,
+        filters: Optional[Dict[str, Any]],
+        tenant: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Level 2: the answer of the most similar cached query in the same scope, if within the radius"""
+        vector = self._unit(embedding)
+        scope_key = self.scope_key(filters, tenant)
+
+        with self._lock:
+            scope = self._scopes.get(scope_key)
+            if vector is None or not scope or not scope['vectors']:
+                self._metrics['misses'] += 1
+                return None
+
+            if scope['matrix'] is None:
+                scope['keys'] = list(scope['vectors'])
+                scope['matrix'] = np.vstack([scope['vectors'][key] for key in scope['keys']])
+
+            if scope['matrix'].shape[1] != vector.shape[0]:
+                self._metrics['misses'] += 1
+                return None
+
+            similarities = scope['matrix'] @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.similarity_threshold:
+                self._metrics['misses'] += 1
+                return None
+
+            entry = self._live_entry(scope['keys'][best])
+            if entry is None:
+                self._metrics['misses'] += 1
+                return None
+            self._metrics['semantic_hits'] += 1
+            return entry['answer'], similarity
+
+    def set(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]],
+        tenant: Optional[Dict[str, Any]],
+        answer: Dict[str, Any],
+        embedding=None
+    ) -> None:
+        """Cache an answer under both levels"""
+        if self.max_entries <= 0:
+            return
+
+        key = self.exact_key(query, filters, tenant)
+        scope_key = self.scope_key(filters, tenant)
+        vector = self._unit(embedding)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {
+                'answer': answer,
+                'scope': scope_key,
+                'filters': dict(filters or {}),
+                'expires_at': time.monotonic() + self.ttl_seconds,
+            }
+
+            if vector is not None:
+                scope = self._scopes.setdefault(scope_key, {'vectors': {}, 'keys': [], 'matrix': None})
+                scope['vectors'][key] = vector
+                scope['matrix'] = None
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._metrics['evictions'] += 1
+
+    def invalidate(self, documents: Iterable[Dict[str, Any]]) -> int:
+        """
+        Drop entries whose filters match any changed chunk's metadata
+        (source_type, user_id, organization_id, document_id). Filters on
+        other fields cannot be checked from that metadata, so their entries
+        are dropped conservatively.
+
+        Returns:
+            Number of entries removed
+        """
+        documents = list(documents)
+        if not documents:
+            return 0
+
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if any(self._filters_match(entry['filters'], document) for document in documents)
+            ]
+            for key in stale:
+                self._remove(key)
+            self._metrics['invalidations'] += len(stale)
+
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached answers after document changes")
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics['exact_hits'] + metrics['semantic_hits'] + metrics['misses']
+        return {
+            **metrics,
+            'size': len(self._entries),
+            'limit': self.max_entries,
+            'hit_rate': (metrics['exact_hits'] + metrics['semantic_hits']) / lookups if lookups else 0.0,
+        }
+
+    def _live_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Fetch an entry and mark it recently used, expiring it if past its TTL (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] <= time.monotonic():
+            self._remove(key)
+            self._metrics['expirations'] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        scope = self._scopes.get(entry['scope'])
+        if scope is not None and scope['vectors'].pop(key, None) is not None:
+            scope['matrix'] = None
+            if not scope['vectors']:
+                del self._scopes[entry['scope']]
+
+    @staticmethod
+    def _unit(embedding):
+        if embedding is None or not HAS_NUMPY:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    @staticmethod
+    def _filters_match(filters: Dict[str, Any], document: Dict[str, Any]) -> bool:
+        for key, value in filters.items():
+            if key not in METADATA_COLUMNS:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if str(document.get(key)) not in {str(v) for v in values}:
+                return False
+        return True
+
+
+class CorpusChangeFeed:
+    """
+    Reports chunks added or tombstoned since the last poll, by any process,
+    using chunk ID and deleted_at high-water marks
+    """
+
+    def __init__(self, session_factory, interval_seconds: float = 5.0):
+        self._session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self._chunk_high_water: Optional[int] = None
+        self._tombstone_high_water: Optional[datetime] = None
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Metadata of chunks changed since the last poll (at most once per interval)"""
+        from ..models import DocumentChunk
+
+        if time.monotonic() - self._last_poll < self.interval_seconds:
+            return []
+        if not self._lock.acquire(blocking=False):
+            return []  # Another thread is polling
+
+        try:
+            self._last_poll = time.monotonic()
+            columns = [getattr(DocumentChunk, column) for column in METADATA_COLUMNS]
+            with self._session_factory() as session:
+                if self._chunk_high_water is None:
+                    # First poll only sets the marks; nothing can be cached yet
+                    self._chunk_high_water = session.query(DocumentChunk.id).order_by(DocumentChunk.id.desc()).limit(1).scalar() or 0
+                    self._tombstone_high_water = session.query(DocumentChunk.deleted_at) \
+                        .filter(DocumentChunk.deleted_at.isnot(None)) \
+                        .order_by(DocumentChunk.deleted_at.desc()).limit(1).scalar() or datetime.min
+                    return []
+
+                changed = []
+                added = session.query(DocumentChunk.id, *columns) \
+                    .filter(DocumentChunk.id > self._chunk_high_water).order_by(DocumentChunk.id).all()
+                if added:
+                    self._chunk_high_water = added[-1].id
+                    changed.extend(added)
+
+                removed = session.query(DocumentChunk.deleted_at, *columns) \
+                    .filter(DocumentChunk.deleted_at > self._tombstone_high_water) \
+                    .order_by(DocumentChunk.deleted_at).all()
+                if removed:
+                    self._tombstone_high_water = removed[-1].deleted_at
+                    changed.extend(removed)
+
+            # One entry per distinct scope is enough to match filters
+            return [dict(scope) for scope in {tuple((column, getattr(row, column)) for column in METADATA_COLUMNS) for row in changed}]
+
+        except Exception as e:
+            logger.warning(f"Failed to poll document changes for the answer cache: {e}")
+            return []
+        finally:
+            self._lock.release()
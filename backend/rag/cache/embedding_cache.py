@@ -0,0 +1,344 @@
+"""
+Embedding Cache
+Two-tier cache for text embeddings: an in-process LRU in front of a store
+shared by every worker process. Embeddings are held as float32 arrays in
+memory and as packed bytes on disk.
+"""
+
+import abc
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence
+
+from ..models.embedding_codec import encode_embedding, decode_embedding
+
+
+logger = logging.getLogger(__name__)
+
+# Entries are dicts of {'embedding': float32 vector, 'model': str, 'cached_at': float}
+CacheEntry = Dict[str, Any]
+
+
+class EmbeddingCacheBackend(abc.ABC):
+    """Abstract base class for embedding cache tiers keyed by EmbedderTool._get_cache_key"""
+
+    @abc.abstractmethod
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        """Return the cached entries for the keys that are present"""
+        pass
+
+    @abc.abstractmethod
+    def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """Store entries, replacing existing ones"""
+        pass
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Remove every entry"""
+        pass
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size statistics"""
+        return {'backend': type(self).__name__, 'size': len(self)}
+
+
+class LRUEmbeddingCache(EmbeddingCacheBackend):
+    """In-process LRU cache with O(1) lookups, inserts and evictions"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = entry
+        return found
+
+    def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        with self._lock:
+            for key, entry in entries.items():
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'limit': self.max_entries, 'evictions': self.evictions})
+        return stats
+
+
+class SQLiteEmbeddingCache(EmbeddingCacheBackend):
+    """
+    On-disk cache shared by every process on the host and kept across restarts.
+    Vectors are stored as packed float32/float16/int8 blobs; entries not read
+    recently are pruned once the table grows past max_entries.
+    """
+
+    # Bound parameters per statement stay well under SQLite's variable limit
+    _BATCH = 500
+    # How many writes between size checks
+    _PRUNE_INTERVAL = 1000
+
+    def __init__(self, path: str, max_entries: int = 500000, dtype: str = 'float32'):
+        self.path = path
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes_since_prune = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork (gunicorn preload), so reopen per process
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, embedding BLOB NOT NULL, "
+                "cached_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_cache_accessed_at ON embedding_cache (accessed_at)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        found = {}
+        now = time.time()
+
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(keys), self._BATCH):
+                batch = list(keys[start:start + self._BATCH])
+                placeholders = ",".join("?" * len(batch))
+                rows = connection.execute(
+                    f"SELECT key, model, embedding, cached_at FROM embedding_cache WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+
+                for key, model, blob, cached_at in rows:
+                    try:
+                        found[key] = {'embedding': decode_embedding(blob), 'model': model, 'cached_at': cached_at}
+                    except ValueError:
+                        # Unreadable entries count as misses and are overwritten on the next write
+                        continue
+
+                if rows:
+                    hit_keys = [row[0] for row in rows]
+                    connection.execute(
+                        f"UPDATE embedding_cache SET accessed_at = ? WHERE key IN ({','.join('?' * len(hit_keys))})",
+                        [now, *hit_keys]
+                    )
+
+        return found
+
+    def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        if not entries:
+            return
+
+        now = time.time()
+        rows = [
+            (key, entry.get('model'), encode_embedding(entry['embedding'], self.dtype), entry.get('cached_at', now), now)
+            for key, entry in entries.items()
+        ]
+
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, model, embedding, cached_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+            self._writes_since_prune += len(rows)
+            if self._writes_since_prune >= self._PRUNE_INTERVAL:
+                self._writes_since_prune = 0
+                self._prune(connection)
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Drop the least recently read entries down to 90% of max_entries"""
+        size = connection.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+        if size <= self.max_entries:
+            return
+
+        excess = size - int(self.max_entries * 0.9)
+        connection.execute(
+            "DELETE FROM embedding_cache WHERE key IN "
+            "(SELECT key FROM embedding_cache ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        self.evictions += excess
+        logger.info(f"Pruned {excess} entries from shared embedding cache")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM embedding_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update({'limit': self.max_entries, 'evictions': self.evictions, 'path': self.path, 'dtype': self.dtype})
+        return stats
+
+
+class TieredEmbeddingCache:
+    """
+    In-process LRU layered over an optional shared tier, with hit/miss metrics.
+    Shared-tier failures are logged and treated as misses so caching never
+    blocks embedding.
+    """
+
+    def __init__(self, memory: LRUEmbeddingCache, shared: Optional[EmbeddingCacheBackend] = None):
+        self.memory = memory
+        self.shared = shared
+        self._metrics_lock = threading.Lock()
+        self._metrics = {'memory_hits': 0, 'shared_hits': 0, 'misses': 0, 'writes': 0, 'shared_errors': 0}
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        """Look keys up in memory, then in the shared tier, promoting shared hits"""
+        found = self.memory.get_many(keys)
+        memory_hits = len(found)
+        shared_hits = 0
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.shared is not None:
+            try:
+                shared_found = self.shared.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache read failed: {e}")
+                shared_found = {}
+                self._count('shared_errors', 1)
+
+            if shared_found:
+                self.memory.set_many(shared_found)
+                found.update(shared_found)
+                shared_hits = len(shared_found)
+
+        with self._metrics_lock:
+            self._metrics['memory_hits'] += memory_hits
+            self._metrics['shared_hits'] += shared_hits
+            self._metrics['misses'] += len(keys) - memory_hits - shared_hits
+
+        return found
+
+    def set_many(self, entries: Dict[str, CacheEntry]) -> None:
+        """Write entries through to both tiers"""
+        if not entries:
+            return
+
+        self.memory.set_many(entries)
+        self._count('writes', len(entries))
+
+        if self.shared is not None:
+            try:
+                self.shared.set_many(entries)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache write failed: {e}")
+                self._count('shared_errors', 1)
+
+    def clear(self) -> None:
+        """Clear both tiers and reset metrics"""
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+        with self._metrics_lock:
+            for key in self._metrics:
+                self._metrics[key] = 0
+
+    def _count(self, metric: str, amount: int) -> None:
+        with self._metrics_lock:
+            self._metrics[metric] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss metrics and per-tier statistics"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        lookups = metrics['memory_hits'] + metrics['shared_hits'] + metrics['misses']
+        stats = {
+            **metrics,
+            'lookups': lookups,
+            'hit_rate': (metrics['memory_hits'] + metrics['shared_hits']) / lookups if lookups else 0.0,
+            'memory': self.memory.get_stats(),
+            'shared': None,
+        }
+
+        if self.shared is not None:
+            try:
+                stats['shared'] = self.shared.get_stats()
+            except Exception as e:
+                stats['shared'] = {'error': str(e)}
+
+        return stats
+
+
+_embedding_cache: Optional[TieredEmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> TieredEmbeddingCache:
+    """Get the process-wide embedding cache configured by RAG_EMBEDDING_CACHE*"""
+    global _embedding_cache
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                from ..config import RAGConfig
+
+                shared = None
+                if RAGConfig.EMBEDDING_CACHE_BACKEND == 'sqlite':
+                    shared = SQLiteEmbeddingCache(
+                        RAGConfig.EMBEDDING_CACHE_PATH,
+                        max_entries=RAGConfig.EMBEDDING_CACHE_MAX_ENTRIES,
+                        dtype=RAGConfig.EMBEDDING_STORAGE_DTYPE
+                    )
+
+                _embedding_cache = TieredEmbeddingCache(
+                    LRUEmbeddingCache(max_entries=RAGConfig.EMBEDDING_CACHE_SIZE),
+                    shared
+                )
+
+    return _embedding_cache
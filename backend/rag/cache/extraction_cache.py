@@ -0,0 +1,140 @@
+"""
+Extraction Cache
+Text extracted from uploaded documents, kept on disk and keyed by a hash of
+the file's bytes, so re-uploading the same file skips parsing it again
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from typing import IO, Any, Dict, Iterable, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed per read
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def file_digest(stream: IO[bytes]) -> str:
+    """SHA-256 of a seekable binary stream, read in blocks; the stream is rewound afterwards"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    while True:
+        block = stream.read(HASH_BLOCK_BYTES)
+        if not block:
+            break
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Directory of extracted text files, one per (file hash, extractor) key.
+
+    Text is written while it is being extracted and only published, by an
+    atomic rename, once extraction finishes, so a partial extraction is never
+    served. Least recently used files are removed beyond max_entries.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def open(self, key: str) -> Optional[IO[str]]:
+        """Open the cached text for key, or return None on a miss"""
+        path = self._path(key)
+        try:
+            handle = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)  # Recency for pruning
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return handle
+
+    def store(self, key: str, blocks: Iterable[str]) -> Iterator[str]:
+        """Pass blocks through while writing them to the cache under key"""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        completed = False
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                for block in blocks:
+                    handle.write(block)
+                    yield block
+            os.replace(temp_path, self._path(key))
+            completed = True
+        finally:
+            if not completed:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+        self._prune()
+
+    def _prune(self) -> None:
+        if self.max_entries <= 0:
+            return
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [entry for entry in entries if entry.name.endswith('.txt')]
+            if len(files) <= self.max_entries:
+                return
+            files.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in files[:len(files) - self.max_entries]:
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Extraction cache prune failed: {e}")
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(('.txt', '.tmp')):
+                    os.remove(entry.path)
+
+    def __len__(self) -> int:
+        with os.scandir(self.directory) as entries:
+            return sum(1 for entry in entries if entry.name.endswith('.txt'))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'size': len(self), 'max_entries': self.max_entries, 'hits': self.hits, 'misses': self.misses}
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Get the process-wide extraction cache configured by RAG_EXTRACTION_CACHE_*, or None when disabled"""
+    global _extraction_cache
+
+    if _extraction_cache is None:
+        with _extraction_cache_lock:
+            if _extraction_cache is None:
+                from ..config import RAGConfig
+
+                if RAGConfig.EXTRACTION_CACHE_MAX_ENTRIES <= 0:
+                    return None
+                _extraction_cache = ExtractionCache(
+                    RAGConfig.EXTRACTION_CACHE_DIR,
+                    max_entries=RAGConfig.EXTRACTION_CACHE_MAX_ENTRIES
+                )
+
+    return _extraction_cache
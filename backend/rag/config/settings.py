@@ -8,30 +8,33 @@ from typing import Dict, Any, Optional
 # Import from main config
 from ...config import Config
 
+# Config exposes its AI/RAG settings as properties, so read them from an instance
+_config = Config()
+
 
 class RAGConfig:
     """Configuration class for RAG system settings"""
 
     # Use main config values
-    OPENAI_API_KEY: Optional[str] = Config.OPENAI_API_KEY
-    GROQ_API_KEY: Optional[str] = Config.GROQ_API_KEY
+    OPENAI_API_KEY: Optional[str] = _config.OPENAI_API_KEY
+    GROQ_API_KEY: Optional[str] = _config.GROQ_API_KEY
 
     # Provider settings from main config
-    AI_PROVIDER: str = Config.AI_PROVIDER
-    EMBEDDING_PROVIDER: str = Config.EMBEDDING_PROVIDER
-    RAG_ENABLED: bool = Config.RAG_ENABLED
+    AI_PROVIDER: str = _config.AI_PROVIDER
+    EMBEDDING_PROVIDER: str = _config.EMBEDDING_PROVIDER
+    RAG_ENABLED: bool = _config.RAG_ENABLED
 
     # Model settings
-    AI_MODEL: Optional[str] = Config.AI_MODEL
-    EMBEDDING_MODEL: Optional[str] = Config.EMBEDDING_MODEL
-    EMBEDDING_DIMENSIONS: int = Config.EMBEDDING_DIMENSIONS
+    AI_MODEL: Optional[str] = _config.AI_MODEL
+    EMBEDDING_MODEL: Optional[str] = _config.EMBEDDING_MODEL
+    EMBEDDING_DIMENSIONS: int = _config.EMBEDDING_DIMENSIONS
 
     # Legacy OpenAI defaults (for backward compatibility)
     OPENAI_EMBEDDING_MODEL: str = EMBEDDING_MODEL or "text-embedding-ada-002"
     OPENAI_EMBEDDING_DIMENSIONS: int = EMBEDDING_DIMENSIONS
     OPENAI_COMPLETION_MODEL: str = AI_MODEL or "gpt-4"
-    OPENAI_MAX_TOKENS: int = Config.AI_MAX_TOKENS
-    OPENAI_TEMPERATURE: float = Config.AI_TEMPERATURE
+    OPENAI_MAX_TOKENS: int = _config.AI_MAX_TOKENS
+    OPENAI_TEMPERATURE: float = _config.AI_TEMPERATURE
 
     # Vector Database Configuration (from main config)
     VECTOR_DB_HOST: str = os.getenv("VECTOR_DB_HOST", "localhost")
@@ -41,27 +44,92 @@ class RAGConfig:
     VECTOR_DB_PASSWORD: str = os.getenv("VECTOR_DB_PASSWORD", "")
 
     # Chunking Configuration
-    CHUNK_SIZE: int = Config.RAG_CHUNK_SIZE
-    CHUNK_OVERLAP: int = Config.RAG_CHUNK_OVERLAP
+    CHUNK_SIZE: int = _config.RAG_CHUNK_SIZE
+    CHUNK_OVERLAP: int = _config.RAG_CHUNK_OVERLAP
+    CHUNK_TOKENS: int = _config.RAG_CHUNK_TOKENS
+    CHUNK_OVERLAP_TOKENS: int = _config.RAG_CHUNK_OVERLAP_TOKENS
+    CHUNK_TOKENIZER: str = _config.RAG_CHUNK_TOKENIZER
     MAX_CHUNKS_PER_DOCUMENT: int = 100
 
     # Retrieval Configuration
-    TOP_K_RESULTS: int = Config.RAG_TOP_K
-    SIMILARITY_THRESHOLD: float = Config.RAG_SIMILARITY_THRESHOLD
-    MAX_CONTEXT_LENGTH: int = Config.RAG_MAX_CONTEXT_LENGTH
+    TOP_K_RESULTS: int = _config.RAG_TOP_K
+    SIMILARITY_THRESHOLD: float = _config.RAG_SIMILARITY_THRESHOLD
+    MAX_CONTEXT_LENGTH: int = _config.RAG_MAX_CONTEXT_LENGTH  # Tokens of retrieved context per answer prompt
+    CONTEXT_DUPLICATE_SIMILARITY: float = _config.RAG_CONTEXT_DUPLICATE_SIMILARITY
+
+    # Vector Index Configuration ('auto', 'numpy', 'hnsw' or 'database')
+    VECTOR_INDEX_BACKEND: str = _config.RAG_VECTOR_INDEX
+
+    # Approximate nearest-neighbour tuning (pgvector and in-process HNSW)
+    ANN_INDEX_TYPE: str = _config.RAG_ANN_INDEX
+    HNSW_M: int = _config.RAG_HNSW_M
+    HNSW_EF_CONSTRUCTION: int = _config.RAG_HNSW_EF_CONSTRUCTION
+    HNSW_EF_SEARCH: int = _config.RAG_HNSW_EF_SEARCH
+    IVFFLAT_LISTS: int = _config.RAG_IVFFLAT_LISTS
+    IVFFLAT_PROBES: int = _config.RAG_IVFFLAT_PROBES
+
+    # Hybrid (keyword + semantic) retrieval
+    FTS_LANGUAGE: str = _config.RAG_FTS_LANGUAGE
+    RRF_K: int = _config.RAG_RRF_K
+    BM25_K1: float = _config.RAG_BM25_K1
+    BM25_B: float = _config.RAG_BM25_B
+    KEYWORD_FIRST_MAX_TERMS: int = _config.RAG_KEYWORD_FIRST_MAX_TERMS
+
+    # Background ingestion
+    WORKER_CONCURRENCY: int = _config.RAG_WORKER_CONCURRENCY
+    WORKER_POLL_SECONDS: float = _config.RAG_WORKER_POLL_SECONDS
+    JOB_MAX_ATTEMPTS: int = _config.RAG_JOB_MAX_ATTEMPTS
+    JOB_LEASE_SECONDS: int = _config.RAG_JOB_LEASE_SECONDS
+    JOB_RETRY_BASE_SECONDS: int = _config.RAG_JOB_RETRY_BASE_SECONDS
+    JOB_PROGRESS_CHUNKS: int = _config.RAG_JOB_PROGRESS_CHUNKS
+    JOB_UPLOAD_DIR: str = _config.RAG_JOB_UPLOAD_DIR
+    INDEX_REFRESH_SECONDS: float = _config.RAG_INDEX_REFRESH_SECONDS
+    BULK_INSERT_BATCH_SIZE: int = _config.RAG_BULK_INSERT_BATCH_SIZE
+    INGEST_PROCESSES: int = _config.RAG_INGEST_PROCESSES
+    INGEST_EMBED_CHUNKS: int = _config.RAG_INGEST_EMBED_CHUNKS
+    PIPELINE_WORKERS: int = _config.RAG_PIPELINE_WORKERS
 
     # Rate Limiting
-    MAX_REQUESTS_PER_MINUTE: int = Config.EMBEDDING_REQUESTS_PER_MINUTE
-    MAX_REQUESTS_PER_HOUR: int = Config.EMBEDDING_REQUESTS_PER_HOUR
+    MAX_REQUESTS_PER_MINUTE: int = _config.EMBEDDING_REQUESTS_PER_MINUTE
+    MAX_REQUESTS_PER_HOUR: int = _config.EMBEDDING_REQUESTS_PER_HOUR
+    MAX_TOKENS_PER_MINUTE: int = _config.EMBEDDING_TOKENS_PER_MINUTE
+
+    # Embedding concurrency and retries
+    EMBEDDING_CONCURRENCY: int = _config.EMBEDDING_MAX_CONCURRENCY
+    EMBEDDING_MAX_RETRIES: int = _config.EMBEDDING_MAX_RETRIES
+    EMBEDDING_RETRY_BASE_DELAY: float = _config.EMBEDDING_RETRY_BASE_DELAY
+
+    # Embedding batch sizing (0 = provider default)
+    EMBEDDING_MAX_BATCH_SIZE: int = _config.EMBEDDING_MAX_BATCH_SIZE
+    EMBEDDING_MAX_BATCH_TOKENS: int = _config.EMBEDDING_MAX_BATCH_TOKENS
+    EMBEDDING_TARGET_BATCH_SECONDS: float = _config.EMBEDDING_TARGET_BATCH_SECONDS
 
     # File Processing
     MAX_FILE_SIZE_MB: int = 10
     SUPPORTED_FILE_TYPES: list = [".pdf", ".txt", ".md", ".docx", ".html"]
 
+    # Text extracted from PDF/DOCX files, cached on disk by file hash
+    EXTRACTION_CACHE_DIR: str = _config.RAG_EXTRACTION_CACHE_DIR
+    EXTRACTION_CACHE_MAX_ENTRIES: int = _config.RAG_EXTRACTION_CACHE_MAX_ENTRIES
+
     # Caching
     CACHE_TTL_SECONDS: int = 3600  # 1 hour
     ENABLE_CACHE: bool = True
 
+    # Query answer cache: exact then semantic (query embedding) matches, TTL from CACHE_TTL_SECONDS
+    ANSWER_CACHE_SIZE: int = _config.RAG_ANSWER_CACHE_SIZE
+    ANSWER_CACHE_SIMILARITY: float = _config.RAG_ANSWER_CACHE_SIMILARITY
+    ANSWER_CACHE_REFRESH_SECONDS: float = _config.RAG_ANSWER_CACHE_REFRESH_SECONDS
+
+    # Embedding cache: in-process LRU over a shared tier ('sqlite' or 'memory' only)
+    EMBEDDING_CACHE_BACKEND: str = _config.RAG_EMBEDDING_CACHE
+    EMBEDDING_CACHE_PATH: str = _config.RAG_EMBEDDING_CACHE_PATH
+    EMBEDDING_CACHE_SIZE: int = _config.RAG_EMBEDDING_CACHE_SIZE
+    EMBEDDING_CACHE_MAX_ENTRIES: int = _config.RAG_EMBEDDING_CACHE_MAX_ENTRIES
+
+    # Binary embedding storage ('float32', 'float16' or 'int8')
+    EMBEDDING_STORAGE_DTYPE: str = _config.RAG_EMBEDDING_STORAGE_DTYPE
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -89,6 +157,7 @@ class RAGConfig:
                 "embedding_model": cls.OPENAI_EMBEDDING_MODEL,
                 "completion_model": cls.OPENAI_COMPLETION_MODEL,
                 "chunk_size": cls.CHUNK_SIZE,
+                "chunk_tokens": cls.CHUNK_TOKENS,
                 "top_k": cls.TOP_K_RESULTS,
                 "max_file_size": cls.MAX_FILE_SIZE_MB,
             }
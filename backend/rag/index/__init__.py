@@ -0,0 +1,28 @@
+"""
+RAG Vector and Keyword Indexes
+"""
+
+from .base import VectorIndex, MetadataColumns, METADATA_COLUMNS
+from .numpy_index import NumpyVectorIndex, HAS_NUMPY
+from .hnsw_index import HNSWVectorIndex
+from .keyword_index import KeywordIndex, tokenize
+from .evaluation import recall_at_k, recall_report, measure_index_recall
+from .sync import register_index, unregister_index, indexes_registered, queue_index_changes
+
+__all__ = [
+    "VectorIndex",
+    "MetadataColumns",
+    "METADATA_COLUMNS",
+    "NumpyVectorIndex",
+    "HNSWVectorIndex",
+    "KeywordIndex",
+    "tokenize",
+    "HAS_NUMPY",
+    "recall_at_k",
+    "recall_report",
+    "measure_index_recall",
+    "register_index",
+    "unregister_index",
+    "indexes_registered",
+    "queue_index_changes",
+]
\ No newline at end of file
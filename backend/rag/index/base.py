@@ -0,0 +1,162 @@
+"""
+Vector Index Interface
+Common contract for in-process similarity indexes used by the retriever
+"""
+
+import abc
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Metadata columns every index keeps per row so filters can be applied without the database
+METADATA_COLUMNS = ("source_type", "user_id", "organization_id", "document_id")
+
+
+class MetadataColumns:
+    """
+    Dictionary encoder for the per-row metadata columns.
+    Values are stored as small integer codes; code 0 is reserved for NULL.
+    """
+
+    def __init__(self):
+        self._vocab: Dict[str, Dict[Optional[str], int]] = {column: {None: 0} for column in METADATA_COLUMNS}
+        self._values: Dict[str, List[Optional[str]]] = {column: [None] for column in METADATA_COLUMNS}
+
+    def encode(self, column: str, value: Any) -> int:
+        """Return the code for a value, assigning a new one if needed"""
+        key = self._key(value)
+        vocab = self._vocab[column]
+        code = vocab.get(key)
+        if code is None:
+            code = len(self._values[column])
+            vocab[key] = code
+            self._values[column].append(key)
+        return code
+
+    def decode(self, column: str, code: int) -> Optional[str]:
+        return self._values[column][code]
+
+    def lookup(self, column: str, value: Any) -> List[int]:
+        """Return the known codes for a filter value (scalar or IN-list)"""
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        codes = [self._vocab[column].get(self._key(v)) for v in values]
+        return [code for code in codes if code is not None]
+
+    @staticmethod
+    def _key(value: Any) -> Optional[str]:
+        # IDs arrive as both ints (JWT identity) and strings (stored columns)
+        return None if value is None else str(value)
+
+
+class VectorIndex(abc.ABC):
+    """
+    Abstract base class for vector indexes keyed by chunk ID.
+    Scores returned by ``search`` are cosine similarities in [-1, 1].
+    """
+
+    # Whether search results are guaranteed to match a brute-force scan
+    exact: bool = True
+
+    @property
+    @abc.abstractmethod
+    def dimension(self) -> int:
+        """Return the dimension of indexed vectors"""
+        pass
+
+    @abc.abstractmethod
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        vectors: Sequence[Sequence[float]],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> None:
+        """Insert or replace vectors for the given chunk IDs"""
+        pass
+
+    @abc.abstractmethod
+    def remove(self, chunk_ids: Sequence[int]) -> int:
+        """Remove vectors for the given chunk IDs, returning how many were present"""
+        pass
+
+    @abc.abstractmethod
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to top_k (chunk_id, similarity) pairs, best first.
+        Filters match METADATA_COLUMNS by value or IN-list, plus a
+        'chunk_id' allow-list.
+        """
+        pass
+
+    def exact_search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Brute-force search used as ground truth for recall measurements"""
+        return self.search(query, top_k, filters, similarity_threshold)
+
+    @abc.abstractmethod
+    def get_metadata(self, chunk_id: int) -> Optional[Dict[str, Any]]:
+        """Return the stored metadata columns for a chunk"""
+        pass
+
+    @abc.abstractmethod
+    def chunk_ids(self) -> List[int]:
+        """Return the chunk IDs currently indexed"""
+        pass
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def __contains__(self, chunk_id: int) -> bool:
+        return self.get_metadata(chunk_id) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size statistics"""
+        return {'backend': type(self).__name__, 'size': len(self), 'dimension': self.dimension}
+
+    def clear(self) -> None:
+        """Remove every vector from the index"""
+        self.remove(list(self.chunk_ids()))
+
+    @classmethod
+    def from_store(cls, session, dimension: int, batch_size: int = 1000, **kwargs) -> 'VectorIndex':
+        """Build an index from every row in the embedding store"""
+        from ..models import EmbeddingStore
+
+        index = cls(dimension=dimension, **kwargs)
+        rows = session.query(
+            EmbeddingStore.chunk_id,
+            EmbeddingStore.embedding,
+            EmbeddingStore.source_type,
+            EmbeddingStore.user_id,
+            EmbeddingStore.organization_id,
+            EmbeddingStore.document_id,
+        ).yield_per(batch_size)
+
+        chunk_ids, vectors, metadata = [], [], []
+        for row in rows:
+            chunk_ids.append(row.chunk_id)
+            vectors.append(EmbeddingStore.decode_embedding(row.embedding))
+            metadata.append({column: getattr(row, column) for column in METADATA_COLUMNS})
+
+            if len(chunk_ids) >= batch_size:
+                index.add(chunk_ids, vectors, metadata)
+                chunk_ids, vectors, metadata = [], [], []
+
+        if chunk_ids:
+            index.add(chunk_ids, vectors, metadata)
+
+        logger.info(f"Loaded {len(index)} embeddings into {cls.__name__}")
+        return index
@@ -0,0 +1,69 @@
+"""
+ANN Recall Evaluation
+Compares approximate search results against an exact scan to guide index tuning
+"""
+
+import time
+from typing import List, Dict, Any, Optional, Sequence
+
+from .base import VectorIndex
+
+
+def recall_at_k(approximate_ids: Sequence[int], exact_ids: Sequence[int]) -> float:
+    """Fraction of the exact top-k that the approximate search also returned"""
+    if not exact_ids:
+        return 1.0
+    return len(set(approximate_ids) & set(exact_ids)) / len(exact_ids)
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[position]
+
+
+def recall_report(
+    approximate: List[List[int]],
+    exact: List[List[int]],
+    approximate_times: List[float],
+    exact_times: List[float],
+    top_k: int
+) -> Dict[str, Any]:
+    """Summarise per-query recall and latency (seconds) for both search paths"""
+    recalls = [recall_at_k(a, e) for a, e in zip(approximate, exact)]
+    approximate_ms = [t * 1000 for t in approximate_times]
+    exact_ms = [t * 1000 for t in exact_times]
+
+    return {
+        'queries': len(recalls),
+        'top_k': top_k,
+        'recall_at_k': sum(recalls) / len(recalls) if recalls else None,
+        'min_recall': min(recalls) if recalls else None,
+        'ann_latency_ms': {'p50': _percentile(approximate_ms, 50), 'p99': _percentile(approximate_ms, 99)},
+        'exact_latency_ms': {'p50': _percentile(exact_ms, 50), 'p99': _percentile(exact_ms, 99)},
+    }
+
+
+def measure_index_recall(
+    index: VectorIndex,
+    queries: Sequence[Sequence[float]],
+    top_k: int,
+    filters: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Measure recall@k of an in-process index against its own exact scan"""
+    approximate, exact, approximate_times, exact_times = [], [], [], []
+
+    for query in queries:
+        start = time.perf_counter()
+        approximate.append([chunk_id for chunk_id, _ in index.search(query, top_k, filters)])
+        approximate_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        exact.append([chunk_id for chunk_id, _ in index.exact_search(query, top_k, filters)])
+        exact_times.append(time.perf_counter() - start)
+
+    report = recall_report(approximate, exact, approximate_times, exact_times, top_k)
+    report['index'] = index.get_stats()
+    return report
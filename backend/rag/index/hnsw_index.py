@@ -0,0 +1,385 @@
+"""
+HNSW Vector Index
+Approximate in-process nearest-neighbour search using a Hierarchical Navigable Small World graph
+"""
+
+import heapq
+import logging
+import math
+import random
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+from .base import VectorIndex, MetadataColumns, METADATA_COLUMNS
+from .numpy_index import normalise_rows
+
+
+logger = logging.getLogger(__name__)
+
+
+class HNSWVectorIndex(VectorIndex):
+    """
+    Approximate vector index for stores without pgvector.
+
+    Vectors are unit-normalised so graph distances are ``1 - cosine``. Deleted
+    chunks are tombstoned and stay in the graph for navigation; the graph is
+    rebuilt once tombstones outnumber live nodes. Filters are applied while
+    walking the graph, and small filtered subsets are searched exactly instead.
+    """
+
+    exact = False
+
+    def __init__(
+        self,
+        dimension: int,
+        m: int = 16,
+        ef_construction: int = 64,
+        ef_search: int = 64,
+        exact_search_limit: int = 2048,
+        initial_capacity: int = 1024,
+        seed: Optional[int] = None
+    ):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for HNSWVectorIndex")
+
+        self._dimension = dimension
+        self.m = max(2, m)
+        self.ef_construction = max(ef_construction, self.m)
+        self.ef_search = ef_search
+        self.exact_search_limit = exact_search_limit
+        self._max_links = {0: self.m * 2}
+        self._level_multiplier = 1 / math.log(self.m)
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._initial_capacity = max(1, initial_capacity)
+        self._reset()
+
+    def _reset(self) -> None:
+        capacity = self._initial_capacity
+        self._count = 0
+        self._vectors = np.zeros((capacity, self._dimension), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._deleted = np.zeros(capacity, dtype=bool)
+        self._codes = {column: np.zeros(capacity, dtype=np.int32) for column in METADATA_COLUMNS}
+        self._columns = MetadataColumns()
+        self._links: List[List[List[int]]] = []
+        self._node_of: Dict[int, int] = {}
+        self._entry_point = -1
+        self._max_level = -1
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def __len__(self) -> int:
+        return len(self._node_of)
+
+    def chunk_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._node_of)
+
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        vectors: Sequence[Sequence[float]],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> None:
+        if len(chunk_ids) == 0:
+            return
+
+        matrix = normalise_rows(np.asarray(vectors, dtype=np.float32).reshape(len(chunk_ids), -1))
+        if matrix.shape[1] != self._dimension:
+            raise ValueError(f"Vectors have {matrix.shape[1]} dimensions, index expects {self._dimension}")
+
+        with self._lock:
+            for i, chunk_id in enumerate(chunk_ids):
+                chunk_id = int(chunk_id)
+                previous = self._node_of.pop(chunk_id, None)
+                if previous is not None:
+                    self._deleted[previous] = True
+                self._insert(chunk_id, matrix[i], metadata[i] if metadata else {})
+
+    def remove(self, chunk_ids: Sequence[int]) -> int:
+        removed = 0
+
+        with self._lock:
+            for chunk_id in chunk_ids:
+                node = self._node_of.pop(int(chunk_id), None)
+                if node is not None:
+                    self._deleted[node] = True
+                    removed += 1
+
+            if removed and self._count - len(self._node_of) > max(len(self._node_of), 1000):
+                self.rebuild()
+
+        return removed
+
+    def rebuild(self) -> None:
+        """Rebuild the graph from live nodes, dropping tombstones"""
+        with self._lock:
+            live = sorted(self._node_of.values())
+            vectors = self._vectors[live].copy()
+            ids = self._ids[live].tolist()
+            metadata = [self._node_metadata(node) for node in live]
+
+            self._reset()
+            for chunk_id, vector, row_metadata in zip(ids, vectors, metadata):
+                self._insert(chunk_id, vector, row_metadata)
+
+        logger.info(f"Rebuilt HNSW index with {len(ids)} live vectors")
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        return self._search(query, top_k, filters, similarity_threshold, exact=False)
+
+    def exact_search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        return self._search(query, top_k, filters, similarity_threshold, exact=True)
+
+    def get_metadata(self, chunk_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            node = self._node_of.get(int(chunk_id))
+            return None if node is None else self._node_metadata(node)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get graph size and tuning statistics"""
+        with self._lock:
+            return {
+                'backend': 'hnsw',
+                'size': len(self._node_of),
+                'tombstones': self._count - len(self._node_of),
+                'dimension': self._dimension,
+                'max_level': self._max_level,
+                'm': self.m,
+                'ef_construction': self.ef_construction,
+                'ef_search': self.ef_search,
+            }
+
+    def _search(self, query, top_k, filters, similarity_threshold, exact: bool) -> List[Tuple[int, float]]:
+        if top_k <= 0:
+            return []
+
+        query_vector = normalise_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        if query_vector.shape[0] != self._dimension:
+            raise ValueError(f"Query has {query_vector.shape[0]} dimensions, index expects {self._dimension}")
+
+        with self._lock:
+            allowed = self._allowed_mask(filters)
+            if allowed is None:
+                return []
+
+            allowed_count = int(allowed.sum())
+            if allowed_count == 0:
+                return []
+
+            if exact or allowed_count <= self.exact_search_limit:
+                rows = np.flatnonzero(allowed)
+                scores = self._vectors[rows] @ query_vector
+                if top_k < scores.size:
+                    best = np.argpartition(-scores, top_k - 1)[:top_k]
+                else:
+                    best = np.arange(scores.size)
+                best = best[np.argsort(-scores[best], kind="stable")]
+                hits = [(int(self._ids[rows[i]]), float(scores[i])) for i in best]
+            else:
+                entry = self._entry_point
+                for level in range(self._max_level, 0, -1):
+                    entry = self._greedy_closest(query_vector, entry, level)
+                found = self._search_layer(query_vector, [entry], max(self.ef_search, top_k), 0, allowed)
+                hits = [(int(self._ids[node]), 1.0 - distance) for distance, node in found[:top_k]]
+
+        if similarity_threshold is not None:
+            hits = [hit for hit in hits if hit[1] >= similarity_threshold]
+        return hits
+
+    def _allowed_mask(self, filters: Optional[Dict[str, Any]]):
+        """Mask of live nodes matching the filters, or None when nothing can match"""
+        if not self._node_of:
+            return None
+
+        mask = ~self._deleted[:self._count]
+        for column in METADATA_COLUMNS:
+            if not filters or column not in filters:
+                continue
+
+            codes = self._columns.lookup(column, filters[column])
+            if not codes:
+                return None
+
+            column_codes = self._codes[column][:self._count]
+            mask &= column_codes == codes[0] if len(codes) == 1 else np.isin(column_codes, codes)
+
+        if filters and 'chunk_id' in filters:
+            mask &= np.isin(self._ids[:self._count], np.asarray(list(filters['chunk_id']), dtype=np.int64))
+
+        return mask
+
+    def _insert(self, chunk_id: int, vector, metadata: Dict[str, Any]) -> None:
+        node = self._count
+        self._reserve(node + 1)
+        self._count += 1
+
+        self._vectors[node] = vector
+        self._ids[node] = chunk_id
+        self._deleted[node] = False
+        for column in METADATA_COLUMNS:
+            self._codes[column][node] = self._columns.encode(column, metadata.get(column))
+
+        level = int(-math.log(1.0 - self._random.random()) * self._level_multiplier)
+        self._links.append([[] for _ in range(level + 1)])
+        self._node_of[chunk_id] = node
+
+        if self._entry_point < 0:
+            self._entry_point = node
+            self._max_level = level
+            return
+
+        entry = self._entry_point
+        for layer in range(self._max_level, level, -1):
+            entry = self._greedy_closest(vector, entry, layer)
+
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(vector, [entry], self.ef_construction, layer)
+            neighbours = self._select_neighbours(candidates, self.m)
+            self._links[node][layer] = neighbours
+
+            max_links = self._max_links.get(layer, self.m)
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    self._shrink_links(neighbour, layer, max_links)
+
+            entry = candidates[0][1]
+
+        if level > self._max_level:
+            self._entry_point = node
+            self._max_level = level
+
+    def _greedy_closest(self, query_vector, entry: int, layer: int) -> int:
+        current = entry
+        current_distance = 1.0 - float(self._vectors[current] @ query_vector)
+
+        improved = True
+        while improved:
+            improved = False
+            links = self._links[current][layer]
+            if not links:
+                break
+            distances = 1.0 - self._vectors[links] @ query_vector
+            best = int(np.argmin(distances))
+            if distances[best] < current_distance:
+                current = links[best]
+                current_distance = float(distances[best])
+                improved = True
+
+        return current
+
+    def _search_layer(self, query_vector, entry_points: List[int], ef: int, layer: int, allowed=None) -> List[Tuple[float, int]]:
+        """Best-first search on one layer, returning (distance, node) pairs sorted ascending"""
+        visited = set(entry_points)
+        entry_distances = (1.0 - self._vectors[entry_points] @ query_vector).tolist()
+
+        candidates = list(zip(entry_distances, entry_points))
+        heapq.heapify(candidates)
+        # Max-heap of the best allowed nodes found so far
+        results = [(-d, n) for d, n in candidates if allowed is None or allowed[n]]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            distance, node = heapq.heappop(candidates)
+            if len(results) >= ef and distance > -results[0][0]:
+                break
+
+            neighbours = [n for n in self._links[node][layer] if n not in visited]
+            if not neighbours:
+                continue
+            visited.update(neighbours)
+
+            distances = (1.0 - self._vectors[neighbours] @ query_vector).tolist()
+            for neighbour_distance, neighbour in zip(distances, neighbours):
+                if len(results) < ef or neighbour_distance < -results[0][0]:
+                    heapq.heappush(candidates, (neighbour_distance, neighbour))
+                    if allowed is None or allowed[neighbour]:
+                        heapq.heappush(results, (-neighbour_distance, neighbour))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted((-d, n) for d, n in results)
+
+    def _select_neighbours(self, candidates: List[Tuple[float, int]], limit: int) -> List[int]:
+        """Keep candidates closer to the query than to any already selected neighbour"""
+        if len(candidates) <= limit:
+            return [node for _, node in candidates]
+
+        nodes = [node for _, node in candidates]
+        query_similarity = [1.0 - distance for distance, _ in candidates]
+        pairwise = self._vectors[nodes] @ self._vectors[nodes].T
+
+        selected: List[int] = []
+        pruned: List[int] = []
+        for i in range(len(nodes)):
+            if len(selected) >= limit:
+                break
+            if selected and pairwise[i, selected].max() > query_similarity[i]:
+                pruned.append(i)
+            else:
+                selected.append(i)
+
+        # Top up with pruned candidates so sparse regions stay connected
+        selected.extend(pruned[:limit - len(selected)])
+        return [nodes[i] for i in selected]
+
+    def _shrink_links(self, node: int, layer: int, limit: int) -> None:
+        links = self._links[node][layer]
+        distances = (1.0 - self._vectors[links] @ self._vectors[node]).tolist()
+        self._links[node][layer] = self._select_neighbours(sorted(zip(distances, links)), limit)
+
+    def _node_metadata(self, node: int) -> Dict[str, Any]:
+        return {
+            column: self._columns.decode(column, self._codes[column][node])
+            for column in METADATA_COLUMNS
+        }
+
+    def _reserve(self, required: int) -> None:
+        capacity = self._vectors.shape[0]
+        if required <= capacity:
+            return
+
+        new_capacity = max(required, capacity * 2)
+
+        vectors = np.zeros((new_capacity, self._dimension), dtype=np.float32)
+        vectors[:self._count] = self._vectors[:self._count]
+        self._vectors = vectors
+
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        ids[:self._count] = self._ids[:self._count]
+        self._ids = ids
+
+        deleted = np.zeros(new_capacity, dtype=bool)
+        deleted[:self._count] = self._deleted[:self._count]
+        self._deleted = deleted
+
+        for column in METADATA_COLUMNS:
+            codes = np.zeros(new_capacity, dtype=np.int32)
+            codes[:self._count] = self._codes[column][:self._count]
+            self._codes[column] = codes
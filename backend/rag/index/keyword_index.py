@@ -0,0 +1,241 @@
+"""
+Keyword Index
+In-process inverted index with BM25 scoring, used for hybrid retrieval when
+Postgres full-text search is unavailable
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+from .base import MetadataColumns, METADATA_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+# Keeps skill-style tokens such as "c++", "c#", "node.js" and "ci/cd" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./\-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the "
+    "this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class KeywordIndex:
+    """
+    BM25 inverted index keyed by chunk ID.
+    Filters follow the VectorIndex contract: METADATA_COLUMNS by value or
+    IN-list, plus a 'chunk_id' allow-list.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._metadata: Dict[int, Dict[str, Optional[str]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, chunk_id: int) -> bool:
+        return chunk_id in self._lengths
+
+    def chunk_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._lengths)
+
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        texts: Sequence[str],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> None:
+        """Insert or replace the text for the given chunk IDs"""
+        with self._lock:
+            for i, chunk_id in enumerate(chunk_ids):
+                chunk_id = int(chunk_id)
+                self._remove_one(chunk_id)
+
+                tokens = tokenize(texts[i])
+                frequencies: Dict[str, int] = {}
+                for token in tokens:
+                    frequencies[token] = frequencies.get(token, 0) + 1
+
+                for term, count in frequencies.items():
+                    self._postings.setdefault(term, {})[chunk_id] = count
+
+                row = metadata[i] if metadata else {}
+                self._metadata[chunk_id] = {
+                    column: MetadataColumns._key(row.get(column)) for column in METADATA_COLUMNS
+                }
+                self._terms[chunk_id] = tuple(frequencies)
+                self._lengths[chunk_id] = len(tokens)
+                self._total_length += len(tokens)
+
+    def remove(self, chunk_ids: Sequence[int]) -> int:
+        """Remove the given chunk IDs, returning how many were present"""
+        with self._lock:
+            return sum(1 for chunk_id in chunk_ids if self._remove_one(int(chunk_id)))
+
+    def _remove_one(self, chunk_id: int) -> bool:
+        if chunk_id not in self._lengths:
+            return False
+
+        for term in self._terms.pop(chunk_id):
+            postings = self._postings[term]
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+
+        self._total_length -= self._lengths.pop(chunk_id)
+        self._metadata.pop(chunk_id, None)
+        return True
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        require_all: bool = False
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to top_k (chunk_id, bm25_score) pairs, best first.
+        With require_all, only chunks containing every query term match.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            document_count = len(self._lengths)
+            if document_count == 0:
+                return []
+            average_length = self._total_length / document_count or 1.0
+
+            scores: Dict[int, float] = {}
+            matched: Dict[int, int] = {}
+            allowed: Dict[int, bool] = {}
+            compiled = self._compile_filters(filters)
+            allow_list = compiled.pop('chunk_id', None)
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    if require_all:
+                        return []
+                    continue
+
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                if allow_list is not None:
+                    # Walk whichever of the postings and the allow-list is smaller
+                    if len(allow_list) < len(postings):
+                        hits = [(chunk_id, postings[chunk_id]) for chunk_id in allow_list if chunk_id in postings]
+                    else:
+                        hits = [(chunk_id, frequency) for chunk_id, frequency in postings.items() if chunk_id in allow_list]
+                else:
+                    hits = postings.items()
+
+                for chunk_id, frequency in hits:
+                    keep = allowed.get(chunk_id)
+                    if keep is None:
+                        keep = allowed[chunk_id] = self._matches(chunk_id, compiled)
+                    if not keep:
+                        continue
+
+                    length_norm = 1 - self.b + self.b * self._lengths[chunk_id] / average_length
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + \
+                        idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                    matched[chunk_id] = matched.get(chunk_id, 0) + 1
+
+        if require_all:
+            scores = {chunk_id: score for chunk_id, score in scores.items() if matched[chunk_id] == len(terms)}
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def _compile_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, set]:
+        """Turn filters into per-column sets of allowed keys, once per search"""
+        compiled = {}
+        for column, value in (filters or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if column == 'chunk_id':
+                compiled[column] = {int(v) for v in values}
+            elif column in METADATA_COLUMNS:
+                compiled[column] = {MetadataColumns._key(v) for v in values}
+            else:
+                raise ValueError(f"Unsupported keyword index filter: {column}")
+        return compiled
+
+    def _matches(self, chunk_id: int, compiled: Dict[str, set]) -> bool:
+        if not compiled:
+            return True
+
+        row = self._metadata[chunk_id]
+        for column, keys in compiled.items():
+            if column == 'chunk_id':
+                if chunk_id not in keys:
+                    return False
+            elif row.get(column) not in keys:
+                return False
+        return True
+
+    def get_metadata(self, chunk_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._metadata.get(chunk_id)
+            return dict(row) if row is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size statistics"""
+        with self._lock:
+            return {
+                'backend': type(self).__name__,
+                'size': len(self._lengths),
+                'terms': len(self._postings),
+                'average_length': self._total_length / len(self._lengths) if self._lengths else 0.0,
+            }
+
+    @classmethod
+    def from_store(cls, session, batch_size: int = 1000, **kwargs) -> 'KeywordIndex':
+        """Build an index from every live (not tombstoned) document chunk"""
+        from ..models import DocumentChunk
+
+        index = cls(**kwargs)
+        rows = session.query(
+            DocumentChunk.id,
+            DocumentChunk.content,
+            DocumentChunk.source_type,
+            DocumentChunk.user_id,
+            DocumentChunk.organization_id,
+            DocumentChunk.document_id,
+        ).filter(DocumentChunk.deleted_at.is_(None)).yield_per(batch_size)
+
+        chunk_ids, texts, metadata = [], [], []
+        for row in rows:
+            chunk_ids.append(row.id)
+            texts.append(row.content)
+            metadata.append({column: getattr(row, column) for column in METADATA_COLUMNS})
+
+            if len(chunk_ids) >= batch_size:
+                index.add(chunk_ids, texts, metadata)
+                chunk_ids, texts, metadata = [], [], []
+
+        if chunk_ids:
+            index.add(chunk_ids, texts, metadata)
+
+        logger.info(f"Loaded {len(index)} chunks into {cls.__name__}")
+        return index
@@ -0,0 +1,225 @@
+"""
+NumPy Vector Index
+Exact in-process cosine similarity search over a contiguous float32 matrix
+"""
+
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+from .base import VectorIndex, MetadataColumns, METADATA_COLUMNS
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalise_rows(matrix):
+    """Scale each row to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NumpyVectorIndex(VectorIndex):
+    """
+    Exact vector index backed by a row-normalised float32 matrix.
+    Metadata columns are dictionary-encoded into int32 arrays so filters
+    become vectorised comparisons instead of Python loops.
+    """
+
+    def __init__(self, dimension: int, initial_capacity: int = 1024):
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for NumpyVectorIndex")
+
+        self._dimension = dimension
+        self._lock = threading.RLock()
+        self._size = 0
+        self._row_of: Dict[int, int] = {}
+
+        capacity = max(1, initial_capacity)
+        self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._codes = {column: np.zeros(capacity, dtype=np.int32) for column in METADATA_COLUMNS}
+        self._columns = MetadataColumns()
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def __len__(self) -> int:
+        return self._size
+
+    def chunk_ids(self) -> List[int]:
+        with self._lock:
+            return self._ids[:self._size].tolist()
+
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        vectors: Sequence[Sequence[float]],
+        metadata: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> None:
+        if len(chunk_ids) == 0:
+            return
+
+        matrix = normalise_rows(np.asarray(vectors, dtype=np.float32).reshape(len(chunk_ids), -1))
+        if matrix.shape[1] != self._dimension:
+            raise ValueError(f"Vectors have {matrix.shape[1]} dimensions, index expects {self._dimension}")
+
+        with self._lock:
+            self._reserve(self._size + len(chunk_ids))
+
+            for i, chunk_id in enumerate(chunk_ids):
+                chunk_id = int(chunk_id)
+                row = self._row_of.get(chunk_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._row_of[chunk_id] = row
+                    self._ids[row] = chunk_id
+
+                self._vectors[row] = matrix[i]
+
+                row_metadata = metadata[i] if metadata else {}
+                for column in METADATA_COLUMNS:
+                    self._codes[column][row] = self._columns.encode(column, row_metadata.get(column))
+
+    def remove(self, chunk_ids: Sequence[int]) -> int:
+        removed = 0
+
+        with self._lock:
+            for chunk_id in chunk_ids:
+                row = self._row_of.pop(int(chunk_id), None)
+                if row is None:
+                    continue
+
+                # Move the last row into the hole to keep the matrix contiguous
+                last = self._size - 1
+                if row != last:
+                    moved_id = int(self._ids[last])
+                    self._vectors[row] = self._vectors[last]
+                    self._ids[row] = moved_id
+                    for column in METADATA_COLUMNS:
+                        self._codes[column][row] = self._codes[column][last]
+                    self._row_of[moved_id] = row
+
+                self._size = last
+                removed += 1
+
+        return removed
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        if top_k <= 0:
+            return []
+
+        query_vector = normalise_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        if query_vector.shape[0] != self._dimension:
+            raise ValueError(f"Query has {query_vector.shape[0]} dimensions, index expects {self._dimension}")
+
+        with self._lock:
+            if self._size == 0:
+                return []
+
+            rows = self._filter_rows(filters)
+            if rows is None:
+                scores = self._vectors[:self._size] @ query_vector
+                candidate_ids = self._ids[:self._size].copy()
+            elif rows.size == 0:
+                return []
+            else:
+                scores = self._vectors[rows] @ query_vector
+                candidate_ids = self._ids[rows]
+
+        if similarity_threshold is not None:
+            keep = np.flatnonzero(scores >= similarity_threshold)
+            scores = scores[keep]
+            candidate_ids = candidate_ids[keep]
+
+        if scores.size == 0:
+            return []
+
+        if top_k < scores.size:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(scores.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        return [(int(candidate_ids[i]), float(scores[i])) for i in best]
+
+    def get_metadata(self, chunk_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._row_of.get(int(chunk_id))
+            if row is None:
+                return None
+            return {
+                column: self._columns.decode(column, self._codes[column][row])
+                for column in METADATA_COLUMNS
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and memory statistics"""
+        with self._lock:
+            return {
+                'backend': 'numpy',
+                'size': self._size,
+                'capacity': self._vectors.shape[0],
+                'dimension': self._dimension,
+                'memory_bytes': int(self._vectors.nbytes + self._ids.nbytes +
+                                    sum(codes.nbytes for codes in self._codes.values())),
+            }
+
+    def _filter_rows(self, filters: Optional[Dict[str, Any]]):
+        """Return matching row numbers, or None when no filter applies"""
+        if not filters:
+            return None
+
+        mask = None
+        for column in METADATA_COLUMNS:
+            if column not in filters:
+                continue
+
+            codes = self._columns.lookup(column, filters[column])
+            if not codes:
+                return np.empty(0, dtype=np.int64)
+
+            column_codes = self._codes[column][:self._size]
+            column_mask = column_codes == codes[0] if len(codes) == 1 else np.isin(column_codes, codes)
+            mask = column_mask if mask is None else mask & column_mask
+
+        if 'chunk_id' in filters:
+            id_mask = np.isin(self._ids[:self._size], np.asarray(list(filters['chunk_id']), dtype=np.int64))
+            mask = id_mask if mask is None else mask & id_mask
+
+        return None if mask is None else np.flatnonzero(mask)
+
+    def _reserve(self, required: int) -> None:
+        capacity = self._vectors.shape[0]
+        if required <= capacity:
+            return
+
+        new_capacity = max(required, capacity * 2)
+        vectors = np.zeros((new_capacity, self._dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        self._ids = ids
+
+        for column in METADATA_COLUMNS:
+            codes = np.zeros(new_capacity, dtype=np.int32)
+            codes[:self._size] = self._codes[column][:self._size]
+            self._codes[column] = codes
@@ -0,0 +1,176 @@
+"""
+Vector Index Synchronisation
+Keeps registered in-process indexes in step with committed EmbeddingStore
+and DocumentChunk changes
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Tuple, Union
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..models import DocumentChunk, EmbeddingStore
+from .base import VectorIndex, METADATA_COLUMNS
+from .keyword_index import KeywordIndex
+
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "rag_index_pending"
+
+_registered_indexes = weakref.WeakSet()
+_registered_keyword_indexes = weakref.WeakSet()
+_listeners_lock = threading.Lock()
+_listeners_installed = False
+
+
+def register_index(index: Union[VectorIndex, KeywordIndex]) -> None:
+    """
+    Apply future committed changes to this index: EmbeddingStore rows for
+    vector indexes, DocumentChunk rows for keyword indexes.
+    """
+    _install_listeners()
+    if isinstance(index, KeywordIndex):
+        _registered_keyword_indexes.add(index)
+    else:
+        _registered_indexes.add(index)
+
+
+def unregister_index(index: Union[VectorIndex, KeywordIndex]) -> None:
+    """Stop synchronising an index"""
+    _registered_indexes.discard(index)
+    _registered_keyword_indexes.discard(index)
+
+
+def indexes_registered(kind: str) -> bool:
+    """Whether any "vector" or "keyword" index is registered for synchronisation"""
+    return bool(_registered_indexes if kind == "vector" else _registered_keyword_indexes)
+
+
+def queue_index_changes(session: Session, changes: List[Tuple]) -> None:
+    """
+    Queue (kind, action, chunk_id, payload, metadata) changes made outside the
+    ORM (e.g. bulk inserts) to be applied to registered indexes when the
+    session commits
+    """
+    if changes:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+def _install_listeners() -> None:
+    global _listeners_installed
+
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+
+        event.listen(EmbeddingStore, "after_insert", _on_insert)
+        event.listen(EmbeddingStore, "after_update", _on_update)
+        event.listen(EmbeddingStore, "after_delete", _on_delete)
+        event.listen(DocumentChunk, "after_insert", _on_chunk_insert)
+        event.listen(DocumentChunk, "after_update", _on_chunk_update)
+        event.listen(DocumentChunk, "after_delete", _on_chunk_delete)
+        # Load the replaced key on assignment, so update handlers can remove it
+        event.listen(EmbeddingStore.chunk_id, "set", _on_key_set, active_history=True)
+        event.listen(DocumentChunk.id, "set", _on_key_set, active_history=True)
+        event.listen(Session, "after_commit", _on_commit)
+        event.listen(Session, "after_rollback", _on_rollback)
+        _listeners_installed = True
+
+
+def _pending(target) -> list:
+    session = object_session(target)
+    if session is None:
+        return []
+    return session.info.setdefault(_PENDING_KEY, [])
+
+
+def _on_insert(mapper, connection, target: EmbeddingStore) -> None:
+    if not _registered_indexes:
+        return
+    metadata: Dict[str, Any] = {column: getattr(target, column) for column in METADATA_COLUMNS}
+    _pending(target).append(("vector", "add", target.chunk_id, EmbeddingStore.decode_embedding(target.embedding), metadata))
+
+
+def _on_update(mapper, connection, target: EmbeddingStore) -> None:
+    if not _registered_indexes:
+        return
+    for chunk_id in _previous_keys(target, "chunk_id"):
+        _pending(target).append(("vector", "remove", chunk_id, None, None))
+    _on_insert(mapper, connection, target)
+
+
+def _on_delete(mapper, connection, target: EmbeddingStore) -> None:
+    if not _registered_indexes:
+        return
+    _pending(target).append(("vector", "remove", target.chunk_id, None, None))
+
+
+def _on_chunk_insert(mapper, connection, target: DocumentChunk) -> None:
+    if not _registered_keyword_indexes:
+        return
+    if target.deleted_at is not None:
+        # Tombstoned chunks leave the index like deleted ones
+        _pending(target).append(("keyword", "remove", target.id, None, None))
+        return
+    metadata: Dict[str, Any] = {column: getattr(target, column) for column in METADATA_COLUMNS}
+    _pending(target).append(("keyword", "add", target.id, target.content, metadata))
+
+
+def _on_chunk_update(mapper, connection, target: DocumentChunk) -> None:
+    if not _registered_keyword_indexes:
+        return
+    for chunk_id in _previous_keys(target, "id"):
+        _pending(target).append(("keyword", "remove", chunk_id, None, None))
+    _on_chunk_insert(mapper, connection, target)
+
+
+def _on_chunk_delete(mapper, connection, target: DocumentChunk) -> None:
+    if not _registered_keyword_indexes:
+        return
+    _pending(target).append(("keyword", "remove", target.id, None, None))
+
+
+def _on_key_set(target, value, oldvalue, initiator) -> None:
+    """
+    Registered only for active_history=True: it makes SQLAlchemy load an
+    expired key (as every attribute is after a commit) before replacing it,
+    so the attribute history keeps the old key for _previous_keys. Without
+    it history.deleted is empty and the old key would stay in the index.
+    The models declare plain Columns, so the flag is set here.
+    """
+
+
+def _previous_keys(target, key: str) -> list:
+    """Values the index key attribute had before this flush, if the update changed it"""
+    current = getattr(target, key)
+    return [value for value in inspect(target).attrs[key].history.deleted if value is not None and value != current]
+
+
+def _on_commit(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if not changes:
+        return
+
+    targets = {"vector": list(_registered_indexes), "keyword": list(_registered_keyword_indexes)}
+
+    for kind, indexes in targets.items():
+        for index in indexes:
+            # Each change is applied on its own, so one bad row does not leave the rest out
+            for change_kind, action, chunk_id, payload, metadata in changes:
+                if change_kind != kind:
+                    continue
+                try:
+                    if action == "add":
+                        index.add([chunk_id], [payload], [metadata])
+                    else:
+                        index.remove([chunk_id])
+                except Exception as e:
+                    logger.error(f"Failed to {action} chunk {chunk_id} in {kind} index: {e}")
+
+
+def _on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,15 @@
+"""
+RAG Background Ingestion Jobs
+"""
+
+from .queue import enqueue_ingestion_job, enqueue_file_ingestion_job, claim_next_job, retry_job, content_hash
+from .worker import IngestionWorker
+
+__all__ = [
+    "enqueue_ingestion_job",
+    "enqueue_file_ingestion_job",
+    "claim_next_job",
+    "retry_job",
+    "content_hash",
+    "IngestionWorker",
+]
\ No newline at end of file
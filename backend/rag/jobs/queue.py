@@ -0,0 +1,284 @@
+"""
+RAG Ingestion Queue
+Persistent job queue backed by the rag_ingestion_jobs table
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from typing import IO, Dict, Any, Optional, Tuple
+
+from sqlalchemy import or_, and_, exists
+from sqlalchemy.orm import aliased
+from werkzeug.utils import secure_filename
+
+from ...extensions import db
+from ...models.ingestion_job import IngestionJob
+from ..config import RAGConfig
+from ..cache.extraction_cache import file_digest
+
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states already cover their content, so an identical enqueue reuses them
+ACTIVE_STATUSES = (IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING, IngestionJob.STATUS_COMPLETED)
+
+
+def content_hash(content: str) -> str:
+    """Hash used for job and chunk deduplication (matches DocumentChunk.content_hash)"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def enqueue_ingestion_job(
+    content: str,
+    source_type: str,
+    user_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    document_id: Optional[str] = None,
+    filename: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    chunking_strategy: str = "semantic",
+    mode: str = IngestionJob.MODE_INCREMENTAL
+) -> Tuple[IngestionJob, bool]:
+    """
+    Queue content for background ingestion.
+
+    In incremental mode the content replaces the document: unchanged chunks
+    are kept, new ones embedded and removed ones tombstoned. Append mode only
+    adds chunks that are not stored yet.
+
+    Returns:
+        (job, created). When the document's latest queued, running or
+        completed job has identical content, that job is returned instead.
+    """
+    if mode not in (IngestionJob.MODE_INCREMENTAL, IngestionJob.MODE_APPEND):
+        raise ValueError(f"Unsupported ingestion mode: {mode}")
+
+    digest = content_hash(content)
+    document_id = document_id or f"doc_{digest[:16]}"
+
+    existing = _covering_job(user_id, organization_id, document_id, digest, mode)
+    if existing is not None:
+        return existing, False
+
+    return _create_job(
+        user_id=user_id,
+        organization_id=organization_id,
+        document_id=document_id,
+        source_type=source_type,
+        filename=filename,
+        content=content,
+        content_hash=digest,
+        chunking_strategy=chunking_strategy,
+        extra_data=json.dumps(metadata) if metadata else None,
+        mode=mode,
+    ), True
+
+
+def enqueue_file_ingestion_job(
+    stream: IO[bytes],
+    file_type: str,
+    source_type: str,
+    user_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    document_id: Optional[str] = None,
+    filename: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    mode: str = IngestionJob.MODE_INCREMENTAL
+) -> Tuple[IngestionJob, bool]:
+    """
+    Queue an uploaded PDF or DOCX file for background ingestion.
+
+    The file is saved under JOB_UPLOAD_DIR and its text is extracted by the
+    worker, page by page as it is chunked, instead of in the request.
+    Deduplication works as in enqueue_ingestion_job, on a hash of the bytes.
+    """
+    if file_type not in ('pdf', 'docx'):
+        raise ValueError(f"Unsupported file type: {file_type}")
+    if mode not in (IngestionJob.MODE_INCREMENTAL, IngestionJob.MODE_APPEND):
+        raise ValueError(f"Unsupported ingestion mode: {mode}")
+
+    digest = file_digest(stream)
+    document_id = document_id or f"doc_{digest[:16]}"
+
+    existing = _covering_job(user_id, organization_id, document_id, digest, mode)
+    if existing is not None:
+        return existing, False
+
+    # The worker picks the extractor from the suffix
+    name = secure_filename(filename or '') or 'upload'
+    if not name.lower().endswith(f".{file_type}"):
+        name = f"{name}.{file_type}"
+    directory = os.path.join(RAGConfig.JOB_UPLOAD_DIR, uuid.uuid4().hex)
+    os.makedirs(directory)
+    file_path = os.path.join(directory, name)
+    with open(file_path, 'wb') as handle:
+        shutil.copyfileobj(stream, handle)
+    stream.seek(0)
+
+    try:
+        return _create_job(
+            user_id=user_id,
+            organization_id=organization_id,
+            document_id=document_id,
+            source_type=source_type,
+            filename=filename,
+            content='',
+            file_path=file_path,
+            content_hash=digest,
+            chunking_strategy="semantic",
+            extra_data=json.dumps(metadata) if metadata else None,
+            mode=mode,
+        ), True
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+
+def _covering_job(user_id, organization_id, document_id: str, digest: str, mode: str) -> Optional[IngestionJob]:
+    """The document's latest queued, running or completed job, if it has the same content and mode"""
+    # Only the latest version counts: after A -> B, re-sending A must run again
+    latest = IngestionJob.query.filter(
+        IngestionJob.user_id == user_id,
+        IngestionJob.organization_id == organization_id,
+        IngestionJob.document_id == document_id,
+        IngestionJob.status.in_(ACTIVE_STATUSES)
+    ).order_by(IngestionJob.id.desc()).first()
+
+    if latest is not None and latest.content_hash == digest and latest.mode == mode:
+        logger.info(f"Ingestion job {latest.id} already covers document {document_id}")
+        return latest
+    return None
+
+
+def _create_job(**fields) -> IngestionJob:
+    job = IngestionJob(
+        status=IngestionJob.STATUS_QUEUED,
+        max_attempts=RAGConfig.JOB_MAX_ATTEMPTS,
+        **fields
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    logger.info(f"Queued ingestion job {job.id} for document {job.document_id}")
+    return job
+
+
+def remove_job_upload(job: IngestionJob) -> None:
+    """Delete the job's uploaded file once it no longer needs processing"""
+    if job.file_path:
+        shutil.rmtree(os.path.dirname(job.file_path), ignore_errors=True)
+
+
+def claim_next_job(worker_id: str) -> Optional[int]:
+    """
+    Atomically claim the oldest runnable job: queued and past its backoff, or
+    running under an expired lease. Claims are a conditional UPDATE on the
+    state that was read, so concurrent workers never take the same job.
+
+    Jobs for a document with another job under a live lease wait, so versions
+    of one document are applied one at a time and in order.
+    """
+    now = datetime.utcnow()
+    lease_expired = now - timedelta(seconds=RAGConfig.JOB_LEASE_SECONDS)
+
+    other = aliased(IngestionJob)
+    document_busy = exists().where(
+        other.id != IngestionJob.id,
+        other.document_id == IngestionJob.document_id,
+        or_(other.user_id == IngestionJob.user_id, and_(other.user_id.is_(None), IngestionJob.user_id.is_(None))),
+        or_(
+            and_(other.status == IngestionJob.STATUS_RUNNING, other.locked_at >= lease_expired),
+            # Older unfinished versions go first
+            and_(other.status.in_((IngestionJob.STATUS_QUEUED, IngestionJob.STATUS_RUNNING)), other.id < IngestionJob.id)
+        )
+    )
+
+    candidates = db.session.query(IngestionJob.id, IngestionJob.status, IngestionJob.locked_at).filter(
+        or_(
+            and_(
+                IngestionJob.status == IngestionJob.STATUS_QUEUED,
+                or_(IngestionJob.run_after.is_(None), IngestionJob.run_after <= now)
+            ),
+            and_(
+                IngestionJob.status == IngestionJob.STATUS_RUNNING,
+                IngestionJob.locked_at < lease_expired
+            )
+        ),
+        ~document_busy
+    ).order_by(IngestionJob.id).limit(10).all()
+
+    for candidate in candidates:
+        locked_at = IngestionJob.locked_at.is_(None) if candidate.locked_at is None \
+            else IngestionJob.locked_at == candidate.locked_at
+
+        claimed = IngestionJob.query.filter(
+            IngestionJob.id == candidate.id,
+            IngestionJob.status == candidate.status,
+            locked_at
+        ).update({
+            IngestionJob.status: IngestionJob.STATUS_RUNNING,
+            IngestionJob.locked_by: worker_id,
+            IngestionJob.locked_at: now,
+            IngestionJob.attempts: IngestionJob.attempts + 1,
+            IngestionJob.started_at: now,
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed == 1:
+            return candidate.id
+
+    return None
+
+
+def heartbeat(job: IngestionJob, **progress) -> None:
+    """Record progress and renew the job's lease"""
+    for field, value in progress.items():
+        setattr(job, field, value)
+    job.locked_at = datetime.utcnow()
+    db.session.commit()
+
+
+def complete_job(job: IngestionJob) -> None:
+    job.status = IngestionJob.STATUS_COMPLETED
+    job.error = None
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    remove_job_upload(job)
+
+
+def fail_job(job: IngestionJob, error: Exception) -> None:
+    """Requeue with exponential backoff, or mark failed once attempts run out"""
+    job.error = str(error)
+    job.locked_by = None
+    job.locked_at = None
+
+    if job.attempts < job.max_attempts:
+        job.status = IngestionJob.STATUS_QUEUED
+        job.run_after = datetime.utcnow() + timedelta(seconds=RAGConfig.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+        logger.warning(f"Ingestion job {job.id} failed (attempt {job.attempts}/{job.max_attempts}), retrying: {error}")
+    else:
+        job.status = IngestionJob.STATUS_FAILED
+        job.finished_at = datetime.utcnow()
+        logger.error(f"Ingestion job {job.id} failed permanently: {error}")
+
+    db.session.commit()
+
+
+def retry_job(job: IngestionJob) -> IngestionJob:
+    """Requeue a failed job. Jobs in any other state are returned unchanged."""
+    if job.status == IngestionJob.STATUS_FAILED:
+        job.status = IngestionJob.STATUS_QUEUED
+        job.attempts = 0
+        job.run_after = None
+        job.error = None
+        job.finished_at = None
+        db.session.commit()
+        logger.info(f"Requeued ingestion job {job.id}")
+    return job
@@ -0,0 +1,290 @@
+"""
+RAG Ingestion Worker
+Processes queued ingestion jobs: chunk, diff against stored chunks, embed and store
+"""
+
+import json
+import logging
+import os
+import signal
+import socket
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import update, bindparam
+from sqlalchemy.orm import sessionmaker
+
+from ...extensions import db
+from ...models.ingestion_job import IngestionJob
+from ..config import RAGConfig
+from ..models import DocumentChunk, EmbeddingStore, BulkChunkWriter
+from ..models.tenant import tenant_value, tenant_filter
+from ..models.vector_store import create_rag_tables
+from ..tools.ingestor import IngestorTool
+from ..tools.embedder import EmbedderTool
+from .queue import claim_next_job, heartbeat, complete_job, fail_job, content_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionWorker:
+    """
+    Pool of threads that claim and process ingestion jobs.
+    Run it with `flask rag-worker` (or `python backend/manage.py rag-worker`).
+    """
+
+    def __init__(self, app, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.app = app
+        self.concurrency = concurrency or RAGConfig.WORKER_CONCURRENCY
+        self.poll_interval = poll_interval if poll_interval is not None else RAGConfig.WORKER_POLL_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.ingestor = IngestorTool()
+        self.embedder = EmbedderTool()
+
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Start the worker threads"""
+        with self.app.app_context():
+            create_rag_tables(db.engine)
+
+        for number in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"rag-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Ingestion worker {self.worker_id} started with {self.concurrency} threads")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after in-flight jobs finish"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_forever(self):
+        """Run until SIGINT/SIGTERM"""
+        def handle_signal(signum, frame):
+            logger.info(f"Ingestion worker received signal {signum}, shutting down")
+            self._stop.set()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
+
+        self.start()
+        while not self._stop.wait(1.0):
+            pass
+        self.stop()
+
+    def run_until_empty(self) -> int:
+        """Process jobs in the calling thread until none are runnable; returns the number processed"""
+        with self.app.app_context():
+            create_rag_tables(db.engine)
+
+        processed = 0
+        while self._process_next():
+            processed += 1
+        return processed
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                processed = self._process_next()
+            except Exception as e:
+                logger.error(f"Ingestion worker loop error: {e}")
+                processed = False
+
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    def _process_next(self) -> bool:
+        """Claim and process one job; returns False when the queue has nothing runnable"""
+        with self.app.app_context():
+            try:
+                job_id = claim_next_job(f"{self.worker_id}/{threading.current_thread().name}")
+                if job_id is None:
+                    return False
+
+                job = db.session.get(IngestionJob, job_id)
+
+                # A job whose lease expired on its last allowed attempt is not retried again
+                if job.attempts > job.max_attempts:
+                    job.attempts = job.max_attempts
+                    fail_job(job, RuntimeError(job.error or "Worker lease expired"))
+                    return True
+
+                try:
+                    self.process_job(job)
+                    complete_job(job)
+                    logger.info(
+                        f"Ingestion job {job.id} completed: {job.stored_chunks} stored, "
+                        f"{job.skipped_chunks} skipped, {job.removed_chunks} removed"
+                    )
+                except Exception as e:
+                    db.session.rollback()
+                    fail_job(db.session.get(IngestionJob, job_id), e)
+
+                return True
+            finally:
+                db.session.remove()
+
+    def process_job(self, job: IngestionJob) -> None:
+        """
+        Chunk the job's content, diff it against the document's stored chunks by
+        content_hash, and apply the difference.
+
+        Unchanged chunks keep their rows and embeddings; new chunks reuse the
+        embedding of an identical stored chunk when one exists and are embedded
+        otherwise. In incremental mode, stored chunks missing from the new
+        content are tombstoned. Every write happens in one transaction, so
+        re-running a job after a failure or crash never duplicates rows.
+        """
+        metadata = json.loads(job.extra_data) if job.extra_data else {}
+        user_id = tenant_value(job.user_id)
+        organization_id = tenant_value(job.organization_id)
+
+        if job.file_path:
+            # Uploaded PDF/DOCX: pages are extracted as the chunker consumes them
+            chunks = self.ingestor.ingest_file(job.file_path, metadata)
+        else:
+            chunks = self.ingestor.ingest_text(job.content, metadata, chunking_strategy=job.chunking_strategy)
+
+        # First occurrence of each hash wins; repeated passages are stored once
+        unique: Dict[str, Dict[str, Any]] = {}
+        for chunk in chunks:
+            unique.setdefault(content_hash(chunk['content']), chunk)
+
+        session_factory = sessionmaker(bind=db.engine)
+        with session_factory() as session:
+            stored = {
+                row.content_hash: row for row in session.query(
+                    DocumentChunk.id, DocumentChunk.content_hash, DocumentChunk.chunk_index
+                ).filter(
+                    DocumentChunk.document_id == job.document_id,
+                    tenant_filter(DocumentChunk.user_id, user_id),
+                    tenant_filter(DocumentChunk.organization_id, organization_id),
+                    DocumentChunk.deleted_at.is_(None)
+                )
+            }
+            added = {digest: chunk for digest, chunk in unique.items() if digest not in stored}
+            reused = self._find_embeddings(session, list(added))
+
+        moved = {
+            stored[digest].id: chunk['chunk_index'] for digest, chunk in unique.items()
+            if digest in stored and stored[digest].chunk_index != chunk['chunk_index']
+        }
+        removed = [row.id for digest, row in stored.items() if digest not in unique] \
+            if job.mode == IngestionJob.MODE_INCREMENTAL else []
+
+        to_embed = [chunk for digest, chunk in added.items() if digest not in reused]
+        for digest, chunk in added.items():
+            if digest in reused:
+                chunk['embedding'] = reused[digest]
+
+        heartbeat(
+            job,
+            total_chunks=len(chunks),
+            skipped_chunks=len(chunks) - len(added),
+            reused_chunks=len(added) - len(to_embed),
+            embedded_chunks=0,
+            stored_chunks=0,
+            removed_chunks=0
+        )
+
+        step = max(1, RAGConfig.JOB_PROGRESS_CHUNKS)
+        for start in range(0, len(to_embed), step):
+            part = self.embedder.generate_embeddings(to_embed[start:start + step])
+
+            failed = [chunk for chunk in part if chunk.get('embedding') is None]
+            if failed:
+                raise RuntimeError(f"{len(failed)} chunks failed to embed: {failed[0].get('embedding_error')}")
+
+            for chunk, embedded in zip(to_embed[start:start + step], part):
+                chunk['embedding'] = embedded['embedding']
+            heartbeat(job, embedded_chunks=min(start + step, len(to_embed)))
+
+        stored_count = self._apply_changes(
+            session_factory, job, list(added.values()), moved, removed, metadata, user_id, organization_id
+        )
+        heartbeat(job, stored_chunks=stored_count, removed_chunks=len(removed))
+
+        logger.info(
+            f"Document {job.document_id}: {len(chunks) - len(added)} unchanged, {len(to_embed)} embedded, "
+            f"{len(added) - len(to_embed)} reused, {len(removed)} removed"
+        )
+
+    def _find_embeddings(self, session, hashes: List[str]) -> Dict[str, Any]:
+        """
+        Return stored embeddings for live chunks with these content hashes that
+        were produced by the current embedding model
+        """
+        if not hashes:
+            return {}
+
+        model = RAGConfig.EMBEDDING_MODEL or RAGConfig.EMBEDDING_PROVIDER
+        found: Dict[str, Any] = {}
+        for start in range(0, len(hashes), 500):
+            rows = session.query(DocumentChunk.content_hash, EmbeddingStore.embedding) \
+                .join(EmbeddingStore, EmbeddingStore.chunk_id == DocumentChunk.id) \
+                .filter(
+                    DocumentChunk.content_hash.in_(hashes[start:start + 500]),
+                    DocumentChunk.embedding_model == model,
+                    DocumentChunk.deleted_at.is_(None)
+                )
+            for row in rows:
+                if row.content_hash not in found:
+                    found[row.content_hash] = EmbeddingStore.decode_embedding(row.embedding)
+        return found
+
+    def _apply_changes(
+        self,
+        session_factory,
+        job: IngestionJob,
+        chunks: List[Dict[str, Any]],
+        moved: Dict[int, int],
+        removed: List[int],
+        metadata: Dict[str, Any],
+        user_id: Optional[str],
+        organization_id: Optional[str]
+    ) -> int:
+        """
+        Insert new chunks with their embeddings, renumber moved chunks and
+        tombstone removed ones in one transaction. Returns the number inserted.
+        """
+        if not chunks and not moved and not removed:
+            return 0
+
+        with session_factory() as session, session.begin():
+            BulkChunkWriter(db.engine).write_chunks(
+                session,
+                document_id=job.document_id,
+                chunks=chunks,
+                source_type=job.source_type,
+                user_id=user_id,
+                organization_id=organization_id,
+                source_id=metadata.get('source_id'),
+                chunking_strategy=job.chunking_strategy
+            )
+
+            if moved:
+                table = DocumentChunk.__table__
+                session.execute(
+                    update(table).where(table.c.id == bindparam('moved_id')).values(chunk_index=bindparam('moved_index')),
+                    [{'moved_id': chunk_id, 'moved_index': chunk_index} for chunk_id, chunk_index in moved.items()]
+                )
+
+            if removed:
+                # Loaded through the ORM so the index sync hooks drop them from in-process indexes
+                now = datetime.utcnow()
+                for start in range(0, len(removed), 500):
+                    batch = removed[start:start + 500]
+                    for row in session.query(DocumentChunk).filter(DocumentChunk.id.in_(batch)):
+                        row.deleted_at = now
+                    for embedding in session.query(EmbeddingStore).filter(EmbeddingStore.chunk_id.in_(batch)):
+                        session.delete(embedding)
+
+        return len(chunks)
@@ -3,5 +3,6 @@ RAG Database Models
 """
 
 from .vector_store import DocumentChunk, EmbeddingStore
+from .bulk_writer import BulkChunkWriter
 
-__all__ = ["DocumentChunk", "EmbeddingStore"]
\ No newline at end of file
+__all__ = ["DocumentChunk", "EmbeddingStore", "BulkChunkWriter"]
\ No newline at end of file
@@ -0,0 +1,275 @@
+"""
+Bulk Chunk Writer
+Set-based inserts of document chunks and their embeddings for ingestion
+and backfills, instead of one ORM flush per row
+"""
+
+import io
+import logging
+import struct
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import RAGConfig
+from .vector_store import DocumentChunk, EmbeddingStore, HAS_VECTOR
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+# Columns written by COPY, in order
+COPY_COLUMNS = (
+    "chunk_id", "document_id", "embedding", "source_type", "user_id",
+    "organization_id", "embedding_confidence", "created_at", "updated_at",
+)
+
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack(">h", -1)
+_PG_EPOCH = datetime(2000, 1, 1)
+
+
+class BulkChunkWriter:
+    """
+    Writes chunks with INSERT ... RETURNING in batches and embeddings with
+    binary COPY on Postgres, or executemany elsewhere (SQLite).
+
+    Rows are written through the caller's session, so they commit or roll
+    back with it; registered in-process indexes are updated on commit.
+    """
+
+    def __init__(self, engine, batch_size: Optional[int] = None):
+        self.engine = engine
+        self.batch_size = max(1, batch_size or RAGConfig.BULK_INSERT_BATCH_SIZE)
+        self._session_factory = sessionmaker(bind=engine)
+
+    def write_chunks(
+        self,
+        session: Session,
+        document_id: str,
+        chunks: List[Dict[str, Any]],
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        chunking_strategy: Optional[str] = None
+    ) -> List[int]:
+        """
+        Insert chunks and their embeddings in the session's transaction.
+
+        Args:
+            chunks: Dicts with content, chunk_index, embedding and optional metadata
+
+        Returns:
+            The new chunk IDs, in input order
+        """
+        if not chunks:
+            return []
+
+        chunk_rows = []
+        for chunk in chunks:
+            values = DocumentChunk.chunk_values(
+                document_id=document_id,
+                chunk_index=chunk['chunk_index'],
+                content=chunk['content'],
+                source_type=source_type,
+                source_id=source_id,
+                user_id=user_id,
+                organization_id=organization_id,
+                metadata=chunk.get('metadata')
+            )
+            if chunking_strategy:
+                values['chunking_strategy'] = chunking_strategy
+            values['processed_at'] = datetime.utcnow()
+            chunk_rows.append(values)
+
+        chunk_ids = self._insert_chunk_rows(session, chunk_rows)
+
+        embedding_rows = [
+            EmbeddingStore.embedding_values(
+                chunk_id=chunk_id,
+                document_id=document_id,
+                embedding_vector=chunk['embedding'],
+                source_type=source_type,
+                user_id=user_id,
+                organization_id=organization_id
+            )
+            for chunk_id, chunk in zip(chunk_ids, chunks)
+        ]
+        self._insert_embedding_rows(session, embedding_rows)
+
+        self._queue_index_updates(session, chunk_ids, chunks, chunk_rows)
+        return chunk_ids
+
+    def write_document(
+        self,
+        document_id: str,
+        chunks: List[Dict[str, Any]],
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        source_id: Optional[str] = None,
+        chunking_strategy: Optional[str] = None
+    ) -> List[int]:
+        """Write one document's chunks in a transaction of their own, returning the new chunk IDs"""
+        with self._session_factory() as session, session.begin():
+            return self.write_chunks(
+                session, document_id, chunks, source_type, user_id, organization_id, source_id, chunking_strategy
+            )
+
+    def write_documents(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Write a stream of documents, committing once per document so a failed
+        document is rolled back on its own.
+
+        Args:
+            documents: Dicts with document_id, chunks and source_type, plus
+                optional user_id, organization_id, source_id and chunking_strategy
+
+        Returns:
+            Counts of documents written and failed and chunks written
+        """
+        stats = {'documents': 0, 'failed_documents': 0, 'chunks': 0}
+
+        for document in documents:
+            try:
+                chunk_ids = self.write_document(
+                    document_id=document['document_id'],
+                    chunks=document['chunks'],
+                    source_type=document['source_type'],
+                    user_id=document.get('user_id'),
+                    organization_id=document.get('organization_id'),
+                    source_id=document.get('source_id'),
+                    chunking_strategy=document.get('chunking_strategy')
+                )
+                stats['documents'] += 1
+                stats['chunks'] += len(chunk_ids)
+            except Exception as e:
+                stats['failed_documents'] += 1
+                logger.error(f"Bulk write failed for document {document.get('document_id')}: {e}")
+
+        logger.info(f"Bulk wrote {stats['chunks']} chunks for {stats['documents']} documents")
+        return stats
+
+    def _insert_chunk_rows(self, session: Session, rows: List[Dict[str, Any]]) -> List[int]:
+        """Batched multi-row INSERT ... RETURNING id, with IDs in parameter order"""
+        table = DocumentChunk.__table__
+        statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+
+        chunk_ids: List[int] = []
+        for start in range(0, len(rows), self.batch_size):
+            result = session.execute(
+                statement,
+                rows[start:start + self.batch_size],
+                execution_options={'insertmanyvalues_page_size': self.batch_size}
+            )
+            chunk_ids.extend(row.id for row in result)
+        return chunk_ids
+
+    def _insert_embedding_rows(self, session: Session, rows: List[Dict[str, Any]]) -> None:
+        connection = session.connection()
+
+        if connection.dialect.name == 'postgresql':
+            try:
+                self._copy_embedding_rows(connection, rows)
+                return
+            except NotImplementedError:
+                pass
+
+        table = EmbeddingStore.__table__
+        now = datetime.utcnow()
+        for start in range(0, len(rows), self.batch_size):
+            batch = [{**row, 'created_at': now, 'updated_at': now} for row in rows[start:start + self.batch_size]]
+            session.execute(insert(table), batch)
+
+    def _copy_embedding_rows(self, connection, rows: List[Dict[str, Any]]) -> None:
+        """Stream rows with COPY ... FROM STDIN in binary format, one buffer per batch"""
+        cursor = connection.connection.cursor()
+        sql = f"COPY {EmbeddingStore.__tablename__} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT binary)"
+        now = datetime.utcnow()
+
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                buffer = io.BytesIO()
+                buffer.write(_PGCOPY_HEADER)
+                for row in rows[start:start + self.batch_size]:
+                    buffer.write(self._copy_tuple(row, now))
+                buffer.write(_PGCOPY_TRAILER)
+
+                if hasattr(cursor, 'copy_expert'):  # psycopg2
+                    buffer.seek(0)
+                    cursor.copy_expert(sql, buffer)
+                elif hasattr(cursor, 'copy'):  # psycopg 3
+                    with cursor.copy(sql) as copy:
+                        copy.write(buffer.getvalue())
+                else:
+                    raise NotImplementedError("DB-API driver does not support COPY")
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_tuple(row: Dict[str, Any], now: datetime) -> bytes:
+        fields = [
+            struct.pack(">i", row['chunk_id']),
+            row['document_id'].encode('utf-8'),
+            _encode_vector(row['embedding']) if HAS_VECTOR else bytes(row['embedding']),
+            row['source_type'].encode('utf-8'),
+            None if row['user_id'] is None else str(row['user_id']).encode('utf-8'),
+            None if row['organization_id'] is None else str(row['organization_id']).encode('utf-8'),
+            struct.pack(">d", row['embedding_confidence']),
+            _encode_timestamp(now),
+            _encode_timestamp(now),
+        ]
+
+        parts = [struct.pack(">h", len(fields))]
+        for field in fields:
+            if field is None:
+                parts.append(struct.pack(">i", -1))
+            else:
+                parts.append(struct.pack(">i", len(field)))
+                parts.append(field)
+        return b"".join(parts)
+
+    @staticmethod
+    def _queue_index_updates(session: Session, chunk_ids, chunks, chunk_rows) -> None:
+        """Hand the new rows to registered in-process indexes, as the ORM hooks would"""
+        from ..index.base import METADATA_COLUMNS
+        from ..index.sync import indexes_registered, queue_index_changes
+
+        want_vectors = indexes_registered("vector")
+        want_keywords = indexes_registered("keyword")
+        if not want_vectors and not want_keywords:
+            return
+
+        changes = []
+        for chunk_id, chunk, row in zip(chunk_ids, chunks, chunk_rows):
+            metadata = {column: row[column] for column in METADATA_COLUMNS}
+            if want_vectors:
+                changes.append(("vector", "add", chunk_id, chunk['embedding'], metadata))
+            if want_keywords:
+                changes.append(("keyword", "add", chunk_id, row['content'], metadata))
+
+        queue_index_changes(session, changes)
+
+
+def _encode_vector(vector) -> bytes:
+    """pgvector binary format: int16 dimension, int16 unused, big-endian float32 values"""
+    if HAS_NUMPY:
+        values = np.asarray(vector, dtype='>f4').reshape(-1)
+        return struct.pack(">hh", values.size, 0) + values.tobytes()
+    values = list(vector)
+    return struct.pack(f">hh{len(values)}f", len(values), 0, *values)
+
+
+def _encode_timestamp(value: datetime) -> bytes:
+    """Postgres binary timestamp: microseconds since 2000-01-01"""
+    delta = value - _PG_EPOCH
+    return struct.pack(">q", (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
@@ -0,0 +1,101 @@
+"""
+Embedding Codec
+Compact binary representation for embeddings held in caches and in the
+JSON-fallback embedding column
+"""
+
+import json
+import struct
+from array import array
+from typing import List, Optional, Sequence, Union
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+
+# Encoded layout: b'E' + dtype code + payload. int8 payloads start with a float32 scale.
+EMBEDDING_MAGIC = b'E'
+EMBEDDING_DTYPES = {'float32': 1, 'float16': 2, 'int8': 3}
+_DTYPE_NAMES = {code: name for name, code in EMBEDDING_DTYPES.items()}
+
+
+def as_vector(embedding: Sequence[float]):
+    """
+    Convert an embedding to a 1-D float32 NumPy array (a few KB instead of a
+    list of Python floats). Without numpy the input is returned as a list.
+    """
+    if embedding is None:
+        return None
+    if not HAS_NUMPY:
+        return list(embedding)
+    return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+
+def embedding_to_list(embedding) -> Optional[List[float]]:
+    """Convert an embedding to a JSON-serialisable list at API boundaries"""
+    if embedding is None:
+        return None
+    if HAS_NUMPY and isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return [float(value) for value in embedding]
+
+
+def encode_embedding(embedding: Sequence[float], dtype: str = 'float32') -> bytes:
+    """Pack an embedding into bytes, optionally quantised to float16 or int8"""
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    header = EMBEDDING_MAGIC + bytes([EMBEDDING_DTYPES[dtype]])
+
+    if not HAS_NUMPY:
+        if dtype != 'float32':
+            raise ImportError(f"numpy is required for {dtype} embedding storage")
+        return header + array('f', embedding).tobytes()
+
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+    if dtype == 'float32':
+        return header + vector.astype('<f4', copy=False).tobytes()
+    if dtype == 'float16':
+        return header + vector.astype('<f2').tobytes()
+
+    # Symmetric per-vector int8 quantisation
+    peak = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    quantised = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+    return header + struct.pack('<f', scale) + quantised.tobytes()
+
+
+def decode_embedding(value: Union[bytes, bytearray, memoryview, str]):
+    """
+    Decode an encoded embedding to a float32 vector. Legacy JSON text is
+    accepted so rows written before the binary format still load.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return as_vector(json.loads(value))
+
+    value = bytes(value)
+    if value[:1] != EMBEDDING_MAGIC or value[1] not in _DTYPE_NAMES:
+        raise ValueError("Value is not an encoded embedding")
+
+    dtype = _DTYPE_NAMES[value[1]]
+    payload = value[2:]
+
+    if not HAS_NUMPY:
+        if dtype != 'float32':
+            raise ImportError(f"numpy is required to decode {dtype} embeddings")
+        return array('f', payload).tolist()
+
+    if dtype == 'float32':
+        return np.frombuffer(payload, dtype='<f4').astype(np.float32)
+    if dtype == 'float16':
+        return np.frombuffer(payload, dtype='<f2').astype(np.float32)
+
+    scale = struct.unpack('<f', payload[:4])[0]
+    return np.frombuffer(payload[4:], dtype=np.int8).astype(np.float32) * np.float32(scale)
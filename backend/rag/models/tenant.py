@@ -0,0 +1,16 @@
+"""
+Tenant Columns
+Helpers for the user_id and organization_id columns of the RAG tables
+"""
+
+from typing import Optional
+
+
+def tenant_value(value) -> Optional[str]:
+    """A user or organization ID as the RAG tables store it (as a string)"""
+    return None if value is None else str(value)
+
+
+def tenant_filter(column, value):
+    """Match a tenant column against a tenant_value, where None means no tenant"""
+    return column.is_(None) if value is None else column == value
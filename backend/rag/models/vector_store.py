@@ -3,10 +3,11 @@ Vector Store Models for RAG System
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import json
+import re
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 
 # Try to import VECTOR for pgvector support, fallback to Text if not available
@@ -14,13 +15,22 @@ try:
     from sqlalchemy.dialects.postgresql import VECTOR
     HAS_VECTOR = True
 except ImportError:
-    HAS_VECTOR = False
-    VECTOR = None
+    try:
+        from pgvector.sqlalchemy import Vector as VECTOR
+        HAS_VECTOR = True
+    except ImportError:
+        HAS_VECTOR = False
+        VECTOR = None
 
 from ..config import RAGConfig
+from .embedding_codec import as_vector, embedding_to_list, encode_embedding
+from .embedding_codec import decode_embedding as decode_embedding_bytes
 
 Base = declarative_base()
 
+# A Postgres text search configuration name, optionally schema-qualified
+FTS_LANGUAGE_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?")
+
 
 class DocumentChunk(Base):
     """
@@ -49,6 +59,7 @@ class DocumentChunk(Base):
     processed_at = Column(DateTime, default=datetime.utcnow)
     embedding_model = Column(String(100), nullable=True)
     chunking_strategy = Column(String(50), nullable=True)
+    deleted_at = Column(DateTime, nullable=True)  # Tombstone: chunk dropped by a later version of the document
 
     # Additional metadata as JSON
     chunk_metadata = Column(Text, nullable=True)  # JSON string for flexible metadata
@@ -74,6 +85,7 @@ class DocumentChunk(Base):
             "processed_at": self.processed_at.isoformat() if self.processed_at else None,
             "embedding_model": self.embedding_model,
             "chunking_strategy": self.chunking_strategy,
+            "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None,
             "metadata": json.loads(self.chunk_metadata) if self.chunk_metadata else None,
         }
 
@@ -90,11 +102,27 @@ class DocumentChunk(Base):
         metadata: Optional[Dict[str, Any]] = None
     ) -> 'DocumentChunk':
         """Factory method to create a document chunk"""
+        return cls(**cls.chunk_values(
+            document_id, chunk_index, content, source_type, source_id, user_id, organization_id, metadata
+        ))
+
+    @staticmethod
+    def chunk_values(
+        document_id: str,
+        chunk_index: int,
+        content: str,
+        source_type: str,
+        source_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Column values for a chunk row, shared by create_chunk and the bulk writer"""
         import hashlib
 
         content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-        return cls(
+        return dict(
             document_id=document_id,
             chunk_index=chunk_index,
             content=content,
@@ -111,6 +139,14 @@ class DocumentChunk(Base):
             chunk_metadata=json.dumps(metadata) if metadata else None,
         )
 
+    @classmethod
+    def purge_tombstones(cls, session, before: datetime) -> int:
+        """Hard-delete chunks tombstoned before the given time; returns the number removed"""
+        return session.query(cls).filter(
+            cls.deleted_at.isnot(None),
+            cls.deleted_at < before
+        ).delete(synchronize_session=False)
+
 
 class EmbeddingStore(Base):
     """
@@ -122,11 +158,11 @@ class EmbeddingStore(Base):
     chunk_id = Column(Integer, nullable=False, index=True)  # Foreign key to DocumentChunk
     document_id = Column(String(255), nullable=False, index=True)  # Denormalized for faster queries
 
-    # Vector embedding (using pgvector if available, otherwise Text for JSON storage)
+    # Vector embedding (using pgvector if available, otherwise packed float32/float16/int8 bytes)
     if HAS_VECTOR:
         embedding = Column(VECTOR(RAGConfig.EMBEDDING_DIMENSIONS), nullable=False)
     else:
-        embedding = Column(Text, nullable=False)  # Store as JSON string for now
+        embedding = Column(LargeBinary, nullable=False)
 
     # Metadata for filtering and search
     source_type = Column(String(50), nullable=False, index=True)
@@ -145,12 +181,6 @@ class EmbeddingStore(Base):
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary representation"""
-        # Handle embedding field based on storage type
-        if HAS_VECTOR:
-            embedding_value = self.embedding
-        else:
-            embedding_value = json.loads(self.embedding) if self.embedding else None
-
         return {
             "id": self.id,
             "chunk_id": self.chunk_id,
@@ -158,31 +188,55 @@ class EmbeddingStore(Base):
             "source_type": self.source_type,
             "user_id": self.user_id,
             "organization_id": self.organization_id,
-            "embedding": embedding_value,
+            "embedding": embedding_to_list(self.decode_embedding(self.embedding)),
             "embedding_confidence": self.embedding_confidence,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
 
+    @staticmethod
+    def decode_embedding(value):
+        """Convert a stored embedding column value back into a float32 vector"""
+        if value is None:
+            return None
+        if HAS_VECTOR:
+            return as_vector(value)
+        return decode_embedding_bytes(value)
+
     @classmethod
     def create_embedding(
         cls,
         chunk_id: int,
         document_id: str,
-        embedding_vector: list,
+        embedding_vector,
         source_type: str,
         user_id: Optional[str] = None,
         organization_id: Optional[str] = None,
         confidence: float = 1.0
     ) -> 'EmbeddingStore':
         """Factory method to create an embedding record"""
+        return cls(**cls.embedding_values(
+            chunk_id, document_id, embedding_vector, source_type, user_id, organization_id, confidence
+        ))
+
+    @staticmethod
+    def embedding_values(
+        chunk_id: int,
+        document_id: str,
+        embedding_vector,
+        source_type: str,
+        user_id: Optional[str] = None,
+        organization_id: Optional[str] = None,
+        confidence: float = 1.0
+    ) -> Dict[str, Any]:
+        """Column values for an embedding row, shared by create_embedding and the bulk writer"""
         # Handle embedding storage based on available vector support
         if HAS_VECTOR:
-            embedding_value = embedding_vector
+            embedding_value = as_vector(embedding_vector)
         else:
-            embedding_value = json.dumps(embedding_vector)  # Store as JSON string
+            embedding_value = encode_embedding(embedding_vector, RAGConfig.EMBEDDING_STORAGE_DTYPE)
 
-        return cls(
+        return dict(
             chunk_id=chunk_id,
             document_id=document_id,
             embedding=embedding_value,
@@ -193,16 +247,101 @@ class EmbeddingStore(Base):
         )
 
 
+def create_rag_tables(engine) -> None:
+    """Create the RAG tables and indexes if they do not exist"""
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
+    # The migrations for these indexes skip tables that do not exist yet,
+    # which is always the case on a fresh install, so create them here too
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as connection:
+            for statement in postgres_index_statements(connection):
+                connection.execute(text(statement))
+
+
+def postgres_index_statements(connection) -> List[str]:
+    """Idempotent CREATE INDEX statements for Postgres indexes the models cannot declare"""
+    statements = []
+
+    if _embedding_is_vector(connection):
+        # Build parameters follow RAG_ANN_INDEX / RAG_HNSW_* / RAG_IVFFLAT_LISTS;
+        # query-time ef_search/probes are applied per transaction by RetrieverTool
+        if RAGConfig.ANN_INDEX_TYPE.lower() == 'ivfflat':
+            statements.append(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_store_embedding_ivfflat "
+                "ON rag_embedding_store USING ivfflat (embedding vector_cosine_ops) "
+                f"WITH (lists = {int(RAGConfig.IVFFLAT_LISTS)})"
+            )
+        else:
+            statements.append(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_store_embedding_hnsw "
+                "ON rag_embedding_store USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {int(RAGConfig.HNSW_M)}, ef_construction = {int(RAGConfig.HNSW_EF_CONSTRUCTION)})"
+            )
+
+    # Serves the chunk_metadata::jsonb @> '{...}' predicates built by RetrieverTool
+    statements.append(
+        "CREATE INDEX IF NOT EXISTS idx_document_chunks_metadata_gin "
+        "ON rag_document_chunks USING gin ((chunk_metadata::jsonb) jsonb_path_ops)"
+    )
+
+    # Serves keyword search; must match the to_tsvector expression RetrieverTool builds
+    language = fts_language()
+    statements.append(
+        "CREATE INDEX IF NOT EXISTS idx_document_chunks_content_fts "
+        f"ON rag_document_chunks USING gin (to_tsvector('{language}'::regconfig, content))"
+    )
+
+    return statements
+
+
+def fts_language() -> str:
+    """RAG_FTS_LANGUAGE, checked to be a regconfig name since it is put into DDL as-is"""
+    language = RAGConfig.FTS_LANGUAGE
+    if not FTS_LANGUAGE_PATTERN.fullmatch(language):
+        raise ValueError(f"RAG_FTS_LANGUAGE is not a text search configuration name: {language!r}")
+    return language
+
+
+def _embedding_is_vector(connection) -> bool:
+    """Whether rag_embedding_store.embedding uses the pgvector type"""
+    column_type = connection.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = to_regclass('rag_embedding_store') AND attname = 'embedding'"
+    )).scalar()
+    return bool(column_type) and column_type.startswith('vector')
+
+
 # Create indexes for better query performance
 Index('idx_document_chunks_document_id', DocumentChunk.document_id)
 Index('idx_document_chunks_source_type', DocumentChunk.source_type)
 Index('idx_document_chunks_user_id', DocumentChunk.user_id)
 Index('idx_document_chunks_content_hash', DocumentChunk.content_hash)
+Index('idx_document_chunks_deleted_at', DocumentChunk.deleted_at)
 
 Index('idx_embedding_store_chunk_id', EmbeddingStore.chunk_id)
 Index('idx_embedding_store_document_id', EmbeddingStore.document_id)
 Index('idx_embedding_store_source_type', EmbeddingStore.source_type)
 Index('idx_embedding_store_user_id', EmbeddingStore.user_id)
+Index('idx_embedding_store_created_at', EmbeddingStore.created_at)
+
+# Composite partial indexes for multi-tenant retrieval filters (tenant + source_type)
+Index(
+    'idx_embedding_store_org_source',
+    EmbeddingStore.organization_id, EmbeddingStore.source_type,
+    postgresql_where=EmbeddingStore.organization_id.isnot(None),
+    sqlite_where=EmbeddingStore.organization_id.isnot(None),
+)
+Index(
+    'idx_embedding_store_user_source',
+    EmbeddingStore.user_id, EmbeddingStore.source_type,
+    postgresql_where=EmbeddingStore.user_id.isnot(None),
+    sqlite_where=EmbeddingStore.user_id.isnot(None),
+)
+
+# JSON metadata filters use a GIN index on chunk_metadata::jsonb (Postgres only),
+# created by create_rag_tables and the add_rag_filter_indexes migration. Keyword search uses a GIN index on
+# to_tsvector(RAG_FTS_LANGUAGE, content), created by create_rag_tables and add_rag_chunk_fulltext_index
 
 # Vector similarity index (requires pgvector extension)
-# This will be created via migration when pgvector is available
\ No newline at end of file
+# Created by create_rag_tables and the add_rag_embedding_ann_index migration (HNSW or IVFFlat, see RAG_ANN_INDEX)
\ No newline at end of file
@@ -4,6 +4,7 @@ RAG Tools Package
 
 from .supervisor import RAGSupervisor
 from .ingestor import IngestorTool
+from .batch_ingestor import BatchIngestor
 from .embedder import EmbedderTool
 from .retriever import RetrieverTool
 from .generator import GeneratorTool
@@ -11,6 +12,7 @@ from .generator import GeneratorTool
 __all__ = [
     "RAGSupervisor",
     "IngestorTool",
+    "BatchIngestor",
     "EmbedderTool",
     "RetrieverTool",
     "GeneratorTool",
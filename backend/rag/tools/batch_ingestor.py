@@ -0,0 +1,306 @@
+"""
+RAG Batch Ingestor
+Fans documents out to a process pool for cleaning and chunking, and funnels
+their chunks into the shared embedder in cross-document batches
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from ..config import RAGConfig
+from ..models.tenant import tenant_value
+from .ingestor import IngestorTool
+
+
+logger = logging.getLogger(__name__)
+
+# IngestorTool owned by each pool process, created on first use
+_process_ingestor: Optional[IngestorTool] = None
+
+
+def _chunk_document(content: str, metadata: Dict[str, Any], chunking_strategy: str) -> Tuple[List[Dict[str, Any]], float]:
+    """Pool task: clean and chunk one document, returning the chunks and seconds spent"""
+    global _process_ingestor
+
+    if _process_ingestor is None:
+        _process_ingestor = IngestorTool()
+
+    started = time.perf_counter()
+    chunks = _process_ingestor.ingest_text(content, metadata, chunking_strategy=chunking_strategy)
+    return chunks, time.perf_counter() - started
+
+
+class BatchIngestor:
+    """
+    Multi-document ingestion engine.
+
+    Chunking (CPU-bound) runs in a process pool, so throughput scales with
+    cores; embedding (I/O-bound) runs in this process through one
+    EmbedderTool, whose rate limiter, cache and concurrency limits then
+    apply to the whole batch. Each document gets its own result, and a
+    document that fails to chunk, embed or store does not affect the others.
+
+    The pool is started on first use and kept for later batches; call close()
+    to shut it down.
+    """
+
+    # Batches smaller than this (in characters) are chunked in-process, where
+    # pool start-up would cost more than it saves
+    INLINE_CHARS = 256 * 1024
+
+    def __init__(
+        self,
+        embedder=None,
+        writer=None,
+        processes: Optional[int] = None,
+        embed_chunks: Optional[int] = None
+    ):
+        """
+        Args:
+            embedder: EmbedderTool to embed with (created on first use if omitted)
+            writer: Optional BulkChunkWriter; completed documents are stored
+                with one commit each
+            processes: Pool size (RAG_INGEST_PROCESSES; 1 chunks in this process)
+            embed_chunks: Chunks gathered across documents per embedder call
+        """
+        self.config = RAGConfig()
+        self.embedder = embedder
+        self.writer = writer
+        self.processes = processes or self.config.INGEST_PROCESSES or os.cpu_count() or 1
+        self.embed_chunks = max(1, embed_chunks or self.config.INGEST_EMBED_CHUNKS)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def close(self) -> None:
+        """Shut down the process pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'BatchIngestor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned workers do not inherit the parent's threads, locks or DB connections
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def ingest(self, documents: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Ingest documents and return one result per document, in input order.
+
+        Args:
+            documents: Dicts with content and optional document_id, metadata,
+                chunking_strategy, source_type, user_id and organization_id
+
+        Returns:
+            Dicts with index, document_id, success, chunk_count and either
+            chunks (embedded) or error
+        """
+        return sorted(self.iter_ingest(documents), key=lambda result: result['index'])
+
+    def iter_ingest(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield per-document results as documents finish (completion order).
+        Only a bounded window of documents is in flight, so large streams
+        never sit in memory at once.
+        """
+        if self.embedder is None:
+            from .embedder import EmbedderTool
+            self.embedder = EmbedderTool()
+
+        started = time.perf_counter()
+        stats = {'documents': 0, 'failed': 0, 'chunks': 0}
+
+        pending: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []  # (state, chunk) awaiting embedding
+        for state in self._iter_chunked(documents):
+            stats['documents'] += 1
+
+            if state.get('error'):
+                stats['failed'] += 1
+                yield self._result(state)
+                continue
+
+            if not state['chunks']:
+                yield from self._finish(state, stats)
+                continue
+
+            state['remaining'] = len(state['chunks'])
+            pending.extend((state, chunk) for chunk in state['chunks'])
+
+            if len(pending) >= self.embed_chunks:
+                yield from self._embed_pending(pending, stats)
+                pending = []
+
+        if pending:
+            yield from self._embed_pending(pending, stats)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Batch ingested {stats['documents']} documents ({stats['failed']} failed, "
+            f"{stats['chunks']} chunks) in {elapsed:.2f}s with {self.processes} processes"
+        )
+
+    def _iter_chunked(self, documents: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Chunk documents in the pool, yielding per-document state as each finishes"""
+        inline = self.processes <= 1 or (
+            isinstance(documents, (list, tuple))
+            and sum(len(document.get('content') or '') for document in documents) < self.INLINE_CHARS
+        )
+        documents = enumerate(documents)
+
+        if inline:
+            for index, document in documents:
+                yield self._chunk_inline(index, document)
+            return
+
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+        window = self.processes * 4
+        exhausted = False
+
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < window:
+                item = next(documents, None)
+                if item is None:
+                    exhausted = True
+                    break
+
+                index, document = item
+                state = self._new_state(index, document)
+                try:
+                    future = self._get_pool().submit(
+                        _chunk_document,
+                        document['content'],
+                        state['metadata'],
+                        document.get('chunking_strategy', 'semantic')
+                    )
+                except Exception as e:
+                    state['error'] = f"Chunking failed: {e}"
+                    yield state
+                    continue
+                in_flight[future] = state
+
+            if not in_flight:
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                state = in_flight.pop(future)
+                try:
+                    state['chunks'], state['timings']['chunking'] = future.result()
+                except BrokenProcessPool as e:
+                    # A worker died (e.g. out of memory); start a fresh pool for the remaining documents
+                    state['error'] = f"Chunking failed: {e}"
+                    if self._pool is not None:
+                        self._pool.shutdown(wait=False)
+                        self._pool = None
+                except Exception as e:
+                    state['error'] = f"Chunking failed: {e}"
+                yield state
+
+    def _chunk_inline(self, index: int, document: Dict[str, Any]) -> Dict[str, Any]:
+        state = self._new_state(index, document)
+        try:
+            state['chunks'], state['timings']['chunking'] = _chunk_document(
+                document['content'], state['metadata'], document.get('chunking_strategy', 'semantic')
+            )
+        except Exception as e:
+            state['error'] = f"Chunking failed: {e}"
+        return state
+
+    @staticmethod
+    def _new_state(index: int, document: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'index': index,
+            'document': document,
+            'metadata': dict(document.get('metadata') or {}),
+            'chunks': [],
+            'failed_chunks': 0,
+            'error': None,
+            'timings': {},
+        }
+
+    def _embed_pending(self, pending: List[Tuple[Dict[str, Any], Dict[str, Any]]], stats: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Embed chunks gathered from several documents in one embedder call, then finish complete documents"""
+        started = time.perf_counter()
+        try:
+            embedded = self.embedder.generate_embeddings([chunk for _, chunk in pending])
+        except Exception as e:
+            embedded = [{**chunk, 'embedding': None, 'embedding_error': str(e)} for _, chunk in pending]
+        elapsed = time.perf_counter() - started
+
+        finished = []
+        for (state, chunk), result in zip(pending, embedded):
+            chunk['embedding'] = result.get('embedding')
+            if chunk['embedding'] is None:
+                state['failed_chunks'] += 1
+                state['error'] = state['error'] or f"Embedding failed: {result.get('embedding_error')}"
+
+            # Share of the call's time, by chunk count
+            state['timings']['embedding'] = state['timings'].get('embedding', 0.0) + elapsed / len(pending)
+            state['remaining'] -= 1
+            if state['remaining'] == 0:
+                finished.append(state)
+
+        for state in finished:
+            if state['error']:
+                stats['failed'] += 1
+                yield self._result(state)
+            else:
+                yield from self._finish(state, stats)
+
+    def _finish(self, state: Dict[str, Any], stats: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        """Store a fully embedded document if a writer is configured, then yield its result"""
+        if self.writer is not None and state['chunks']:
+            document = state['document']
+            started = time.perf_counter()
+            try:
+                state['chunk_ids'] = self.writer.write_document(
+                    document_id=self._document_id(state),
+                    chunks=state['chunks'],
+                    source_type=document.get('source_type', 'batch'),
+                    user_id=tenant_value(document.get('user_id')),
+                    organization_id=tenant_value(document.get('organization_id')),
+                    source_id=document.get('source_id'),
+                    chunking_strategy=document.get('chunking_strategy', 'semantic')
+                )
+            except Exception as e:
+                state['error'] = f"Storing failed: {e}"
+                stats['failed'] += 1
+            state['timings']['storing'] = time.perf_counter() - started
+
+        if not state['error']:
+            stats['chunks'] += len(state['chunks'])
+        yield self._result(state)
+
+    @staticmethod
+    def _document_id(state: Dict[str, Any]) -> str:
+        return state['document'].get('document_id') or f"batch_{state['index']}"
+
+    def _result(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        result = {
+            'index': state['index'],
+            'document_id': self._document_id(state),
+            'success': state['error'] is None,
+            'chunk_count': len(state['chunks']),
+            'timings': state['timings'],
+        }
+        if state['error']:
+            result['error'] = state['error']
+            result['failed_chunks'] = state['failed_chunks']
+        else:
+            result['chunks'] = state['chunks']
+            if 'chunk_ids' in state:
+                result['chunk_ids'] = state['chunk_ids']
+        return result
@@ -0,0 +1,214 @@
+"""
+RAG Context Packer
+Turns retrieved chunks into the context for an answer prompt: duplicates are
+dropped, neighbouring chunks of a document are merged back together, and the
+most relevant text is kept within a token budget
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+from ..config import RAGConfig
+from .tokenizer import Tokenizer, get_tokenizer
+
+
+logger = logging.getLogger(__name__)
+
+# Tokens allowed per context block for its "[Source n (...) - Relevance: ...]" header
+BLOCK_HEADER_TOKENS = 16
+
+# Characters of the next chunk used to find where it overlaps the previous one
+OVERLAP_PROBE_CHARS = 16
+
+
+def relevance(chunk: Dict[str, Any]) -> float:
+    """
+    A chunk's retrieval score: the fused hybrid score when present (it
+    reflects the retriever's final ranking), else vector similarity, else
+    keyword score. Scores of different kinds are on different scales.
+    """
+    for key in ('hybrid_score', 'similarity_score', 'keyword_score'):
+        score = chunk.get(key)
+        if score is not None:
+            return float(score)
+    return 0.0
+
+
+def merge_overlapping(previous: str, following: str) -> str:
+    """
+    Join the text of two consecutive chunks, dropping the sentences the
+    following chunk repeats from the end of the previous one (chunk overlap)
+    """
+    probe = following[:OVERLAP_PROBE_CHARS]
+    if probe:
+        position = previous.find(probe, max(0, len(previous) - len(following)))
+        while position != -1:
+            if following.startswith(previous[position:]):
+                return previous[:position] + following
+            position = previous.find(probe, position + 1)
+    return f"{previous.rstrip()}\n{following.lstrip()}"
+
+
+class ContextPacker:
+    """
+    Packs retrieved chunks into prompt context.
+
+    Chunks arrive in the retriever's ranking order, which is kept as their
+    rank (fused hybrid results and plain vector results score on different
+    scales, so scores are not re-sorted). Exact duplicates (same
+    content_hash), chunks contained in a higher-ranked chunk, and chunks
+    whose embeddings are near-identical to a higher-ranked one are dropped.
+    Kept chunks that are consecutive in the same document are merged into
+    one block, which ranks as its best chunk. Blocks are then added, best
+    ranked first, while they fit in max_tokens; a merged block too large to
+    fit is split back into its chunks.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Optional[Tokenizer] = None,
+        max_tokens: Optional[int] = None,
+        duplicate_similarity: Optional[float] = None
+    ):
+        """
+        Args:
+            tokenizer: Token counter (the shared RAG_CHUNK_TOKENIZER one by default)
+            max_tokens: Context budget in tokens (RAG_MAX_CONTEXT_LENGTH)
+            duplicate_similarity: Embedding cosine similarity at which two
+                chunks count as duplicates (RAG_CONTEXT_DUPLICATE_SIMILARITY)
+        """
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.max_tokens = max_tokens if max_tokens is not None else RAGConfig.MAX_CONTEXT_LENGTH
+        self.duplicate_similarity = (
+            duplicate_similarity if duplicate_similarity is not None else RAGConfig.CONTEXT_DUPLICATE_SIMILARITY
+        )
+
+    def pack(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Pack chunks into context blocks.
+
+        Returns:
+            Blocks, best ranked first, each with content, document_id,
+            source_type, rank (input position of its best chunk), relevance
+            (that chunk's retrieval score), similarity_score (best vector
+            similarity among its chunks, or None), chunk_ids, chunk_count
+            and token_count
+        """
+        ranked = [dict(chunk, _rank=position) for position, chunk in enumerate(chunks)]
+        kept = self._deduplicate(ranked)
+        blocks = self._merge_adjacent(kept)
+
+        packed = []
+        used = 0
+        for block in blocks:
+            # A merged block that does not fit may still fit as separate chunks
+            candidates = [block] if len(block['members']) == 1 else [block] + [self._block([member]) for member in block['members']]
+            for candidate in candidates:
+                tokens = self.tokenizer.count(candidate['content']) + BLOCK_HEADER_TOKENS
+                if used + tokens <= self.max_tokens:
+                    candidate['token_count'] = tokens
+                    packed.append(candidate)
+                    used += tokens
+                    if candidate is block:
+                        break
+
+        packed.sort(key=lambda block: block['rank'])
+        for block in packed:
+            del block['members']
+
+        if len(packed) < len(chunks):
+            logger.debug(
+                f"Packed {len(chunks)} chunks into {len(packed)} context blocks "
+                f"({used}/{self.max_tokens} tokens, {len(chunks) - len(kept)} duplicates dropped)"
+            )
+        return packed
+
+    def _deduplicate(self, ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        kept: List[Dict[str, Any]] = []
+        hashes = set()
+        vectors = []
+
+        for chunk in ranked:
+            content = chunk.get('content') or ''
+            if not content.strip():
+                continue
+
+            digest = chunk.get('content_hash') or hashlib.sha256(content.encode('utf-8')).hexdigest()
+            if digest in hashes:
+                continue
+            if any(content in other.get('content', '') for other in kept):
+                continue
+
+            vector = self._unit(chunk.get('embedding'))
+            if vector is not None and any(
+                other.shape == vector.shape and float(other @ vector) >= self.duplicate_similarity
+                for other in vectors
+            ):
+                continue
+
+            hashes.add(digest)
+            if vector is not None:
+                vectors.append(vector)
+            kept.append(chunk)
+
+        return kept
+
+    def _merge_adjacent(self, kept: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group runs of consecutive chunk_index in the same document into blocks, in rank order"""
+        by_document: Dict[Any, List[Dict[str, Any]]] = {}
+        blocks = []
+        for chunk in kept:
+            if chunk.get('document_id') is None or chunk.get('chunk_index') is None:
+                blocks.append(self._block([chunk]))
+            else:
+                by_document.setdefault(chunk['document_id'], []).append(chunk)
+
+        for members in by_document.values():
+            members.sort(key=lambda chunk: chunk['chunk_index'])
+            run = [members[0]]
+            for chunk in members[1:]:
+                if chunk['chunk_index'] == run[-1]['chunk_index'] + 1:
+                    run.append(chunk)
+                else:
+                    blocks.append(self._block(run))
+                    run = [chunk]
+            blocks.append(self._block(run))
+
+        blocks.sort(key=lambda block: block['rank'])
+        return blocks
+
+    @staticmethod
+    def _block(members: List[Dict[str, Any]]) -> Dict[str, Any]:
+        content = members[0]['content']
+        for chunk in members[1:]:
+            content = merge_overlapping(content, chunk['content'])
+
+        best = min(members, key=lambda chunk: chunk['_rank'])
+        similarities = [chunk['similarity_score'] for chunk in members if chunk.get('similarity_score') is not None]
+        return {
+            'content': content,
+            'document_id': members[0].get('document_id'),
+            'source_type': members[0].get('source_type'),
+            'rank': best['_rank'],
+            'relevance': relevance(best),
+            'similarity_score': max(similarities) if similarities else None,
+            'chunk_ids': [chunk.get('chunk_id') for chunk in members],
+            'chunk_count': len(members),
+            'members': members,
+        }
+
+    @staticmethod
+    def _unit(embedding):
+        if embedding is None or not HAS_NUMPY:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
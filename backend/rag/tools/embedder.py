@@ -6,17 +6,29 @@ Converts text chunks to vector embeddings using provider-agnostic interface
 import asyncio
 import hashlib
 import logging
+import random
 import time
 from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
 
 from ...ai_providers import get_ai_provider_manager
 from ..config import RAGConfig
+from ..cache import get_embedding_cache
+from ..models.embedding_codec import as_vector
 
 
 logger = logging.getLogger(__name__)
 
+# (max inputs, max estimated tokens) per embedding request
+PROVIDER_BATCH_LIMITS = {
+    "openai": (2048, 200000),  # API allows 2048 inputs / 300k tokens; leave room for estimate error
+}
+DEFAULT_BATCH_LIMITS = (32, 8192)
+
+# HTTP statuses that mean the request itself was rejected, so retrying it unchanged cannot succeed
+NON_RETRYABLE_STATUS = (400, 413, 422)
+
 
 class EmbedderTool:
     """
@@ -29,60 +41,125 @@ class EmbedderTool:
         self.provider_manager = get_ai_provider_manager()
         self.embedding_provider = self.provider_manager.embedding
 
-        # Caching and rate limiting
-        self._embedding_cache = {}
-        self._cache_lock = threading.Lock()
+        # Caching (shared across EmbedderTool instances and worker processes) and rate limiting
+        self._embedding_cache = get_embedding_cache()
         self._rate_limiter = self._RateLimiter(
             requests_per_minute=self.config.MAX_REQUESTS_PER_MINUTE,
-            requests_per_hour=self.config.MAX_REQUESTS_PER_HOUR
+            requests_per_hour=self.config.MAX_REQUESTS_PER_HOUR,
+            tokens_per_minute=self.config.MAX_TOKENS_PER_MINUTE
         )
 
-        # Thread pool for async processing
-        self._executor = ThreadPoolExecutor(max_workers=4)
+        max_items, max_tokens = PROVIDER_BATCH_LIMITS.get(self.config.EMBEDDING_PROVIDER, DEFAULT_BATCH_LIMITS)
+        self._batch_sizer = self._BatchSizer(
+            max_items=self.config.EMBEDDING_MAX_BATCH_SIZE or max_items,
+            max_tokens=min(self.config.EMBEDDING_MAX_BATCH_TOKENS or max_tokens, self.config.MAX_TOKENS_PER_MINUTE),
+            target_seconds=self.config.EMBEDDING_TARGET_BATCH_SECONDS
+        )
+
+        # Embedding batches are dispatched concurrently on this pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.config.EMBEDDING_CONCURRENCY),
+            thread_name_prefix="embedder"
+        )
 
     class _RateLimiter:
-        """Simple rate limiter for OpenAI API calls"""
+        """
+        Thread-safe token-bucket limiter for embedding API calls.
+        Each call consumes one request from the per-minute and per-hour buckets
+        and its estimated tokens from the per-minute token bucket.
+        """
 
-        def __init__(self, requests_per_minute: int = 60, requests_per_hour: int = 1000):
+        def __init__(self, requests_per_minute: int = 60, requests_per_hour: int = 1000, tokens_per_minute: int = 1000000):
             self.requests_per_minute = requests_per_minute
             self.requests_per_hour = requests_per_hour
-            self.minute_calls = []
-            self.hour_calls = []
-
-        def can_make_call(self) -> bool:
-            """Check if we can make another API call"""
-            now = time.time()
-
-            # Clean old calls
-            self.minute_calls = [t for t in self.minute_calls if now - t < 60]
-            self.hour_calls = [t for t in self.hour_calls if now - t < 3600]
-
-            return (len(self.minute_calls) < self.requests_per_minute and
-                    len(self.hour_calls) < self.requests_per_hour)
-
-        def record_call(self):
-            """Record that a call was made"""
-            now = time.time()
-            self.minute_calls.append(now)
-            self.hour_calls.append(now)
-
-        def wait_time(self) -> float:
-            """Get how long to wait before next call"""
-            if self.can_make_call():
-                return 0.0
-
-            now = time.time()
-            if self.minute_calls:
-                oldest_minute = min(self.minute_calls)
-                if now - oldest_minute < 60:
-                    return 60 - (now - oldest_minute)
-
-            if self.hour_calls:
-                oldest_hour = min(self.hour_calls)
-                if now - oldest_hour < 3600:
-                    return 3600 - (now - oldest_hour)
+            self.tokens_per_minute = tokens_per_minute
+            self._lock = threading.Lock()
+
+            # [capacity, refill per second, level] for requests/minute, requests/hour, tokens/minute
+            self._buckets = [
+                [requests_per_minute, requests_per_minute / 60, float(requests_per_minute)],
+                [requests_per_hour, requests_per_hour / 3600, float(requests_per_hour)],
+                [tokens_per_minute, tokens_per_minute / 60, float(tokens_per_minute)],
+            ]
+            self._updated = time.monotonic()
+
+        def _refill(self):
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            for bucket in self._buckets:
+                bucket[2] = min(bucket[0], bucket[2] + elapsed * bucket[1])
+
+        def _needs(self, tokens: int) -> List[float]:
+            # A request larger than the token bucket waits for a full bucket instead of forever
+            return [1, 1, min(tokens, self.tokens_per_minute)]
+
+        def wait_time(self, tokens: int = 0) -> float:
+            """Get how long to wait before a call with this many tokens can start"""
+            with self._lock:
+                self._refill()
+                return max(
+                    (need - level) / rate if level < need else 0.0
+                    for (_, rate, level), need in zip(self._buckets, self._needs(tokens))
+                )
+
+        def acquire(self, tokens: int = 0) -> float:
+            """Block until a call with this many tokens may start; returns seconds waited"""
+            waited = 0.0
+            while True:
+                with self._lock:
+                    self._refill()
+                    needs = self._needs(tokens)
+                    wait = max(
+                        (need - level) / rate if level < need else 0.0
+                        for (_, rate, level), need in zip(self._buckets, needs)
+                    )
+                    if wait <= 0:
+                        for bucket, need in zip(self._buckets, needs):
+                            bucket[2] -= need
+                        return waited
+
+                time.sleep(wait)
+                waited += wait
+
+    class _BatchSizer:
+        """
+        Packs chunks into requests by estimated token count and adapts the
+        per-request item limit: additive growth while batches finish within
+        the target latency, multiplicative decrease on slow or failed batches.
+        """
 
-            return 1.0  # Default wait time
+        def __init__(self, max_items: int, max_tokens: int, target_seconds: float = 5.0):
+            self.max_items = max(1, max_items)
+            self.max_tokens = max(1, max_tokens)
+            self.target_seconds = target_seconds
+            self.item_limit = min(self.max_items, 32)
+            self._lock = threading.Lock()
+
+        def next_batch_end(self, token_counts: List[int], start: int) -> int:
+            """Return the end index of the next batch starting at start (always at least one chunk)"""
+            with self._lock:
+                item_limit = self.item_limit
+
+            end, tokens = start, 0
+            while end < len(token_counts) and end - start < item_limit:
+                if end > start and tokens + token_counts[end] > self.max_tokens:
+                    break
+                tokens += token_counts[end]
+                end += 1
+            return end
+
+        def record_success(self, size: int, seconds: float):
+            with self._lock:
+                if seconds > self.target_seconds:
+                    self.item_limit = max(1, int(self.item_limit * 0.75))
+                elif size >= self.item_limit:
+                    # Only grow when the batch was limited by item count
+                    self.item_limit = min(self.max_items, self.item_limit + max(1, self.item_limit // 4))
+
+        def record_failure(self, size: int):
+            with self._lock:
+                self.item_limit = max(1, min(self.item_limit, size) // 2)
 
     def generate_embeddings(
         self,
@@ -122,8 +199,9 @@ class EmbedderTool:
             if use_cache:
                 self._update_cache(embedded_chunks)
 
-            # Combine results
-            result_chunks = embedded_chunks + already_embedded
+            # Combine results in input order
+            embedded_iter = iter(embedded_chunks)
+            result_chunks = [chunk if 'embedding' in chunk else next(embedded_iter) for chunk in chunks]
         else:
             logger.info("All chunks found in cache")
             result_chunks = already_embedded
@@ -134,90 +212,160 @@ class EmbedderTool:
         self,
         chunks: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Generate embeddings for chunks in optimized batches"""
+        """
+        Generate embeddings for chunks in token-packed batches, keeping up to
+        EMBEDDING_CONCURRENCY batches in flight. Each batch is sized when it is
+        dispatched, so latency and errors from earlier batches shape later ones.
+        Results are returned in input order.
+        """
         if not chunks:
             return []
 
-        # Use provider-specific batch size limits
-        if self.config.EMBEDDING_PROVIDER == "openai":
-            batch_size = min(100, len(chunks))  # OpenAI limit
-        else:
-            batch_size = min(32, len(chunks))  # Local models batch size
+        token_counts = [self._estimate_tokens(chunk['content']) for chunk in chunks]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        max_in_flight = max(1, self.config.EMBEDDING_CONCURRENCY)
+
+        in_flight = {}
+        position = 0
+        batch_number = 0
+
+        while position < len(chunks) or in_flight:
+            while position < len(chunks) and len(in_flight) < max_in_flight:
+                end = self._batch_sizer.next_batch_end(token_counts, position)
+                batch_number += 1
+                future = self._executor.submit(
+                    self._embed_batch, chunks[position:end], token_counts[position:end], batch_number
+                )
+                in_flight[future] = position
+                position = end
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                start = in_flight.pop(future)
+                for offset, chunk in enumerate(future.result()):
+                    results[start + offset] = chunk
+
+        logger.info(f"Embedded {len(chunks)} chunks in {batch_number} batches")
+        return results
+
+    def _embed_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        token_counts: List[int],
+        batch_number: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Embed one batch under the rate limiter. A batch the provider rejects is
+        split in half and retried, so only the offending chunks are marked failed.
+        """
+        batch_texts = [chunk['content'] for chunk in batch]
 
-        embedded_chunks = []
+        try:
+            started = time.monotonic()
+            embeddings = self._call_with_retry(batch_texts, sum(token_counts))
+            self._batch_sizer.record_success(len(batch), time.monotonic() - started)
 
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
-            batch_texts = [chunk['content'] for chunk in batch]
+        except Exception as e:
+            self._batch_sizer.record_failure(len(batch))
 
-            try:
-                # Wait for rate limit
-                wait_time = self._rate_limiter.wait_time()
-                if wait_time > 0:
-                    logger.info(f"Rate limited, waiting {wait_time:.1f} seconds")
-                    time.sleep(wait_time)
+            if len(batch) > 1 and self._is_rejected_request(e):
+                middle = len(batch) // 2
+                logger.warning(f"Splitting rejected batch {batch_number} of {len(batch)} chunks: {e}")
+                return self._embed_batch(batch[:middle], token_counts[:middle], batch_number) + \
+                    self._embed_batch(batch[middle:], token_counts[middle:], batch_number)
 
-                # Use provider-agnostic embedding
-                embeddings = self.embedding_provider.embed_batch(batch_texts)
+            logger.error(f"Error embedding batch {batch_number}: {e}")
 
-                self._rate_limiter.record_call()
+            # On error, mark chunks as failed but continue
+            failed_chunks = []
+            for chunk in batch:
+                chunk_copy = chunk.copy()
+                chunk_copy['embedding_error'] = str(e)
+                chunk_copy['embedding'] = None
+                failed_chunks.append(chunk_copy)
+            return failed_chunks
 
-                # Process response
-                for j, chunk in enumerate(batch):
-                    chunk_copy = chunk.copy()
-                    chunk_copy['embedding'] = embeddings[j]
-                    chunk_copy['embedding_model'] = self.config.EMBEDDING_PROVIDER
-                    chunk_copy['embedding_generated_at'] = time.time()
-                    embedded_chunks.append(chunk_copy)
+        embedded_chunks = []
+        for chunk, embedding in zip(batch, embeddings):
+            chunk_copy = chunk.copy()
+            chunk_copy['embedding'] = as_vector(embedding)
+            chunk_copy['embedding_model'] = self.config.EMBEDDING_PROVIDER
+            chunk_copy['embedding_generated_at'] = time.time()
+            embedded_chunks.append(chunk_copy)
+
+        logger.debug(f"Embedded batch {batch_number} ({len(batch)} chunks)")
+        return embedded_chunks
+
+    @staticmethod
+    def _is_rejected_request(error: Exception) -> bool:
+        """
+        Whether the provider rejected the request itself (too large, invalid
+        input), by HTTP status. Other errors, such as a ValueError raised for
+        an unexpected response during an outage, are not worth splitting for.
+        """
+        return getattr(error, 'status_code', None) in NON_RETRYABLE_STATUS
 
-                logger.info(f"Embedded batch {i//batch_size + 1}/{(len(chunks) + batch_size - 1)//batch_size}")
+    def _call_with_retry(self, texts: List[str], tokens: int) -> List[List[float]]:
+        """Call the embedding provider, retrying transient failures with jittered exponential backoff"""
+        max_retries = self.config.EMBEDDING_MAX_RETRIES
+
+        for attempt in range(max_retries + 1):
+            waited = self._rate_limiter.acquire(tokens)
+            if waited > 0:
+                logger.info(f"Rate limited, waited {waited:.1f} seconds")
+
+            try:
+                embeddings = self.embedding_provider.embed_batch(texts)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Provider returned {len(embeddings)} embeddings for {len(texts)} texts")
+                return embeddings
+
+            except (ValueError, ImportError):
+                # Bad input or configuration; retrying will not help
+                raise
 
             except Exception as e:
-                logger.error(f"Error embedding batch {i//batch_size + 1}: {e}")
+                if attempt >= max_retries or self._is_rejected_request(e):
+                    raise
 
-                # On error, mark chunks as failed but continue
-                for chunk in batch:
-                    chunk_copy = chunk.copy()
-                    chunk_copy['embedding_error'] = str(e)
-                    chunk_copy['embedding'] = None
-                    embedded_chunks.append(chunk_copy)
+                # Full jitter keeps concurrent batches from retrying in lockstep
+                delay = random.uniform(0, min(30.0, self.config.EMBEDDING_RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning(f"Embedding request failed ({e}), retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+                time.sleep(delay)
 
-        return embedded_chunks
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Rough estimate: 1 token ≈ 4 characters (same heuristic as estimate_cost)
+        return max(1, len(text) // 4)
 
     def _apply_cache(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Apply embedding cache to chunks"""
-        with self._cache_lock:
-            for chunk in chunks:
-                cache_key = self._get_cache_key(chunk['content'])
-                if cache_key in self._embedding_cache:
-                    cached_data = self._embedding_cache[cache_key]
-                    chunk['embedding'] = cached_data['embedding']
-                    chunk['embedding_model'] = cached_data['model']
-                    chunk['embedding_from_cache'] = True
-                    chunk['embedding_cached_at'] = cached_data['cached_at']
+        keys = [self._get_cache_key(chunk['content']) for chunk in chunks]
+        cached = self._embedding_cache.get_many(list(dict.fromkeys(keys)))
+
+        for chunk, cache_key in zip(chunks, keys):
+            cached_data = cached.get(cache_key)
+            if cached_data is not None:
+                chunk['embedding'] = cached_data['embedding']
+                chunk['embedding_model'] = cached_data['model']
+                chunk['embedding_from_cache'] = True
+                chunk['embedding_cached_at'] = cached_data['cached_at']
 
         return chunks
 
     def _update_cache(self, chunks: List[Dict[str, Any]]):
         """Update embedding cache with new embeddings"""
-        with self._cache_lock:
-            for chunk in chunks:
-                if 'embedding' in chunk and chunk['embedding'] is not None:
-                    cache_key = self._get_cache_key(chunk['content'])
-                    self._embedding_cache[cache_key] = {
-                        'embedding': chunk['embedding'],
-                        'model': chunk.get('embedding_model', self.config.OPENAI_EMBEDDING_MODEL),
-                        'cached_at': time.time()
-                    }
-
-            # Limit cache size to prevent memory issues
-            if len(self._embedding_cache) > 10000:
-                # Remove oldest 20% of entries
-                items = list(self._embedding_cache.items())
-                items.sort(key=lambda x: x[1]['cached_at'])
-                to_remove = items[:len(items) // 5]
-                for key, _ in to_remove:
-                    del self._embedding_cache[key]
+        now = time.time()
+        entries = {
+            self._get_cache_key(chunk['content']): {
+                'embedding': chunk['embedding'],
+                'model': chunk.get('embedding_model', self.config.OPENAI_EMBEDDING_MODEL),
+                'cached_at': now
+            }
+            for chunk in chunks
+            if chunk.get('embedding') is not None
+        }
+        self._embedding_cache.set_many(entries)
 
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for text content"""
@@ -261,20 +409,16 @@ class EmbedderTool:
         }
 
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache statistics"""
-        with self._cache_lock:
-            return {
-                'cache_size': len(self._embedding_cache),
-                'cache_limit': 10000,
-                'oldest_entry': min((v['cached_at'] for v in self._embedding_cache.values()), default=None),
-                'newest_entry': max((v['cached_at'] for v in self._embedding_cache.values()), default=None)
-            }
+        """Get cache statistics, including hit/miss metrics for both cache tiers"""
+        stats = self._embedding_cache.get_stats()
+        stats['cache_size'] = stats['memory']['size']
+        stats['cache_limit'] = stats['memory']['limit']
+        return stats
 
     def clear_cache(self):
         """Clear the embedding cache"""
-        with self._cache_lock:
-            self._embedding_cache.clear()
-            logger.info("Embedding cache cleared")
+        self._embedding_cache.clear()
+        logger.info("Embedding cache cleared")
 
     def estimate_cost(self, text_lengths: List[int]) -> Dict[str, Any]:
         """Estimate OpenAI API cost for given text lengths"""
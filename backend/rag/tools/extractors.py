@@ -0,0 +1,132 @@
+"""
+Document Text Extractors
+Stream text out of PDF and DOCX files page by page (or paragraph by
+paragraph), with extracted text cached by file hash
+"""
+
+import logging
+import zipfile
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, Optional, Union
+from xml.etree import ElementTree
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+    PdfReader = None
+    PyPdfError = None
+
+from ..cache.extraction_cache import ExtractionCache, file_digest, get_extraction_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Characters read per block when streaming cached text
+CACHED_BLOCK_CHARS = 64 * 1024
+
+# Bump when extractor output changes, so older cached text is not served
+EXTRACTOR_VERSION = 1
+
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_PARAGRAPH = f"{_WORD_NAMESPACE}p"
+_DOCX_TEXT = f"{_WORD_NAMESPACE}t"
+_DOCX_TAB = f"{_WORD_NAMESPACE}tab"
+_DOCX_BREAKS = (f"{_WORD_NAMESPACE}br", f"{_WORD_NAMESPACE}cr")
+
+FileSource = Union[str, Path, IO[bytes]]
+
+
+def iter_pdf_pages(stream: IO[bytes]) -> Iterator[str]:
+    """Yield the text of each PDF page in turn; pages are parsed only as they are reached"""
+    if not HAS_PYPDF:
+        raise ImportError("pypdf is required for PDF extraction")
+
+    try:
+        reader = PdfReader(stream)
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            if text.strip():
+                yield text + "\n\n"
+    except PyPdfError as e:
+        raise ValueError(f"Could not read PDF: {e}") from e
+
+
+def iter_docx_paragraphs(stream: IO[bytes]) -> Iterator[str]:
+    """
+    Yield the text of each DOCX paragraph (including table cells) by
+    incrementally parsing word/document.xml, clearing each paragraph once read
+    """
+    try:
+        with zipfile.ZipFile(stream) as archive, archive.open("word/document.xml") as document:
+            parts = []
+            for event, element in ElementTree.iterparse(document, events=("end",)):
+                tag = element.tag
+                if tag == _DOCX_TEXT:
+                    parts.append(element.text or "")
+                elif tag == _DOCX_TAB:
+                    parts.append("\t")
+                elif tag in _DOCX_BREAKS:
+                    parts.append("\n")
+                elif tag == _DOCX_PARAGRAPH:
+                    text = "".join(parts)
+                    parts = []
+                    element.clear()
+                    if text.strip():
+                        yield text + "\n"
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise ValueError(f"Could not read DOCX: {e}") from e
+
+
+EXTRACTORS: Dict[str, Callable[[IO[bytes]], Iterator[str]]] = {
+    "pdf": iter_pdf_pages,
+    "docx": iter_docx_paragraphs,
+}
+
+
+def extract_text_blocks(
+    source: FileSource,
+    file_type: str,
+    cache: Optional[ExtractionCache] = None
+) -> Iterator[str]:
+    """
+    Lazily yield text blocks extracted from a PDF or DOCX path or seekable
+    binary stream. Text for bytes seen before is streamed from the
+    extraction cache (the shared one unless another is given) instead.
+    """
+    file_type = file_type.lower().lstrip(".")
+    extractor = EXTRACTORS.get(file_type)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: .{file_type}")
+
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as stream:
+            yield from extract_text_blocks(stream, file_type, cache)
+        return
+
+    cache = cache if cache is not None else get_extraction_cache()
+    if cache is None:
+        yield from extractor(source)
+        return
+
+    key = f"{file_digest(source)}.{file_type}.v{EXTRACTOR_VERSION}"
+    cached = cache.open(key)
+    if cached is not None:
+        with cached:
+            while True:
+                block = cached.read(CACHED_BLOCK_CHARS)
+                if not block:
+                    return
+                yield block
+
+    yield from cache.store(key, extractor(source))
+
+
+def extract_text(source: FileSource, file_type: str, cache: Optional[ExtractionCache] = None) -> str:
+    """Extract a document's full text, for callers that need it as one string"""
+    return "".join(extract_text_blocks(source, file_type, cache))
@@ -4,11 +4,12 @@ Generates answers using LLM based on retrieved context (provider-agnostic)
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import datetime
 
 from ...ai_providers import get_ai_provider_manager
 from ..config import RAGConfig
+from .context_packer import ContextPacker
 
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,7 @@ class GeneratorTool:
         self.config = RAGConfig()
         self.provider_manager = get_ai_provider_manager()
         self.llm_provider = self.provider_manager.llm
+        self.context_packer = ContextPacker()
 
         # Rate limiting (provider-specific limits)
         self._request_count = 0
@@ -51,68 +53,134 @@ class GeneratorTool:
             Dictionary containing answer, metadata, and confidence
         """
         try:
-            # Prepare context from chunks
-            context_text = self._prepare_context(context_chunks)
-
-            # Build system prompt
-            system_prompt = self._build_system_prompt(user_context)
-
-            # Build user prompt
-            user_prompt = self._build_user_prompt(query, context_text)
+            messages, blocks = self._build_answer_messages(query, context_chunks, user_context)
 
             # Check rate limits
             self._check_rate_limit()
 
-            # Use provider-agnostic LLM
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            answer = self.llm_provider.chat(messages, self._answer_params(max_tokens, temperature))
 
-            params = {
-                "max_tokens": max_tokens or self.config.OPENAI_MAX_TOKENS,
-                "temperature": temperature or self.config.OPENAI_TEMPERATURE,
-            }
+            self._request_count += 1
+
+            return self._answer_result(query, context_chunks, answer, blocks)
+
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
+            return self._answer_error(e)
+
+    def generate_answer_stream(
+        self,
+        query: str,
+        context_chunks: List[Dict[str, Any]],
+        user_context: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an answer as it is generated.
 
-            # Add provider-specific parameters
-            if self.config.AI_PROVIDER in ["openai", "groq"]:
-                params.update({
-                    "top_p": 0.9,
-                    "frequency_penalty": 0.1,
-                    "presence_penalty": 0.1
-                })
+        Yields {'type': 'token', 'text': ...} events for each text delta, then
+        one {'type': 'done', 'result': ...} event carrying what
+        generate_answer would have returned. A failure before the first
+        token yields the usual error result; after it, the result holds the
+        partial answer and the error.
+        """
+        parts = []
+        blocks = []
+        try:
+            messages, blocks = self._build_answer_messages(query, context_chunks, user_context)
+
+            self._check_rate_limit()
 
-            answer = self.llm_provider.chat(messages, params)
+            for delta in self.llm_provider.chat_stream(messages, self._answer_params(max_tokens, temperature)):
+                if delta:
+                    parts.append(delta)
+                    yield {'type': 'token', 'text': delta}
 
             self._request_count += 1
 
-            # Calculate confidence based on context relevance
-            confidence = self._calculate_confidence(query, context_chunks, answer)
-
-            # Extract sources
-            sources = self._extract_sources(context_chunks)
-
-            return {
-                'answer': answer,
-                'confidence': confidence,
-                'sources': sources,
-                'model': self.config.AI_PROVIDER,
-                'tokens_used': None,  # Not available from all providers
-                'finish_reason': 'completed',
-                'generated_at': datetime.utcnow().isoformat(),
-                'context_chunks_used': len(context_chunks),
-                'query': query
-            }
+            result = self._answer_result(query, context_chunks, "".join(parts), blocks)
 
         except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            return {
-                'error': str(e),
-                'answer': "I apologize, but I encountered an error while generating a response. Please try again.",
-                'confidence': 0.0,
-                'sources': [],
-                'generated_at': datetime.utcnow().isoformat()
-            }
+            logger.error(f"Error streaming answer: {e}")
+            if parts:
+                result = self._answer_result(query, context_chunks, "".join(parts), blocks)
+                result['error'] = str(e)
+                result['finish_reason'] = 'error'
+            else:
+                result = self._answer_error(e)
+
+        yield {'type': 'done', 'result': result}
+
+    def _build_answer_messages(
+        self,
+        query: str,
+        context_chunks: List[Dict[str, Any]],
+        user_context: Optional[Dict[str, Any]] = None
+    ):
+        """Build the answer prompt, returning the messages and the packed context blocks"""
+        # Prepare context from chunks
+        blocks = self.context_packer.pack(context_chunks)
+        context_text = self._format_context(blocks)
+
+        # Build system prompt
+        system_prompt = self._build_system_prompt(user_context)
+
+        # Build user prompt
+        user_prompt = self._build_user_prompt(query, context_text)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return messages, blocks
+
+    def _answer_params(self, max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> Dict[str, Any]:
+        params = {
+            "max_tokens": max_tokens or self.config.OPENAI_MAX_TOKENS,
+            "temperature": temperature or self.config.OPENAI_TEMPERATURE,
+        }
+
+        # Add provider-specific parameters
+        if self.config.AI_PROVIDER in ["openai", "groq"]:
+            params.update({
+                "top_p": 0.9,
+                "frequency_penalty": 0.1,
+                "presence_penalty": 0.1
+            })
+
+        return params
+
+    def _answer_result(
+        self,
+        query: str,
+        context_chunks: List[Dict[str, Any]],
+        answer: str,
+        blocks: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            'answer': answer,
+            # Calculate confidence based on context relevance
+            'confidence': self._calculate_confidence(query, context_chunks, answer),
+            'sources': self._extract_sources(context_chunks),
+            'model': self.config.AI_PROVIDER,
+            'tokens_used': None,  # Not available from all providers
+            'finish_reason': 'completed',
+            'generated_at': datetime.utcnow().isoformat(),
+            'context_chunks_used': sum(block['chunk_count'] for block in blocks),
+            'context_tokens': sum(block['token_count'] for block in blocks),
+            'query': query
+        }
+
+    @staticmethod
+    def _answer_error(error: Exception) -> Dict[str, Any]:
+        return {
+            'error': str(error),
+            'answer': "I apologize, but I encountered an error while generating a response. Please try again.",
+            'confidence': 0.0,
+            'sources': [],
+            'generated_at': datetime.utcnow().isoformat()
+        }
 
     def generate_summary(
         self,
@@ -132,77 +200,122 @@ class GeneratorTool:
             Summary with metadata
         """
         try:
-            prompts = {
-                'concise': "Provide a concise summary of the following text in 2-3 sentences:",
-                'detailed': "Provide a detailed summary of the following text, covering all key points:",
-                'bullet_points': "Summarize the following text using bullet points, highlighting the main ideas:"
-            }
-
-            system_prompt = "You are a professional summarizer. Create clear, accurate summaries that capture the essential information."
-            user_prompt = f"{prompts.get(summary_type, prompts['concise'])}\n\n{content}"
-
-            if max_length:
-                user_prompt += f"\n\nKeep the summary under {max_length} words."
+            messages, params = self._summary_request(content, summary_type, max_length)
 
             self._check_rate_limit()
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-
-            params = {
-                "max_tokens": min(max_length * 2 if max_length else 500, 1000),
-                "temperature": 0.3  # More focused for summaries
-            }
-
             summary = self.llm_provider.chat(messages, params)
 
             self._request_count += 1
 
-            return {
-                'summary': summary,
-                'summary_type': summary_type,
-                'original_length': len(content),
-                'summary_length': len(summary),
-                'compression_ratio': len(summary) / len(content) if content else 0,
-                'model': self.config.AI_PROVIDER,
-                'tokens_used': None,  # Not available from all providers
-                'generated_at': datetime.utcnow().isoformat()
-            }
+            return self._summary_result(content, summary, summary_type)
 
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
-            return {
-                'error': str(e),
-                'summary': "Unable to generate summary due to an error.",
-                'generated_at': datetime.utcnow().isoformat()
-            }
+            return self._summary_error(e)
+
+    def generate_summaries(
+        self,
+        contents: List[str],
+        summary_type: str = "concise",
+        max_length: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Summarize several texts concurrently (up to AI_MAX_CONCURRENCY
+        requests in flight), returning one generate_summary result per text
+        in order.
+        """
+        if not contents:
+            return []
+
+        try:
+            self._check_rate_limit()
+
+            replies = self.provider_manager.chat_many(
+                [self._summary_request(content, summary_type, max_length) for content in contents],
+                provider=self.llm_provider
+            )
+        except Exception as e:
+            logger.error(f"Error generating summaries: {e}")
+            return [self._summary_error(e) for _ in contents]
+
+        self._request_count += len(contents)
+
+        results = []
+        for content, reply in zip(contents, replies):
+            if isinstance(reply, Exception):
+                logger.error(f"Error generating summary: {reply}")
+                results.append(self._summary_error(reply))
+            else:
+                results.append(self._summary_result(content, reply, summary_type))
+        return results
+
+    @staticmethod
+    def _summary_request(content: str, summary_type: str, max_length: Optional[int]):
+        prompts = {
+            'concise': "Provide a concise summary of the following text in 2-3 sentences:",
+            'detailed': "Provide a detailed summary of the following text, covering all key points:",
+            'bullet_points': "Summarize the following text using bullet points, highlighting the main ideas:"
+        }
+
+        system_prompt = "You are a professional summarizer. Create clear, accurate summaries that capture the essential information."
+        user_prompt = f"{prompts.get(summary_type, prompts['concise'])}\n\n{content}"
+
+        if max_length:
+            user_prompt += f"\n\nKeep the summary under {max_length} words."
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        params = {
+            "max_tokens": min(max_length * 2 if max_length else 500, 1000),
+            "temperature": 0.3  # More focused for summaries
+        }
+
+        return messages, params
+
+    def _summary_result(self, content: str, summary: str, summary_type: str) -> Dict[str, Any]:
+        return {
+            'summary': summary,
+            'summary_type': summary_type,
+            'original_length': len(content),
+            'summary_length': len(summary),
+            'compression_ratio': len(summary) / len(content) if content else 0,
+            'model': self.config.AI_PROVIDER,
+            'tokens_used': None,  # Not available from all providers
+            'generated_at': datetime.utcnow().isoformat()
+        }
+
+    @staticmethod
+    def _summary_error(error: Exception) -> Dict[str, Any]:
+        return {
+            'error': str(error),
+            'summary': "Unable to generate summary due to an error.",
+            'generated_at': datetime.utcnow().isoformat()
+        }
 
     def _prepare_context(self, context_chunks: List[Dict[str, Any]]) -> str:
-        """Prepare context text from retrieved chunks."""
-        if not context_chunks:
-            return "No relevant context found."
+        """Prepare context text from retrieved chunks, deduplicated, merged and fitted to MAX_CONTEXT_LENGTH tokens."""
+        return self._format_context(self.context_packer.pack(context_chunks))
 
-        # Sort by similarity score if available
-        sorted_chunks = sorted(
-            context_chunks,
-            key=lambda x: x.get('similarity_score', 0),
-            reverse=True
-        )
+    def _format_context(self, blocks: List[Dict[str, Any]]) -> str:
+        """Format packed context blocks with source attribution, most relevant first."""
+        if not blocks:
+            return "No relevant context found."
 
-        # Build context with source attribution
         context_parts = []
-        for i, chunk in enumerate(sorted_chunks[:5]):  # Limit to top 5 chunks
+        for i, block in enumerate(blocks):
             source_info = f"Source {i+1}"
-            if chunk.get('source_type'):
-                source_info += f" ({chunk['source_type']})"
+            if block.get('source_type'):
+                source_info += f" ({block['source_type']})"
 
-            similarity = chunk.get('similarity_score', 0)
+            similarity = block.get('similarity_score') or 0
             if similarity > 0:
                 source_info += f" - Relevance: {similarity:.2f}"
 
-            context_parts.append(f"[{source_info}]\n{chunk['content']}\n")
+            context_parts.append(f"[{source_info}]\n{block['content']}\n")
 
         return "\n".join(context_parts)
 
@@ -3,30 +3,77 @@ RAG Ingestor Tool
 Converts various input types into text chunks for embedding
 """
 
+import io
 import logging
 import re
-from typing import List, Dict, Any, Optional, Union
+from collections import deque
+from typing import List, Dict, Any, Optional, Union, Iterable, Iterator, IO, Deque, Tuple
 from pathlib import Path
 import hashlib
 
 from ..config import RAGConfig
+from .extractors import extract_text_blocks
+from .tokenizer import Tokenizer, get_tokenizer
 
 
 logger = logging.getLogger(__name__)
 
+# Characters read from a file handle per block when streaming
+STREAM_BLOCK_CHARS = 64 * 1024
+
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Control characters are dropped and curly quotes straightened in a single translate pass
+_NORMALIZE_TABLE = str.maketrans(
+    {
+        **{code: None for code in [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), 0x7f]},
+        '\u201c': '"', '\u201d': '"', '\u201e': '"',
+        '\u2018': "'", '\u2019': "'", '\u201a': "'",
+    }
+)
+
+TextSource = Union[str, IO, Iterable[str]]
+
+
+def iter_text_blocks(source: TextSource, block_size: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    """
+    Yield text blocks from a string, a text or binary (UTF-8) file handle, or
+    an iterable of strings, without reading a file into memory at once
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), block_size):
+            yield source[start:start + block_size]
+        return
+
+    if hasattr(source, 'read'):
+        if isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(source, 'mode', ''):
+            source = io.TextIOWrapper(source, encoding='utf-8', errors='replace')
+        while True:
+            block = source.read(block_size)
+            if not block:
+                return
+            yield block
+
+    for block in source:
+        if block:
+            yield block
+
 
 class IngestorTool:
     """
     Tool for ingesting and processing various content types into text chunks.
-    Handles text, PDF, and other document formats.
+    Handles text, PDF, DOCX and other document formats.
     """
 
-    def __init__(self):
+    def __init__(self, tokenizer: Optional[Tokenizer] = None):
         self.config = RAGConfig()
+        # Sizes semantic and sentence chunks; any Tokenizer can be plugged in
+        self.tokenizer = tokenizer or get_tokenizer()
 
     def ingest_text(
         self,
-        text: str,
+        text: TextSource,
         metadata: Optional[Dict[str, Any]] = None,
         chunking_strategy: str = "semantic"
     ) -> List[Dict[str, Any]]:
@@ -34,7 +81,7 @@ class IngestorTool:
         Ingest plain text and convert to chunks.
 
         Args:
-            text: The text content to process
+            text: The text content to process, or a file handle / iterable of text blocks
             metadata: Additional metadata for the chunks
             chunking_strategy: Strategy for chunking ('semantic', 'fixed', 'sentence')
 
@@ -42,36 +89,14 @@ class IngestorTool:
             List of chunk dictionaries with metadata
         """
         try:
-            # Preprocess text
-            cleaned_text = self._preprocess_text(text)
-
-            # Split into chunks based on strategy
-            if chunking_strategy == "semantic":
-                chunks = self._semantic_chunking(cleaned_text)
-            elif chunking_strategy == "sentence":
-                chunks = self._sentence_chunking(cleaned_text)
-            else:
-                chunks = self._fixed_size_chunking(cleaned_text)
-
-            # Create chunk objects with metadata
-            chunk_objects = []
-            for i, chunk_text in enumerate(chunks):
-                if len(chunk_text.strip()) < 10:  # Skip very small chunks
-                    continue
-
-                chunk_obj = {
-                    'content': chunk_text.strip(),
-                    'chunk_index': i,
-                    'word_count': len(chunk_text.split()),
-                    'char_count': len(chunk_text),
-                    'metadata': metadata or {},
-                    'processing_info': {
-                        'chunking_strategy': chunking_strategy,
-                        'original_length': len(text),
-                        'chunk_count': len(chunks)
-                    }
-                }
-                chunk_objects.append(chunk_obj)
+            chunk_objects = list(self.ingest_stream(text, metadata, chunking_strategy))
+
+            original_length = len(text) if isinstance(text, str) else None
+            for chunk_obj in chunk_objects:
+                chunk_obj['processing_info'].update({
+                    'original_length': original_length,
+                    'chunk_count': len(chunk_objects)
+                })
 
             logger.info(f"Processed text into {len(chunk_objects)} chunks using {chunking_strategy} strategy")
             return chunk_objects
@@ -80,6 +105,41 @@ class IngestorTool:
             logger.error(f"Error ingesting text: {e}")
             raise
 
+    def ingest_stream(
+        self,
+        source: TextSource,
+        metadata: Optional[Dict[str, Any]] = None,
+        chunking_strategy: str = "semantic"
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily chunk a string, file handle or iterable of text blocks.
+
+        Chunks are yielded as soon as they fill, so memory stays bounded by
+        the block and chunk sizes regardless of document length.
+        """
+        sentences_or_text = self._iter_normalized(iter_text_blocks(source))
+
+        if chunking_strategy in ("semantic", "sentence"):
+            chunks = self._iter_sentence_chunks(self._iter_sentences(sentences_or_text))
+        else:
+            chunks = self._iter_fixed_size_chunks(sentences_or_text)
+
+        for i, chunk_text in enumerate(chunks):
+            chunk_text = chunk_text.strip()
+            if len(chunk_text) < 10:  # Skip very small chunks
+                continue
+
+            yield {
+                'content': chunk_text,
+                'chunk_index': i,
+                'word_count': len(chunk_text.split()),
+                'char_count': len(chunk_text),
+                'metadata': metadata or {},
+                'processing_info': {
+                    'chunking_strategy': chunking_strategy,
+                }
+            }
+
     def ingest_pdf(
         self,
         file_path: Union[str, Path],
@@ -95,29 +155,53 @@ class IngestorTool:
         Returns:
             List of chunk dictionaries with metadata
         """
+        return self._ingest_document(file_path, 'pdf', metadata)
+
+    def ingest_docx(
+        self,
+        file_path: Union[str, Path],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest DOCX file and convert to text chunks.
+
+        Args:
+            file_path: Path to the DOCX file
+            metadata: Additional metadata for the chunks
+
+        Returns:
+            List of chunk dictionaries with metadata
+        """
+        return self._ingest_document(file_path, 'docx', metadata)
+
+    def _ingest_document(
+        self,
+        file_path: Union[str, Path],
+        file_type: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Stream a PDF or DOCX file's extracted text into the chunker"""
         try:
             # Check file size
             file_path = Path(file_path)
-            if file_path.stat().st_size > self.config.MAX_FILE_SIZE_MB * 1024 * 1024:
+            file_size = file_path.stat().st_size
+            if file_size > self.config.MAX_FILE_SIZE_MB * 1024 * 1024:
                 raise ValueError(f"File size exceeds maximum limit of {self.config.MAX_FILE_SIZE_MB}MB")
 
-            # Extract text from PDF
-            text_content = self._extract_pdf_text(file_path)
-
-            # Add PDF-specific metadata
-            pdf_metadata = metadata or {}
-            pdf_metadata.update({
+            # Add file-specific metadata
+            file_metadata = metadata or {}
+            file_metadata.update({
                 'file_name': file_path.name,
-                'file_size': file_path.stat().st_size,
-                'file_type': 'pdf',
-                'extraction_method': 'pdf_parser'
+                'file_size': file_size,
+                'file_type': file_type,
+                'extraction_method': f'{file_type}_parser'
             })
 
-            # Process the extracted text
-            return self.ingest_text(text_content, pdf_metadata, chunking_strategy="semantic")
+            # Pages are extracted as the chunker consumes them
+            return self.ingest_text(extract_text_blocks(file_path, file_type), file_metadata, chunking_strategy="semantic")
 
         except Exception as e:
-            logger.error(f"Error ingesting PDF {file_path}: {e}")
+            logger.error(f"Error ingesting {file_type.upper()} {file_path}: {e}")
             raise
 
     def ingest_file(
@@ -140,131 +224,190 @@ class IngestorTool:
 
         if file_extension == '.pdf':
             return self.ingest_pdf(file_path, metadata)
+        elif file_extension == '.docx':
+            return self.ingest_docx(file_path, metadata)
         elif file_extension in ['.txt', '.md', '.html']:
-            text_content = file_path.read_text(encoding='utf-8')
             file_metadata = metadata or {}
             file_metadata.update({
                 'file_name': file_path.name,
                 'file_type': file_extension[1:],  # Remove the dot
             })
-            return self.ingest_text(text_content, file_metadata)
+            with file_path.open(encoding='utf-8') as handle:
+                return self.ingest_text(handle, file_metadata)
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
 
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for better chunking and embedding."""
-        if not text:
-            return ""
+    def _iter_normalized(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Drop control characters, straighten quotes and collapse whitespace runs
+        to single spaces, including runs that span block boundaries.
+        """
+        pending_space = False
+        started = False
 
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
+        for block in blocks:
+            block = _WHITESPACE.sub(' ', block.translate(_NORMALIZE_TABLE))
+            if not block:
+                continue
 
-        # Remove control characters but keep newlines
-        text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]', '', text)
+            if block[0] == ' ':
+                pending_space = True
+                block = block[1:]
+            if not block:
+                continue
 
-        # Normalize quotes
-        text = re.sub(r'["""]', '"', text)
-        text = re.sub(r"[''']", "'", text)
+            if pending_space and started:
+                block = ' ' + block
 
-        return text
+            pending_space = block[-1] == ' '
+            if pending_space:
+                block = block[:-1]
 
-    def _semantic_chunking(self, text: str) -> List[str]:
-        """Split text into semantically meaningful chunks."""
-        if len(text) <= self.config.CHUNK_SIZE:
-            return [text]
+            if block:
+                started = True
+                yield block
 
-        chunks = []
-        sentences = self._split_into_sentences(text)
+    def _iter_sentences(self, blocks: Iterable[str]) -> Iterator[str]:
+        """
+        Yield sentences from normalized text blocks.
 
-        current_chunk = ""
-        current_length = 0
+        Only the unfinished tail of a block is carried into the next one; a tail
+        that grows past the chunk budget without a sentence end is cut at a
+        word boundary so memory stays bounded.
+        """
+        limit = max(1, self.config.CHUNK_SIZE, self.config.CHUNK_TOKENS * 8)
+        carry = ""
+
+        for block in blocks:
+            text = carry + block
+            position = 0
+            for match in _SENTENCE_BOUNDARY.finditer(text):
+                sentence = text[position:match.start()].strip()
+                if sentence:
+                    yield sentence
+                position = match.end()
+
+            while len(text) - position > limit:
+                cut = text.rfind(' ', position, position + limit)
+                if cut <= position:
+                    cut = position + limit
+                sentence = text[position:cut].strip()
+                if sentence:
+                    yield sentence
+                position = cut
+
+            carry = text[position:].lstrip()
+
+        carry = carry.strip()
+        if carry:
+            yield carry
+
+    def _iter_sentence_chunks(self, sentences: Iterable[str]) -> Iterator[str]:
+        """
+        Pack sentences into chunks of at most CHUNK_TOKENS tokens.
 
-        for sentence in sentences:
-            sentence_length = len(sentence)
+        Each chunk after the first starts with the previous chunk's trailing
+        whole sentences, up to CHUNK_OVERLAP_TOKENS tokens.
+        """
+        max_tokens = max(1, self.config.CHUNK_TOKENS)
+        overlap_tokens = min(max(0, self.config.CHUNK_OVERLAP_TOKENS), max_tokens // 2)
+        count = self.tokenizer.count
 
-            # If adding this sentence would exceed chunk size, save current chunk
-            if current_length + sentence_length > self.config.CHUNK_SIZE and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
-                current_length = sentence_length
-            else:
-                current_chunk += sentence
-                current_length += sentence_length
+        window: Deque[Tuple[str, int]] = deque()
+        total = 0
+        fresh = 0  # Sentences not yet emitted in any chunk
 
-        # Add the last chunk
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        for sentence in self._split_long_sentences(sentences, max_tokens):
+            tokens = count(sentence)
 
-        return chunks
+            if window and total + tokens > max_tokens:
+                yield ' '.join(text for text, _ in window)
 
-    def _sentence_chunking(self, text: str) -> List[str]:
-        """Split text into sentence-based chunks."""
-        sentences = self._split_into_sentences(text)
-        chunks = []
-        current_chunk = ""
+                kept: Deque[Tuple[str, int]] = deque()
+                kept_tokens = 0
+                for text, text_tokens in reversed(window):
+                    if kept_tokens + text_tokens > overlap_tokens or \
+                            kept_tokens + text_tokens + tokens > max_tokens:
+                        break
+                    kept.appendleft((text, text_tokens))
+                    kept_tokens += text_tokens
 
-        for sentence in sentences:
-            if len(current_chunk + sentence) > self.config.CHUNK_SIZE and current_chunk:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
-            else:
-                current_chunk += sentence
+                window, total, fresh = kept, kept_tokens, 0
 
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
+            window.append((sentence, tokens))
+            total += tokens
+            fresh += 1
 
-        return chunks
+        if fresh:
+            yield ' '.join(text for text, _ in window)
 
-    def _fixed_size_chunking(self, text: str) -> List[str]:
-        """Split text into fixed-size chunks with overlap."""
-        if not text:
-            return []
+    def _split_long_sentences(self, sentences: Iterable[str], max_tokens: int) -> Iterator[str]:
+        """Cut sentences longer than max_tokens into word runs that fit."""
+        count = self.tokenizer.count
 
-        chunks = []
+        for sentence in sentences:
+            if count(sentence) <= max_tokens:
+                yield sentence
+                continue
+
+            words: List[str] = []
+            tokens = 0
+            for word in sentence.split(' '):
+                word_tokens = count(word)
+                if words and tokens + word_tokens > max_tokens:
+                    yield ' '.join(words)
+                    words, tokens = [], 0
+                words.append(word)
+                tokens += word_tokens
+            if words:
+                yield ' '.join(words)
+
+    def _iter_fixed_size_chunks(self, blocks: Iterable[str]) -> Iterator[str]:
+        """Split text into fixed-size chunks with overlap, over a sliding window."""
+        size = self.config.CHUNK_SIZE
+        overlap = self.config.CHUNK_OVERLAP
+
+        # Unconsumed text lives in window[start:]; it is compacted once per block
+        window = ""
         start = 0
+        blocks = iter(blocks)
+        exhausted = False
+
+        while True:
+            # Keep enough text buffered to decide on the next break point
+            while not exhausted and len(window) - start <= size:
+                block = next(blocks, None)
+                if block is None:
+                    exhausted = True
+                else:
+                    window = window[start:] + block
+                    start = 0
+
+            if start >= len(window):
+                return
 
-        while start < len(text):
-            end = start + self.config.CHUNK_SIZE
+            end = start + size
 
             # Find a good breaking point (sentence end or word boundary)
-            if end < len(text):
+            if end < len(window):
                 # Look for sentence endings within the last 100 characters
-                last_period = text.rfind('.', end - 100, end)
-                last_newline = text.rfind('\n', end - 100, end)
+                last_period = window.rfind('.', end - 100, end)
+                last_newline = window.rfind('\n', end - 100, end)
 
                 break_point = max(last_period, last_newline)
                 if break_point > start:
                     end = break_point + 1
 
-            chunk = text[start:end].strip()
+            chunk = window[start:end].strip()
             if chunk:
-                chunks.append(chunk)
+                yield chunk
 
-            # Move start position with overlap
-            start = end - self.config.CHUNK_OVERLAP
+            if end >= len(window) and exhausted:
+                return
 
-        return chunks
-
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences using regex."""
-        # Simple sentence splitting - can be enhanced with NLP libraries
-        sentence_pattern = r'(?<=[.!?])\s+'
-        sentences = re.split(sentence_pattern, text)
-
-        # Filter out empty sentences
-        return [s.strip() for s in sentences if s.strip()]
-
-    def _extract_pdf_text(self, file_path: Path) -> str:
-        """Extract text from PDF file."""
-        try:
-            # For now, return a placeholder - in production you'd use PyPDF2, pdfplumber, etc.
-            # This is a mock implementation
-            logger.warning("PDF extraction not fully implemented - using mock text")
-            return f"Mock extracted text from PDF: {file_path.name}\n\nThis is placeholder text that would be replaced with actual PDF parsing logic using libraries like PyPDF2 or pdfplumber."
-
-        except Exception as e:
-            logger.error(f"Error extracting PDF text: {e}")
-            raise
+            # Move start position with overlap, always moving forward
+            next_start = end - overlap
+            start = next_start if next_start > start else end
 
     def validate_chunks(self, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Validate chunk quality and provide statistics."""
@@ -1,31 +1,104 @@
 """
 RAG Retriever Tool
-Performs similarity search on vector embeddings using pgvector
+Performs similarity search on vector embeddings using pgvector, and hybrid
+keyword + semantic search using Postgres full-text search or BM25
 """
 
+import json
 import logging
+import operator
+import threading
+import time
+from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy import text, func
+from sqlalchemy import text, func, cast, or_, false, Float, String
+from sqlalchemy.dialects.postgresql import JSONB, REGCONFIG
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
 
 from ..config import RAGConfig
-from ..models import EmbeddingStore
+from ..models import DocumentChunk, EmbeddingStore
+from ..models.vector_store import HAS_VECTOR
+from ..index import VectorIndex, NumpyVectorIndex, HNSWVectorIndex, register_index, METADATA_COLUMNS
+from ..index import KeywordIndex, tokenize
+from ..index import measure_index_recall, recall_report
 
 
 logger = logging.getLogger(__name__)
 
+# Filter keys that compile to equality / IN-list predicates
+FILTER_COLUMNS = {
+    'chunk_id': EmbeddingStore.chunk_id,
+    'source_type': EmbeddingStore.source_type,
+    'user_id': EmbeddingStore.user_id,
+    'organization_id': EmbeddingStore.organization_id,
+    'document_id': EmbeddingStore.document_id,
+    'source_id': DocumentChunk.source_id,
+    'language': DocumentChunk.language,
+    'chunking_strategy': DocumentChunk.chunking_strategy,
+}
+
+# Filter keys that compile to date range predicates
+DATE_FILTER_COLUMNS = {
+    'created_at': EmbeddingStore.created_at,
+    'updated_at': EmbeddingStore.updated_at,
+    'processed_at': DocumentChunk.processed_at,
+}
+
+RANGE_OPERATORS = {
+    'gte': operator.ge,
+    'gt': operator.gt,
+    'lte': operator.le,
+    'lt': operator.lt,
+}
+
+# Metadata columns loaded alongside vectors when refreshing in-process indexes
+INDEX_METADATA_COLUMNS = tuple(getattr(EmbeddingStore, column) for column in METADATA_COLUMNS)
+
+# Columns projected for every result row. The embedding column is never
+# selected, so hits do not pay for deserialising the vector.
+RESULT_COLUMNS = (
+    EmbeddingStore.chunk_id,
+    EmbeddingStore.document_id,
+    EmbeddingStore.source_type,
+    EmbeddingStore.user_id,
+    EmbeddingStore.organization_id,
+    DocumentChunk.chunk_index,
+    DocumentChunk.content,
+    DocumentChunk.content_hash,
+    DocumentChunk.chunk_metadata,
+    DocumentChunk.word_count,
+    DocumentChunk.char_count,
+    DocumentChunk.processed_at,
+)
+
 
 class RetrieverTool:
     """
     Tool for retrieving relevant document chunks based on semantic similarity.
-    Uses pgvector for efficient vector similarity search.
+    Uses pgvector for efficient vector similarity search, or an in-process
+    vector index when pgvector is unavailable.
     """
 
-    def __init__(self, db_engine: Optional[Engine] = None):
+    def __init__(
+        self,
+        db_engine: Optional[Engine] = None,
+        vector_index: Optional[VectorIndex] = None,
+        keyword_index: Optional[KeywordIndex] = None
+    ):
         self.config = RAGConfig()
         self.db_engine = db_engine
         self._session_factory = sessionmaker(bind=db_engine) if db_engine else None
+        self.vector_index = vector_index
+        self.keyword_index = keyword_index
+        self._index_lock = threading.Lock()
+
+        # Highest row IDs loaded into indexes built here; newer rows are picked up by _refresh_indexes
+        self._vector_high_water: Optional[int] = None
+        self._keyword_high_water: Optional[int] = None
+        # Latest chunk tombstone applied to the indexes
+        self._tombstone_high_water: Optional[datetime] = None
+        self._last_refresh = time.monotonic()
 
     def retrieve_similar(
         self,
@@ -52,42 +125,16 @@ class RetrieverTool:
         top_k = top_k or self.config.TOP_K_RESULTS
         similarity_threshold = similarity_threshold or self.config.SIMILARITY_THRESHOLD
 
+        if self.use_vector_index():
+            return self._retrieve_from_index(query_embedding, top_k, similarity_threshold, filters)
+
         try:
             with self._session_factory() as session:
-                # Build the query with pgvector similarity search
-                query = session.query(
-                    EmbeddingStore,
-                    func.cosine_similarity(EmbeddingStore.embedding, query_embedding).label('similarity')
+                rows = self._search_database(
+                    session, query_embedding, top_k, filters,
+                    similarity_threshold=similarity_threshold
                 )
-
-                # Apply filters
-                if filters:
-                    query = self._apply_filters(query, filters)
-
-                # Order by similarity (descending) and limit results
-                query = query.order_by(text('similarity DESC')).limit(top_k)
-
-                results = []
-                for embedding_store, similarity in query.all():
-                    if similarity >= similarity_threshold:
-                        # Get the associated document chunk
-                        chunk_data = self._get_chunk_data(session, embedding_store.chunk_id)
-
-                        if chunk_data:
-                            result = {
-                                'chunk_id': embedding_store.chunk_id,
-                                'document_id': embedding_store.document_id,
-                                'content': chunk_data['content'],
-                                'similarity_score': float(similarity),
-                                'source_type': embedding_store.source_type,
-                                'user_id': embedding_store.user_id,
-                                'organization_id': embedding_store.organization_id,
-                                'metadata': chunk_data.get('metadata', {}),
-                                'word_count': chunk_data.get('word_count', 0),
-                                'char_count': chunk_data.get('char_count', 0),
-                                'processed_at': chunk_data.get('processed_at'),
-                            }
-                            results.append(result)
+                results = [self._row_to_result(row, row.similarity) for row in rows]
 
                 logger.info(f"Retrieved {len(results)} similar chunks with similarity >= {similarity_threshold}")
                 return results
@@ -96,6 +143,233 @@ class RetrieverTool:
             logger.error(f"Error retrieving similar chunks: {e}")
             raise
 
+    def _search_database(
+        self,
+        session,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        exact: bool = False,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Run a pgvector similarity query joined to the chunk content.
+
+        Ordering by the ``<=>`` cosine distance operator lets Postgres use the
+        HNSW/IVFFlat index; ``exact`` disables index scans to get ground truth.
+        The similarity threshold is applied as a distance predicate so rows
+        below it are never transferred and do not take up top-k slots.
+        """
+        self._set_search_params(session, exact)
+
+        distance = EmbeddingStore.embedding.op('<=>', return_type=Float)(query_embedding)
+        query = self._result_query(session, (1 - distance).label('similarity'))
+
+        if similarity_threshold is not None:
+            query = query.filter(distance <= 1 - similarity_threshold)
+
+        # Apply filters
+        if filters:
+            query = self._apply_filters(query, filters)
+
+        # Order by distance (ascending) and limit results
+        return query.order_by(distance).limit(top_k).all()
+
+    def _set_search_params(self, session, exact: bool = False) -> None:
+        """Apply ANN search tuning for the current transaction."""
+        if session.get_bind().dialect.name != 'postgresql':
+            return
+
+        if exact:
+            session.execute(text("SET LOCAL enable_indexscan = off"))
+        elif self.config.ANN_INDEX_TYPE == 'ivfflat':
+            session.execute(text(f"SET LOCAL ivfflat.probes = {int(self.config.IVFFLAT_PROBES)}"))
+        else:
+            session.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.config.HNSW_EF_SEARCH)}"))
+
+    def use_vector_index(self) -> bool:
+        """Whether similarity search runs against the in-process vector index."""
+        backend = self.config.VECTOR_INDEX_BACKEND
+        if backend in ('numpy', 'hnsw'):
+            return True
+        if backend == 'database':
+            return False
+        return self.vector_index is not None or not HAS_VECTOR
+
+    def get_vector_index(self) -> VectorIndex:
+        """Get the in-process vector index, loading it from the store on first use."""
+        if self.vector_index is not None:
+            self._refresh_indexes()
+            return self.vector_index
+
+        with self._index_lock:
+            if self.vector_index is None:
+                if not self.db_engine:
+                    raise ValueError("Database engine not provided")
+
+                with self._session_factory() as session:
+                    high_water = session.query(func.max(EmbeddingStore.id)).scalar() or 0
+                    self._init_tombstone_high_water(session)
+                    if self.config.VECTOR_INDEX_BACKEND == 'hnsw':
+                        index = HNSWVectorIndex.from_store(
+                            session,
+                            dimension=self.config.EMBEDDING_DIMENSIONS,
+                            m=self.config.HNSW_M,
+                            ef_construction=self.config.HNSW_EF_CONSTRUCTION,
+                            ef_search=self.config.HNSW_EF_SEARCH
+                        )
+                    else:
+                        index = NumpyVectorIndex.from_store(
+                            session, dimension=self.config.EMBEDDING_DIMENSIONS
+                        )
+
+                register_index(index)
+                self.vector_index = index
+                self._vector_high_water = high_water
+
+        return self.vector_index
+
+    def _init_tombstone_high_water(self, session) -> None:
+        if self._tombstone_high_water is None:
+            self._tombstone_high_water = session.query(func.max(DocumentChunk.deleted_at)).scalar() or datetime.min
+
+    def _refresh_indexes(self) -> None:
+        """
+        Apply rows other processes (e.g. the ingestion worker) added or
+        tombstoned since the indexes were built. Commits in this process are
+        already applied by the index sync hooks; re-applying them is harmless.
+        """
+        interval = self.config.INDEX_REFRESH_SECONDS
+        if interval <= 0 or time.monotonic() - self._last_refresh < interval:
+            return
+        if self._vector_high_water is None and self._keyword_high_water is None:
+            return
+        if not self._index_lock.acquire(blocking=False):
+            return  # Another thread is refreshing
+
+        try:
+            self._last_refresh = time.monotonic()
+            with self._session_factory() as session:
+                if self._vector_high_water is not None:
+                    rows = session.query(
+                        EmbeddingStore.id, EmbeddingStore.chunk_id, EmbeddingStore.embedding, *INDEX_METADATA_COLUMNS
+                    ).filter(EmbeddingStore.id > self._vector_high_water).order_by(EmbeddingStore.id).all()
+                    if rows:
+                        self.vector_index.add(
+                            [row.chunk_id for row in rows],
+                            [EmbeddingStore.decode_embedding(row.embedding) for row in rows],
+                            [{column: getattr(row, column) for column in METADATA_COLUMNS} for row in rows]
+                        )
+                        self._vector_high_water = rows[-1].id
+
+                if self._keyword_high_water is not None:
+                    rows = session.query(
+                        DocumentChunk.id, DocumentChunk.content, DocumentChunk.source_type, DocumentChunk.user_id,
+                        DocumentChunk.organization_id, DocumentChunk.document_id
+                    ).filter(
+                        DocumentChunk.id > self._keyword_high_water,
+                        DocumentChunk.deleted_at.is_(None)
+                    ).order_by(DocumentChunk.id).all()
+                    if rows:
+                        self.keyword_index.add(
+                            [row.id for row in rows],
+                            [row.content for row in rows],
+                            [{column: getattr(row, column) for column in METADATA_COLUMNS} for row in rows]
+                        )
+                        self._keyword_high_water = rows[-1].id
+
+                rows = session.query(DocumentChunk.id, DocumentChunk.deleted_at) \
+                    .filter(DocumentChunk.deleted_at > self._tombstone_high_water) \
+                    .order_by(DocumentChunk.deleted_at).all()
+                if rows:
+                    removed = [row.id for row in rows]
+                    for index in (self.vector_index, self.keyword_index):
+                        if index is not None:
+                            index.remove(removed)
+                    self._tombstone_high_water = rows[-1].deleted_at
+
+        except Exception as e:
+            logger.warning(f"Failed to refresh in-process indexes: {e}")
+        finally:
+            self._index_lock.release()
+
+    def _retrieve_from_index(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        similarity_threshold: float,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Run a top-k cosine search against the in-process vector index."""
+        try:
+            index = self.get_vector_index()
+            index_filters = self._compile_index_filters(filters)
+            if index_filters is None:
+                return []
+
+            hits = index.search(
+                query_embedding,
+                top_k=top_k,
+                filters=index_filters,
+                similarity_threshold=similarity_threshold
+            )
+
+            rows = self._load_hits(hits)
+            results = [
+                self._row_to_result(rows[chunk_id], similarity)
+                for chunk_id, similarity in hits
+                if chunk_id in rows
+            ]
+
+            logger.info(f"Retrieved {len(results)} similar chunks from vector index with similarity >= {similarity_threshold}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error retrieving similar chunks from vector index: {e}")
+            raise
+
+    def _load_hits(self, hits: List[Tuple[int, float]]) -> Dict[int, Any]:
+        """Fetch result rows for index hits in a single chunk_id IN query."""
+        if not hits:
+            return {}
+
+        with self._session_factory() as session:
+            query = self._result_query(session).filter(
+                EmbeddingStore.chunk_id.in_([chunk_id for chunk_id, _ in hits])
+            )
+            return {row.chunk_id: row for row in query.all()}
+
+    def _compile_index_filters(self, filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Split filters into ones the vector index evaluates itself and the rest.
+
+        Filters the index cannot evaluate (date ranges, JSON metadata, chunk
+        columns) are resolved in SQL to a chunk_id allow-list, so the index
+        still returns k matching results. Returns None when nothing can match.
+        """
+        if not filters:
+            return {}
+
+        index_filters = {
+            key: value for key, value in filters.items()
+            if key in METADATA_COLUMNS and not isinstance(value, dict)
+        }
+        residual = {key: value for key, value in filters.items() if key not in index_filters}
+        if not residual:
+            return index_filters
+
+        with self._session_factory() as session:
+            query = session.query(EmbeddingStore.chunk_id) \
+                .select_from(EmbeddingStore) \
+                .join(DocumentChunk, DocumentChunk.id == EmbeddingStore.chunk_id)
+            allowed = [row.chunk_id for row in self._apply_filters(query, filters).all()]
+
+        if not allowed:
+            return None
+
+        index_filters['chunk_id'] = allowed
+        return index_filters
+
     def retrieve_by_text(
         self,
         query_text: str,
@@ -144,6 +418,105 @@ class RetrieverTool:
             logger.error(f"Error retrieving by text query: {e}")
             raise
 
+    def use_database_keyword_search(self) -> bool:
+        """Whether keyword search runs on Postgres full-text search instead of the BM25 index."""
+        return self.keyword_index is None and self.db_engine is not None \
+            and self.db_engine.dialect.name == 'postgresql'
+
+    def get_keyword_index(self) -> KeywordIndex:
+        """Get the in-process BM25 index, loading it from the store on first use."""
+        if self.keyword_index is not None:
+            self._refresh_indexes()
+            return self.keyword_index
+
+        with self._index_lock:
+            if self.keyword_index is None:
+                if not self.db_engine:
+                    raise ValueError("Database engine not provided")
+
+                with self._session_factory() as session:
+                    high_water = session.query(func.max(DocumentChunk.id)).scalar() or 0
+                    self._init_tombstone_high_water(session)
+                    index = KeywordIndex.from_store(session, k1=self.config.BM25_K1, b=self.config.BM25_B)
+
+                register_index(index)
+                self.keyword_index = index
+                self._keyword_high_water = high_water
+
+        return self.keyword_index
+
+    def retrieve_by_keywords(
+        self,
+        query_text: str,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        require_all: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve chunks by keyword relevance without an embedding call.
+
+        Args:
+            query_text: The text query to search for
+            top_k: Number of results to return
+            filters: Additional filters
+            require_all: Only return chunks containing every query term
+
+        Returns:
+            List of matching chunks with a keyword_score, best first
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+
+        top_k = top_k or self.config.TOP_K_RESULTS
+
+        try:
+            if self.use_database_keyword_search():
+                with self._session_factory() as session:
+                    rows = self._search_full_text(session, query_text, top_k, filters, require_all)
+                    return [self._keyword_result(row, row.keyword_score) for row in rows]
+
+            index_filters = self._compile_index_filters(filters)
+            if index_filters is None:
+                return []
+
+            hits = self.get_keyword_index().search(query_text, top_k, index_filters, require_all=require_all)
+            rows = self._load_hits(hits)
+            return [self._keyword_result(rows[chunk_id], score) for chunk_id, score in hits if chunk_id in rows]
+
+        except Exception as e:
+            logger.error(f"Error retrieving by keywords: {e}")
+            raise
+
+    def _search_full_text(
+        self,
+        session,
+        query_text: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]],
+        require_all: bool = False
+    ):
+        """Rank chunks with ts_rank_cd; the tsvector expression matches the GIN index."""
+        language = cast(self.config.FTS_LANGUAGE, REGCONFIG)
+        document = func.to_tsvector(language, DocumentChunk.content)
+
+        if require_all:
+            tsquery = func.plainto_tsquery(language, query_text)
+        else:
+            # OR the terms for recall; tokenize() terms contain no quotes, so each quotes as-is
+            terms = list(dict.fromkeys(tokenize(query_text)))
+            if not terms:
+                return []
+            tsquery = func.to_tsquery(language, ' | '.join(f"'{term}'" for term in terms))
+
+        rank = func.ts_rank_cd(document, tsquery)
+        query = self._result_query(session, rank.label('keyword_score')) \
+            .filter(document.op('@@')(tsquery))
+
+        if filters:
+            query = self._apply_filters(query, filters)
+
+        return query.order_by(rank.desc()).limit(top_k).all()
+
     def retrieve_hybrid(
         self,
         query_text: str,
@@ -151,18 +524,23 @@ class RetrieverTool:
         keyword_filters: Optional[Dict[str, Any]] = None,
         semantic_weight: float = 0.7,
         keyword_weight: float = 0.3,
-        top_k: Optional[int] = None
+        top_k: Optional[int] = None,
+        keyword_first: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Perform hybrid search combining semantic similarity with keyword matching.
 
+        Rankings are merged with weighted reciprocal-rank fusion. Short queries
+        that keywords alone answer (e.g. skill names) skip the embedding call.
+
         Args:
             query_text: The text query
             embedder_tool: EmbedderTool instance
-            keyword_filters: Keyword-based filters
+            keyword_filters: Filters applied to both searches
             semantic_weight: Weight for semantic similarity (0-1)
             keyword_weight: Weight for keyword matching (0-1)
             top_k: Number of results to return
+            keyword_first: Try an all-terms keyword match before embedding the query
 
         Returns:
             List of results with combined scores
@@ -170,23 +548,60 @@ class RetrieverTool:
         if not self.db_engine:
             raise ValueError("Database engine not provided")
 
+        top_k = top_k or self.config.TOP_K_RESULTS
+
         try:
-            # Get semantic results
+            term_count = len(tokenize(query_text))
+            if keyword_first and 0 < term_count <= self.config.KEYWORD_FIRST_MAX_TERMS:
+                exact_matches = self.retrieve_by_keywords(
+                    query_text, top_k=top_k, filters=keyword_filters, require_all=True
+                )
+                if len(exact_matches) >= top_k:
+                    logger.info(f"Hybrid query answered by keyword match, skipping embedding ({len(exact_matches)} results)")
+                    for result in exact_matches:
+                        result['retrieval_method'] = 'keyword'
+                    return exact_matches
+
+            # Get more candidates from each side for fusion
+            keyword_results = self.retrieve_by_keywords(
+                query_text, top_k=top_k * 2, filters=keyword_filters
+            )
             semantic_results = self.retrieve_by_text(
                 query_text=query_text,
                 embedder_tool=embedder_tool,
-                top_k=top_k * 2 if top_k else None,  # Get more for reranking
+                top_k=top_k * 2,
                 filters=keyword_filters
             )
 
-            # For now, just return semantic results
-            # TODO: Implement keyword scoring and combination
-            return semantic_results[:top_k] if top_k else semantic_results
+            results = self._fuse_results(semantic_results, keyword_results, semantic_weight, keyword_weight)
+            return results[:top_k]
 
         except Exception as e:
             logger.error(f"Error in hybrid retrieval: {e}")
             raise
 
+    def _fuse_results(
+        self,
+        semantic_results: List[Dict[str, Any]],
+        keyword_results: List[Dict[str, Any]],
+        semantic_weight: float,
+        keyword_weight: float
+    ) -> List[Dict[str, Any]]:
+        """Weighted reciprocal-rank fusion of two ranked result lists."""
+        rrf_k = self.config.RRF_K
+        fused: Dict[int, Dict[str, Any]] = {}
+
+        for weight, results in ((semantic_weight, semantic_results), (keyword_weight, keyword_results)):
+            for rank, result in enumerate(results, start=1):
+                entry = fused.get(result['chunk_id'])
+                if entry is None:
+                    entry = fused[result['chunk_id']] = {**result, 'hybrid_score': 0.0, 'retrieval_method': 'hybrid'}
+                else:
+                    entry.update({k: v for k, v in result.items() if k in ('similarity_score', 'keyword_score')})
+                entry['hybrid_score'] += weight / (rrf_k + rank)
+
+        return sorted(fused.values(), key=lambda result: result['hybrid_score'], reverse=True)
+
     def search_by_metadata(
         self,
         filters: Dict[str, Any],
@@ -207,29 +622,13 @@ class RetrieverTool:
 
         try:
             with self._session_factory() as session:
-                query = session.query(EmbeddingStore)
+                query = self._result_query(session)
 
                 # Apply filters
                 query = self._apply_filters(query, filters)
                 query = query.limit(limit)
 
-                results = []
-                for embedding_store in query.all():
-                    chunk_data = self._get_chunk_data(session, embedding_store.chunk_id)
-                    if chunk_data:
-                        result = {
-                            'chunk_id': embedding_store.chunk_id,
-                            'document_id': embedding_store.document_id,
-                            'content': chunk_data['content'],
-                            'source_type': embedding_store.source_type,
-                            'user_id': embedding_store.user_id,
-                            'organization_id': embedding_store.organization_id,
-                            'metadata': chunk_data.get('metadata', {}),
-                            'word_count': chunk_data.get('word_count', 0),
-                            'char_count': chunk_data.get('char_count', 0),
-                            'processed_at': chunk_data.get('processed_at'),
-                        }
-                        results.append(result)
+                results = [self._row_to_result(row) for row in query.all()]
 
                 logger.info(f"Found {len(results)} chunks matching metadata filters")
                 return results
@@ -267,6 +666,8 @@ class RetrieverTool:
                         'earliest': date_range[0].isoformat() if date_range[0] else None,
                         'latest': date_range[1].isoformat() if date_range[1] else None
                     },
+                    'vector_index': self.vector_index.get_stats() if self.vector_index is not None else None,
+                    'keyword_index': self.keyword_index.get_stats() if self.keyword_index is not None else None,
                     'database_connected': True
                 }
 
@@ -277,38 +678,172 @@ class RetrieverTool:
                 'database_connected': False
             }
 
+    def evaluate_recall(
+        self,
+        sample_size: int = 20,
+        top_k: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Measure recall@k of the approximate search path against an exact scan.
+
+        Query vectors are sampled from stored embeddings. Use the report to tune
+        ef_search/probes (pgvector) or the HNSW parameters (in-process index).
+        """
+        if not self.db_engine:
+            raise ValueError("Database engine not provided")
+
+        top_k = top_k or self.config.TOP_K_RESULTS
+
+        with self._session_factory() as session:
+            sample = session.query(EmbeddingStore.embedding).order_by(func.random()).limit(sample_size).all()
+            queries = [EmbeddingStore.decode_embedding(row.embedding) for row in sample]
+
+        if self.use_vector_index():
+            report = measure_index_recall(self.get_vector_index(), queries, top_k, filters)
+            report['backend'] = self.config.VECTOR_INDEX_BACKEND
+            return report
+
+        approximate, exact, approximate_times, exact_times = [], [], [], []
+        with self._session_factory() as session:
+            for query_embedding in queries:
+                start = time.perf_counter()
+                rows = self._search_database(session, query_embedding, top_k, filters)
+                approximate_times.append(time.perf_counter() - start)
+                approximate.append([row.chunk_id for row in rows])
+                session.rollback()  # End the transaction so SET LOCAL does not leak
+
+                start = time.perf_counter()
+                rows = self._search_database(session, query_embedding, top_k, filters, exact=True)
+                exact_times.append(time.perf_counter() - start)
+                exact.append([row.chunk_id for row in rows])
+                session.rollback()
+
+        report = recall_report(approximate, exact, approximate_times, exact_times, top_k)
+        report['backend'] = 'database'
+        report['index'] = {
+            'type': self.config.ANN_INDEX_TYPE,
+            'ef_search': self.config.HNSW_EF_SEARCH,
+            'probes': self.config.IVFFLAT_PROBES,
+        }
+        return report
+
     def _apply_filters(self, query, filters: Dict[str, Any]):
-        """Apply metadata filters to the query."""
-        if 'source_type' in filters:
-            query = query.filter(EmbeddingStore.source_type == filters['source_type'])
+        """
+        Compile metadata filters into SQL predicates.
+
+        Supported forms:
+            {'source_type': 'resume'}                         equality
+            {'user_id': ['1', '2']}                           IN-list
+            {'created_at': {'gte': '2024-01-01', 'lt': ...}}  date range
+            {'metadata': {'skill': 'python'}}                 JSON key on chunk_metadata
+            {'tenant': {'user_id': '1', 'organization_id': '7'}}
+                                                              the user's or the organization's chunks
+        """
+        for key, value in filters.items():
+            column = FILTER_COLUMNS.get(key)
+
+            if column is not None:
+                if isinstance(value, (list, tuple, set)):
+                    query = query.filter(column.in_([self._coerce_filter_value(column, v) for v in value]))
+                elif value is None:
+                    query = query.filter(column.is_(None))
+                else:
+                    query = query.filter(column == self._coerce_filter_value(column, value))
 
-        if 'user_id' in filters:
-            query = query.filter(EmbeddingStore.user_id == filters['user_id'])
+            elif key in DATE_FILTER_COLUMNS:
+                query = self._apply_range_filter(query, DATE_FILTER_COLUMNS[key], key, value)
 
-        if 'organization_id' in filters:
-            query = query.filter(EmbeddingStore.organization_id == filters['organization_id'])
+            elif key == 'tenant':
+                query = query.filter(self._tenant_predicate(value))
 
-        if 'document_id' in filters:
-            query = query.filter(EmbeddingStore.document_id == filters['document_id'])
+            elif key == 'metadata':
+                if not isinstance(value, dict):
+                    raise ValueError("metadata filter must be an object of key/value pairs")
+                dialect = query.session.get_bind().dialect.name
+                for metadata_key, metadata_value in value.items():
+                    query = query.filter(self._metadata_predicate(dialect, metadata_key, metadata_value))
+
+            else:
+                logger.warning(f"Ignoring unsupported retrieval filter: {key}")
 
-        # Add more filters as needed
         return query
 
-    def _get_chunk_data(self, session, chunk_id: int) -> Optional[Dict[str, Any]]:
-        """Get document chunk data by ID."""
-        # This is a placeholder - in production, you'd have a DocumentChunk model
-        # For now, return mock data
-        try:
-            # Mock implementation - replace with actual DocumentChunk query
-            return {
-                'content': f"Mock content for chunk {chunk_id}",
-                'metadata': {'chunk_id': chunk_id},
-                'word_count': 50,
-                'char_count': 300,
-                'processed_at': '2024-01-01T00:00:00Z'
-            }
-        except Exception:
-            return None
+    def _apply_range_filter(self, query, column, key: str, value):
+        """Apply a {'gte'|'gt'|'lte'|'lt': date} range to a timestamp column."""
+        if not isinstance(value, dict):
+            raise ValueError(f"{key} filter must be an object with gte/gt/lte/lt bounds")
+
+        for operator, bound in value.items():
+            if operator not in RANGE_OPERATORS:
+                raise ValueError(f"Unsupported range operator for {key}: {operator}")
+            if isinstance(bound, str):
+                bound = datetime.fromisoformat(bound.replace('Z', '+00:00')).replace(tzinfo=None)
+            query = query.filter(RANGE_OPERATORS[operator](column, bound))
+
+        return query
+
+    @staticmethod
+    def _tenant_predicate(value):
+        """Chunks owned by the user or the organization; nothing when neither is given."""
+        if not isinstance(value, dict):
+            raise ValueError("tenant filter must be an object with user_id and/or organization_id")
+
+        predicates = [
+            FILTER_COLUMNS[key] == str(value[key])
+            for key in ('user_id', 'organization_id') if value.get(key) is not None
+        ]
+        return or_(*predicates) if predicates else false()
+
+    def _metadata_predicate(self, dialect: str, key: str, value):
+        """Predicate on a top-level key of the JSON chunk_metadata column."""
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+        if dialect == 'postgresql':
+            # Containment matches the GIN index on chunk_metadata::jsonb
+            document = cast(DocumentChunk.chunk_metadata, JSONB)
+            return or_(*[document.contains({key: v}) for v in values])
+
+        extracted = func.json_extract(DocumentChunk.chunk_metadata, f'$."{key}"')
+        return extracted.in_(values) if len(values) > 1 else extracted == values[0]
+
+    @staticmethod
+    def _coerce_filter_value(column, value):
+        # Tenant IDs are stored as strings but usually arrive as ints
+        if isinstance(column.type, String) and value is not None:
+            return str(value)
+        return value
+
+    def _result_query(self, session, *extra_columns):
+        """Query the result columns with chunk content joined in a single round trip."""
+        return session.query(*RESULT_COLUMNS, *extra_columns) \
+            .select_from(EmbeddingStore) \
+            .join(DocumentChunk, DocumentChunk.id == EmbeddingStore.chunk_id)
+
+    def _row_to_result(self, row, similarity: Optional[float] = None) -> Dict[str, Any]:
+        """Convert a projected result row into the response dictionary."""
+        result = {
+            'chunk_id': row.chunk_id,
+            'document_id': row.document_id,
+            'chunk_index': row.chunk_index,
+            'content': row.content,
+            'content_hash': row.content_hash,
+            'source_type': row.source_type,
+            'user_id': row.user_id,
+            'organization_id': row.organization_id,
+            'metadata': json.loads(row.chunk_metadata) if row.chunk_metadata else {},
+            'word_count': row.word_count or 0,
+            'char_count': row.char_count or 0,
+            'processed_at': row.processed_at.isoformat() if row.processed_at else None,
+        }
+        if similarity is not None:
+            result['similarity_score'] = float(similarity)
+        return result
+
+    def _keyword_result(self, row, score: float) -> Dict[str, Any]:
+        result = self._row_to_result(row)
+        result['keyword_score'] = float(score)
+        return result
 
     def validate_query_embedding(self, embedding: List[float]) -> Dict[str, Any]:
         """Validate query embedding dimensions and quality."""
@@ -324,7 +859,7 @@ class RetrieverTool:
             issues.append("Embedding is all zeros")
 
         # Check for reasonable value range (-1 to 1 for normalized embeddings)
-        min_val, max_val = min(embedding), max(embedding)
+        min_val, max_val = float(min(embedding)), float(max(embedding))
         if min_val < -1.1 or max_val > 1.1:
             issues.append(f"Embedding values out of range: [{min_val:.3f}, {max_val:.3f}]")
 
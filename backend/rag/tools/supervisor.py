@@ -5,24 +5,105 @@ Directs workflow and decides which tools to call based on input type
 
 import logging
 import time
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, Iterator, List, Optional, Union
 from datetime import datetime
 
+from sqlalchemy.orm import sessionmaker
+
+from ..cache.answer_cache import AnswerCache, CorpusChangeFeed
 from ..config import RAGConfig
+from .pipeline import PipelineExecutor, PipelineStage, payload_size
 
 
 logger = logging.getLogger(__name__)
 
+# Input types orchestrate_workflow can process; audio, video and image have no transcriber/ocr tool
+SUPPORTED_INPUT_TYPES = ('text', 'pdf', 'query', 'batch')
+
+# user_context fields the generator builds its system prompt from, so cached answers differ by them
+PROMPT_CONTEXT_FIELDS = ('context', 'role', 'plan', 'interview_context')
+
+# Retrieval filters that scope a query to a tenant; set from user_context, never by the client
+TENANT_FILTER_KEYS = ('user_id', 'organization_id', 'tenant')
+
 
 class RAGSupervisor:
     """
     Supervisor tool that orchestrates the RAG workflow.
-    Routes inputs to appropriate tools and manages the overall process.
+    Routes inputs to appropriate tools and runs them as a pipeline of
+    stages, overlapping stages that do not depend on each other.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        ingestor=None,
+        embedder=None,
+        retriever=None,
+        generator=None
+    ):
+        """
+        Args:
+            ingestor, embedder, retriever, generator: Tool instances to run
+                stages with; any left out are created on first use
+        """
         self.config = RAGConfig()
         self._activity_log = []
+        self._batch_ingestor = None
+        self._tools = {
+            'ingestor': ingestor,
+            'embedder': embedder,
+            'retriever': retriever,
+            'generator': generator,
+        }
+        self._executor = PipelineExecutor(max_workers=self.config.PIPELINE_WORKERS)
+        self._answer_cache: Optional[AnswerCache] = None
+        self._change_feed: Optional[CorpusChangeFeed] = None
+
+    def get_tool(self, tool_name: str):
+        """Get the tool instance for a stage, creating it on first use"""
+        if tool_name not in self._tools:
+            raise ValueError(f"Tool {tool_name} is not available")
+
+        tool = self._tools[tool_name]
+        if tool is None:
+            if tool_name == 'ingestor':
+                from .ingestor import IngestorTool
+                tool = IngestorTool()
+            elif tool_name == 'embedder':
+                from .embedder import EmbedderTool
+                tool = EmbedderTool()
+            elif tool_name == 'retriever':
+                from .retriever import RetrieverTool
+                tool = RetrieverTool()
+            else:
+                from .generator import GeneratorTool
+                tool = GeneratorTool()
+            self._tools[tool_name] = tool
+        return tool
+
+    def get_answer_cache(self) -> Optional[AnswerCache]:
+        """The query answer cache, or None when disabled (ENABLE_CACHE / RAG_ANSWER_CACHE_SIZE)"""
+        if not self.config.ENABLE_CACHE or self.config.ANSWER_CACHE_SIZE <= 0:
+            return None
+        if self._answer_cache is None:
+            self._answer_cache = AnswerCache(
+                max_entries=self.config.ANSWER_CACHE_SIZE,
+                ttl_seconds=self.config.CACHE_TTL_SECONDS,
+                similarity_threshold=self.config.ANSWER_CACHE_SIMILARITY
+            )
+        return self._answer_cache
+
+    def _sync_answer_cache(self) -> None:
+        """Drop cached answers that chunks ingested or removed since the last check could change"""
+        if self._change_feed is None:
+            engine = self.get_tool('retriever').db_engine
+            if engine is None:
+                return
+            self._change_feed = CorpusChangeFeed(sessionmaker(bind=engine), self.config.ANSWER_CACHE_REFRESH_SECONDS)
+
+        changed = self._change_feed.poll()
+        if changed:
+            self._answer_cache.invalidate(changed)
 
     def route_input(self, input_type: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
         """
@@ -60,7 +141,7 @@ class RAGSupervisor:
         if metadata and metadata.get('needs_safety_check', False):
             tools.append('safety')
 
-        if metadata and metadata.get('needs_metadata_enrichment', True):
+        if (metadata or {}).get('needs_metadata_enrichment', True):
             tools.insert(0, 'metadata_manager')  # Add at beginning
 
         return tools
@@ -99,6 +180,10 @@ class RAGSupervisor:
             }
 
         try:
+            # Media inputs are routed to transcriber/ocr tools that do not exist yet
+            if input_type not in SUPPORTED_INPUT_TYPES:
+                raise ValueError(f"Unsupported input type: {input_type}")
+
             # Log workflow start
             self.log_activity(
                 workflow_id,
@@ -123,7 +208,7 @@ class RAGSupervisor:
             }
 
             # Execute workflow based on input type
-            if input_type in ['text', 'pdf', 'audio', 'video', 'image']:
+            if input_type in ['text', 'pdf']:
                 # Ingestion workflow
                 result = self._execute_ingestion_workflow(
                     input_data, input_type, tools_needed, result, user_context
@@ -141,12 +226,13 @@ class RAGSupervisor:
             else:
                 raise ValueError(f"Unsupported input type: {input_type}")
 
-            # Calculate performance metrics
+            # Calculate performance metrics; stage timings come from the pipeline run
             end_time = time.time()
             result['performance'] = {
                 'total_time': end_time - start_time,
                 'tools_executed': len(result['processing_steps']),
-                'success': len(result['errors']) == 0
+                'success': len(result['errors']) == 0,
+                'stages': result['performance'].get('stages', {})
             }
 
             # Log workflow completion
@@ -185,90 +271,402 @@ class RAGSupervisor:
         result: Dict[str, Any],
         user_context: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Execute ingestion workflow for documents and media"""
-        current_data = input_data
-
-        for tool_name in tools_needed:
-            try:
-                step_result = self._execute_tool(tool_name, current_data, {
-                    'input_type': input_type,
-                    'user_context': user_context,
-                    'workflow_metadata': result['metadata']
-                })
+        """
+        Execute ingestion workflow for documents:
+        ingestor -> embedder, with metadata enrichment running alongside the ingestor
+        """
+        stages = []
+
+        def ingest(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            ingestor = self.get_tool('ingestor')
+            if input_type == 'pdf':
+                return ingestor.ingest_file(input_data, dict(result['metadata']))
+            content = input_data
+            if isinstance(content, dict):
+                content = content.get('content') or content.get('text', '')
+            return ingestor.ingest_text(content, dict(result['metadata']))
+
+        stages.append(PipelineStage('ingestor', ingest))
+
+        if 'metadata_manager' in tools_needed:
+            stages.append(PipelineStage(
+                'metadata_manager',
+                lambda inputs: self._enrich_document_metadata(input_data, input_type, result['metadata'], user_context)
+            ))
+
+        def embed(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            chunks = inputs['ingestor']
+            enriched = inputs.get('metadata_manager')
+            if enriched:
+                for chunk in chunks:
+                    chunk['metadata'] = {**chunk['metadata'], **enriched}
+            return self.get_tool('embedder').generate_embeddings(chunks)
+
+        embed_depends = ['ingestor'] + (['metadata_manager'] if 'metadata_manager' in tools_needed else [])
+        stages.append(PipelineStage('embedder', embed, embed_depends))
+
+        records = self._run_pipeline(stages, result)
+
+        embedded = records['embedder']
+        if embedded['success']:
+            result['final_result'] = embedded['output']
+        return result
+
+    def _execute_query_workflow(
+        self,
+        input_data: Union[str, Dict[str, Any]],
+        tools_needed: List[str],
+        result: Dict[str, Any],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Execute query workflow for RAG retrieval and generation. The query
+        embedding and metadata enrichment run concurrently, then retrieval,
+        then generation.
+        """
+        query, records = self._retrieve_for_query(input_data, tools_needed, result, user_context)
+        if records is None:
+            return result
 
+        def generate(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            generation = self.get_tool('generator').generate_answer(query, inputs['retriever'], user_context)
+            if generation.get('error'):
+                raise RuntimeError(generation['error'])
+            return generation
+
+        records.update(self._run_pipeline(
+            [PipelineStage('generator', generate, ['retriever'])], result, completed=records
+        ))
+
+        generation = records['generator']
+        if generation['success']:
+            self._finish_query(input_data, user_context, result, records, generation['output'])
+
+        return result
+
+    def stream_query(
+        self,
+        input_data: Union[str, Dict[str, Any]],
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run the query workflow, streaming the generated answer.
+
+        Caching, embedding and retrieval run as in orchestrate_workflow; the
+        generator's tokens are then passed on as they arrive. Yields
+        {'type': 'token', 'text': ...} events (a cached answer arrives as
+        one token), then either {'type': 'done', ...} with the final result
+        and timings, or {'type': 'error', ...}.
+        """
+        start_time = time.time()
+        workflow_id = f"rag_{int(start_time)}_{hash(str(input_data)) % 10000}"
+
+        if not self.config.RAG_ENABLED:
+            yield {'type': 'error', 'workflow_id': workflow_id, 'rag_disabled': True,
+                   'error': 'RAG functionality is currently disabled'}
+            return
+
+        result = {
+            'workflow_id': workflow_id,
+            'input_type': 'query',
+            'tools_used': self.route_input('query'),
+            'processing_steps': [],
+            'final_result': None,
+            'metadata': {},
+            'errors': [],
+            'performance': {}
+        }
+        self.log_activity(workflow_id, 'workflow_start', {'input_type': 'query', 'streaming': True}, None)
+
+        try:
+            query, records = self._retrieve_for_query(input_data, result['tools_used'], result, user_context)
+
+            if records is None:
+                if result['final_result'] is not None:
+                    yield {'type': 'token', 'text': result['final_result'].get('answer', '')}
+            else:
+                generation = None
+                first_token_at = None
+                generator_start = time.perf_counter()
+                for event in self.get_tool('generator').generate_answer_stream(query, records['retriever']['output'], user_context):
+                    if event['type'] == 'token':
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        yield event
+                    else:
+                        generation = event['result']
+
+                wall_time = time.perf_counter() - generator_start
+                result['performance'].setdefault('stages', {})['generator'] = {
+                    'started_at': generator_start - start_time,
+                    'time_to_first_token': first_token_at - generator_start if first_token_at is not None else None,
+                    'wall_time': wall_time,
+                    'input_bytes': payload_size(records['retriever']['output']),
+                    'output_bytes': payload_size(generation.get('answer')),
+                    'skipped': False,
+                }
                 result['processing_steps'].append({
-                    'tool': tool_name,
-                    'success': step_result.get('success', True),
+                    'tool': 'generator',
+                    'success': not generation.get('error'),
                     'timestamp': datetime.utcnow().isoformat(),
-                    'output_summary': self._summarize_step_output(step_result)
+                    'output_summary': f"Generated answer ({len(generation.get('answer', ''))} chars)",
+                    'wall_time': wall_time,
+                    'answer_length': len(generation.get('answer', '')),
                 })
 
-                # Pass output to next tool if successful
-                if step_result.get('success', True) and 'output' in step_result:
-                    current_data = step_result['output']
+                if generation.get('error'):
+                    result['errors'].append(f"Tool generator failed: {generation['error']}")
+                else:
+                    self._finish_query(input_data, user_context, result, records, generation)
+
+        except Exception as e:
+            logger.error(f"Streaming workflow {workflow_id} failed: {e}")
+            result['errors'].append(str(e))
 
-            except Exception as e:
-                error_msg = f"Tool {tool_name} failed: {str(e)}"
-                result['errors'].append(error_msg)
-                logger.error(error_msg)
-                break
+        result['performance']['total_time'] = time.time() - start_time
+        result['performance']['success'] = not result['errors']
+        self.log_activity(workflow_id, 'workflow_complete', result['performance'], result['final_result'])
 
-        result['final_result'] = current_data
-        return result
+        if result['final_result'] is None:
+            yield {'type': 'error', 'workflow_id': workflow_id, 'error': '; '.join(result['errors']) or 'Query failed',
+                   'stage_timings': result['performance'].get('stages', {})}
+            return
 
-    def _execute_query_workflow(
+        final_result = result['final_result']
+        yield {
+            'type': 'done',
+            'workflow_id': workflow_id,
+            'confidence': final_result.get('confidence', 0.0),
+            'sources': final_result.get('sources', []),
+            'cached': final_result.get('cached'),
+            'processing_time': result['performance']['total_time'],
+            'stage_timings': result['performance'].get('stages', {})
+        }
+
+    def _retrieve_for_query(
         self,
         input_data: Union[str, Dict[str, Any]],
         tools_needed: List[str],
         result: Dict[str, Any],
         user_context: Optional[Dict[str, Any]]
-    ) -> Dict[str, Any]:
-        """Execute query workflow for RAG retrieval and generation"""
+    ):
+        """
+        Everything in the query workflow before generation: the answer cache
+        levels, query embedding, metadata enrichment and retrieval.
+
+        Returns:
+            (query, stage records); records is None when there is nothing to
+            generate, either because a cached answer was put in
+            result['final_result'] or because retrieval failed
+        """
         query = input_data if isinstance(input_data, str) else input_data.get('query', '')
+        filters = self._client_filters(input_data, user_context)
+
+        def embed_query(inputs: Dict[str, Any]) -> List[float]:
+            embedded = self.get_tool('embedder').generate_embeddings([{
+                'content': query,
+                'chunk_index': 0,
+                'word_count': len(query.split()),
+                'char_count': len(query),
+                'metadata': {}
+            }], use_cache=True)
+            if not embedded or embedded[0].get('embedding') is None:
+                raise ValueError(f"Failed to generate embedding for query: {embedded[0].get('embedding_error') if embedded else ''}")
+            return embedded[0]['embedding']
+
+        def retrieve(inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            enriched = inputs.get('metadata_manager') or {}
+            return self.get_tool('retriever').retrieve_similar(
+                query_embedding=inputs['query_embedding'],
+                filters={**enriched.get('filters', filters), **self._tenant_filters(user_context)}
+            )
 
-        # Step 1: Retrieve relevant chunks
-        retrieval_result = self._execute_tool('retriever', {
-            'query': query,
-            'user_context': user_context,
-            'filters': input_data.get('filters', {}) if isinstance(input_data, dict) else {}
-        }, {'workflow_metadata': result['metadata']})
+        # Level 1: exact match on the normalized query, before any model call
+        cache = self.get_answer_cache()
+        tenant = self._cache_tenant(user_context)
+        if cache is not None:
+            def exact_lookup(inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                self._sync_answer_cache()
+                return cache.get(query, filters, tenant)
+
+            cached = self._run_pipeline([PipelineStage('answer_cache', exact_lookup)], result)['answer_cache']['output']
+            if cached is not None:
+                result['final_result'] = {**cached, 'cached': 'exact'}
+                return query, None
+
+        stages = [PipelineStage('query_embedding', embed_query)]
+        retrieve_depends = ['query_embedding']
+        if 'metadata_manager' in tools_needed:
+            stages.append(PipelineStage(
+                'metadata_manager',
+                lambda inputs: self._enrich_query_metadata(query, filters, user_context)
+            ))
+            retrieve_depends.append('metadata_manager')
+
+        # Level 2: a near-identical earlier question in the same scope
+        if cache is not None:
+            stages.append(PipelineStage(
+                'semantic_cache',
+                lambda inputs: cache.get_similar(inputs['query_embedding'], filters, tenant),
+                ['query_embedding']
+            ))
+
+        records = self._run_pipeline(stages, result)
+
+        similar = records.get('semantic_cache', {}).get('output')
+        if similar is not None:
+            answer, similarity = similar
+            result['final_result'] = {**answer, 'cached': 'semantic', 'cache_similarity': similarity}
+            return query, None
+
+        records.update(self._run_pipeline(
+            [PipelineStage('retriever', retrieve, retrieve_depends)], result, completed=records
+        ))
+        if not records['retriever']['success']:
+            return query, None
+
+        return query, records
+
+    def _finish_query(
+        self,
+        input_data: Union[str, Dict[str, Any]],
+        user_context: Optional[Dict[str, Any]],
+        result: Dict[str, Any],
+        records: Dict[str, Dict[str, Any]],
+        generation: Dict[str, Any]
+    ) -> None:
+        """Set the workflow's final result from a generated answer and cache it"""
+        result['final_result'] = {
+            'answer': generation.get('answer', ''),
+            'sources': records['retriever']['output'],
+            'confidence': generation.get('confidence', 0.0)
+        }
 
-        result['processing_steps'].append({
-            'tool': 'retriever',
-            'success': retrieval_result.get('success', True),
-            'timestamp': datetime.utcnow().isoformat(),
-            'chunks_retrieved': len(retrieval_result.get('chunks', []))
-        })
+        cache = self.get_answer_cache()
+        if cache is not None:
+            query = input_data if isinstance(input_data, str) else input_data.get('query', '')
+            filters = self._client_filters(input_data, user_context)
+            cache.set(query, filters, self._cache_tenant(user_context), dict(result['final_result']), records['query_embedding']['output'])
+
+    @staticmethod
+    def _client_filters(input_data: Union[str, Dict[str, Any]], user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The request's retrieval filters, without tenant keys when user_context scopes the query"""
+        filters = (input_data.get('filters') or {}) if isinstance(input_data, dict) else {}
+        if user_context:
+            filters = {key: value for key, value in filters.items() if key not in TENANT_FILTER_KEYS}
+        return filters
+
+    @staticmethod
+    def _tenant_filters(user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Retrieval scope from the server-set user_id and organization_id: the
+        user's own chunks plus their organization's. Without user_context the
+        query is not scoped (internal callers).
+        """
+        if not user_context:
+            return {}
+        user_id, organization_id = user_context.get('user_id'), user_context.get('organization_id')
+        if organization_id is None and user_id is not None:
+            # Plain equality, which the vector index evaluates itself
+            return {'user_id': str(user_id)}
+        return {'tenant': {'user_id': user_id, 'organization_id': organization_id}}
+
+    @staticmethod
+    def _cache_tenant(user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Answer cache scope: the user and organization whose chunks the answer
+        was retrieved from, plus the fields that select the generator's system
+        prompt. Identity comes from the server-set user_id and organization_id only.
+        """
+        user_context = user_context or {}
+        tenant = {'user_id': str(user_context.get('user_id'))}
+        if user_context.get('organization_id') is not None:
+            tenant['organization_id'] = str(user_context['organization_id'])
 
-        if not retrieval_result.get('success', True):
-            result['errors'].append("Retrieval failed")
-            return result
+        for field in PROMPT_CONTEXT_FIELDS:
+            if user_context.get(field) is not None:
+                tenant[field] = user_context[field]
+        return tenant
 
-        # Step 2: Generate answer using retrieved context
-        context_chunks = retrieval_result.get('chunks', [])
-        generation_result = self._execute_tool('generator', {
-            'query': query,
-            'context': context_chunks,
-            'user_context': user_context
-        }, {'workflow_metadata': result['metadata']})
+    def _run_pipeline(
+        self,
+        stages: List[PipelineStage],
+        result: Dict[str, Any],
+        completed: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run stages and record their steps, errors and timings on the workflow result"""
+        records = self._executor.run(stages, completed)
+
+        stage_timings = result['performance'].setdefault('stages', {})
+        for name, record in records.items():
+            step = {
+                'tool': name,
+                'success': record['success'],
+                'timestamp': datetime.utcnow().isoformat(),
+                'output_summary': 'Skipped' if record['skipped'] else self._summarize_step_output(record),
+                'wall_time': record['wall_time'],
+                'input_bytes': record['input_bytes'],
+                'output_bytes': record['output_bytes'],
+            }
+            if name == 'retriever' and record['success']:
+                step['chunks_retrieved'] = len(record['output'])
+            elif name == 'generator' and record['success']:
+                step['answer_length'] = len(record['output'].get('answer', ''))
+            result['processing_steps'].append(step)
+
+            stage_timings[name] = {
+                'started_at': record['started_at'],
+                'wall_time': record['wall_time'],
+                'input_bytes': record['input_bytes'],
+                'output_bytes': record['output_bytes'],
+                'skipped': record['skipped'],
+            }
 
-        result['processing_steps'].append({
-            'tool': 'generator',
-            'success': generation_result.get('success', True),
-            'timestamp': datetime.utcnow().isoformat(),
-            'answer_length': len(generation_result.get('answer', ''))
-        })
+            if record['error']:
+                result['errors'].append(f"Tool {name} failed: {record['error']}")
 
-        if generation_result.get('success', True):
-            result['final_result'] = {
-                'answer': generation_result.get('answer', ''),
-                'sources': context_chunks,
-                'confidence': generation_result.get('confidence', 0.0)
-            }
-        else:
-            result['errors'].append("Generation failed")
+        return records
 
-        return result
+    def _enrich_query_metadata(
+        self,
+        query: str,
+        filters: Dict[str, Any],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Normalize retrieval filters and describe the query"""
+        from .retriever import FILTER_COLUMNS, DATE_FILTER_COLUMNS
+
+        supported = set(FILTER_COLUMNS) | set(DATE_FILTER_COLUMNS) | {'metadata'}
+        unsupported = sorted(key for key in filters if key not in supported)
+        if unsupported:
+            logger.warning(f"Dropping unsupported retrieval filters: {unsupported}")
+
+        return {
+            'filters': {key: value for key, value in filters.items() if key in supported},
+            'dropped_filters': unsupported,
+            'query_length': len(query),
+            'query_terms': len(query.split()),
+            'user_id': (user_context or {}).get('user_id'),
+            'requested_at': datetime.utcnow().isoformat(),
+        }
+
+    def _enrich_document_metadata(
+        self,
+        input_data: Union[str, Dict[str, Any]],
+        input_type: str,
+        metadata: Dict[str, Any],
+        user_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Metadata added to every chunk of an ingested document"""
+        enriched = {
+            'input_type': input_type,
+            'ingested_at': datetime.utcnow().isoformat(),
+        }
+        if isinstance(input_data, str) and input_type == 'text':
+            enriched['document_length'] = len(input_data)
+        if user_context and user_context.get('user_id') is not None and 'user_id' not in metadata:
+            enriched['user_id'] = user_context['user_id']
+        return enriched
 
     def _execute_batch_workflow(
         self,
@@ -277,39 +675,57 @@ class RAGSupervisor:
         result: Dict[str, Any],
         user_context: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
-        """Execute batch processing workflow"""
-        # Implementation for batch processing multiple documents
-        batch_items = input_data if isinstance(input_data, list) else [input_data]
-        results = []
+        """
+        Execute batch processing workflow: chunk in parallel, embed in shared batches.
+        Documents are stored when the retriever has a database engine; otherwise
+        each result carries its embedded chunks for the caller to store.
+        """
+        from ..models.bulk_writer import BulkChunkWriter
+        from .batch_ingestor import BatchIngestor
 
+        batch_items = input_data if isinstance(input_data, list) else [input_data]
+        documents = []
         for item in batch_items:
-            item_result = self.orchestrate_workflow(
-                item, 'text', result['metadata'], user_context
-            )
+            document = dict(item) if isinstance(item, dict) else {'content': item}
+            document.setdefault('content', document.pop('text', ''))
+            document['metadata'] = {**result['metadata'], **(document.get('metadata') or {})}
+            if user_context:
+                # Stored chunks belong to the requesting user, whatever the documents claim
+                document['user_id'] = user_context.get('user_id')
+                document.pop('organization_id', None)
+            documents.append(document)
+
+        if self._batch_ingestor is None:
+            self._batch_ingestor = BatchIngestor(embedder=self.get_tool('embedder'))
+        if self._batch_ingestor.writer is None:
+            engine = self.get_tool('retriever').db_engine
+            if engine is not None:
+                self._batch_ingestor.writer = BulkChunkWriter(engine)
+
+        stored = self._batch_ingestor.writer is not None
+        results = []
+        for item_result in self._batch_ingestor.ingest(documents):
+            # Stored documents report their chunk_ids instead of carrying the chunks
+            if stored:
+                item_result = {key: value for key, value in item_result.items() if key != 'chunks'}
             results.append(item_result)
 
+        result['processing_steps'].append({
+            'tool': 'batch_ingestor',
+            'success': all(r['success'] for r in results),
+            'timestamp': datetime.utcnow().isoformat(),
+            'output_summary': f"Ingested {sum(r['chunk_count'] for r in results if r['success'])} chunks"
+        })
+        result['errors'].extend(f"Document {r['document_id']}: {r['error']}" for r in results if not r['success'])
+
         result['final_result'] = {
             'batch_size': len(batch_items),
-            'successful': sum(1 for r in results if r.get('success', False)),
+            'successful': sum(1 for r in results if r['success']),
             'results': results
         }
 
         return result
 
-    def _execute_tool(self, tool_name: str, input_data: Any, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a specific tool with given input and context"""
-        # This is a placeholder - actual tool execution will be implemented
-        # when individual tools are created
-        logger.info(f"Executing tool: {tool_name} with input type: {type(input_data)}")
-
-        # Mock successful execution for now
-        return {
-            'success': True,
-            'output': input_data,
-            'tool': tool_name,
-            'execution_time': 0.1
-        }
-
     def _summarize_step_output(self, step_result: Dict[str, Any]) -> str:
         """Create a summary of step output for logging"""
         if not step_result.get('success', False):
@@ -0,0 +1,130 @@
+"""
+Chunking Tokenizers
+Token counters used to size chunks, with a per-sentence count cache
+"""
+
+import abc
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+    tiktoken = None
+
+
+logger = logging.getLogger(__name__)
+
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+
+class Tokenizer(abc.ABC):
+    """Abstract base class for counting tokens in a piece of text"""
+
+    name: str = "tokenizer"
+
+    @abc.abstractmethod
+    def count(self, text: str) -> int:
+        """Return the number of tokens in text"""
+        pass
+
+
+class ApproximateTokenizer(Tokenizer):
+    """
+    Fast regex estimate of BPE token counts (cl100k-style) for English text:
+    short words are one token, longer words one more per ~4 letters, digits
+    go in groups of three and each symbol is a token.
+    """
+
+    name = "approximate"
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for piece in _PIECES.findall(text):
+            length = len(piece)
+            if piece.isdigit():
+                tokens += (length + 2) // 3
+            elif length > 6 and piece.isalpha():
+                tokens += 1 + (length - 3) // 4
+            else:
+                tokens += 1
+        return tokens
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts with a tiktoken encoding"""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        if not HAS_TIKTOKEN:
+            raise ImportError("tiktoken is required for TiktokenTokenizer")
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class CachedTokenizer(Tokenizer):
+    """LRU cache of token counts in front of another tokenizer, keyed by text"""
+
+    def __init__(self, tokenizer: Tokenizer, max_entries: int = 50000):
+        self.tokenizer = tokenizer
+        self.name = tokenizer.name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        with self._lock:
+            tokens = self._counts.get(text)
+            if tokens is not None:
+                self._counts.move_to_end(text)
+                self.hits += 1
+                return tokens
+
+        tokens = self.tokenizer.count(text)
+
+        with self._lock:
+            self.misses += 1
+            self._counts[text] = tokens
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size and hit/miss counts"""
+        return {'size': len(self._counts), 'hits': self.hits, 'misses': self.misses}
+
+
+_tokenizers: Dict[str, CachedTokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(name: Optional[str] = None) -> CachedTokenizer:
+    """
+    Get the shared cached tokenizer by name ('approximate' or 'tiktoken',
+    defaulting to RAG_CHUNK_TOKENIZER). Falls back to the approximate
+    tokenizer when tiktoken is not installed.
+    """
+    from ..config import RAGConfig
+
+    name = name or RAGConfig.CHUNK_TOKENIZER
+
+    with _tokenizers_lock:
+        if name not in _tokenizers:
+            if name == "tiktoken" and HAS_TIKTOKEN:
+                tokenizer: Tokenizer = TiktokenTokenizer()
+            else:
+                if name != "approximate":
+                    logger.warning(f"Tokenizer '{name}' unavailable, using approximate token counts")
+                tokenizer = ApproximateTokenizer()
+            _tokenizers[name] = CachedTokenizer(tokenizer)
+        return _tokenizers[name]
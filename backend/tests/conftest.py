@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the backend test suite.
+The environment (in-memory SQLite, dummy provider keys) is set up by the
+conftest.py at the repository root.
+"""
+
+import hashlib
+
+import pytest
+
+from backend.app import app as flask_app
+from backend.extensions import db
+from backend.rag.models.vector_store import Base, create_rag_tables
+
+
+class HashEmbeddingProvider:
+    """Deterministic 8-dimensional embeddings; fails the next `failures` batches"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+
+    @property
+    def embedding_dimension(self) -> int:
+        return 8
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("embedding service unavailable")
+        return [[byte / 255 for byte in hashlib.sha256(text.encode("utf-8")).digest()[:8]] for text in texts]
+
+
+@pytest.fixture
+def app():
+    """The Flask app with fresh application and RAG tables"""
+    with flask_app.app_context():
+        db.create_all()
+        create_rag_tables(db.engine)
+        try:
+            yield flask_app
+        finally:
+            db.session.remove()
+            Base.metadata.drop_all(bind=db.engine)
+            db.drop_all()
+
+
+@pytest.fixture
+def embedding_provider():
+    return HashEmbeddingProvider()
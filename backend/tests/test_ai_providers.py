@@ -0,0 +1,286 @@
+"""
+Tests for LLM provider routing and request coalescing
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.ai_providers import (
+    AllProvidersFailedError, CoalescingEmbeddingProvider, CoalescingLLMProvider, EmbeddingProvider,
+    LLMProvider, RoutingLLMProvider, SingleFlight, request_key
+)
+from backend.ai_service import AIService
+
+MESSAGES = [{'role': 'user', 'content': 'hello'}]
+
+
+class FakeLLMProvider(LLMProvider):
+    """Answers with its model name after delay seconds, or raises while failures remain"""
+
+    def __init__(self, model: str, failures: int = 0, delay: float = 0.0, usage: int = 100,
+                 gate: threading.Event = None):
+        self.model = model
+        self.failures = failures
+        self.delay = delay
+        self.usage = usage
+        self.gate = gate
+        self.calls = 0
+        self.last_token_usage = 0
+
+    def _reply(self) -> str:
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError(f"{self.model} unavailable")
+        self.last_token_usage = self.usage
+        return self.model
+
+    def generate(self, prompt, context=None, params=None):
+        return self.chat([{'role': 'user', 'content': prompt}], params)
+
+    def chat(self, messages, params=None):
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        return self._reply()
+
+    def chat_stream(self, messages, params=None):
+        if self.failures:
+            self._reply()
+        yield self.model[:2]
+        yield self.model[2:]
+        self.last_token_usage = self.usage
+
+    async def achat(self, messages, params=None, timeout=None):
+        await asyncio.sleep(self.delay)
+        return self._reply()
+
+    def healthcheck(self):
+        return True
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, short: bool = False):
+        self.short = short
+        self.batches = []
+        self.model = 'fake-embedding'
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        embeddings = [[float(len(text))] for text in texts]
+        return embeddings[:-1] if self.short else embeddings
+
+    @property
+    def embedding_dimension(self):
+        return 1
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+class TestRoutingLLMProvider:
+    def test_fails_over_to_the_next_provider(self):
+        primary, fallback = FakeLLMProvider('primary', failures=1), FakeLLMProvider('fallback', usage=42)
+        router = RoutingLLMProvider({'groq': primary, 'openai': fallback})
+
+        assert router.chat(MESSAGES) == 'fallback'
+        assert router.get_last_token_usage() == 42
+        assert router.get_last_model() == ('openai', 'fallback')
+
+    def test_all_providers_failing_raises(self):
+        router = RoutingLLMProvider({'groq': FakeLLMProvider('a', failures=1), 'openai': FakeLLMProvider('b', failures=1)})
+
+        with pytest.raises(AllProvidersFailedError):
+            router.chat(MESSAGES)
+
+    def test_failing_provider_cools_down(self):
+        primary, fallback = FakeLLMProvider('primary', failures=2), FakeLLMProvider('fallback')
+        router = RoutingLLMProvider({'groq': primary, 'openai': fallback}, failure_threshold=2, cooldown_seconds=60)
+
+        router.chat(MESSAGES)
+        router.chat(MESSAGES)
+        assert router.get_stats()['order'] == ['openai', 'groq']
+
+        assert router.chat(MESSAGES) == 'fallback'
+        assert primary.calls == 2
+
+    def test_slow_primary_is_hedged(self):
+        primary, fallback = FakeLLMProvider('primary', delay=1.0), FakeLLMProvider('fallback')
+        router = RoutingLLMProvider({'groq': primary, 'openai': fallback}, hedge=True, hedge_delay=0.05)
+
+        assert router.chat(MESSAGES) == 'fallback'
+        assert router.hedges_sent == 1 and router.hedges_won == 1
+        assert router.get_last_model() == ('openai', 'fallback')
+
+    def test_async_chat_fails_over(self):
+        router = RoutingLLMProvider({'groq': FakeLLMProvider('primary', failures=1), 'openai': FakeLLMProvider('fallback')})
+
+        async def ask():
+            # Read in the task that awaited the call; the answering provider is kept per task
+            return await router.achat(MESSAGES), router.get_last_model()
+
+        assert asyncio.run(ask()) == ('fallback', ('openai', 'fallback'))
+
+    def test_stream_fails_over_before_the_first_token(self):
+        router = RoutingLLMProvider({'groq': FakeLLMProvider('primary', failures=1), 'openai': FakeLLMProvider('fallback')})
+
+        assert ''.join(router.chat_stream(MESSAGES)) == 'fallback'
+        assert router.get_last_model() == ('openai', 'fallback')
+
+    def test_each_thread_sees_its_own_answering_provider(self):
+        router = RoutingLLMProvider({'groq': FakeLLMProvider('primary', failures=1), 'openai': FakeLLMProvider('fallback', usage=42)})
+        answered, proceed, seen = threading.Event(), threading.Event(), []
+
+        def failed_over():
+            router.chat(MESSAGES)
+            answered.set()
+            proceed.wait(5)
+            seen.append((router.get_last_token_usage(), router.get_last_model()))
+
+        thread = threading.Thread(target=failed_over)
+        thread.start()
+        assert answered.wait(5)
+        assert router.chat(MESSAGES) == 'primary'
+        proceed.set()
+        thread.join()
+
+        assert seen == [(42, ('openai', 'fallback'))]
+        assert (router.get_last_token_usage(), router.get_last_model()) == (100, ('groq', 'primary'))
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        flights, gate, calls = SingleFlight(), threading.Event(), []
+
+        def call():
+            calls.append(1)
+            gate.wait(5)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do('key', call))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: flights.get_stats()['shared'] == 2)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['result'] * 3
+        assert len(calls) == 1
+        assert flights.get_stats()['in_flight'] == 0
+
+    def test_leader_exception_reaches_followers(self):
+        flights = SingleFlight()
+        owned, _ = flights.claim(['key'])
+        _, shared = flights.claim(['key'])
+
+        flights.fail(owned, RuntimeError("boom"))
+        with pytest.raises(RuntimeError, match="boom"):
+            shared['key'].result(0)
+
+    def test_missing_result_fails_followers(self):
+        flights = SingleFlight()
+        owned, _ = flights.claim(['a', 'b'])
+        _, shared = flights.claim(['b'])
+
+        flights.resolve(owned, {'a': 1})
+        assert owned['a'].result(0) == 1
+        with pytest.raises(RuntimeError):
+            shared['b'].result(0)
+
+
+class TestCoalescingLLMProvider:
+    def test_usage_is_billed_to_the_leader_only(self):
+        gate = threading.Event()
+        router = RoutingLLMProvider({'groq': FakeLLMProvider('primary', failures=1), 'openai': FakeLLMProvider('fallback', gate=gate)})
+        provider = CoalescingLLMProvider(router)
+        seen = []
+
+        def call():
+            provider.chat(MESSAGES)
+            seen.append((provider.get_last_token_usage(), provider.get_last_model()))
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: provider.flights.get_stats()['shared'] == 2)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(usage for usage, _ in seen) == [0, 0, 100]
+        assert {model for _, model in seen} == {('openai', 'fallback')}
+
+    def test_async_usage_is_billed_to_the_leader_only(self):
+        provider = CoalescingLLMProvider(FakeLLMProvider('model', delay=0.1))
+
+        async def call():
+            await provider.achat(MESSAGES)
+            return provider.get_last_token_usage()
+
+        async def main():
+            return await asyncio.gather(call(), call(), call())
+
+        assert sorted(asyncio.run(main())) == [0, 0, 100]
+        assert provider.provider.calls == 1
+
+    def test_different_params_are_not_shared(self):
+        inner = FakeLLMProvider('model')
+        provider = CoalescingLLMProvider(inner)
+
+        provider.chat(MESSAGES, {'temperature': 0.1})
+        provider.chat(MESSAGES, {'temperature': 0.9})
+        assert inner.calls == 2
+        assert provider.get_last_token_usage() == 100
+
+
+class TestCoalescingEmbeddingProvider:
+    def test_texts_in_flight_are_not_sent_again(self):
+        inner = FakeEmbeddingProvider()
+        provider = CoalescingEmbeddingProvider(inner)
+        owned, _ = provider.flights.claim([request_key('embed', inner.model, 'shared')])
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(provider.embed_batch(['shared', 'own', 'own'])))
+        thread.start()
+        _wait_for(lambda: inner.batches)
+        provider.flights.resolve(owned, {key: [9.0] for key in owned})
+        thread.join()
+
+        assert inner.batches == [['own']]
+        assert results == [[[9.0], [3.0], [3.0]]]
+
+    def test_short_batch_raises(self):
+        provider = CoalescingEmbeddingProvider(FakeEmbeddingProvider(short=True))
+
+        with pytest.raises(ValueError):
+            provider.embed_batch(['a', 'b'])
+        assert provider.flights.get_stats()['in_flight'] == 0
+
+
+class TestAnsweringModel:
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.setenv('AI_PROVIDER', 'groq')
+        monkeypatch.setenv('AI_MODEL', 'configured-model')
+        return AIService()
+
+    def test_configured_provider_keeps_the_configured_model(self, service):
+        service.llm_provider = FakeLLMProvider('anything')
+        assert service._answering_model() == ('groq', 'configured-model')
+
+    def test_fallback_provider_is_billed(self, service):
+        service.llm_provider = RoutingLLMProvider({'groq': FakeLLMProvider('primary', failures=1), 'openai': FakeLLMProvider('gpt-4o')})
+        service.llm_provider.chat(MESSAGES)
+        assert service._answering_model() == ('openai', 'gpt-4o')
@@ -0,0 +1,103 @@
+"""
+Tests for the RAG answer cache and its tenant scoping
+"""
+
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.rag.cache.answer_cache import AnswerCache, normalize_query
+from backend.rag.tools.supervisor import RAGSupervisor
+
+ALICE = {'user_id': '1'}
+BOB = {'user_id': '2'}
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.95)
+
+
+def _answer(text: str):
+    return {'answer': text, 'sources': [], 'confidence': 0.9}
+
+
+def test_normalize_query():
+    assert normalize_query("  What is your   PYTHON experience?? ") == "what is your python experience"
+
+
+class TestExactLevel:
+    def test_hit_after_normalization(self, cache):
+        cache.set("What is your Python experience?", {}, ALICE, _answer("five years"))
+        assert cache.get("what is your python experience", {}, ALICE)['answer'] == "five years"
+
+    def test_scoped_by_tenant_and_filters(self, cache):
+        cache.set("question", {'source_type': 'resume'}, ALICE, _answer("a"))
+
+        assert cache.get("question", {'source_type': 'resume'}, BOB) is None
+        assert cache.get("question", {'source_type': 'job'}, ALICE) is None
+        assert cache.get("question", {'source_type': 'resume'}, ALICE) is not None
+
+    def test_entries_expire(self, cache, monkeypatch):
+        cache.set("question", {}, ALICE, _answer("a"))
+
+        later = time.monotonic() + 61
+        monkeypatch.setattr("backend.rag.cache.answer_cache.time.monotonic", lambda: later)
+        assert cache.get("question", {}, ALICE) is None
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        cache = AnswerCache(max_entries=2)
+        cache.set("first", {}, ALICE, _answer("1"))
+        cache.set("second", {}, ALICE, _answer("2"))
+        cache.get("first", {}, ALICE)
+        cache.set("third", {}, ALICE, _answer("3"))
+
+        assert cache.get("second", {}, ALICE) is None
+        assert cache.get("first", {}, ALICE) is not None
+        assert cache.get_stats()['evictions'] == 1
+
+
+class TestSemanticLevel:
+    def test_similar_query_in_scope(self, cache):
+        embedding = np.array([1.0, 0.0, 0.0, 0.0])
+        cache.set("what is your python experience", {}, ALICE, _answer("five years"), embedding)
+
+        answer, similarity = cache.get_similar(np.array([0.99, 0.05, 0.0, 0.0]), {}, ALICE)
+        assert answer['answer'] == "five years"
+        assert similarity > 0.95
+
+        assert cache.get_similar(np.array([0.99, 0.05, 0.0, 0.0]), {}, BOB) is None
+        assert cache.get_similar(np.array([0.0, 1.0, 0.0, 0.0]), {}, ALICE) is None
+
+
+def test_invalidation_drops_matching_scopes(cache):
+    cache.set("resume question", {'source_type': 'resume'}, ALICE, _answer("r"))
+    cache.set("job question", {'source_type': 'job'}, ALICE, _answer("j"))
+    cache.set("unfiltered question", {}, ALICE, _answer("u"))
+
+    removed = cache.invalidate([{'source_type': 'resume', 'user_id': '1', 'document_id': 'cv'}])
+
+    assert removed == 2
+    assert cache.get("job question", {'source_type': 'job'}, ALICE) is not None
+    assert cache.get("resume question", {'source_type': 'resume'}, ALICE) is None
+
+
+class TestCacheTenant:
+    def test_users_of_an_organization_are_kept_apart(self):
+        # Retrieval covers the user's own chunks as well as the organization's
+        first = RAGSupervisor._cache_tenant({'user_id': '1', 'organization_id': 7})
+        second = RAGSupervisor._cache_tenant({'user_id': '2', 'organization_id': '7'})
+        assert first == {'user_id': '1', 'organization_id': '7'}
+        assert first != second
+
+    def test_user_without_organization(self):
+        assert RAGSupervisor._cache_tenant({'user_id': '3', 'organization_id': None}) == {'user_id': '3'}
+
+    def test_only_prompt_fields_come_from_the_client(self):
+        tenant = RAGSupervisor._cache_tenant({
+            'user_id': '3', 'organization_id': None, 'role': 'recruiter', 'theme': 'dark', 'request_id': 'abc'
+        })
+        assert tenant == {'user_id': '3', 'role': 'recruiter'}
@@ -0,0 +1,96 @@
+"""
+Tests for packing retrieved chunks into answer context
+"""
+
+import pytest
+
+from backend.rag.tools.context_packer import BLOCK_HEADER_TOKENS, ContextPacker, merge_overlapping, relevance
+from backend.rag.tools.tokenizer import Tokenizer
+
+
+class WordTokenizer(Tokenizer):
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def _chunk(chunk_id, content, document_id='doc', chunk_index=None, **extra):
+    return {
+        'chunk_id': chunk_id, 'content': content, 'document_id': document_id,
+        'chunk_index': chunk_id if chunk_index is None else chunk_index, 'source_type': 'resume', **extra
+    }
+
+
+def _packer(max_tokens: int = 1000):
+    return ContextPacker(tokenizer=WordTokenizer(), max_tokens=max_tokens, duplicate_similarity=0.98)
+
+
+def test_merge_overlapping_drops_the_repeated_sentences():
+    assert merge_overlapping("Built the API. Scaled it to millions.", "Scaled it to millions. Led the team.") == \
+        "Built the API. Scaled it to millions. Led the team."
+    assert merge_overlapping("Built the API.", "Led the team.") == "Built the API.\nLed the team."
+
+
+def test_relevance_prefers_the_fused_score():
+    assert relevance({'hybrid_score': 0.02, 'similarity_score': 0.9}) == 0.02
+    assert relevance({'keyword_score': 3.5}) == 3.5
+    assert relevance({}) == 0.0
+
+
+class TestDeduplication:
+    def test_same_hash_and_contained_text_are_dropped(self):
+        blocks = _packer().pack([
+            _chunk(1, "Led the Python platform team.", content_hash='a'),
+            _chunk(5, "Led the Python platform team, again.", content_hash='a'),
+            _chunk(9, "Python platform", content_hash='b'),
+        ])
+        assert [block['chunk_ids'] for block in blocks] == [[1]]
+
+    def test_near_identical_embeddings_are_dropped(self):
+        pytest.importorskip("numpy")
+        blocks = _packer().pack([
+            _chunk(1, "Kubernetes operator work.", embedding=[1.0, 0.0]),
+            _chunk(5, "Operating Kubernetes clusters.", embedding=[0.999, 0.01]),
+            _chunk(9, "Java backend services.", embedding=[0.0, 1.0]),
+        ])
+        assert [block['chunk_ids'] for block in blocks] == [[1], [9]]
+
+
+class TestMerging:
+    def test_consecutive_chunks_merge_and_keep_the_best_rank(self):
+        blocks = _packer().pack([
+            _chunk(2, "Scaled it to millions. Led the team.", similarity_score=0.9),
+            _chunk(7, "Other document text.", document_id='other', similarity_score=0.8),
+            _chunk(1, "Built the API. Scaled it to millions.", similarity_score=0.7),
+        ])
+
+        assert [block['chunk_ids'] for block in blocks] == [[1, 2], [7]]
+        merged = blocks[0]
+        assert merged['content'] == "Built the API. Scaled it to millions. Led the team."
+        assert merged['rank'] == 0 and merged['similarity_score'] == 0.9
+
+    def test_retriever_order_is_kept_across_score_scales(self):
+        blocks = _packer().pack([
+            _chunk(1, "Fused result first.", hybrid_score=0.016),
+            _chunk(5, "Vector result second.", similarity_score=0.95),
+        ])
+        assert [block['chunk_ids'] for block in blocks] == [[1], [5]]
+        assert blocks[0]['relevance'] == 0.016
+
+
+class TestBudget:
+    def test_blocks_past_the_budget_are_left_out(self):
+        chunks = [_chunk(i * 10, f"Chunk {i} has five words.") for i in range(4)]
+        blocks = _packer(max_tokens=2 * (5 + BLOCK_HEADER_TOKENS)).pack(chunks)
+
+        assert [block['chunk_ids'] for block in blocks] == [[0], [10]]
+        assert sum(block['token_count'] for block in blocks) <= 2 * (5 + BLOCK_HEADER_TOKENS)
+
+    def test_oversized_merged_block_is_split_into_chunks(self):
+        chunks = [
+            _chunk(1, "one two three four five six"),
+            _chunk(2, "seven eight nine ten eleven twelve"),
+        ]
+        blocks = _packer(max_tokens=6 + BLOCK_HEADER_TOKENS).pack(chunks)
+
+        assert [block['chunk_ids'] for block in blocks] == [[1]]
+        assert blocks[0]['content'] == "one two three four five six"
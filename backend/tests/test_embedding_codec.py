@@ -0,0 +1,59 @@
+"""
+Tests for the packed embedding format
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend.rag.models.embedding_codec import EMBEDDING_MAGIC, EMBEDDING_DTYPES, encode_embedding, decode_embedding
+
+
+@pytest.fixture
+def embedding():
+    return np.random.default_rng(0).normal(size=384).astype(np.float32)
+
+
+def test_float32_round_trip_is_exact(embedding):
+    encoded = encode_embedding(embedding)
+
+    assert encoded[:2] == EMBEDDING_MAGIC + bytes([EMBEDDING_DTYPES['float32']])
+    assert len(encoded) == 2 + 4 * embedding.size
+    decoded = decode_embedding(encoded)
+    assert decoded.dtype == np.float32
+    assert np.array_equal(decoded, embedding)
+
+
+@pytest.mark.parametrize("dtype, bytes_per_value, tolerance", [('float16', 2, 1e-2), ('int8', 1, 3e-2)])
+def test_quantised_round_trip_is_close(embedding, dtype, bytes_per_value, tolerance):
+    encoded = encode_embedding(embedding, dtype)
+
+    assert len(encoded) == 2 + (4 if dtype == 'int8' else 0) + bytes_per_value * embedding.size
+    decoded = decode_embedding(encoded)
+    assert np.max(np.abs(decoded - embedding)) <= tolerance * np.max(np.abs(embedding))
+    cosine = float(decoded @ embedding / (np.linalg.norm(decoded) * np.linalg.norm(embedding)))
+    assert cosine > 0.999
+
+
+def test_buffer_types_decode(embedding):
+    encoded = encode_embedding(embedding)
+    assert np.array_equal(decode_embedding(memoryview(encoded)), embedding)
+    assert np.array_equal(decode_embedding(bytearray(encoded)), embedding)
+
+
+def test_legacy_json_text_still_decodes():
+    assert decode_embedding(json.dumps([0.5, -1.0, 2.0])).tolist() == [0.5, -1.0, 2.0]
+
+
+def test_zero_vector_int8():
+    assert decode_embedding(encode_embedding([0.0, 0.0, 0.0], 'int8')).tolist() == [0.0, 0.0, 0.0]
+
+
+def test_invalid_input():
+    assert decode_embedding(None) is None
+    with pytest.raises(ValueError):
+        encode_embedding([1.0], 'float64')
+    with pytest.raises(ValueError):
+        decode_embedding(b'not an embedding')
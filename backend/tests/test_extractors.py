@@ -0,0 +1,114 @@
+"""
+Tests for PDF and DOCX text extraction and the extraction cache
+"""
+
+import io
+
+import pytest
+
+from backend.rag.cache.extraction_cache import ExtractionCache
+from backend.rag.tools import extractors
+from backend.rag.tools.extractors import extract_text, extract_text_blocks, iter_docx_paragraphs, iter_pdf_pages
+
+
+def _pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page"""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(pages),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, text in zip(page_ids, pages):
+        content = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1))
+        objects[page_id + 1] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = out.tell()
+        out.write(b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for number in sorted(objects):
+        out.write(b"%010d 00000 n \n" % offsets[number])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    out.seek(0)
+    return out
+
+
+def _docx():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("First paragraph")
+    document.add_paragraph("")
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Python"
+    table.cell(0, 1).text = "Flask"
+    paragraph = document.add_paragraph("Tab")
+    paragraph.add_run().add_tab()
+    paragraph.add_run("separated")
+    out = io.BytesIO()
+    document.save(out)
+    out.seek(0)
+    return out
+
+
+class TestPdf:
+    def test_pages_are_streamed_in_order(self):
+        pytest.importorskip("pypdf")
+        assert [page.strip() for page in iter_pdf_pages(_pdf(["First page", "Second page"]))] == ["First page", "Second page"]
+
+    def test_unreadable_pdf_raises_value_error(self):
+        pytest.importorskip("pypdf")
+        with pytest.raises(ValueError):
+            list(iter_pdf_pages(io.BytesIO(b"%PDF-1.4 not really a pdf")))
+
+
+class TestDocx:
+    def test_paragraphs_and_table_cells(self):
+        assert list(iter_docx_paragraphs(_docx())) == [
+            "First paragraph\n", "Python\n", "Flask\n", "Tab\tseparated\n"
+        ]
+
+    def test_unreadable_docx_raises_value_error(self):
+        with pytest.raises(ValueError):
+            list(iter_docx_paragraphs(io.BytesIO(b"not a zip file")))
+
+
+class TestExtractTextBlocks:
+    def test_unsupported_type(self):
+        with pytest.raises(ValueError):
+            list(extract_text_blocks(io.BytesIO(b"data"), "rtf"))
+
+    def test_path_source(self, tmp_path):
+        path = tmp_path / "cv.docx"
+        path.write_bytes(_docx().getvalue())
+        assert "First paragraph" in extract_text(str(path), ".DOCX", cache=ExtractionCache(str(tmp_path / "cache")))
+
+    def test_repeat_extraction_is_served_from_the_cache(self, tmp_path, monkeypatch):
+        cache = ExtractionCache(str(tmp_path))
+        upload = _docx()
+        text = extract_text(upload, "docx", cache)
+
+        def unavailable(stream):
+            raise AssertionError("extractor ran on a cached file")
+
+        monkeypatch.setitem(extractors.EXTRACTORS, "docx", unavailable)
+        assert extract_text(upload, "docx", cache) == text
+        assert cache.hits == 1
+
+    def test_partial_extraction_is_not_cached(self, tmp_path):
+        cache = ExtractionCache(str(tmp_path))
+        upload = _docx()
+
+        blocks = extract_text_blocks(upload, "docx", cache)
+        next(blocks)
+        blocks.close()
+
+        assert list(tmp_path.iterdir()) == []
+        assert extract_text(upload, "docx", cache).startswith("First paragraph")
+        assert cache.hits == 0
@@ -0,0 +1,209 @@
+"""
+Tests for the RAG ingestion job queue and worker
+"""
+
+import io
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.extensions import db
+from backend.models.ingestion_job import IngestionJob
+from backend.rag.config import RAGConfig
+from backend.rag.jobs import IngestionWorker, enqueue_ingestion_job, enqueue_file_ingestion_job, claim_next_job, retry_job
+from backend.rag.jobs.queue import fail_job
+from backend.rag.models import DocumentChunk, EmbeddingStore
+
+
+def _document(count: int, topic: str = "python") -> str:
+    return " ".join(f"Sentence {i} describes {topic} work on project {i} in some detail." for i in range(count))
+
+
+@pytest.fixture
+def worker(app, embedding_provider):
+    worker = IngestionWorker(app, concurrency=1, poll_interval=0)
+    worker.embedder.embedding_provider = embedding_provider
+    return worker
+
+
+def _run(worker) -> int:
+    """Process every runnable job, then drop this session's stale copies of the rows the worker changed"""
+    processed = worker.run_until_empty()
+    db.session.expire_all()
+    return processed
+
+
+def _live_chunks(document_id: str):
+    return db.session.query(DocumentChunk).filter(
+        DocumentChunk.document_id == document_id,
+        DocumentChunk.deleted_at.is_(None)
+    ).all()
+
+
+class TestQueue:
+    def test_identical_content_reuses_the_job(self, app):
+        job, created = enqueue_ingestion_job(_document(5), 'text', user_id=None, document_id='doc')
+        again, created_again = enqueue_ingestion_job(_document(5), 'text', user_id=None, document_id='doc')
+
+        assert created and not created_again
+        assert again.id == job.id
+
+    def test_reverted_content_is_queued_again(self, app):
+        first, _ = enqueue_ingestion_job("version A", 'text', document_id='doc')
+        enqueue_ingestion_job("version B", 'text', document_id='doc')
+        reverted, created = enqueue_ingestion_job("version A", 'text', document_id='doc')
+
+        assert created
+        assert reverted.id != first.id
+
+    def test_unknown_mode_is_rejected(self, app):
+        with pytest.raises(ValueError):
+            enqueue_ingestion_job("text", 'text', mode='replace')
+
+    def test_claim_is_exclusive(self, app):
+        job, _ = enqueue_ingestion_job("some text", 'text', document_id='doc')
+
+        assert claim_next_job('worker-1') == job.id
+        assert claim_next_job('worker-2') is None
+
+        db.session.refresh(job)
+        assert job.status == IngestionJob.STATUS_RUNNING
+        assert job.locked_by == 'worker-1'
+        assert job.attempts == 1
+
+    def test_expired_lease_is_reclaimed(self, app):
+        job, _ = enqueue_ingestion_job("some text", 'text', document_id='doc')
+        claim_next_job('worker-1')
+
+        job.locked_at = datetime.utcnow() - timedelta(seconds=RAGConfig.JOB_LEASE_SECONDS + 1)
+        db.session.commit()
+
+        assert claim_next_job('worker-2') == job.id
+        db.session.refresh(job)
+        assert job.locked_by == 'worker-2'
+        assert job.attempts == 2
+
+    def test_later_version_waits_for_the_earlier_one(self, app):
+        first, _ = enqueue_ingestion_job("version A", 'text', document_id='doc')
+        second, _ = enqueue_ingestion_job("version B", 'text', document_id='doc')
+        other, _ = enqueue_ingestion_job("other document", 'text', document_id='other')
+
+        assert claim_next_job('worker-1') == first.id
+        assert claim_next_job('worker-2') == other.id
+        assert claim_next_job('worker-3') is None
+        assert second.status == IngestionJob.STATUS_QUEUED
+
+    def test_failure_backs_off_then_fails_permanently(self, app):
+        job, _ = enqueue_ingestion_job("some text", 'text', document_id='doc')
+        job.max_attempts = 2
+        db.session.commit()
+
+        claim_next_job('worker')
+        fail_job(job, RuntimeError("boom"))
+        assert job.status == IngestionJob.STATUS_QUEUED
+        assert job.run_after > datetime.utcnow()
+        assert claim_next_job('worker') is None
+
+        job.run_after = None
+        db.session.commit()
+        claim_next_job('worker')
+        fail_job(job, RuntimeError("boom again"))
+        assert job.status == IngestionJob.STATUS_FAILED
+        assert job.error == "boom again"
+
+        retry_job(job)
+        assert job.status == IngestionJob.STATUS_QUEUED
+        assert job.attempts == 0
+
+
+class TestWorker:
+    def test_job_is_retried_after_an_embedding_failure(self, app, worker, embedding_provider):
+        job, _ = enqueue_ingestion_job(_document(20, "retry"), 'text', document_id='doc')
+        worker.embedder.config.EMBEDDING_MAX_RETRIES = 0
+        embedding_provider.failures = 1
+
+        assert _run(worker) == 1
+        job = db.session.get(IngestionJob, job.id)
+        assert job.status == IngestionJob.STATUS_QUEUED
+        assert "failed to embed" in job.error
+        assert not _live_chunks('doc')
+
+        job.run_after = None
+        db.session.commit()
+        assert _run(worker) == 1
+
+        job = db.session.get(IngestionJob, job.id)
+        assert job.status == IngestionJob.STATUS_COMPLETED
+        assert job.stored_chunks == job.total_chunks > 0
+        assert len(_live_chunks('doc')) == job.total_chunks
+        assert db.session.query(EmbeddingStore).count() == job.total_chunks
+
+    def test_incremental_update_only_embeds_changed_chunks(self, app, worker, embedding_provider):
+        text = _document(200)
+        first, _ = enqueue_ingestion_job(text, 'text', document_id='doc')
+        _run(worker)
+        first = db.session.get(IngestionJob, first.id)
+        embedded_before = sum(len(batch) for batch in embedding_provider.batches)
+
+        second, _ = enqueue_ingestion_job(text + " One more sentence about kubernetes operations.", 'text', document_id='doc')
+        _run(worker)
+        second = db.session.get(IngestionJob, second.id)
+
+        assert second.status == IngestionJob.STATUS_COMPLETED
+        assert second.skipped_chunks == second.total_chunks - 1
+        assert second.stored_chunks == 1
+        assert sum(len(batch) for batch in embedding_provider.batches) - embedded_before == 1
+        assert len(_live_chunks('doc')) == second.total_chunks
+
+    def test_incremental_update_tombstones_removed_chunks(self, app, worker):
+        enqueue_ingestion_job(_document(200), 'text', document_id='doc')
+        _run(worker)
+
+        shorter, _ = enqueue_ingestion_job(_document(100), 'text', document_id='doc')
+        _run(worker)
+        shorter = db.session.get(IngestionJob, shorter.id)
+
+        assert shorter.removed_chunks > 0
+        assert len(_live_chunks('doc')) == shorter.total_chunks
+        live_ids = [chunk.id for chunk in _live_chunks('doc')]
+        assert db.session.query(EmbeddingStore).filter(~EmbeddingStore.chunk_id.in_(live_ids)).count() == 0
+
+    def test_append_mode_keeps_existing_chunks(self, app, worker):
+        first, _ = enqueue_ingestion_job(_document(200), 'text', document_id='doc')
+        _run(worker)
+        first = db.session.get(IngestionJob, first.id)
+
+        appended, _ = enqueue_ingestion_job(_document(10, "golang"), 'text', document_id='doc', mode=IngestionJob.MODE_APPEND)
+        _run(worker)
+        appended = db.session.get(IngestionJob, appended.id)
+
+        assert appended.removed_chunks == 0
+        assert len(_live_chunks('doc')) == first.total_chunks + appended.stored_chunks
+
+    def test_uploaded_file_is_extracted_by_the_worker(self, app, worker):
+        docx = pytest.importorskip("docx")
+        document = docx.Document()
+        for i in range(30):
+            document.add_paragraph(f"Paragraph {i} about distributed systems and flask services.")
+        upload = io.BytesIO()
+        document.save(upload)
+
+        job, created = enqueue_file_ingestion_job(upload, 'docx', 'file_upload', document_id='cv', filename='My CV.docx')
+        duplicate, created_again = enqueue_file_ingestion_job(upload, 'docx', 'file_upload', document_id='cv', filename='My CV.docx')
+
+        assert created and not created_again and duplicate.id == job.id
+        assert job.content == '' and os.path.exists(job.file_path)
+        file_path = job.file_path
+
+        _run(worker)
+        job = db.session.get(IngestionJob, job.id)
+
+        assert job.status == IngestionJob.STATUS_COMPLETED, job.error
+        assert job.stored_chunks > 0
+        assert "distributed systems" in " ".join(chunk.content for chunk in _live_chunks('cv'))
+        assert not os.path.exists(file_path)
+
+    def test_unsupported_upload_type_is_rejected(self, app):
+        with pytest.raises(ValueError):
+            enqueue_file_ingestion_job(io.BytesIO(b"data"), 'exe', 'file_upload')
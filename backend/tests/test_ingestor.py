@@ -0,0 +1,84 @@
+"""
+Tests for IngestorTool chunking
+"""
+
+import re
+from itertools import islice
+
+import pytest
+
+from backend.rag.tools.ingestor import IngestorTool
+from backend.rag.tools.tokenizer import Tokenizer
+
+SENTENCE = re.compile(r"Sentence number \d+ is here\.")
+
+
+class WordTokenizer(Tokenizer):
+    """One token per whitespace-separated word, so budgets are easy to reason about"""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def _sentences(count: int):
+    return [f"Sentence number {i} is here." for i in range(count)]
+
+
+@pytest.fixture
+def ingestor():
+    ingestor = IngestorTool(tokenizer=WordTokenizer())
+    ingestor.config.CHUNK_TOKENS = 20
+    ingestor.config.CHUNK_OVERLAP_TOKENS = 8
+    return ingestor
+
+
+class TestSentenceChunks:
+    def test_chunks_fit_the_token_budget(self, ingestor):
+        chunks = ingestor.ingest_text(" ".join(_sentences(30)), chunking_strategy="sentence")
+
+        assert len(chunks) > 1
+        assert all(len(chunk['content'].split()) <= 20 for chunk in chunks)
+        text = " ".join(chunk['content'] for chunk in chunks)
+        assert all(sentence in text for sentence in _sentences(30))
+
+    def test_chunks_overlap_by_whole_trailing_sentences(self, ingestor):
+        chunks = [
+            SENTENCE.findall(chunk['content'])
+            for chunk in ingestor.ingest_text(" ".join(_sentences(30)), chunking_strategy="semantic")
+        ]
+
+        for previous, current in zip(chunks, chunks[1:]):
+            # 5-token sentences under an 8-token overlap: exactly the last one carries over
+            assert current[0] == previous[-1]
+            assert current[1] not in previous
+
+    def test_long_sentences_are_split(self, ingestor):
+        sentence = " ".join(f"word{i}" for i in range(50)) + "."
+        chunks = ingestor.ingest_text(sentence, chunking_strategy="sentence")
+
+        assert len(chunks) == 3
+        assert all(len(chunk['content'].split()) <= 20 for chunk in chunks)
+
+
+class TestFixedSizeChunks:
+    def test_overlap_not_smaller_than_size_still_advances(self, ingestor):
+        ingestor.config.CHUNK_SIZE = 40
+        ingestor.config.CHUNK_OVERLAP = 60
+        text = " ".join(f"word{i}" for i in range(200))
+
+        chunks = list(islice(ingestor._iter_fixed_size_chunks([text]), 1000))
+
+        assert len(chunks) < 1000
+        assert all(len(chunk) <= 40 for chunk in chunks)
+        assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+
+    def test_chunks_overlap(self, ingestor):
+        ingestor.config.CHUNK_SIZE = 40
+        ingestor.config.CHUNK_OVERLAP = 10
+        text = " ".join(f"word{i}" for i in range(200))
+
+        chunks = list(ingestor._iter_fixed_size_chunks([text]))
+
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current[:5] in previous
+        assert chunks[-1].endswith("word199")
@@ -0,0 +1,48 @@
+"""
+Tests for the BM25 keyword index
+"""
+
+import pytest
+
+from backend.rag.index import KeywordIndex
+
+
+class TestKeywordIndex:
+    @pytest.fixture
+    def index(self):
+        index = KeywordIndex()
+        index.add(
+            [1, 2, 3, 4],
+            [
+                "Python developer with Flask and SQLAlchemy experience",
+                "Kubernetes operator, Python tooling",
+                "Java Spring backend engineer",
+                "python python python scripting enthusiast",
+            ],
+            [{'user_id': '1'}, {'user_id': '2'}, {'user_id': '1'}, {'user_id': '1'}]
+        )
+        return index
+
+    def test_bm25_ranks_matching_chunks(self, index):
+        results = index.search("flask python", 10)
+        assert results[0][0] == 1
+        assert {chunk_id for chunk_id, _ in results} == {1, 2, 4}
+
+    def test_require_all_terms(self, index):
+        assert [chunk_id for chunk_id, _ in index.search("python kubernetes", 10, require_all=True)] == [2]
+
+    def test_filters(self, index):
+        assert {chunk_id for chunk_id, _ in index.search("python", 10, filters={'user_id': 1})} == {1, 4}
+        assert [chunk_id for chunk_id, _ in index.search("python", 10, filters={'chunk_id': ['2', 3]})] == [2]
+
+        with pytest.raises(ValueError):
+            index.search("python", 10, filters={'salary': 1})
+
+    def test_replace_and_remove(self, index):
+        index.add([3], ["Python data engineer"], [{'user_id': '1'}])
+        assert 3 in {chunk_id for chunk_id, _ in index.search("python", 10)}
+        assert not index.search("spring", 10)
+
+        assert index.remove([1, 99]) == 1
+        assert 1 not in index
+        assert 1 not in {chunk_id for chunk_id, _ in index.search("python", 10)}
@@ -0,0 +1,80 @@
+"""
+Tests for bounded interview conversation context
+"""
+
+from datetime import datetime
+
+import pytest
+
+from backend.extensions import db
+from backend.memory_service import ConversationMemoryService
+from backend.models import ConversationMemory, ConversationMessage, Interview, User
+from backend.rag.tools.tokenizer import Tokenizer
+
+
+class WordTokenizer(Tokenizer):
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+@pytest.fixture
+def interview(app):
+    user = User(email="candidate@example.test")
+    db.session.add(user)
+    db.session.flush()
+    interview = Interview(title="Backend engineer", scheduled_at=datetime(2026, 1, 1), user_id=user.id)
+    db.session.add(interview)
+    db.session.commit()
+    return interview
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ConversationMemoryService()
+    service.tail_tokens = 10
+    service._tokenizer = WordTokenizer()
+    service.refreshes = []
+    monkeypatch.setattr(service, 'schedule_refresh', lambda *args: service.refreshes.append(args))
+    return service
+
+
+def _messages(interview, count):
+    messages = [
+        ConversationMessage(interview_id=interview.id, sender_type="user", sender_user_id=interview.user_id,
+                            content=f"message {i} four words")
+        for i in range(count)
+    ]
+    db.session.add_all(messages)
+    db.session.commit()
+    return messages
+
+
+def test_history_within_the_budget_needs_no_summary(service, interview):
+    _messages(interview, 2)
+
+    summary, history = service.build_context(interview)
+
+    assert summary is None and len(history) == 2
+    assert service.refreshes == []
+
+
+def test_overflow_is_kept_until_it_is_summarised(service, interview):
+    messages = _messages(interview, 4)
+
+    summary, history = service.build_context(interview)
+
+    # Only two messages fit the tail; all four are sent while the refresh runs
+    assert [turn['content'] for turn in history] == [message.content for message in messages]
+    assert service.refreshes == [(interview.id, interview.user_id, messages[2].id)]
+
+
+def test_summarised_messages_leave_the_history(service, interview):
+    messages = _messages(interview, 4)
+    ConversationMemory.save_summary(interview.id, interview.user_id, "Earlier turns",
+                                    {"through_message_id": messages[2].id})
+
+    summary, history = service.build_context(interview)
+
+    assert summary == "Earlier turns"
+    assert [turn['content'] for turn in history] == [messages[3].content]
+    assert service.refreshes == []
@@ -0,0 +1,43 @@
+"""
+Tests for access control on the RAG API
+"""
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from backend.extensions import db
+from backend.models import Organization, TeamMember, User
+
+
+@pytest.fixture
+def users(app):
+    """An organization Admin and an individual user"""
+    organization = Organization(name="Acme")
+    admin = User(email="admin@acme.test", role="organization", organization=organization)
+    member = User(email="member@example.test")
+    db.session.add_all([organization, admin, member])
+    db.session.flush()
+    db.session.add(TeamMember(organization_id=organization.id, user_id=admin.id, role="Admin"))
+    db.session.commit()
+    return {'admin': admin.id, 'member': member.id}
+
+
+def _client(app, user_id=None):
+    client = app.test_client()
+    if user_id is not None:
+        client.set_cookie("access_token_cookie", create_access_token(identity=str(user_id)))
+    return client
+
+
+def test_clear_cache_is_for_admins_only(app, users):
+    assert _client(app, users['member']).post("/api/rag/clear-cache").status_code == 403
+    assert _client(app, users['admin']).post("/api/rag/clear-cache").status_code == 200
+
+
+def test_estimate_cost_requires_a_token(app, users):
+    assert _client(app).post("/api/rag/estimate-cost", json={'text_lengths': [100]}).status_code == 401
+    assert _client(app, users['member']).post("/api/rag/estimate-cost", json={'text_lengths': [100]}).status_code == 200
+
+
+def test_test_route_is_gone(app):
+    assert _client(app).get("/api/rag/test").status_code == 404
@@ -0,0 +1,134 @@
+"""
+Tests for the retriever's filter compiler
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+np = pytest.importorskip("numpy")
+
+from backend.rag.config import RAGConfig
+from backend.rag.index import NumpyVectorIndex
+from backend.rag.models import DocumentChunk, EmbeddingStore
+from backend.rag.models.embedding_codec import encode_embedding
+from backend.rag.models.vector_store import create_rag_tables, fts_language
+from backend.rag.tools.retriever import RetrieverTool
+
+# (user_id, organization_id, source_type, skill, processed_at, embedding)
+ROWS = [
+    ('1', None, 'resume', 'python', datetime(2024, 1, 1), [1.0, 0.0, 0.0, 0.0]),
+    ('2', None, 'resume', 'java', datetime(2024, 6, 1), [0.9, 0.1, 0.0, 0.0]),
+    ('1', '9', 'job', 'python', datetime(2024, 6, 1), [0.0, 1.0, 0.0, 0.0]),
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    create_rag_tables(engine)
+    return engine
+
+
+@pytest.fixture
+def chunk_ids(engine):
+    """IDs of the seeded chunks, in ROWS order"""
+    ids = []
+    with Session(engine) as session:
+        for index, (user_id, organization_id, source_type, skill, processed_at, embedding) in enumerate(ROWS):
+            chunk = DocumentChunk(
+                document_id=f'doc{index}', chunk_index=0, content=f"{skill} experience", content_hash=str(index),
+                source_type=source_type, user_id=user_id, organization_id=organization_id,
+                word_count=2, char_count=20, processed_at=processed_at,
+                chunk_metadata=json.dumps({'skill': skill})
+            )
+            session.add(chunk)
+            session.flush()
+            session.add(EmbeddingStore(
+                chunk_id=chunk.id, document_id=chunk.document_id, source_type=source_type,
+                user_id=user_id, organization_id=organization_id, embedding=encode_embedding(embedding)
+            ))
+            ids.append(chunk.id)
+        session.commit()
+    return ids
+
+
+@pytest.fixture
+def retriever(engine, chunk_ids):
+    index = NumpyVectorIndex(dimension=4)
+    index.add(
+        chunk_ids,
+        [row[5] for row in ROWS],
+        [{'user_id': row[0], 'organization_id': row[1], 'source_type': row[2], 'document_id': f'doc{i}'}
+         for i, row in enumerate(ROWS)]
+    )
+    return RetrieverTool(db_engine=engine, vector_index=index)
+
+
+def _matching(retriever, filters):
+    return sorted(result['chunk_id'] for result in retriever.search_by_metadata(filters))
+
+
+class TestFilterCompiler:
+    def test_equality_coerces_tenant_ids(self, retriever, chunk_ids):
+        assert _matching(retriever, {'user_id': 1}) == [chunk_ids[0], chunk_ids[2]]
+
+    def test_in_lists(self, retriever, chunk_ids):
+        assert _matching(retriever, {'user_id': [1, 2], 'source_type': ['job']}) == [chunk_ids[2]]
+
+    def test_none_matches_null(self, retriever, chunk_ids):
+        assert _matching(retriever, {'organization_id': None}) == chunk_ids[:2]
+
+    def test_date_range(self, retriever, chunk_ids):
+        assert _matching(retriever, {'processed_at': {'gte': '2024-03-01T00:00:00Z'}}) == chunk_ids[1:]
+        assert _matching(retriever, {'processed_at': {'gt': '2024-01-01', 'lt': '2024-06-01'}}) == []
+
+        with pytest.raises(ValueError):
+            retriever.search_by_metadata({'processed_at': {'after': '2024-01-01'}})
+        with pytest.raises(ValueError):
+            retriever.search_by_metadata({'processed_at': '2024-01-01'})
+
+    def test_json_metadata(self, retriever, chunk_ids):
+        assert _matching(retriever, {'metadata': {'skill': 'python'}}) == [chunk_ids[0], chunk_ids[2]]
+        assert _matching(retriever, {'metadata': {'skill': ['java', 'python']}}) == chunk_ids
+
+        with pytest.raises(ValueError):
+            retriever.search_by_metadata({'metadata': 'python'})
+
+    def test_tenant_is_the_user_or_the_organization(self, retriever, chunk_ids):
+        assert _matching(retriever, {'tenant': {'user_id': 2, 'organization_id': 9}}) == chunk_ids[1:]
+        assert _matching(retriever, {'tenant': {'user_id': '3', 'organization_id': None}}) == []
+        assert _matching(retriever, {'tenant': {}}) == []
+
+    def test_unsupported_keys_are_ignored(self, retriever, chunk_ids):
+        assert _matching(retriever, {'salary': 100}) == chunk_ids
+
+
+class TestIndexFilters:
+    def test_residual_filters_become_an_allow_list(self, retriever, chunk_ids):
+        compiled = retriever._compile_index_filters({'user_id': '1', 'metadata': {'skill': 'python'}})
+        assert compiled['user_id'] == '1'
+        assert sorted(compiled['chunk_id']) == [chunk_ids[0], chunk_ids[2]]
+
+        assert retriever._compile_index_filters({'metadata': {'skill': 'rust'}}) is None
+
+    def test_index_search_honours_sql_only_filters(self, retriever, chunk_ids):
+        results = retriever.retrieve_similar(
+            [1.0, 0.0, 0.0, 0.0], top_k=3, similarity_threshold=0.1, filters={'metadata': {'skill': 'java'}}
+        )
+        assert [result['chunk_id'] for result in results] == [chunk_ids[1]]
+        assert results[0]['metadata'] == {'skill': 'java'}
+
+
+class TestFullTextLanguage:
+    def test_regconfig_names_are_accepted(self, monkeypatch):
+        monkeypatch.setattr(RAGConfig, 'FTS_LANGUAGE', 'pg_catalog.english')
+        assert fts_language() == 'pg_catalog.english'
+
+    def test_anything_else_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(RAGConfig, 'FTS_LANGUAGE', "english'::regconfig, content)); DROP TABLE users; --")
+        with pytest.raises(ValueError):
+            fts_language()
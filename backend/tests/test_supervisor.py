@@ -0,0 +1,102 @@
+"""
+Tests for RAGSupervisor workflows
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.rag.models import DocumentChunk, EmbeddingStore
+from backend.rag.models.vector_store import create_rag_tables
+from backend.rag.tools.batch_ingestor import BatchIngestor
+from backend.rag.tools.embedder import EmbedderTool
+from backend.rag.tools.retriever import RetrieverTool
+from backend.rag.tools.supervisor import RAGSupervisor
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    create_rag_tables(engine)
+    return engine
+
+
+@pytest.fixture
+def supervisor(engine, embedding_provider):
+    embedder = EmbedderTool()
+    embedder.embedding_provider = embedding_provider
+    return RAGSupervisor(embedder=embedder, retriever=RetrieverTool(db_engine=engine))
+
+
+class TestBatchWorkflow:
+    def test_documents_are_stored_for_the_requesting_user(self, supervisor, engine):
+        result = supervisor.orchestrate_workflow(
+            [{'content': "Python developer. Built Flask APIs.", 'document_id': 'a', 'user_id': '99'},
+             "Java engineer with Spring experience."],
+            'batch', user_context={'user_id': '7'}
+        )
+
+        assert result['final_result']['successful'] == 2
+        results = result['final_result']['results']
+        assert all(item['chunk_ids'] and 'chunks' not in item for item in results)
+        with Session(engine) as session:
+            assert {chunk.user_id for chunk in session.query(DocumentChunk)} == {'7'}
+            assert session.query(EmbeddingStore).count() == sum(len(item['chunk_ids']) for item in results)
+
+    def test_chunks_are_returned_without_a_database(self, embedding_provider):
+        embedder = EmbedderTool()
+        embedder.embedding_provider = embedding_provider
+        supervisor = RAGSupervisor(embedder=embedder, retriever=RetrieverTool())
+
+        result = supervisor.orchestrate_workflow(["Python developer."], 'batch')
+
+        [item] = result['final_result']['results']
+        assert item['success'] and item['chunks'][0]['embedding'] is not None
+
+
+def test_batch_ingestor_chunks_in_spawned_processes(embedding_provider):
+    embedder = EmbedderTool()
+    embedder.embedding_provider = embedding_provider
+    # A generator is never chunked inline, so this goes through the pool
+    documents = ({'content': f"Document {i} about Python."} for i in range(3))
+    with BatchIngestor(embedder=embedder, processes=2) as ingestor:
+        results = ingestor.ingest(documents)
+
+    assert [item['success'] for item in results] == [True, True, True]
+
+
+class EchoGenerator:
+    """Answers with the retrieved chunks instead of calling a model"""
+
+    def generate_answer(self, query, context_chunks, user_context=None, **kwargs):
+        return {'answer': " ".join(chunk['content'] for chunk in context_chunks), 'confidence': 1.0}
+
+
+class TestQueryTenancy:
+    QUESTION = "Python developer with Flask experience."
+
+    @pytest.fixture
+    def supervisor(self, engine, embedding_provider):
+        embedder = EmbedderTool()
+        embedder.embedding_provider = embedding_provider
+        supervisor = RAGSupervisor(embedder=embedder, retriever=RetrieverTool(db_engine=engine), generator=EchoGenerator())
+        supervisor.orchestrate_workflow([self.QUESTION], 'batch', user_context={'user_id': '1'})
+        return supervisor
+
+    def _sources(self, supervisor, user_context, filters=None):
+        result = supervisor.orchestrate_workflow(
+            {'query': self.QUESTION, 'filters': filters or {}}, 'query', user_context=user_context
+        )
+        return result['final_result']['sources']
+
+    def test_owner_retrieves_their_chunks(self, supervisor):
+        assert [source['user_id'] for source in self._sources(supervisor, {'user_id': '1', 'organization_id': None})] == ['1']
+
+    def test_another_user_cannot_retrieve_them(self, supervisor):
+        intruder = {'user_id': '2', 'organization_id': None}
+        assert self._sources(supervisor, intruder) == []
+        assert self._sources(supervisor, intruder, {'user_id': '1'}) == []
+        assert self._sources(supervisor, intruder, {'tenant': {'user_id': '1'}}) == []
+
+    def test_organization_does_not_open_other_users_chunks(self, supervisor):
+        assert self._sources(supervisor, {'user_id': '2', 'organization_id': '5'}, {'organization_id': None}) == []
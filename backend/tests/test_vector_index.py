@@ -0,0 +1,168 @@
+"""
+Tests for the in-process vector indexes and their synchronisation with the store
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+np = pytest.importorskip("numpy")
+
+from backend.rag.index import (
+    NumpyVectorIndex, HNSWVectorIndex, KeywordIndex, measure_index_recall, register_index, unregister_index
+)
+from backend.rag.models import DocumentChunk, EmbeddingStore
+from backend.rag.models.embedding_codec import encode_embedding
+from backend.rag.models.vector_store import create_rag_tables
+
+
+def _vectors(count: int, dimension: int = 16, seed: int = 0):
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+
+def _metadata(count: int):
+    return [{'user_id': str(i % 3), 'source_type': 'resume' if i % 2 else 'job', 'document_id': f'doc{i}'} for i in range(count)]
+
+
+@pytest.fixture(params=[NumpyVectorIndex, HNSWVectorIndex], ids=['numpy', 'hnsw'])
+def vector_index(request):
+    if request.param is HNSWVectorIndex:
+        return HNSWVectorIndex(dimension=16, seed=7)
+    return NumpyVectorIndex(dimension=16)
+
+
+class TestVectorIndexes:
+    def test_nearest_vector_is_itself(self, vector_index):
+        vectors = _vectors(200)
+        vector_index.add(list(range(200)), vectors, _metadata(200))
+
+        chunk_id, similarity = vector_index.search(vectors[42], 1)[0]
+        assert chunk_id == 42
+        assert similarity == pytest.approx(1.0, abs=1e-5)
+
+    def test_filters_and_allow_list(self, vector_index):
+        vectors = _vectors(200)
+        vector_index.add(list(range(200)), vectors, _metadata(200))
+
+        results = vector_index.search(vectors[0], 10, filters={'user_id': 1, 'source_type': ['resume']})
+        assert results
+        assert all(chunk_id % 3 == 1 and chunk_id % 2 == 1 for chunk_id, _ in results)
+
+        allowed = [5, 17, 99]
+        assert {chunk_id for chunk_id, _ in vector_index.search(vectors[0], 10, filters={'chunk_id': allowed})} == set(allowed)
+
+    def test_similarity_threshold(self, vector_index):
+        vectors = _vectors(50)
+        vector_index.add(list(range(50)), vectors)
+
+        results = vector_index.search(vectors[3], 50, similarity_threshold=0.99)
+        assert [chunk_id for chunk_id, _ in results] == [3]
+
+    def test_replace_and_remove(self, vector_index):
+        vectors = _vectors(20)
+        vector_index.add(list(range(20)), vectors)
+
+        vector_index.add([0], [vectors[19]])
+        assert len(vector_index) == 20
+        assert {chunk_id for chunk_id, _ in vector_index.search(vectors[19], 2)} == {0, 19}
+
+        assert vector_index.remove([0, 19, 1000]) == 2
+        assert len(vector_index) == 18
+        assert 19 not in vector_index
+        assert all(chunk_id not in (0, 19) for chunk_id, _ in vector_index.search(vectors[19], 5))
+
+    def test_dimension_mismatch_is_rejected(self, vector_index):
+        vector_index.add([1], _vectors(1))
+        with pytest.raises(ValueError):
+            vector_index.search([1.0, 2.0], 1)
+
+
+def test_hnsw_recall_against_exact_scan():
+    index = HNSWVectorIndex(dimension=16, seed=3)
+    index.add(list(range(2000)), _vectors(2000), _metadata(2000))
+
+    report = measure_index_recall(index, _vectors(30, seed=1), top_k=10)
+    assert report['recall_at_k'] >= 0.9
+
+    filtered = measure_index_recall(index, _vectors(10, seed=2), top_k=10, filters={'user_id': '2'})
+    assert filtered['recall_at_k'] >= 0.9
+
+
+class TestIndexSync:
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine('sqlite://')
+        create_rag_tables(engine)
+        return engine
+
+    @pytest.fixture
+    def indexes(self):
+        vector_index, keyword_index = NumpyVectorIndex(dimension=4), KeywordIndex()
+        register_index(vector_index)
+        register_index(keyword_index)
+        yield vector_index, keyword_index
+        unregister_index(vector_index)
+        unregister_index(keyword_index)
+
+    @staticmethod
+    def _chunk(index: int, content: str) -> DocumentChunk:
+        return DocumentChunk(
+            document_id='doc', chunk_index=index, content=content, content_hash=str(index),
+            source_type='resume', word_count=len(content.split()), char_count=len(content)
+        )
+
+    def test_committed_rows_are_indexed(self, engine, indexes):
+        vector_index, keyword_index = indexes
+        with Session(engine) as session:
+            chunk = self._chunk(0, "alpha beta")
+            session.add(chunk)
+            session.flush()
+            session.add(EmbeddingStore(chunk_id=chunk.id, document_id='doc', source_type='resume',
+                                       embedding=encode_embedding([1.0, 0.0, 0.0, 0.0])))
+            session.commit()
+
+            assert chunk.id in vector_index
+            assert [chunk_id for chunk_id, _ in keyword_index.search("alpha", 5)] == [chunk.id]
+
+    def test_rolled_back_rows_are_not_indexed(self, engine, indexes):
+        vector_index, keyword_index = indexes
+        with Session(engine) as session:
+            session.add(self._chunk(0, "gamma"))
+            session.flush()
+            session.rollback()
+
+        assert len(keyword_index) == 0 and len(vector_index) == 0
+
+    def test_updates_replace_the_old_key(self, engine, indexes):
+        vector_index, keyword_index = indexes
+        with Session(engine) as session:
+            first, second = self._chunk(0, "alpha"), self._chunk(1, "beta")
+            session.add_all([first, second])
+            session.flush()
+            embedding = EmbeddingStore(chunk_id=first.id, document_id='doc', source_type='resume',
+                                       embedding=encode_embedding([1.0, 0.0, 0.0, 0.0]))
+            session.add(embedding)
+            session.commit()
+
+            # Attributes are expired after commit, so the old key is only known from the loaded history
+            embedding.chunk_id = second.id
+            first.content = "delta"
+            session.commit()
+
+            assert vector_index.chunk_ids() == [second.id]
+            assert [chunk_id for chunk_id, _ in keyword_index.search("delta", 5)] == [first.id]
+            assert not keyword_index.search("alpha", 5)
+
+    def test_a_failing_change_does_not_drop_the_others(self, engine, indexes):
+        vector_index, _ = indexes
+        with Session(engine) as session:
+            chunks = [self._chunk(i, f"chunk {i}") for i in range(3)]
+            session.add_all(chunks)
+            session.flush()
+            for chunk, embedding in zip(chunks, ([1.0, 0.0, 0.0, 0.0], [1.0, 0.0], [0.0, 1.0, 0.0, 0.0])):
+                session.add(EmbeddingStore(chunk_id=chunk.id, document_id='doc', source_type='resume',
+                                           embedding=encode_embedding(embedding)))
+            session.commit()
+
+            # The 2-dimensional embedding is rejected by the index; the chunk after it still goes in
+            assert sorted(vector_index.chunk_ids()) == [chunks[0].id, chunks[2].id]
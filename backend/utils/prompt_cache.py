@@ -0,0 +1,95 @@
+"""
+Compiled prompt cache for RecruAI AI chat
+Keeps prompts that are expensive to assemble from database rows, tagged by
+the rows they were built from so an update to any of them drops the prompt.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+
+class CompiledPromptCache:
+    """Thread-safe LRU cache of compiled prompts with a TTL and tag invalidation"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 600):
+        """
+        Args:
+            max_entries: Prompts kept before the least recently used is evicted
+            ttl_seconds: Upper bound on a prompt's age, covering updates made
+                by other processes, which cannot invalidate this cache
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self._metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics['hits'] += 1
+            return entry['prompt']
+
+    def set(self, key: Hashable, prompt: str, tags: Iterable[Hashable] = ()) -> None:
+        """Cache a prompt, dropped when any of its tags is invalidated"""
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._remove(key)
+            tags = set(tags)
+            self._entries[key] = {'prompt': prompt, 'tags': tags, 'expires_at': time.monotonic() + self.ttl_seconds}
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tag: Hashable) -> int:
+        """Drop every prompt built from the tagged row; returns how many were dropped"""
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._remove(key)
+            self._metrics['invalidations'] += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics['hits'] + metrics['misses']
+        return {
+            **metrics,
+            'size': len(self._entries),
+            'limit': self.max_entries,
+            'hit_rate': metrics['hits'] / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry and its tag references (lock held)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry['tags']:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
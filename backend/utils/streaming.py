@@ -0,0 +1,32 @@
+"""
+Server-Sent Events helpers for RecruAI API endpoints
+Streams generator output to the browser as text/event-stream responses.
+"""
+
+import json
+from typing import Any, Iterable, Optional
+
+from flask import Response, stream_with_context
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Event; data is sent as JSON"""
+    message = f"data: {json.dumps(data, default=str)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+def sse_response(events: Iterable[str]) -> Response:
+    """
+    Stream already formatted events, keeping the request context available
+    to the generator and asking proxies not to buffer the response
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
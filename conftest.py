@@ -0,0 +1,38 @@
+"""
+Test environment for the backend suite (backend/tests).
+backend.app builds the app and its AI providers from the environment when it
+is imported, so the test settings are exported and the app built here, before
+any test module is collected:
+an in-memory SQLite database, dummy provider keys and temporary upload and
+extraction directories. No request leaves the process.
+
+The legacy backend/test_*.py scripts rewrite os.environ when they are
+collected, so the same settings are pinned again for every test.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+TEST_ENV = {
+    "DATABASE_URL": "sqlite://",
+    "AI_PROVIDER": "groq",
+    "GROQ_API_KEY": "test",
+    "OPENAI_API_KEY": "test",
+    "EMBEDDING_PROVIDER": "openai",
+    "EMBEDDING_DIMENSIONS": "8",
+    "RAG_EMBEDDING_CACHE": "memory",
+    "RAG_JOB_UPLOAD_DIR": tempfile.mkdtemp(prefix="rag-uploads-"),
+    "RAG_EXTRACTION_CACHE_DIR": tempfile.mkdtemp(prefix="rag-extraction-"),
+}
+
+os.environ.update(TEST_ENV)
+
+import backend.app  # noqa: E402,F401
+
+
+@pytest.fixture(autouse=True)
+def test_env(monkeypatch):
+    for key, value in TEST_ENV.items():
+        monkeypatch.setenv(key, value)